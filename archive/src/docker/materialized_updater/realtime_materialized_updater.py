@@ -1,3 +1,4 @@
+import bisect
 import mysql.connector
 import logging
 import time
@@ -14,6 +15,21 @@ import os
 sys.path.append('/mnt/e/git/crypto-data-collection')
 from enhanced_ml_calculations import AdvancedMLCalculator
 from shared.database_config import get_db_config
+from shared.query_builder import (
+    crypto_sentiment_assets_hourly_query,
+    crypto_sentiment_hourly_query,
+    date_span_bounds,
+    day_bounds,
+    hourly_prices_query,
+    latest_ohlc_query,
+    latest_per_day_query,
+    onchain_span_query,
+    range_predicate,
+    social_sentiment_by_symbol_hourly_query,
+    social_sentiment_hourly_query,
+    stock_sentiment_hourly_query,
+    technical_span_query,
+)
 
 # Set up logging
 logging.basicConfig(
@@ -21,6 +37,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Set-based mode: size of each time window and of each multi-row upsert
+SET_BASED_WINDOW_HOURS = int(os.getenv("MATERIALIZED_WINDOW_HOURS", "24"))
+SET_BASED_SYMBOL_BATCH = int(os.getenv("MATERIALIZED_SYMBOL_BATCH", "100"))
+UPSERT_BATCH_SIZE = int(os.getenv("MATERIALIZED_UPSERT_BATCH", "500"))
+# How far back macro values may be carried forward (monthly series need ~31 days)
+MACRO_ASOF_LOOKBACK_DAYS = int(os.getenv("MATERIALIZED_MACRO_LOOKBACK_DAYS", "45"))
+
+MACRO_FIELDS = [
+    "vix",
+    "spx",
+    "dxy",
+    "tnx",
+    "treasury_10y",
+    "fed_funds_rate",
+    "gold_price",
+    "oil_price",
+    "unemployment_rate",
+    "inflation_rate",
+]
+
+# Source column in technical_indicators -> columns in ml_features_materialized
+TECH_FIELDS_MAPPING = {
+    "rsi_14": ["rsi_14"],
+    "sma_20": ["sma_20"],
+    "sma_50": ["sma_50"],
+    "ema_12": ["ema_12"],
+    "ema_26": ["ema_26"],
+    "macd": ["macd", "macd_line"],
+    "macd_signal": ["macd_signal"],
+    "macd_histogram": ["macd_histogram"],
+    "bb_upper": ["bb_upper"],
+    "bb_middle": ["bb_middle"],
+    "bb_lower": ["bb_lower"],
+    "stoch_k": ["stoch_k"],
+    "stoch_d": ["stoch_d"],
+    "atr_14": ["atr_14"],
+    "vwap": ["vwap"],
+}
+
+# Columns the set-based upsert always overwrites (the row path does the same);
+# OHLC is only overwritten with non-null values, everything else is fill-missing.
+OVERWRITE_FIELDS = [
+    "social_post_count",
+    "social_avg_sentiment",
+    "social_avg_confidence",
+    "social_unique_authors",
+]
+OHLC_FIELDS = ["open_price", "high_price", "low_price", "close_price", "ohlc_source"]
+KEY_FIELDS = ["symbol", "price_date", "price_hour"]
+
 
 class RealTimeMaterializedTableUpdater:
 
@@ -131,21 +197,7 @@ class RealTimeMaterializedTableUpdater:
 
             # Get daily OHLC data for the date (ignore hour since OHLC is daily)
             # Use the most recent OHLC data for that day
-            query = """
-            SELECT 
-                open_price,
-                high_price,
-                low_price,
-                close_price,
-                volume as ohlc_volume,
-                data_source as ohlc_source
-            FROM ohlc_data 
-            WHERE symbol = %s 
-            AND DATE(timestamp_iso) = %s
-            ORDER BY timestamp_iso DESC
-            LIMIT 1
-            """
-            cursor.execute(query, (symbol, date.date()))
+            cursor.execute(latest_ohlc_query(), (symbol, *day_bounds(date)))
             result = cursor.fetchone()
             cursor.close()
             conn.close()
@@ -214,7 +266,7 @@ class RealTimeMaterializedTableUpdater:
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor(dictionary=True)
-            query = """
+            query = f"""
             SELECT 
                 COUNT(*) as sentiment_count,
                 AVG(cryptobert_score) as avg_cryptobert_score,
@@ -222,10 +274,9 @@ class RealTimeMaterializedTableUpdater:
                 AVG(textblob_score) as avg_textblob_score,
                 AVG(crypto_keywords_score) as avg_crypto_keywords_score
             FROM crypto_news.crypto_sentiment_data 
-            WHERE DATE(published_at) = %s
-            AND published_at IS NOT NULL
+            WHERE {range_predicate("published_at")}
             """
-            cursor.execute(query, (date.date(),))
+            cursor.execute(query, day_bounds(date))
             result = cursor.fetchone()
             cursor.close()
             conn.close()
@@ -246,7 +297,7 @@ class RealTimeMaterializedTableUpdater:
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor(dictionary=True)
-            query = """
+            query = f"""
             SELECT 
                 COUNT(*) as sentiment_count,
                 AVG(finbert_sentiment_score) as avg_finbert_sentiment_score,
@@ -255,10 +306,9 @@ class RealTimeMaterializedTableUpdater:
                 AVG(risk_appetite_score) as avg_risk_appetite,
                 AVG(crypto_correlation_score) as avg_crypto_correlation
             FROM stock_market_news.stock_market_sentiment_data 
-            WHERE DATE(published_at) = %s
-            AND published_at IS NOT NULL
+            WHERE {range_predicate("published_at")}
             """
-            cursor.execute(query, (date.date(),))
+            cursor.execute(query, day_bounds(date))
             result = cursor.fetchone()
             cursor.close()
             conn.close()
@@ -616,18 +666,7 @@ class RealTimeMaterializedTableUpdater:
         try:
             tech_conn = self.get_db_connection()
             tech_cursor = tech_conn.cursor(dictionary=True)
-            tech_query = """
-            SELECT 
-                symbol, timestamp_iso, DATE(timestamp_iso) as tech_date,
-                rsi_14, sma_20, sma_50, sma_30, sma_200, ema_12, ema_20, ema_26, ema_50, ema_200,
-                macd, macd_signal, macd_histogram,
-                bb_upper, bb_middle, bb_lower, stoch_k, stoch_d, atr_14, vwap
-            FROM technical_indicators 
-            WHERE symbol = %s 
-            AND DATE(timestamp_iso) >= %s AND DATE(timestamp_iso) <= %s
-            ORDER BY timestamp_iso DESC
-            """
-            tech_cursor.execute(tech_query, (symbol, start_time, end_time))
+            tech_cursor.execute(technical_span_query(), (symbol, *date_span_bounds(start_time, end_time)))
             for row in tech_cursor.fetchall():
                 # Use (symbol, date) as key - keep latest timestamp for each date
                 key = (symbol, row["tech_date"])
@@ -685,40 +724,12 @@ class RealTimeMaterializedTableUpdater:
             crypto_conn = self.get_db_connection()
             crypto_cursor = crypto_conn.cursor(dictionary=True)
             # Coin-specific sentiment
-            coin_query = """
-            SELECT 
-                asset, DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
-                COUNT(*) as sentiment_count,
-                AVG(cryptobert_score) as avg_cryptobert_score,
-                AVG(vader_score) as avg_vader_score,
-                AVG(textblob_score) as avg_textblob_score,
-                AVG(crypto_keywords_score) as avg_crypto_keywords_score
-            FROM crypto_news.crypto_sentiment_data 
-            WHERE DATE(published_at) >= %s AND DATE(published_at) <= %s
-            AND published_at IS NOT NULL
-            AND asset IS NOT NULL AND asset != 'crypto_general'
-            GROUP BY asset, sent_date, sent_hour
-            """
-            crypto_cursor.execute(coin_query, (start_time, end_time))
+            crypto_cursor.execute(crypto_sentiment_hourly_query(per_asset=True), date_span_bounds(start_time, end_time))
             for row in crypto_cursor.fetchall():
                 key = (row["asset"], row["sent_date"], row["sent_hour"])
                 coin_sent_lookup[key] = row
             # General crypto sentiment
-            general_query = """
-            SELECT 
-                DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
-                COUNT(*) as sentiment_count,
-                AVG(cryptobert_score) as avg_cryptobert_score,
-                AVG(vader_score) as avg_vader_score,
-                AVG(textblob_score) as avg_textblob_score,
-                AVG(crypto_keywords_score) as avg_crypto_keywords_score
-            FROM crypto_news.crypto_sentiment_data 
-            WHERE DATE(published_at) >= %s AND DATE(published_at) <= %s
-            AND published_at IS NOT NULL
-            AND asset = 'crypto_general'
-            GROUP BY sent_date, sent_hour
-            """
-            crypto_cursor.execute(general_query, (start_time, end_time))
+            crypto_cursor.execute(crypto_sentiment_hourly_query(per_asset=False), date_span_bounds(start_time, end_time))
             for row in crypto_cursor.fetchall():
                 key = (row["sent_date"], row["sent_hour"])
                 general_sent_lookup[key] = row
@@ -769,8 +780,8 @@ class RealTimeMaterializedTableUpdater:
                 debug_conn = self.get_db_connection()
                 debug_cursor = debug_conn.cursor()
                 debug_cursor.execute(
-                    "SELECT DISTINCT asset FROM crypto_news.social_sentiment_data WHERE DATE(timestamp) >= %s AND DATE(timestamp) <= %s",
-                    (start_time, end_time),
+                    f"SELECT DISTINCT asset FROM crypto_news.social_sentiment_data WHERE {range_predicate('timestamp')}",
+                    date_span_bounds(start_time, end_time),
                 )
                 unique_assets = [row[0] for row in debug_cursor.fetchall()]
                 logger.info(
@@ -799,33 +810,21 @@ class RealTimeMaterializedTableUpdater:
                     print(
                         f"[DEBUG] {symbol}: Error fetching unique assets for debug: {e}"
                     )
-            format_strings = ",".join(["%s"] * len(sentiment_assets))
-            # Use LOWER(asset) for case-insensitive matching
-            social_query = f"""
-            SELECT
-                DATE(timestamp) AS price_date,
-                HOUR(timestamp) AS price_hour,
-                COUNT(*) AS social_post_count,
-                AVG(sentiment_score) AS social_avg_sentiment,
-                AVG(confidence) AS social_avg_confidence,
-                COUNT(DISTINCT author) AS social_unique_authors
-            FROM crypto_news.social_sentiment_data
-            WHERE LOWER(asset) IN ({format_strings}) AND timestamp IS NOT NULL
-                AND DATE(timestamp) >= %s AND DATE(timestamp) <= %s
-            GROUP BY price_date, price_hour
-            """
+            # Aliases are matched against LOWER(asset) for case-insensitive matching
+            social_query = social_sentiment_hourly_query(len(sentiment_assets))
+            social_bounds = date_span_bounds(start_time, end_time)
             if symbol in ("ETH", "BTC"):
                 print(
                     f"[DEBUG] {symbol}: Running social sentiment query: {social_query}"
                 )
                 print(
-                    f"[DEBUG] {symbol}: Query params: {(*sentiment_assets, start_time, end_time)}"
+                    f"[DEBUG] {symbol}: Query params: {(*sentiment_assets, *social_bounds)}"
                 )
             logger.info(
                 f"🔎 {symbol}: Running social sentiment query with aliases: {sentiment_assets}"
             )
             crypto_cursor.execute(
-                social_query, (*sentiment_assets, start_time, end_time)
+                social_query, (*sentiment_assets, *social_bounds)
             )
             found_any = False
             for row in crypto_cursor.fetchall():
@@ -851,21 +850,7 @@ class RealTimeMaterializedTableUpdater:
         try:
             stock_conn = self.get_db_connection()
             stock_cursor = stock_conn.cursor(dictionary=True)
-            stock_query = """
-            SELECT 
-                DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
-                COUNT(*) as sentiment_count,
-                AVG(finbert_sentiment_score) as avg_finbert_sentiment_score,
-                AVG(fear_greed_score) as avg_fear_greed_score,
-                AVG(volatility_sentiment) as avg_volatility_sentiment,
-                AVG(risk_appetite) as avg_risk_appetite,
-                AVG(crypto_correlation) as avg_crypto_correlation
-            FROM crypto_news.stock_sentiment_data 
-            WHERE DATE(published_at) >= %s AND DATE(published_at) <= %s
-            AND published_at IS NOT NULL
-            GROUP BY sent_date, sent_hour
-            """
-            stock_cursor.execute(stock_query, (start_time, end_time))
+            stock_cursor.execute(stock_sentiment_hourly_query(), date_span_bounds(start_time, end_time))
             for row in stock_cursor.fetchall():
                 key = (row["sent_date"], row["sent_hour"])
                 stock_sent_lookup[key] = row
@@ -879,22 +864,7 @@ class RealTimeMaterializedTableUpdater:
         try:
             onchain_conn = self.get_db_connection()
             onchain_cursor = onchain_conn.cursor(dictionary=True)
-            onchain_query = """
-            SELECT 
-                coin_symbol as symbol,
-                DATE(timestamp) as onchain_date,
-                active_addresses_24h,
-                transaction_count_24h,
-                exchange_net_flow_24h,
-                price_volatility_7d
-            FROM crypto_onchain_data 
-            WHERE coin_symbol = %s 
-            AND DATE(timestamp) >= %s AND DATE(timestamp) <= %s
-            AND active_addresses_24h IS NOT NULL
-            AND transaction_count_24h IS NOT NULL
-            ORDER BY timestamp DESC
-            """
-            onchain_cursor.execute(onchain_query, (symbol, start_time, end_time))
+            onchain_cursor.execute(onchain_span_query(), (symbol, *date_span_bounds(start_time, end_time)))
             for row in onchain_cursor.fetchall():
                 # Use (symbol, date) as key - keep latest timestamp for each date
                 key = (symbol, row["onchain_date"])
@@ -1357,12 +1327,458 @@ class RealTimeMaterializedTableUpdater:
         )
         return processed_count
 
+    # --- Set-based mode ---
+    #
+    # Builds every (symbol, hour) row of a time window from a fixed number of
+    # range queries (one per source table) and writes it back with multi-row
+    # upserts, instead of per-row lookups and SELECT-then-UPDATE round trips.
+
+    @staticmethod
+    def _clean_rows(rows):
+        cleaned_rows = []
+        for row in rows:
+            cleaned_row = {}
+            for key, value in row.items():
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8")
+                cleaned_row[key] = value
+            cleaned_rows.append(cleaned_row)
+        return cleaned_rows
+
+    def get_feature_columns(self, cursor):
+        """Columns of ml_features_materialized; upserts only write these (cached)."""
+        if getattr(self, "_feature_columns", None) is None:
+            cursor.execute("SHOW COLUMNS FROM ml_features_materialized")
+            columns = set()
+            for row in self._clean_rows(cursor.fetchall()):
+                name = row["Field"]
+                columns.add(name.decode("utf-8") if isinstance(name, bytes) else name)
+            self._feature_columns = columns
+        return self._feature_columns
+
+    def get_sentiment_aliases(self, cursor, symbols):
+        """Map lowercased symbol/name/alias -> canonical symbol for the given symbols."""
+        import json
+
+        placeholders = ",".join(["%s"] * len(symbols))
+        cursor.execute(
+            f"SELECT symbol, name, aliases FROM crypto_assets WHERE symbol IN ({placeholders})",
+            tuple(symbols),
+        )
+        alias_map = {symbol.lower(): symbol for symbol in symbols}
+        for row in self._clean_rows(cursor.fetchall()):
+            symbol = row["symbol"]
+            names = [row.get("name")]
+            if row.get("aliases"):
+                try:
+                    names.extend(json.loads(row["aliases"]))
+                except Exception as e:
+                    logger.error(f"Error parsing aliases for {symbol}: {e}")
+            for name in names:
+                if not name:
+                    continue
+                # Aliases are expected to be unique; the first claim wins
+                alias_map.setdefault(str(name).lower(), symbol)
+        return alias_map
+
+    def fetch_hourly_prices(self, cursor, symbols, window_start, window_end):
+        """Latest price per (symbol, hour) in the window, joined to the price of
+        the same hour bucket one day earlier."""
+        cursor.execute(
+            hourly_prices_query(len(symbols)),
+            (*symbols, window_start - timedelta(days=1), window_end, window_start),
+        )
+        return self._clean_rows(cursor.fetchall())
+
+    def fetch_latest_per_day(
+        self, cursor, table, symbol_column, time_column, columns, symbols,
+        range_start, range_end, extra_where="",
+    ):
+        """Latest row per (symbol, day) of a daily source, keyed by (symbol, date)."""
+        query = latest_per_day_query(
+            table, symbol_column, time_column, columns, len(symbols), extra_where
+        )
+        cursor.execute(query, (*symbols, range_start, range_end))
+        return {
+            (row["symbol"], row["source_date"]): row
+            for row in self._clean_rows(cursor.fetchall())
+        }
+
+    def fetch_macro_asof(self, cursor, range_start, range_end):
+        """Daily macro values carried forward, so each date sees the latest
+        value published on or before it. Returns (sorted dates, values by date)."""
+        query = """
+        SELECT 
+            indicator_date as macro_date,
+            MAX(CASE WHEN indicator_name = 'VIX' THEN value END) as vix,
+            MAX(CASE WHEN indicator_name = 'SPX' THEN value END) as spx,
+            MAX(CASE WHEN indicator_name = 'DXY' THEN value END) as dxy,
+            MAX(CASE WHEN indicator_name = 'TNX' THEN value END) as tnx,
+            MAX(CASE WHEN indicator_name = '10Y_YIELD' THEN value END) as tnx_alt,
+            MAX(CASE WHEN indicator_name = 'FEDERAL_FUNDS_RATE' THEN value END) as fed_funds_rate,
+            MAX(CASE WHEN indicator_name = 'Fed_Funds_Rate' THEN value END) as fed_funds_rate_alt,
+            MAX(CASE WHEN indicator_name = 'GOLD_PRICE' THEN value END) as gold_price,
+            MAX(CASE WHEN indicator_name = 'OIL_PRICE' THEN value END) as oil_price,
+            MAX(CASE WHEN indicator_name = 'US_UNEMPLOYMENT' THEN value END) as unemployment_rate,
+            MAX(CASE WHEN indicator_name = 'US_INFLATION' THEN value END) as inflation_rate,
+            MAX(CASE WHEN indicator_name = 'Treasury_10Y' THEN value END) as treasury_10y
+        FROM macro_indicators 
+        WHERE indicator_date >= %s AND indicator_date < %s
+        GROUP BY indicator_date
+        ORDER BY indicator_date
+        """
+        cursor.execute(query, (range_start, range_end))
+        carried = {}
+        dates = []
+        values_by_date = {}
+        for row in self._clean_rows(cursor.fetchall()):
+            if row.get("tnx_alt") and not row.get("tnx"):
+                row["tnx"] = row["tnx_alt"]
+            if row.get("fed_funds_rate_alt") and not row.get("fed_funds_rate"):
+                row["fed_funds_rate"] = row["fed_funds_rate_alt"]
+            for field in MACRO_FIELDS:
+                if row.get(field) is not None:
+                    carried[field] = row[field]
+            dates.append(row["macro_date"])
+            values_by_date[row["macro_date"]] = dict(carried)
+        return dates, values_by_date
+
+    def fetch_sentiment_by_hour(self, cursor, symbols, window_start, window_end, alias_map):
+        """Coin, general, stock and social sentiment aggregated per hour bucket."""
+        lookups = {"coin": {}, "general": {}, "stock": {}, "social": {}}
+
+        assets = list(symbols) + ["crypto_general"]
+        cursor.execute(
+            crypto_sentiment_assets_hourly_query(len(assets)),
+            (window_start, window_end, *assets),
+        )
+        for row in self._clean_rows(cursor.fetchall()):
+            if row["asset"] == "crypto_general":
+                lookups["general"][(row["sent_date"], row["sent_hour"])] = row
+            else:
+                lookups["coin"][(row["asset"], row["sent_date"], row["sent_hour"])] = row
+
+        cursor.execute(stock_sentiment_hourly_query(), (window_start, window_end))
+        for row in self._clean_rows(cursor.fetchall()):
+            lookups["stock"][(row["sent_date"], row["sent_hour"])] = row
+
+        # Map every alias to its symbol in SQL so COUNT(DISTINCT author) spans aliases
+        aliases = list(alias_map)
+        case_params = [value for alias in aliases for value in (alias, alias_map[alias])]
+        cursor.execute(
+            social_sentiment_by_symbol_hourly_query(len(aliases)),
+            (*case_params, window_start, window_end, *aliases),
+        )
+        for row in self._clean_rows(cursor.fetchall()):
+            lookups["social"][(row["symbol"], row["price_date"], row["price_hour"])] = row
+
+        return lookups
+
+    def build_feature_record(self, price_row, sources):
+        """Assemble one ml_features_materialized row from pre-fetched sources."""
+        symbol = price_row["symbol"]
+        timestamp_iso = price_row["timestamp_iso"]
+        price_date = price_row["price_date"]
+        price_hour = price_row["price_hour"]
+        current_price = price_row.get("current_price")
+
+        volume_usd_24h = price_row.get("volume_usd_24h")
+        volume_24h = volume_usd_24h if volume_usd_24h else None
+
+        price_change_24h = price_row.get("price_change_24h")
+        price_change_percentage_24h = price_row.get("price_change_percentage_24h")
+        prev_price = price_row.get("price_24h_ago")
+        if (
+            price_change_24h is None or price_change_percentage_24h is None
+        ) and current_price and prev_price:
+            prev_price = float(prev_price)
+            change = float(current_price) - prev_price
+            change_pct = (change / prev_price) * 100
+            # Same sanity limit as calculate_price_change_24h
+            if abs(change_pct) <= 1000:
+                price_change_24h = round(change, 8)
+                price_change_percentage_24h = round(change_pct, 6)
+
+        record = {
+            "symbol": symbol,
+            "price_date": price_date,
+            "price_hour": price_hour,
+            "timestamp_iso": timestamp_iso,
+            "current_price": current_price,
+            "volume_24h": volume_24h,
+            "hourly_volume": None,
+            "market_cap": price_row.get("market_cap"),
+            "price_change_24h": price_change_24h,
+            "price_change_percentage_24h": price_change_percentage_24h,
+        }
+
+        ohlc = sources["ohlc"].get((symbol, price_date))
+        if ohlc:
+            for field in OHLC_FIELDS + ["ohlc_volume"]:
+                record[field] = ohlc.get(field)
+
+        tech = sources["technical"].get((symbol, price_date))
+        if tech:
+            for source_field, dest_fields in TECH_FIELDS_MAPPING.items():
+                if tech.get(source_field) is not None:
+                    for dest_field in dest_fields:
+                        record[dest_field] = tech[source_field]
+
+        macro_dates = sources["macro_dates"]
+        index = bisect.bisect_right(macro_dates, price_date)
+        if index:
+            macro = sources["macro"][macro_dates[index - 1]]
+            for field in MACRO_FIELDS:
+                if macro.get(field) is not None:
+                    record[field] = macro[field]
+
+        coin_sentiment = sources["sentiment"]["coin"].get((symbol, price_date, price_hour))
+        record["crypto_sentiment_count"] = (coin_sentiment or {}).get("sentiment_count", 0)
+        for field in [
+            "avg_cryptobert_score",
+            "avg_vader_score",
+            "avg_textblob_score",
+            "avg_crypto_keywords_score",
+        ]:
+            record[field] = (coin_sentiment or {}).get(field)
+
+        general_sentiment = sources["sentiment"]["general"].get((price_date, price_hour))
+        record["general_crypto_sentiment_count"] = (general_sentiment or {}).get(
+            "sentiment_count", 0
+        )
+        for field in [
+            "cryptobert_score",
+            "vader_score",
+            "textblob_score",
+            "crypto_keywords_score",
+        ]:
+            record[f"avg_general_{field}"] = (general_sentiment or {}).get(f"avg_{field}")
+
+        stock_sentiment = sources["sentiment"]["stock"].get((price_date, price_hour))
+        record["stock_sentiment_count"] = (stock_sentiment or {}).get("sentiment_count", 0)
+        for field in [
+            "avg_finbert_sentiment_score",
+            "avg_fear_greed_score",
+            "avg_volatility_sentiment",
+            "avg_risk_appetite",
+            "avg_crypto_correlation",
+        ]:
+            record[field] = (stock_sentiment or {}).get(field)
+
+        social = sources["sentiment"]["social"].get((symbol, price_date, price_hour)) or {}
+        record["social_post_count"] = social.get("social_post_count") or 0
+        record["social_avg_sentiment"] = social.get("social_avg_sentiment")
+        record["social_avg_confidence"] = social.get("social_avg_confidence")
+        record["social_unique_authors"] = social.get("social_unique_authors") or 0
+
+        onchain = sources["onchain"].get((symbol, price_date))
+        if onchain:
+            for field in [
+                "active_addresses_24h",
+                "transaction_count_24h",
+                "exchange_net_flow_24h",
+                "price_volatility_7d",
+            ]:
+                record[field] = onchain.get(field)
+
+        try:
+            record.update(
+                self.ml_calculator.calculate_advanced_ml_indicators(
+                    symbol, timestamp_iso, record
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error calculating advanced ML indicators for {symbol}: {e}")
+            record.update(self.ml_calculator.get_default_ml_indicators())
+
+        record["data_quality_score"] = self.calculate_data_quality_score(record)
+        return record
+
+    def upsert_feature_records(self, cursor, records):
+        """Write records with multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+
+        Matches insert_or_update_record: existing values are only filled when
+        NULL, social sentiment is always overwritten and OHLC is overwritten
+        with non-null values. In insert-only mode existing rows are left alone.
+        """
+        if not records:
+            return 0
+        feature_columns = self.get_feature_columns(cursor)
+        present = set().union(*(record.keys() for record in records))
+        columns = KEY_FIELDS + sorted(
+            c for c in present if c in feature_columns and c not in KEY_FIELDS
+        )
+
+        if getattr(self, "insert_only", False):
+            update_clause = "symbol = symbol"
+        else:
+            assignments = []
+            for column in columns[len(KEY_FIELDS):]:
+                if column in OVERWRITE_FIELDS:
+                    assignments.append(f"{column} = VALUES({column})")
+                elif column in OHLC_FIELDS:
+                    assignments.append(f"{column} = COALESCE(VALUES({column}), {column})")
+                else:
+                    assignments.append(f"{column} = COALESCE({column}, VALUES({column}))")
+            update_clause = ", ".join(assignments)
+
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        affected = 0
+        for i in range(0, len(records), UPSERT_BATCH_SIZE):
+            batch = records[i : i + UPSERT_BATCH_SIZE]
+            query = (
+                f"INSERT INTO ml_features_materialized ({', '.join(columns)}) "
+                f"VALUES {', '.join([row_placeholder] * len(batch))} "
+                f"ON DUPLICATE KEY UPDATE {update_clause}"
+            )
+            params = [record.get(column) for record in batch for column in columns]
+            cursor.execute(query, params)
+            affected += cursor.rowcount
+            self.processing_stats["total_upserted"] += len(batch)
+        return affected
+
+    def process_window_set_based(
+        self, cursor, symbols, window_start, window_end, alias_map
+    ):
+        """Build and upsert all hourly rows for a batch of symbols in one window."""
+        day_start = datetime.combine(window_start.date(), datetime.min.time())
+        price_rows = self.fetch_hourly_prices(cursor, symbols, window_start, window_end)
+        if not price_rows:
+            return 0
+
+        macro_dates, macro_values = self.fetch_macro_asof(
+            cursor,
+            window_start.date() - timedelta(days=MACRO_ASOF_LOOKBACK_DAYS),
+            window_end.date() + timedelta(days=1),
+        )
+        sources = {
+            "ohlc": self.fetch_latest_per_day(
+                cursor,
+                "ohlc_data",
+                "symbol",
+                "timestamp_iso",
+                [
+                    "open_price",
+                    "high_price",
+                    "low_price",
+                    "close_price",
+                    "volume AS ohlc_volume",
+                    "data_source AS ohlc_source",
+                ],
+                symbols,
+                day_start,
+                window_end,
+            ),
+            "technical": self.fetch_latest_per_day(
+                cursor,
+                "technical_indicators",
+                "symbol",
+                "timestamp_iso",
+                list(TECH_FIELDS_MAPPING),
+                symbols,
+                day_start,
+                window_end,
+            ),
+            "onchain": self.fetch_latest_per_day(
+                cursor,
+                "crypto_onchain_data",
+                "coin_symbol",
+                "timestamp",
+                [
+                    "active_addresses_24h",
+                    "transaction_count_24h",
+                    "exchange_net_flow_24h",
+                    "price_volatility_7d",
+                ],
+                symbols,
+                day_start,
+                window_end,
+                "AND active_addresses_24h IS NOT NULL AND transaction_count_24h IS NOT NULL",
+            ),
+            "macro_dates": macro_dates,
+            "macro": macro_values,
+            "sentiment": self.fetch_sentiment_by_hour(
+                cursor,
+                symbols,
+                window_start,
+                window_end,
+                alias_map,
+            ),
+        }
+
+        records = [self.build_feature_record(row, sources) for row in price_rows]
+        self.upsert_feature_records(cursor, records)
+        return len(records)
+
+    def process_updates_set_based(self, symbols):
+        """Set-based update of ml_features_materialized for the configured date range.
+
+        Each window of MATERIALIZED_WINDOW_HOURS is built from a fixed number of
+        range queries per symbol batch, independent of how many rows it contains.
+        """
+        start_date = getattr(
+            self, "start_date", (datetime.now() - timedelta(days=7)).date()
+        )
+        end_date = getattr(self, "end_date", datetime.now().date())
+        range_start = datetime.combine(start_date, datetime.min.time())
+        # end_date is inclusive, like get_new_price_data
+        range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        window = timedelta(hours=SET_BASED_WINDOW_HOURS)
+
+        processed_count = 0
+        conn = self.get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            symbol_batches = [
+                symbols[i : i + SET_BASED_SYMBOL_BATCH]
+                for i in range(0, len(symbols), SET_BASED_SYMBOL_BATCH)
+            ]
+            alias_maps = [
+                self.get_sentiment_aliases(cursor, batch) for batch in symbol_batches
+            ]
+            window_start = range_start
+            while window_start < range_end:
+                window_end = min(window_start + window, range_end)
+                for batch, alias_map in zip(symbol_batches, alias_maps):
+                    try:
+                        count = self.process_window_set_based(
+                            cursor, batch, window_start, window_end, alias_map
+                        )
+                    except Exception as e:
+                        error_msg = str(e)
+                        if "Lock wait timeout" in error_msg or "1205" in error_msg:
+                            logger.warning(
+                                f"⚠️  Lock timeout for window {window_start}, skipping {len(batch)} symbols"
+                            )
+                            continue
+                        raise
+                    processed_count += count
+                    self.processing_stats["total_processed"] += count
+                logger.info(
+                    f"Window {window_start} - {window_end}: {processed_count} records processed so far"
+                )
+                window_start = window_end
+        finally:
+            cursor.close()
+            conn.close()
+        return processed_count
+
     def run_update_cycle(self):
         """Run one complete update cycle for all symbols"""
         start_time = datetime.now()
         total_processed = 0
         logger.info("Starting materialized table update cycle...")
-        for symbol in self.symbols:
+        row_symbols = self.symbols
+        if self.update_mode == "set":
+            row_symbols = []
+            try:
+                total_processed = self.process_updates_set_based(self.symbols)
+            except Exception as e:
+                logger.error(f"❌ Error in set-based update: {e}")
+                import traceback
+
+                logger.error(f"Traceback: {traceback.format_exc()}")
+        for symbol in row_symbols:
             try:
                 logger.info(f"Beginning update for symbol: {symbol}")
                 # You must implement process_symbol_updates or copy it from the original script
@@ -1408,11 +1824,14 @@ class RealTimeMaterializedTableUpdater:
         # Database config removed - using shared connection pool
         self.symbols = self.load_symbols_from_db()
         self.running = True
+        # "set" builds hourly batches with joined range queries; "row" is the per-record path
+        self.update_mode = os.getenv("MATERIALIZED_UPDATE_MODE", "set")
         self.last_processed_timestamps = {}
         self.processing_stats = {
             "total_processed": 0,
             "total_inserted": 0,
             "total_updated": 0,
+            "total_upserted": 0,
             "last_run": None,
             "processing_time": 0,
         }
@@ -1559,6 +1978,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Update records if new data fills missing fields (default behavior)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["set", "row"],
+        help="Update mode: set-based batches or per-record processing (default: MATERIALIZED_UPDATE_MODE or set)",
+    )
     parser.add_argument(
         "--insert-only",
         action="store_true",
@@ -1588,6 +2012,8 @@ if __name__ == "__main__":
     updater.end_date = end_date
     updater.update_if_changed = args.update_if_changed or not args.insert_only
     updater.insert_only = args.insert_only
+    if args.mode:
+        updater.update_mode = args.mode
     if args.status:
         updater.display_status()
     else:
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Onchain Completeness Repair
+Recompute data_completeness_percentage for stored onchain rows over any date
+range, one set-based UPDATE per chunk of days.
+
+Usage:
+    python scripts/repair_onchain_completeness.py --start 2024-01-01 --end 2024-12-31 [--symbols BTC,ETH] [--chunk-days 7]
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+
+import mysql.connector
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared.database_config import get_db_config
+from shared.onchain_completeness import recompute_onchain_completeness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute onchain completeness percentages")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last day (YYYY-MM-DD)")
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: all)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days per UPDATE statement")
+    parser.add_argument("--table", default="onchain_data")
+    args = parser.parse_args()
+
+    if args.chunk_days < 1 or args.end < args.start:
+        parser.error("--chunk-days must be positive and --end not before --start")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] if args.symbols else None
+
+    conn = mysql.connector.connect(**get_db_config())
+    cursor = conn.cursor()
+    try:
+        totals = recompute_onchain_completeness(
+            cursor, args.start, args.end, symbols=symbols,
+            chunk_days=args.chunk_days, table=args.table, commit=conn.commit,
+        )
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"✅ Recomputed completeness for {totals['rows_updated']} rows in {totals['chunks']} chunks")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Query Plan Verification
+EXPLAIN every query registered in shared.query_builder and fail if any of them
+falls back to a full scan.
+
+A table access of type ALL (full table scan) or index (full index scan) with
+no usable candidate index means the predicate is not sargable or the index it
+needs is missing, and always fails. With --strict, a full scan also fails when
+a candidate index exists but the optimizer skipped it (common on tiny CI
+tables, hence not the default).
+
+Usage:
+    python scripts/verify_query_plans.py [--apply-migrations] [--dry-run] [--strict]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import mysql.connector
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared.database_config import get_db_config
+from shared.index_migrations import apply_index_migrations
+from shared.query_builder import get_registered_queries
+
+FULL_SCAN_TYPES = {"ALL", "index"}
+MISSING_TABLE_ERRNO = 1146
+
+
+def check_plan(plan_rows, strict: bool = False):
+    """Return a list of problems found in EXPLAIN output rows (dicts)"""
+    problems = []
+    for row in plan_rows:
+        table = row.get("table") or ""
+        # Derived tables and union results are built in memory by the plan itself
+        if not table or table.startswith("<"):
+            continue
+        if row.get("type") not in FULL_SCAN_TYPES:
+            continue
+        if not row.get("possible_keys"):
+            problems.append(f"full scan of {table} (type={row.get('type')}, no usable index)")
+        elif strict:
+            problems.append(f"full scan of {table} (type={row.get('type')}, skipped {row['possible_keys']})")
+    return problems
+
+
+def verify_query_plans(cursor, strict: bool = False):
+    """EXPLAIN each registered query; returns {name: 'ok' | 'skipped: ...' | 'failed: ...'}"""
+    results = {}
+    for query in get_registered_queries():
+        try:
+            cursor.execute(f"EXPLAIN {query.sql}", query.params)
+            plan = cursor.fetchall()
+        except mysql.connector.Error as e:
+            if e.errno == MISSING_TABLE_ERRNO:
+                results[query.name] = f"skipped: {e.msg}"
+            else:
+                results[query.name] = f"failed: {e}"
+            continue
+
+        problems = check_plan(plan, strict)
+        results[query.name] = f"failed: {'; '.join(problems)}" if problems else "ok"
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify registered time-range queries use indexes")
+    parser.add_argument("--apply-migrations", action="store_true",
+                        help="Create missing composite indexes before checking plans")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --apply-migrations, only report which indexes are pending")
+    parser.add_argument("--strict", action="store_true",
+                        help="Fail on any full scan, even when a candidate index exists")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**get_db_config())
+    cursor = conn.cursor(dictionary=True)
+    failed = False
+
+    try:
+        if args.apply_migrations:
+            print("🔧 Index migrations")
+            migration_cursor = conn.cursor()
+            for key, status in apply_index_migrations(migration_cursor, dry_run=args.dry_run).items():
+                print(f"   {key}: {status}")
+                failed |= status.startswith("failed")
+            migration_cursor.close()
+
+        print("🔍 Query plans")
+        for name, status in verify_query_plans(cursor, args.strict).items():
+            icon = "✅" if status == "ok" else "⚠️" if status.startswith("skipped") else "❌"
+            print(f"   {icon} {name}: {status}")
+            failed |= status.startswith("failed")
+    finally:
+        cursor.close()
+        conn.close()
+
+    return not failed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -17,7 +17,6 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
 
-import mysql.connector
 import aiohttp
 from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
 from fastapi.responses import JSONResponse
@@ -29,9 +28,14 @@ import hashlib
 import signal
 from functools import wraps
 import asyncio
-from collections import defaultdict, deque
 import threading
 
+from shared.database_pool import DatabaseConnectionPool, AsyncDatabasePool
+from shared.rate_limiter import TokenBucketRateLimiter, get_rate_limiter, get_rate_limit_backend
+from shared.dedup_index import DedupIndex, RecordFingerprinter
+from shared.telemetry import PerformanceTelemetry, PROMETHEUS_DURATION_BUCKETS
+from shared.health_monitor import HealthSampler
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -99,32 +103,6 @@ class CircuitBreaker:
         if self.failure_count >= self.failure_threshold:
             self.state = CircuitBreakerState.OPEN
 
-class RateLimiter:
-    """Token bucket rate limiter"""
-    
-    def __init__(self, max_tokens: int = 60, refill_rate: float = 1.0):
-        self.max_tokens = max_tokens
-        self.tokens = max_tokens
-        self.refill_rate = refill_rate
-        self.last_refill = time.time()
-        self._lock = threading.Lock()
-
-    async def acquire(self, tokens: int = 1) -> bool:
-        with self._lock:
-            now = time.time()
-            elapsed = now - self.last_refill
-            self.tokens = min(self.max_tokens, self.tokens + elapsed * self.refill_rate)
-            self.last_refill = now
-            
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            return False
-
-    async def wait_for_token(self, tokens: int = 1):
-        while not await self.acquire(tokens):
-            await asyncio.sleep(0.1)
-
 class DataValidator:
     """Data validation utilities"""
     
@@ -207,6 +185,11 @@ class CollectorConfig:
     alert_webhook_url: Optional[str]
     alert_error_threshold: int
     
+    # Duplicate detection index
+    duplicate_cache_size: int = 10000
+    duplicate_cache_ttl_seconds: Optional[int] = None
+    duplicate_snapshot_path: Optional[str] = None
+    
     @classmethod
     def from_env(cls) -> 'CollectorConfig':
         """Load configuration from environment variables"""
@@ -258,7 +241,12 @@ class CollectorConfig:
             # Alerting and notifications
             enable_alerting=os.getenv('ENABLE_ALERTING', 'false').lower() == 'true',
             alert_webhook_url=os.getenv('ALERT_WEBHOOK_URL'),
-            alert_error_threshold=int(os.getenv('ALERT_ERROR_THRESHOLD', '10'))
+            alert_error_threshold=int(os.getenv('ALERT_ERROR_THRESHOLD', '10')),
+            
+            # Duplicate detection index
+            duplicate_cache_size=int(os.getenv('DUPLICATE_CACHE_SIZE', '10000')),
+            duplicate_cache_ttl_seconds=int(os.getenv('DUPLICATE_CACHE_TTL_SECONDS')) if os.getenv('DUPLICATE_CACHE_TTL_SECONDS') else None,
+            duplicate_snapshot_path=os.getenv('DUPLICATE_SNAPSHOT_PATH')
         )
 
 class BaseModel(BaseModel):
@@ -279,12 +267,18 @@ class HealthResponse(BaseModel):
     last_collection: Optional[datetime]
     last_successful_collection: Optional[datetime]
     collection_errors: int
+    health_sampled_at: Optional[datetime] = None
+    health_age_seconds: Optional[float] = None
+    health_stale: bool = False
 
 class ReadinessResponse(BaseModel):
     ready: bool
     timestamp: datetime
     service: str
     checks: Dict[str, bool]
+    health_sampled_at: Optional[datetime] = None
+    health_age_seconds: Optional[float] = None
+    health_stale: bool = False
 
 class StatusResponse(BaseModel):
     service_info: Dict[str, Any]
@@ -330,6 +324,7 @@ class PerformanceMetrics(BaseModel):
     api_latency: float
     memory_usage_mb: float
     cpu_usage_percent: float
+    operations: Dict[str, Dict[str, Any]] = {}
 
 class BaseCollector(ABC):
     """
@@ -337,6 +332,9 @@ class BaseCollector(ABC):
     Provides standardized logging, metrics, health checks, and backfill capabilities.
     """
     
+    # Fields that identify a record for duplicate detection; None uses every field
+    dedup_key_fields: Optional[Tuple[str, ...]] = None
+    
     def __init__(self, config: CollectorConfig):
         self.config = config
         self.app = FastAPI(
@@ -356,11 +354,40 @@ class BaseCollector(ABC):
         self.startup_complete = False
         
         # Additional components
-        self.rate_limiter = RateLimiter(max_tokens=config.api_rate_limit_per_minute, refill_rate=1.0) if config.enable_rate_limiting else None
+        self.rate_limiter = self._create_rate_limiter() if config.enable_rate_limiting else None
         self.circuit_breaker = CircuitBreaker(failure_threshold=config.circuit_breaker_failure_threshold, timeout=config.circuit_breaker_timeout)
         self.data_validator = DataValidator()
-        self.duplicate_hashes = deque(maxlen=10000)  # Keep track of recent data hashes
-        self.performance_metrics = defaultdict(list)
+        # Recently seen records; warm-started from the last snapshot when one is configured
+        self.dedup_index = DedupIndex(
+            max_entries=config.duplicate_cache_size,
+            ttl_seconds=config.duplicate_cache_ttl_seconds,
+            fingerprint=RecordFingerprinter(self.dedup_key_fields)
+        )
+        if config.enable_duplicate_detection and config.duplicate_snapshot_path:
+            self.dedup_index.load(config.duplicate_snapshot_path)
+        
+        # Pooled database access; connections are opened lazily on first use
+        self.db_pool = DatabaseConnectionPool(
+            connection_kwargs={
+                'host': config.mysql_host,
+                'port': config.mysql_port,
+                'user': config.mysql_user,
+                'password': config.mysql_password,
+                'database': config.mysql_database,
+                'charset': 'utf8mb4',
+                'autocommit': False,
+                'connection_timeout': config.query_timeout
+            },
+            pool_size=config.connection_pool_size,
+            checkout_timeout=config.query_timeout,
+            session_init=[f"SET SESSION max_execution_time = {config.query_timeout * 1000}"],
+            name=f"{config.service_name.replace('-', '_')}_pool"
+        )
+        self.db = AsyncDatabasePool(
+            self.db_pool,
+            query_timeout=config.query_timeout,
+            on_complete=lambda seconds, success: self.telemetry.record('db', seconds, success)
+        )
         
         # Graceful shutdown handling
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -371,9 +398,22 @@ class BaseCollector(ABC):
         self._setup_logging()
         self.logger = structlog.get_logger(service=config.service_name, session=self.session_id)
         
+        # Dependency probes run in the background; /health and /ready serve the cached snapshot
+        self.health_sampler = HealthSampler(
+            interval=config.health_check_interval,
+            probe_timeout=config.query_timeout
+        )
+        self.health_sampler.add_probe('database', self._check_database_connection)
+        self.health_sampler.add_probe('dependencies', self._check_dependencies)
+        
         # Setup metrics
         self._setup_metrics()
         
+        # Fixed-memory latency/rate telemetry per operation ('collection', 'db', 'api', ...)
+        self.telemetry = PerformanceTelemetry(
+            prometheus_histogram=self.metrics['operation_duration_seconds']
+        )
+        
         # Setup routes
         self._setup_routes()
         
@@ -439,19 +479,48 @@ class BaseCollector(ABC):
             'active_collections': Gauge(
                 f'{service_name}_active_collections',
                 'Number of active collection processes'
+            ),
+            'duplicate_checks_total': Counter(
+                f'{service_name}_duplicate_checks_total',
+                'Duplicate index lookups',
+                ['result']
+            ),
+            'duplicate_index_size': Gauge(
+                f'{service_name}_duplicate_index_size',
+                'Fingerprints held in the duplicate index'
+            ),
+            'operation_duration_seconds': Histogram(
+                f'{service_name}_operation_duration_seconds',
+                'Operation duration in seconds',
+                ['operation'],
+                buckets=PROMETHEUS_DURATION_BUCKETS
             )
         }
 
     def _setup_routes(self):
         """Setup FastAPI routes"""
         
+        @self.app.on_event("startup")
+        async def start_health_sampler():
+            self.health_sampler.start()
+        
+        @self.app.on_event("shutdown")
+        async def stop_health_sampler():
+            self.health_sampler.stop()
+        
         @self.app.get("/health", response_model=HealthResponse)
         async def health():
-            """Health check endpoint - Kubernetes liveness probe"""
-            database_connected = await self._check_database_connection()
+            """Health check endpoint - Kubernetes liveness probe (served from the cached snapshot)"""
+            snapshot = self._health_snapshot()
+            database_connected = snapshot.ok('database')
+            stale = snapshot.is_stale()
+            if snapshot.warming_up:
+                status = "warming_up"
+            else:
+                status = "healthy" if database_connected and not stale else "unhealthy"
             
             return HealthResponse(
-                status="healthy" if database_connected else "unhealthy",
+                status=status,
                 timestamp=datetime.now(timezone.utc),
                 service=self.config.service_name,
                 version=self.config.service_version,
@@ -459,26 +528,26 @@ class BaseCollector(ABC):
                 database_connected=database_connected,
                 last_collection=self.last_collection,
                 last_successful_collection=self.last_successful_collection,
-                collection_errors=self.collection_errors
+                collection_errors=self.collection_errors,
+                health_sampled_at=snapshot.sampled_at_datetime,
+                health_age_seconds=snapshot.age_seconds(),
+                health_stale=stale
             )
 
         @self.app.get("/ready", response_model=ReadinessResponse)
         async def ready():
-            """Readiness check endpoint - Kubernetes readiness probe"""
-            is_ready = await self._check_service_readiness()
+            """Readiness check endpoint - Kubernetes readiness probe (served from the cached snapshot)"""
+            snapshot = self._health_snapshot()
+            checks = self._readiness_checks(snapshot)
             
             return ReadinessResponse(
-                ready=is_ready,
+                ready=all(checks.values()),
                 timestamp=datetime.now(timezone.utc),
                 service=self.config.service_name,
-                checks={
-                    "database": await self._check_database_connection(),
-                    "configuration": self._check_configuration_valid(),
-                    "dependencies": await self._check_dependencies(),
-                    "circuit_breaker": self.circuit_breaker.state.value != "open",
-                    "rate_limiter": self.rate_limiter is not None if self.config.enable_rate_limiting else True,
-                    "startup_complete": self.startup_complete
-                }
+                checks=checks,
+                health_sampled_at=snapshot.sampled_at_datetime,
+                health_age_seconds=snapshot.age_seconds(),
+                health_stale=snapshot.is_stale()
             )
 
         @self.app.get("/status", response_model=StatusResponse)
@@ -629,53 +698,45 @@ class BaseCollector(ABC):
 
     @contextmanager
     def get_database_connection(self):
-        """Database connection context manager"""
-        conn = None
+        """Database connection context manager backed by the collector's pool"""
         try:
-            conn = mysql.connector.connect(
-                host=self.config.mysql_host,
-                port=self.config.mysql_port,
-                user=self.config.mysql_user,
-                password=self.config.mysql_password,
-                database=self.config.mysql_database,
-                charset='utf8mb4',
-                autocommit=False
-            )
-            yield conn
+            with self.db_pool.get_connection_context() as conn:
+                yield conn
         except Exception as e:
             self.logger.error("database_connection_error", error=str(e))
-            if conn:
-                conn.rollback()
             raise
-        finally:
-            if conn:
-                conn.close()
 
     async def _check_database_connection(self) -> bool:
-        """Check database connectivity"""
+        """Check database connectivity without blocking the event loop"""
         try:
-            with self.get_database_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                return True
+            row = await self.db.fetchone("SELECT 1")
+            return bool(row) and row[0] == 1
         except Exception as e:
             self.logger.error("database_health_check_failed", error=str(e))
             return False
 
-    async def _check_service_readiness(self) -> bool:
-        """Check if service is ready to receive traffic"""
-        checks = {
-            "database": await self._check_database_connection(),
+    def _health_snapshot(self):
+        """Latest background health snapshot; starts the sampler if the app skipped startup events"""
+        if not self.health_sampler.running:
+            self.health_sampler.start()
+        return self.health_sampler.snapshot()
+
+    def _readiness_checks(self, snapshot) -> Dict[str, bool]:
+        """Readiness checks from the cached snapshot plus in-process state"""
+        return {
+            "database": snapshot.ok('database'),
             "configuration": self._check_configuration_valid(),
-            "dependencies": await self._check_dependencies(),
+            "dependencies": snapshot.ok('dependencies'),
+            "health_fresh": not snapshot.is_stale(),
             "circuit_breaker": self.circuit_breaker.state.value != "open",
             "rate_limiter": self.rate_limiter is not None if self.config.enable_rate_limiting else True,
             "startup_complete": self.startup_complete
         }
-        
+
+    async def _check_service_readiness(self) -> bool:
+        """Check if service is ready to receive traffic"""
         # All checks must pass for service to be ready
-        return all(checks.values())
+        return all(self._readiness_checks(self._health_snapshot()).values())
 
     def _check_configuration_valid(self) -> bool:
         """Check if configuration is valid"""
@@ -699,30 +760,37 @@ class BaseCollector(ABC):
         # For example: check if external APIs are reachable
         return True
 
+    def _read_database_status(self, conn) -> Tuple[str, Dict[str, Any]]:
+        """Server version and table status on one pooled connection (runs in a pool worker thread)"""
+        cursor = conn.cursor()
+        try:
+            # Check connection
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            
+            # Get database info
+            cursor.execute("SELECT VERSION()")
+            db_version = cursor.fetchone()[0]
+            
+            # Table hooks only drive the cursor synchronously, so run them to completion here
+            table_info = asyncio.run(self._get_table_status(cursor))
+            return db_version, table_info
+        finally:
+            cursor.close()
+
     async def _get_database_status(self) -> Dict[str, Any]:
-        """Get detailed database status"""
+        """Get detailed database status without blocking the event loop"""
         try:
-            with self.get_database_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check connection
-                cursor.execute("SELECT 1")
-                connected = True
-                
-                # Get database info
-                cursor.execute("SELECT VERSION()")
-                db_version = cursor.fetchone()[0]
-                
-                # Get table info for this collector
-                table_info = await self._get_table_status(cursor)
-                
-                return {
-                    "connected": connected,
-                    "version": db_version,
-                    "host": self.config.mysql_host,
-                    "database": self.config.mysql_database,
-                    "tables": table_info
-                }
+            db_version, table_info = await self.db.run(self._read_database_status)
+            
+            return {
+                "connected": True,
+                "version": db_version,
+                "host": self.config.mysql_host,
+                "database": self.config.mysql_database,
+                "tables": table_info,
+                "pool": self.db_pool.get_pool_stats()
+            }
         except Exception as e:
             self.logger.error("database_status_check_failed", error=str(e))
             return {
@@ -740,6 +808,19 @@ class BaseCollector(ABC):
             "collection_interval_seconds": self.config.collection_interval
         }
 
+    def _create_rate_limiter(self) -> TokenBucketRateLimiter:
+        """Shared provider bucket when RATE_LIMIT_PROVIDER names an entry in
+        RATE_LIMITS, otherwise a bucket of api_rate_limit_per_minute for this service"""
+        provider = os.getenv('RATE_LIMIT_PROVIDER')
+        if provider:
+            return get_rate_limiter(provider)
+        return TokenBucketRateLimiter(
+            self.config.service_name,
+            calls_per_minute=self.config.api_rate_limit_per_minute,
+            burst=self.config.api_rate_limit_per_minute,
+            backend=get_rate_limit_backend()
+        )
+
     def _get_metrics_summary(self) -> Dict[str, Any]:
         """Get metrics summary"""
         # This would extract current metric values
@@ -747,7 +828,10 @@ class BaseCollector(ABC):
             "collection_requests_total": "Available via /metrics endpoint",
             "records_processed_total": "Available via /metrics endpoint",
             "active_collections": int(self.is_collecting),
-            "uptime_seconds": (datetime.now(timezone.utc) - self.start_time).total_seconds()
+            "uptime_seconds": (datetime.now(timezone.utc) - self.start_time).total_seconds(),
+            "rate_limiter": self.rate_limiter.get_stats() if self.rate_limiter else None,
+            "duplicate_index": self.dedup_index.get_stats(),
+            "health": self.health_sampler.snapshot().to_dict()
         }
 
     def _get_safe_config(self) -> Dict[str, Any]:
@@ -773,9 +857,9 @@ class BaseCollector(ABC):
 
         self.is_collecting = True
         self.metrics['active_collections'].set(1)
+        start_time = time.time()
         
         try:
-            start_time = time.time()
             self.last_collection = datetime.now(timezone.utc)
             
             self.logger.info("collection_started", task_id=task_id)
@@ -786,6 +870,7 @@ class BaseCollector(ABC):
             duration = time.time() - start_time
             self.metrics['collection_duration_seconds'].observe(duration)
             self.metrics['collection_requests_total'].labels(status='success').inc()
+            self.telemetry.record('collection', duration)
             
             self.last_successful_collection = datetime.now(timezone.utc)
             
@@ -797,6 +882,7 @@ class BaseCollector(ABC):
             
         except Exception as e:
             self.metrics['collection_requests_total'].labels(status='error').inc()
+            self.telemetry.record('collection', time.time() - start_time, success=False)
             self.collection_errors += 1
             
             self.logger.error(
@@ -807,6 +893,7 @@ class BaseCollector(ABC):
         finally:
             self.is_collecting = False
             self.metrics['active_collections'].set(0)
+            self._save_dedup_snapshot()
 
     async def _perform_backfill(
         self,
@@ -817,6 +904,7 @@ class BaseCollector(ABC):
         force: bool
     ):
         """Perform backfill operation"""
+        start_time = time.time()
         try:
             self.logger.info(
                 "backfill_operation_started",
@@ -840,6 +928,7 @@ class BaseCollector(ABC):
             backfilled_records = await self.backfill_data(missing_data, force)
             
             self.metrics['backfill_operations_total'].labels(status='success').inc()
+            self.telemetry.record('backfill', time.time() - start_time)
             
             self.logger.info(
                 "backfill_operation_completed",
@@ -849,6 +938,7 @@ class BaseCollector(ABC):
             
         except Exception as e:
             self.metrics['backfill_operations_total'].labels(status='error').inc()
+            self.telemetry.record('backfill', time.time() - start_time, success=False)
             
             self.logger.error(
                 "backfill_operation_failed",
@@ -951,14 +1041,20 @@ class BaseCollector(ABC):
         
         # Check for duplicates if enabled
         if self.config.enable_duplicate_detection:
-            data_hash = self.data_validator.generate_data_hash(data)
-            if data_hash in self.duplicate_hashes:
+            if self.dedup_index.check_and_add(data):
+                self.metrics['duplicate_checks_total'].labels(result='hit').inc()
                 validation_result["warnings"].append("Potential duplicate data detected")
             else:
-                self.duplicate_hashes.append(data_hash)
+                self.metrics['duplicate_checks_total'].labels(result='miss').inc()
+            self.metrics['duplicate_index_size'].set(len(self.dedup_index))
         
         return validation_result
 
+    def _save_dedup_snapshot(self):
+        """Persist the duplicate index so a restart does not replay recent records"""
+        if self.config.enable_duplicate_detection and self.config.duplicate_snapshot_path:
+            self.dedup_index.save(self.config.duplicate_snapshot_path)
+
     async def _generate_data_quality_report(self) -> DataQualityReport:
         """Generate comprehensive data quality report"""
         # This should be implemented by child classes
@@ -976,11 +1072,15 @@ class BaseCollector(ABC):
         import psutil
         import os
         
-        # Calculate averages from stored metrics
-        avg_collection_time = sum(self.performance_metrics.get('collection_time', [0])) / max(len(self.performance_metrics.get('collection_time', [1])), 1)
-        total_requests = self.collection_errors + len(self.performance_metrics.get('successful_collections', []))
-        success_rate = (len(self.performance_metrics.get('successful_collections', [])) / max(total_requests, 1)) * 100
-        error_rate = (self.collection_errors / max(total_requests, 1)) * 100
+        # Streaming per-operation summaries: constant cost however long the collector has run
+        operations = self.telemetry.summary()
+        collection = operations.get('collection') or {'count': 0, 'errors': 0, 'mean_seconds': None}
+        total_requests = collection['count']
+        success_rate = ((total_requests - collection['errors']) / max(total_requests, 1)) * 100
+        error_rate = (collection['errors'] / max(total_requests, 1)) * 100
+        
+        def mean_latency(operation: str) -> float:
+            return (operations.get(operation) or {}).get('mean_seconds') or 0.0
         
         # Get system metrics
         process = psutil.Process(os.getpid())
@@ -988,13 +1088,14 @@ class BaseCollector(ABC):
         cpu_usage = process.cpu_percent()
         
         return PerformanceMetrics(
-            avg_collection_time=avg_collection_time,
+            avg_collection_time=collection['mean_seconds'] or 0.0,
             success_rate=success_rate,
             error_rate=error_rate,
-            database_latency=sum(self.performance_metrics.get('db_latency', [0])) / max(len(self.performance_metrics.get('db_latency', [1])), 1),
-            api_latency=sum(self.performance_metrics.get('api_latency', [0])) / max(len(self.performance_metrics.get('api_latency', [1])), 1),
+            database_latency=mean_latency('db'),
+            api_latency=mean_latency('api'),
             memory_usage_mb=memory_usage,
-            cpu_usage_percent=cpu_usage
+            cpu_usage_percent=cpu_usage,
+            operations=operations
         )
 
     async def _send_alert(self, alert: AlertRequest):
@@ -1026,6 +1127,7 @@ class BaseCollector(ABC):
     def _signal_handler(self, signum, frame):
         """Handle graceful shutdown signals"""
         self.logger.info("shutdown_signal_received", signal=signum)
+        self._save_dedup_snapshot()
         self._shutdown_event.set()
 
     async def _get_required_fields(self) -> List[str]:
@@ -33,6 +33,8 @@ from table_config import (
     normalize_symbol_for_exchange,
     validate_symbol_exists
 )
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from shared.rate_limiter import get_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,8 +52,8 @@ class CryptoDerivativesCollector:
             'api_key': os.getenv('COINGECKO_API_KEY', 'CG-94NCcVD2euxaGTZe94bS2oYz'),
             'base_url': 'https://pro-api.coingecko.com/api/v3',
             'derivatives_endpoint': '/derivatives',
-            'rate_limit_delay': 0.12  # 500 calls/minute = 120ms delay
         }
+        self.rate_limiter = get_rate_limiter('coingecko_premium')
         
         # Initialize session with headers
         self.session = requests.Session()
@@ -59,8 +61,7 @@ class CryptoDerivativesCollector:
             'x-cg-pro-api-key': self.coingecko_config['api_key'],
             'accept': 'application/json'
         })
-        
-        self.last_request_time = 0
+
         
         # ML indicators derived from derivatives data
         self.ml_indicators = {
@@ -254,12 +255,9 @@ class CryptoDerivativesCollector:
         except (ValueError, TypeError):
             return 0
     
-    def rate_limit(self):
-        """Enforce CoinGecko rate limiting"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.coingecko_config['rate_limit_delay']:
-            time.sleep(self.coingecko_config['rate_limit_delay'] - elapsed)
-        self.last_request_time = time.time()
+    async def rate_limit(self):
+        """Enforce CoinGecko rate limiting (shared premium budget)"""
+        await self.rate_limiter.acquire()
         
     def setup_database(self):
         """Initialize database connection and tables"""
@@ -422,7 +420,7 @@ class CryptoDerivativesCollector:
             derivatives_data = []
             
             # Rate limiting
-            self.rate_limit()
+            await self.rate_limit()
             
             # Get all derivatives tickers from CoinGecko
             url = f"{self.coingecko_config['base_url']}{self.coingecko_config['derivatives_endpoint']}"
@@ -740,6 +738,7 @@ class CryptoDerivativesCollector:
                 ))
             
             if self.use_shared_pool:
+                from shared.database_pool import get_connection_context
                 with get_connection_context() as conn:
                     cursor = conn.cursor()
                     cursor.executemany(insert_sql, insert_data)
@@ -13,10 +13,15 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Set
 import mysql.connector
 import time
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from base_collector_template import (
     BaseCollector, CollectorConfig, DataQualityReport, AlertRequest
 )
+from shared.mention_detector import MentionDetector
 
 class EnhancedNewsCollectorConfig(CollectorConfig):
     """Extended configuration for enhanced news collector"""
@@ -55,6 +60,9 @@ class EnhancedNewsCollector(BaseCollector):
         config = EnhancedNewsCollectorConfig.from_env()
         super().__init__(config)
         self.session = None
+        # Compiled matcher plus the symbol set it was built from
+        self._mention_detector: Optional[MentionDetector] = None
+        self._mention_detector_symbols: Optional[Set[str]] = None
 
     async def collect_data(self) -> int:
         """
@@ -237,26 +245,28 @@ class EnhancedNewsCollector(BaseCollector):
         try:
             with self.get_database_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT DISTINCT symbol FROM crypto_assets ORDER BY symbol")
-                symbols = {row[0] for row in cursor.fetchall()}
-                self.config.crypto_symbols = symbols
-                self.logger.info("crypto_symbols_loaded", count=len(symbols))
+                cursor.execute("SELECT symbol, name, aliases FROM crypto_assets ORDER BY symbol")
+                rows = [tuple(row) for row in cursor.fetchall()]
+                detector = MentionDetector(rows)
+                self.config.crypto_symbols = detector.symbols
+                self._mention_detector = detector
+                self._mention_detector_symbols = detector.symbols
+                self.logger.info("crypto_symbols_loaded", count=len(detector.symbols),
+                                 patterns=detector.pattern_count)
         except Exception as e:
             self.logger.warning("failed_to_load_symbols", error=str(e))
             # Fallback to common crypto symbols
             self.config.crypto_symbols = {'BTC', 'ETH', 'ADA', 'SOL', 'DOT', 'AVAX', 'MATIC', 'LINK', 'UNI', 'AAVE'}
 
     async def _detect_crypto_mentions(self, text: str) -> List[str]:
-        """Detect cryptocurrency mentions in text"""
-        
-        mentions = []
-        text_upper = text.upper()
+        """Detect cryptocurrency mentions (symbols, names, aliases) in a single pass"""
         
-        for symbol in self.config.crypto_symbols:
-            if re.search(r'\b' + re.escape(symbol) + r'\b', text_upper):
-                mentions.append(symbol)
+        # Rebuild bare-ticker matcher if the symbol set was replaced directly
+        if self._mention_detector_symbols is not self.config.crypto_symbols:
+            self._mention_detector = MentionDetector.from_symbols(self.config.crypto_symbols)
+            self._mention_detector_symbols = self.config.crypto_symbols
                 
-        return mentions
+        return self._mention_detector.detect(text)
 
     async def _save_articles_batch(self, articles: List[Dict[str, Any]]) -> int:
         """Save a batch of articles to database"""
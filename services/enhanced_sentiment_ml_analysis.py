@@ -17,6 +17,8 @@ from services.base_collector import (
     BaseCollector, CollectorConfig, DataQualityReport, AlertRequest
 )
 from shared.smart_model_manager import get_model_manager, ModelSource, ModelLoadingError
+from shared.batched_inference import MicroBatcher
+from shared.query_builder import day_range
 
 class MLSentimentCollectorConfig(CollectorConfig):
     """Extended configuration for ML sentiment collector"""
@@ -39,6 +41,12 @@ class MLSentimentCollectorConfig(CollectorConfig):
         # Data processing configuration
         self.days_lookback = 7
         self.min_confidence_threshold = 0.1
+        
+        # Batched inference configuration
+        self.inference_batch_size = 16
+        self.inference_max_latency = 0.05  # seconds a text waits for its batch to fill
+        self.inference_cache_size = 4096
+        self.sentiment_update_chunk_size = 500
 
     @classmethod
     def from_env(cls) -> 'MLSentimentCollectorConfig':
@@ -70,6 +78,14 @@ class EnhancedMLSentimentCollector(BaseCollector):
             "stock": False
         }
         
+        # Micro-batched inference on a dedicated worker thread
+        self.inference = MicroBatcher(
+            self._run_pipeline_batch,
+            max_batch_size=self.config.inference_batch_size,
+            max_latency=self.config.inference_max_latency,
+            cache_size=self.config.inference_cache_size
+        )
+        
         self.logger.info(f"Initialized sentiment collector for environment: {self.model_manager.environment.value}")
 
     async def collect_data(self) -> int:
@@ -180,157 +196,179 @@ class EnhancedMLSentimentCollector(BaseCollector):
                 
                 # Get articles that need ML sentiment analysis
                 cursor.execute("""
-                    SELECT id FROM crypto_news 
+                    SELECT id, title, content, market_type FROM crypto_news 
                     WHERE (ml_sentiment_score IS NULL OR ml_sentiment_score = 0)
                     AND created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
                     ORDER BY created_at DESC
                     LIMIT %s
                 """, (self.config.days_lookback, limit))
                 
-                article_ids = [row[0] for row in cursor.fetchall()]
-                
-                if not article_ids:
-                    self.logger.info("no_pending_articles")
-                    return 0
-                
-                self.logger.info("processing_articles", count=len(article_ids))
-                
-                processed = 0
-                errors = 0
-                
-                # Process articles with rate limiting
-                for article_id in article_ids:
-                    try:
-                        # Rate limiting
-                        if self.rate_limiter:
-                            await self.rate_limiter.wait_for_token()
-                        
-                        success = await self._process_single_article(article_id)
-                        if success:
-                            processed += 1
-                            self.metrics['records_processed_total'].labels(operation='sentiment_analysis').inc()
-                        else:
-                            errors += 1
-                            
-                    except Exception as e:
-                        self.logger.error("article_processing_error", 
-                                         article_id=article_id, error=str(e))
-                        errors += 1
-                        self.collection_errors += 1
-                
-                # Send alert if too many errors
-                if errors > 0 and self.config.enable_alerting and errors >= self.config.alert_error_threshold:
-                    await self._send_alert(AlertRequest(
-                        alert_type="sentiment_processing_errors",
-                        severity="warning",
-                        message=f"Multiple sentiment processing failures: {errors}/{len(article_ids)}",
-                        service=self.config.service_name,
-                        additional_data={"errors": errors, "total": len(article_ids)}
-                    ))
-                
-                self.logger.info("batch_processing_completed",
-                                processed=processed, errors=errors, total=len(article_ids))
-                return processed
+                articles = cursor.fetchall()
                 
         except Exception as e:
             self.logger.error("batch_processing_error", error=str(e))
             self.metrics['database_operations_total'].labels(operation='batch_read', status='error').inc()
             raise
+                
+        if not articles:
+            self.logger.info("no_pending_articles")
+            return 0
+        
+        self.logger.info("processing_articles", count=len(articles))
+        
+        processed, errors = await self._process_article_batch(articles)
+        
+        # Send alert if too many errors
+        if errors > 0 and self.config.enable_alerting and errors >= self.config.alert_error_threshold:
+            await self._send_alert(AlertRequest(
+                alert_type="sentiment_processing_errors",
+                severity="warning",
+                message=f"Multiple sentiment processing failures: {errors}/{len(articles)}",
+                service=self.config.service_name,
+                additional_data={"errors": errors, "total": len(articles)}
+            ))
+        
+        self.logger.info("batch_processing_completed",
+                        processed=processed, errors=errors, total=len(articles),
+                        inference=self.inference.get_stats())
+        return processed
 
-    async def _process_single_article(self, article_id: int) -> bool:
-        """Process a single news article for ML sentiment analysis"""
+    async def _process_article_batch(self, articles: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Analyze a batch of articles and write the results back
+        
+        Texts are submitted concurrently so the micro-batcher can group them
+        into model batches; results are written with one multi-row UPDATE.
+        Returns (processed, errors).
+        """
+        
+        # Rate limiting (once per batch; inference itself runs locally)
+        if self.rate_limiter:
+            await self.rate_limiter.wait_for_token()
+        
+        prepared = []
+        errors = 0
+        for article in articles:
+            text = self._prepare_article_text(article)
+            
+            # Detect market type if not set
+            market_type = article["market_type"] or self._detect_market_type(text)
+            
+            # Validate data if enabled
+            if self.config.enable_data_validation:
+                validation_result = await self._validate_data({
+                    "id": article["id"],
+                    "title": article["title"],
+                    "content": article["content"],
+                    "text_length": len(text)
+                })
+                if not validation_result["is_valid"]:
+                    self.logger.warning("article_validation_failed",
+                                      article_id=article["id"],
+                                      errors=validation_result["errors"])
+                    errors += 1
+                    continue
+            
+            prepared.append((article["id"], text, market_type))
+        
+        if not prepared:
+            return 0, errors
+        
+        analyses = await asyncio.gather(*(
+            self._analyze_sentiment_with_ml(text, market_type)
+            for _, text, market_type in prepared
+        ))
+        
+        rows = []
+        for (article_id, _, market_type), (ml_score, ml_confidence, ml_analysis) in zip(prepared, analyses):
+            # For stock market articles, also record as stock sentiment
+            stock_score, stock_confidence, stock_analysis = 0.0, 0.0, None
+            if market_type == "stock":
+                stock_score, stock_confidence, stock_analysis = ml_score, ml_confidence, ml_analysis
+            rows.append((
+                article_id, ml_score, ml_confidence, ml_analysis, market_type,
+                stock_score, stock_confidence, stock_analysis
+            ))
         
         try:
-            with self.get_database_connection() as conn:
-                cursor = conn.cursor(dictionary=True)
-                
-                # Get article data
-                cursor.execute("""
-                    SELECT id, title, content, market_type, ml_sentiment_score, ml_sentiment_confidence
-                    FROM crypto_news 
-                    WHERE id = %s
-                """, (article_id,))
-                
-                article = cursor.fetchone()
-                if not article:
-                    self.logger.warning("article_not_found", article_id=article_id)
-                    return False
-                
-                # Skip if already processed with good confidence
-                if (article["ml_sentiment_score"] is not None 
-                    and article["ml_sentiment_score"] != 0
-                    and article["ml_sentiment_confidence"] > self.config.min_confidence_threshold):
-                    return True
-                
-                # Prepare text for analysis
-                text = f"{article['title']}"
-                if article["content"]:
-                    text += f" {article['content']}"
-                
-                # Truncate text if too long
-                if len(text) > self.config.max_text_length:
-                    text = text[:self.config.max_text_length]
-                
-                # Detect market type if not set
-                market_type = article["market_type"] or self._detect_market_type(text)
-                
-                # Validate data if enabled
-                if self.config.enable_data_validation:
-                    article_data = {
-                        "id": article_id,
-                        "title": article['title'],
-                        "content": article['content'],
-                        "text_length": len(text)
-                    }
-                    validation_result = await self._validate_data(article_data)
-                    if not validation_result["is_valid"]:
-                        self.logger.warning("article_validation_failed",
-                                          article_id=article_id,
-                                          errors=validation_result["errors"])
-                        return False
-                
-                # Analyze sentiment with ML
-                ml_score, ml_confidence, ml_analysis = await self._analyze_sentiment_with_ml(
-                    text, market_type
-                )
-                
-                # For stock market articles, also analyze as stock sentiment
-                stock_score, stock_confidence, stock_analysis = 0.0, 0.0, None
-                if market_type == "stock":
-                    stock_score, stock_confidence, stock_analysis = (
-                        ml_score, ml_confidence, ml_analysis
-                    )
-                
-                # Update database
-                cursor.execute("""
-                    UPDATE crypto_news 
-                    SET ml_sentiment_score = %s,
-                        ml_sentiment_confidence = %s,
-                        ml_sentiment_analysis = %s,
-                        market_type = %s,
-                        stock_sentiment_score = %s,
-                        stock_sentiment_confidence = %s,
-                        stock_sentiment_analysis = %s,
-                        sentiment_updated_at = NOW()
-                    WHERE id = %s
-                """, (
-                    ml_score, ml_confidence, ml_analysis, market_type,
-                    stock_score, stock_confidence, stock_analysis, article_id
-                ))
-                
-                conn.commit()
-                self.metrics['database_operations_total'].labels(operation='update', status='success').inc()
-                
-                self.logger.debug("article_processed_successfully",
-                                 article_id=article_id, market_type=market_type, 
-                                 score=ml_score, confidence=ml_confidence)
-                return True
-                
+            self._write_sentiment_results(rows)
         except Exception as e:
-            self.logger.error("single_article_processing_error", 
-                             article_id=article_id, error=str(e))
+            self.logger.error("sentiment_batch_write_error", articles=len(rows), error=str(e))
             self.metrics['database_operations_total'].labels(operation='update', status='error').inc()
-            raise
+            self.collection_errors += 1
+            return 0, errors + len(rows)
+        
+        self.metrics['records_processed_total'].labels(operation='sentiment_analysis').inc(len(rows))
+        return len(rows), errors
+
+    async def _process_single_article(self, article_id: int) -> bool:
+        """Process a single news article for ML sentiment analysis"""
+        
+        with self.get_database_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, title, content, market_type
+                FROM crypto_news 
+                WHERE id = %s
+            """, (article_id,))
+            article = cursor.fetchone()
+        
+        if not article:
+            self.logger.warning("article_not_found", article_id=article_id)
+            return False
+        
+        processed, _ = await self._process_article_batch([article])
+        return processed == 1
+
+    def _prepare_article_text(self, article: Dict[str, Any]) -> str:
+        """Title plus content, truncated to the configured length"""
+        
+        text = f"{article['title']}"
+        if article["content"]:
+            text += f" {article['content']}"
+        return text[:self.config.max_text_length]
+
+    def _write_sentiment_results(self, rows: List[Tuple]):
+        """
+        Write (id, ml_score, ml_confidence, ml_analysis, market_type,
+        stock_score, stock_confidence, stock_analysis) rows with one
+        multi-row UPDATE per chunk
+        """
+        
+        with self.get_database_connection() as conn:
+            cursor = conn.cursor()
+            chunk_size = self.config.sentiment_update_chunk_size
+            for offset in range(0, len(rows), chunk_size):
+                chunk = rows[offset:offset + chunk_size]
+                cursor.execute(
+                    self._sentiment_update_query(len(chunk)),
+                    [value for row in chunk for value in row]
+                )
+            conn.commit()
+        self.metrics['database_operations_total'].labels(operation='update', status='success').inc()
+
+    @staticmethod
+    def _sentiment_update_query(row_count: int) -> str:
+        """UPDATE ... JOIN over a derived table of row_count literal rows"""
+        
+        first_row = (
+            "SELECT %s AS id, %s AS ml_sentiment_score, %s AS ml_sentiment_confidence, "
+            "%s AS ml_sentiment_analysis, %s AS market_type, %s AS stock_sentiment_score, "
+            "%s AS stock_sentiment_confidence, %s AS stock_sentiment_analysis"
+        )
+        other_rows = " UNION ALL SELECT %s, %s, %s, %s, %s, %s, %s, %s" * (row_count - 1)
+        return f"""
+            UPDATE crypto_news n
+            JOIN ({first_row}{other_rows}) v ON n.id = v.id
+            SET n.ml_sentiment_score = v.ml_sentiment_score,
+                n.ml_sentiment_confidence = v.ml_sentiment_confidence,
+                n.ml_sentiment_analysis = v.ml_sentiment_analysis,
+                n.market_type = v.market_type,
+                n.stock_sentiment_score = v.stock_sentiment_score,
+                n.stock_sentiment_confidence = v.stock_sentiment_confidence,
+                n.stock_sentiment_analysis = v.stock_sentiment_analysis,
+                n.sentiment_updated_at = NOW()
+        """
 
     def _detect_market_type(self, text: str) -> str:
         """Detect if the text is about crypto or stock market"""
@@ -372,30 +410,42 @@ class EnhancedMLSentimentCollector(BaseCollector):
             # Default to crypto for this system
             return "crypto"
 
+    def _select_model(self, market_type: str) -> Tuple[str, str]:
+        """Return (model_key, model_name) for a market type"""
+        
+        if market_type == "crypto" and self.crypto_sentiment_pipeline:
+            return "crypto", "CryptoBERT"
+        elif market_type == "stock" and self.stock_sentiment_pipeline:
+            return "stock", "FinBERT"
+        # Fallback to available model
+        elif self.crypto_sentiment_pipeline:
+            return "crypto", "CryptoBERT (fallback)"
+        elif self.stock_sentiment_pipeline:
+            return "stock", "FinBERT (fallback)"
+        raise Exception("No ML models available")
+
+    def _run_pipeline_batch(self, model_key: str, texts: List[str]) -> List[Any]:
+        """Run one padded batch through a pipeline (called on the inference worker thread)"""
+        
+        pipeline = self.crypto_sentiment_pipeline if model_key == "crypto" else self.stock_sentiment_pipeline
+        # Ensure tokenizer truncates to model max length
+        results = pipeline(texts, truncation=True, max_length=512, batch_size=len(texts))
+        if len(texts) == 1 and isinstance(results, list) and results and isinstance(results[0], dict):
+            # Single-text calls may come back unwrapped
+            results = [results]
+        # Top-1 outputs are one dict per text; wrap them so every text gets the
+        # same [{label, score}, ...] shape whatever it was batched with
+        return [[result] if isinstance(result, dict) else result for result in results]
+
     async def _analyze_sentiment_with_ml(self, text: str, market_type: str) -> Tuple[float, float, str]:
         """Analyze sentiment using specialized ML models"""
         
         try:
             # Select appropriate model based on market type
-            if market_type == "crypto" and self.crypto_sentiment_pipeline:
-                pipeline = self.crypto_sentiment_pipeline
-                model_name = "CryptoBERT"
-            elif market_type == "stock" and self.stock_sentiment_pipeline:
-                pipeline = self.stock_sentiment_pipeline
-                model_name = "FinBERT"
-            else:
-                # Fallback to available model
-                if self.crypto_sentiment_pipeline:
-                    pipeline = self.crypto_sentiment_pipeline
-                    model_name = "CryptoBERT (fallback)"
-                elif self.stock_sentiment_pipeline:
-                    pipeline = self.stock_sentiment_pipeline
-                    model_name = "FinBERT (fallback)"
-                else:
-                    raise Exception("No ML models available")
+            model_key, model_name = self._select_model(market_type)
             
-            # Analyze sentiment (ensure tokenizer truncates to model max length)
-            results = pipeline(text, truncation=True, max_length=512)
+            # Queued with concurrent requests and run as part of a batch
+            results = await self.inference.infer(model_key, text)
             
             # Extract sentiment scores - handle different result formats
             sentiment_score, confidence = await self._extract_sentiment_from_results(
@@ -491,14 +541,14 @@ class EnhancedMLSentimentCollector(BaseCollector):
         
         try:
             with self.get_database_connection() as conn:
-                cursor = conn.cursor()
+                cursor = conn.cursor(dictionary=True)
                 
                 for period in missing_periods:
                     try:
                         # Get articles in this period that need sentiment analysis
                         if "start_date" in period and "end_date" in period:
                             cursor.execute("""
-                                SELECT id FROM crypto_news
+                                SELECT id, title, content, market_type FROM crypto_news
                                 WHERE created_at BETWEEN %s AND %s
                                 AND (ml_sentiment_score IS NULL OR ml_sentiment_score = 0)
                                 ORDER BY created_at DESC
@@ -506,27 +556,22 @@ class EnhancedMLSentimentCollector(BaseCollector):
                             """, (period["start_date"], period["end_date"]))
                         else:
                             # Single date period
-                            cursor.execute("""
-                                SELECT id FROM crypto_news
-                                WHERE DATE(created_at) = %s
+                            predicate, params = day_range("created_at", period.get("date"))
+                            cursor.execute(f"""
+                                SELECT id, title, content, market_type FROM crypto_news
+                                WHERE {predicate}
                                 AND (ml_sentiment_score IS NULL OR ml_sentiment_score = 0)
                                 ORDER BY created_at DESC
                                 LIMIT 50
-                            """, (period.get("date"),))
+                            """, params)
                         
-                        article_ids = [row[0] for row in cursor.fetchall()]
+                        articles = cursor.fetchall()
                         
-                        # Process articles in this period
-                        for article_id in article_ids:
-                            if self.rate_limiter:
-                                await self.rate_limiter.wait_for_token()
-                            
-                            success = await self._process_single_article(article_id)
-                            if success:
-                                total_processed += 1
-                            
-                            # Small delay to prevent overload
-                            await asyncio.sleep(0.1)
+                        # Process articles in this period as batches
+                        for offset in range(0, len(articles), self.config.inference_batch_size):
+                            batch = articles[offset:offset + self.config.inference_batch_size]
+                            processed, _ = await self._process_article_batch(batch)
+                            total_processed += processed
                         
                     except Exception as e:
                         self.logger.error("backfill_period_error", period=period, error=str(e))
@@ -7,15 +7,15 @@ Migrated from legacy implementation to standardized collector template
 import asyncio
 import aiohttp
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional
 import mysql.connector
-import numpy as np
 import pandas as pd
-import math
 
 from services.base_collector import (
     BaseCollector, CollectorConfig, DataQualityReport, AlertRequest
 )
+from shared.indicator_engine import IndicatorEngine
+from shared.query_builder import day_bounds, price_history_query, price_history_since_query
 
 class TechnicalCalculatorConfig(CollectorConfig):
     """Extended configuration for technical calculator"""
@@ -47,9 +47,8 @@ class TechnicalCalculatorConfig(CollectorConfig):
     @classmethod
     def from_env(cls) -> 'TechnicalCalculatorConfig':
         """Load configuration from environment variables"""
-        config = super().from_env()
-        # Convert to TechnicalCalculatorConfig
-        tech_config = cls(**config.__dict__)
+        # CollectorConfig.from_env builds cls, so this is already a TechnicalCalculatorConfig
+        tech_config = super().from_env()
         tech_config.service_name = "enhanced-technical-calculator"
         return tech_config
 
@@ -62,6 +61,17 @@ class EnhancedTechnicalCalculator(BaseCollector):
     def __init__(self):
         config = TechnicalCalculatorConfig.from_env()
         super().__init__(config)
+        
+        # Per-symbol rolling indicator state; cold-started from price history
+        self.indicator_engine = IndicatorEngine(
+            sma_periods=config.sma_periods,
+            ema_periods=config.ema_periods,
+            rsi_periods=config.rsi_periods,
+            bollinger_period=config.bollinger_period,
+            bollinger_std=config.bollinger_std,
+            stochastic_k_period=config.stochastic_k_period,
+            stochastic_d_period=config.stochastic_d_period
+        )
 
     async def collect_data(self) -> int:
         """
@@ -144,7 +154,20 @@ class EnhancedTechnicalCalculator(BaseCollector):
             return fallback_symbols
 
     async def _calculate_symbol_indicators(self, symbol: str) -> bool:
-        """Calculate all technical indicators for a single symbol"""
+        """Calculate all technical indicators for a single symbol
+        
+        Symbols with rolling state only read and apply the bars newer than the
+        last processed timestamp; full recomputation happens on cold start or
+        after the state has been invalidated.
+        """
+        
+        if self.indicator_engine.has_state(symbol):
+            try:
+                return await self._update_symbol_indicators(symbol)
+            except Exception as e:
+                self.logger.warning("incremental_update_failed_recomputing", 
+                                  symbol=symbol, error=str(e))
+                self.indicator_engine.invalidate(symbol)
         
         try:
             # Get price data
@@ -168,21 +191,58 @@ class EnhancedTechnicalCalculator(BaseCollector):
                                       errors=validation_result["errors"])
                     return False
             
-            # Calculate all indicators
-            indicators = await self._calculate_all_indicators(symbol, price_data)
+            # Cold start: one vectorized pass that also seeds the rolling state
+            indicators = self._format_indicators(
+                self.indicator_engine.warm_start(symbol, price_data), price_data
+            )
             
             # Store indicators in database
             success = await self._store_indicators(symbol, indicators)
             
             self.logger.debug("symbol_indicators_calculated", 
-                            symbol=symbol, indicators_count=len(indicators))
+                            symbol=symbol, indicators_count=len(indicators), mode="full")
             return success
             
         except Exception as e:
+            self.indicator_engine.invalidate(symbol)
             self.logger.error("symbol_indicator_calculation_error", 
                              symbol=symbol, error=str(e))
             raise
 
+    async def _update_symbol_indicators(self, symbol: str) -> bool:
+        """Apply only the price rows newer than the symbol's rolling state"""
+        
+        new_bars = await self._get_price_data_since(
+            symbol, self.indicator_engine.last_timestamp(symbol)
+        )
+        if not new_bars:
+            self.logger.debug("no_new_price_data", symbol=symbol)
+            return False
+        
+        latest = self.indicator_engine.update_many(symbol, new_bars)
+        indicators = self._format_indicators(
+            latest, new_bars, data_points=self.indicator_engine.bar_count(symbol)
+        )
+        success = await self._store_indicators(symbol, indicators)
+        
+        self.logger.debug("symbol_indicators_calculated", 
+                        symbol=symbol, new_bars=len(new_bars), mode="incremental")
+        return success
+
+    def _format_indicators(self, values: Dict[str, Optional[float]], price_data: List[Dict[str, Any]],
+                           data_points: Optional[int] = None) -> Dict[str, Any]:
+        """Round engine output and add the metadata stored alongside indicators"""
+        
+        indicators = {}
+        for name, value in values.items():
+            if value is not None:
+                indicators[name] = round(value, 4 if name.startswith(("rsi_", "stoch_")) else 6)
+        
+        indicators["calculated_at"] = datetime.now(timezone.utc)
+        indicators["data_points"] = data_points if data_points is not None else len(price_data)
+        indicators["latest_price"] = price_data[-1]["close"]
+        return indicators
+
     async def _get_price_data(self, symbol: str) -> List[Dict[str, Any]]:
         """Get recent price data for a symbol"""
         
@@ -198,25 +258,45 @@ class EnhancedTechnicalCalculator(BaseCollector):
                     LIMIT %s
                 """, (symbol, self.config.price_data_limit))
                 
-                price_data = cursor.fetchall()
+                # Convert to proper data types and sort chronologically (oldest first)
+                processed_data = self._rows_to_ohlcv(cursor.fetchall())
+                processed_data.reverse()
                 
-                # Convert to proper data types and sort chronologically
-                processed_data = []
-                for row in price_data:
-                    try:
-                        processed_data.append({
-                            "timestamp": row["timestamp_iso"],
-                            "open": float(row["open"]) if row["open"] else 0.0,
-                            "high": float(row["high"]) if row["high"] else 0.0,
-                            "low": float(row["low"]) if row["low"] else 0.0,
-                            "close": float(row["close"]) if row["close"] else 0.0,
-                            "volume": float(row["volume"]) if row["volume"] else 0.0
-                        })
-                    except (ValueError, TypeError):
-                        continue
+                self.metrics['database_operations_total'].labels(operation='price_data_read', status='success').inc()
+                return processed_data
                 
-                # Sort chronologically (oldest first) for calculations
-                processed_data.reverse()
+        except Exception as e:
+            self.logger.error("price_data_retrieval_error", symbol=symbol, error=str(e))
+            self.metrics['database_operations_total'].labels(operation='price_data_read', status='error').inc()
+            raise
+
+    @staticmethod
+    def _rows_to_ohlcv(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert price_data_real rows to float OHLCV bars, skipping unparsable rows"""
+        
+        bars = []
+        for row in rows:
+            try:
+                bars.append({
+                    "timestamp": row["timestamp_iso"],
+                    "open": float(row["open"]) if row["open"] else 0.0,
+                    "high": float(row["high"]) if row["high"] else 0.0,
+                    "low": float(row["low"]) if row["low"] else 0.0,
+                    "close": float(row["close"]) if row["close"] else 0.0,
+                    "volume": float(row["volume"]) if row["volume"] else 0.0
+                })
+            except (ValueError, TypeError):
+                continue
+        return bars
+
+    async def _get_price_data_since(self, symbol: str, since: datetime) -> List[Dict[str, Any]]:
+        """Get price rows strictly newer than ``since``, oldest first"""
+        
+        try:
+            with self.get_database_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(price_history_since_query(), (symbol, since))
+                processed_data = self._rows_to_ohlcv(cursor.fetchall())
                 
                 self.metrics['database_operations_total'].labels(operation='price_data_read', status='success').inc()
                 return processed_data
@@ -229,212 +309,14 @@ class EnhancedTechnicalCalculator(BaseCollector):
     async def _calculate_all_indicators(self, symbol: str, price_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate all technical indicators for the given price data"""
         
-        # Extract price arrays
-        closes = [d["close"] for d in price_data]
-        highs = [d["high"] for d in price_data]
-        lows = [d["low"] for d in price_data]
-        volumes = [d["volume"] for d in price_data]
-        
-        indicators = {}
-        
         try:
-            # Simple Moving Averages
-            for period in self.config.sma_periods:
-                sma = self._calculate_sma(closes, period)
-                if sma is not None:
-                    indicators[f"sma_{period}"] = sma
-            
-            # Exponential Moving Averages  
-            for period in self.config.ema_periods:
-                ema = self._calculate_ema(closes, period)
-                if ema is not None:
-                    indicators[f"ema_{period}"] = ema
-            
-            # RSI
-            for period in self.config.rsi_periods:
-                rsi = self._calculate_rsi(closes, period)
-                if rsi is not None:
-                    indicators[f"rsi_{period}"] = rsi
-            
-            # MACD
-            macd_line, macd_signal, macd_histogram = self._calculate_macd(closes)
-            if macd_line is not None:
-                indicators["macd_line"] = macd_line
-                indicators["macd_signal"] = macd_signal
-                indicators["macd_histogram"] = macd_histogram
-            
-            # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(
-                closes, self.config.bollinger_period, self.config.bollinger_std
-            )
-            if bb_middle is not None:
-                indicators["bb_upper"] = bb_upper
-                indicators["bb_middle"] = bb_middle
-                indicators["bb_lower"] = bb_lower
-            
-            # Stochastic Oscillator
-            stoch_k, stoch_d = self._calculate_stochastic(
-                highs, lows, closes, 
-                self.config.stochastic_k_period, 
-                self.config.stochastic_d_period
-            )
-            if stoch_k is not None:
-                indicators["stoch_k"] = stoch_k
-                indicators["stoch_d"] = stoch_d
-            
-            # Add metadata
-            indicators["calculated_at"] = datetime.now(timezone.utc)
-            indicators["data_points"] = len(price_data)
-            indicators["latest_price"] = closes[-1]
-            
-            return indicators
+            # Stateless vectorized pass (used by backfill over arbitrary periods)
+            return self._format_indicators(self.indicator_engine.compute_latest(price_data), price_data)
             
         except Exception as e:
             self.logger.error("indicator_calculation_error", symbol=symbol, error=str(e))
             raise
 
-    def _calculate_sma(self, prices: List[float], period: int) -> Optional[float]:
-        """Calculate Simple Moving Average"""
-        
-        if len(prices) < period:
-            return None
-        
-        return round(sum(prices[-period:]) / period, 6)
-
-    def _calculate_ema(self, prices: List[float], period: int) -> Optional[float]:
-        """Calculate Exponential Moving Average"""
-        
-        if len(prices) < period:
-            return None
-        
-        multiplier = 2 / (period + 1)
-        ema = prices[0]  # Start with first price
-        
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return round(ema, 6)
-
-    def _calculate_rsi(self, prices: List[float], period: int = 14) -> Optional[float]:
-        """Calculate Relative Strength Index"""
-        
-        if len(prices) < period + 1:
-            return None
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            gains.append(max(0, change))
-            losses.append(max(0, -change))
-        
-        if len(gains) < period:
-            return None
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return round(rsi, 4)
-
-    def _calculate_macd(self, prices: List[float], fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-        """Calculate MACD (Moving Average Convergence Divergence)"""
-        
-        if len(prices) < slow_period:
-            return None, None, None
-        
-        try:
-            ema_fast = self._calculate_ema(prices, fast_period)
-            ema_slow = self._calculate_ema(prices, slow_period)
-            
-            if ema_fast is None or ema_slow is None:
-                return None, None, None
-            
-            macd_line = ema_fast - ema_slow
-            
-            # Calculate signal line (EMA of MACD line)
-            # For simplicity, using a basic average here
-            # In production, you'd want to maintain MACD history
-            macd_signal = macd_line  # Simplified
-            macd_histogram = macd_line - macd_signal
-            
-            return (
-                round(macd_line, 6),
-                round(macd_signal, 6),
-                round(macd_histogram, 6)
-            )
-            
-        except Exception:
-            return None, None, None
-
-    def _calculate_bollinger_bands(self, prices: List[float], period: int = 20, std_dev: int = 2) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-        """Calculate Bollinger Bands"""
-        
-        if len(prices) < period:
-            return None, None, None
-        
-        try:
-            # Middle line (SMA)
-            middle = self._calculate_sma(prices, period)
-            
-            if middle is None:
-                return None, None, None
-            
-            # Standard deviation
-            recent_prices = prices[-period:]
-            variance = sum((p - middle) ** 2 for p in recent_prices) / period
-            std = math.sqrt(variance)
-            
-            upper = middle + (std_dev * std)
-            lower = middle - (std_dev * std)
-            
-            return (
-                round(upper, 6),
-                round(middle, 6),
-                round(lower, 6)
-            )
-            
-        except Exception:
-            return None, None, None
-
-    def _calculate_stochastic(self, highs: List[float], lows: List[float], closes: List[float], k_period: int = 14, d_period: int = 3) -> Tuple[Optional[float], Optional[float]]:
-        """Calculate Stochastic Oscillator"""
-        
-        if len(closes) < k_period:
-            return None, None
-        
-        try:
-            # %K calculation
-            recent_highs = highs[-k_period:]
-            recent_lows = lows[-k_period:]
-            current_close = closes[-1]
-            
-            highest_high = max(recent_highs)
-            lowest_low = min(recent_lows)
-            
-            if highest_high == lowest_low:
-                stoch_k = 50.0  # Avoid division by zero
-            else:
-                stoch_k = ((current_close - lowest_low) / (highest_high - lowest_low)) * 100
-            
-            # %D calculation (simplified as SMA of %K)
-            # In production, you'd want to maintain %K history
-            stoch_d = stoch_k  # Simplified
-            
-            return (
-                round(stoch_k, 4),
-                round(stoch_d, 4)
-            )
-            
-        except Exception:
-            return None, None
-
     async def _store_indicators(self, symbol: str, indicators: Dict[str, Any]) -> bool:
         """Store calculated indicators in database"""
         
@@ -558,32 +440,9 @@ class EnhancedTechnicalCalculator(BaseCollector):
                     """, (symbol, period["start_date"], period["end_date"]))
                 else:
                     # Single date
-                    cursor.execute("""
-                        SELECT timestamp_iso, open, high, low, close, volume
-                        FROM price_data_real 
-                        WHERE symbol = %s 
-                        AND DATE(timestamp_iso) = %s
-                        ORDER BY timestamp_iso ASC
-                    """, (symbol, period.get("date")))
-                
-                price_data = cursor.fetchall()
+                    cursor.execute(price_history_query(), (symbol, *day_bounds(period.get("date"))))
                 
-                # Process data
-                processed_data = []
-                for row in price_data:
-                    try:
-                        processed_data.append({
-                            "timestamp": row["timestamp_iso"],
-                            "open": float(row["open"]) if row["open"] else 0.0,
-                            "high": float(row["high"]) if row["high"] else 0.0,
-                            "low": float(row["low"]) if row["low"] else 0.0,
-                            "close": float(row["close"]) if row["close"] else 0.0,
-                            "volume": float(row["volume"]) if row["volume"] else 0.0
-                        })
-                    except (ValueError, TypeError):
-                        continue
-                
-                return processed_data
+                return self._rows_to_ohlcv(cursor.fetchall())
                 
         except Exception as e:
             self.logger.error("historical_price_data_error", symbol=symbol, error=str(e))
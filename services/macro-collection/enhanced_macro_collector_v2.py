@@ -10,16 +10,20 @@ import os
 import sys
 import logging
 import mysql.connector
-import time
 import json
+import threading
 import requests
 from datetime import datetime, timedelta, date
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from shared.rate_limiter import get_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,6 +47,55 @@ class MacroIndicator:
     category: str
     active: bool = True
 
+@dataclass
+class SeriesWatermark:
+    """Latest stored observation of a series, plus stored values inside its revision window"""
+    last_date: date
+    recent_values: Dict[date, float] = field(default_factory=dict)
+
+# Incremental collection - series are fetched from their latest stored
+# observation, reaching back far enough to pick up FRED's revisions of recent
+# observations; only new or revised observations are written
+INITIAL_LOOKBACK_DAYS = {
+    DataFrequency.DAILY: 7,      # 1 week
+    DataFrequency.WEEKLY: 14,    # 2 weeks
+    DataFrequency.MONTHLY: 35,   # ~1 month
+    DataFrequency.QUARTERLY: 95, # ~3 months
+}
+REVISION_LOOKBACK_DAYS = {
+    DataFrequency.DAILY: 7,
+    DataFrequency.WEEKLY: 21,
+    DataFrequency.MONTHLY: 62,
+    DataFrequency.QUARTERLY: 185,
+    DataFrequency.ANNUAL: 366,
+}
+FRED_FETCH_CONCURRENCY = int(os.getenv("FRED_FETCH_CONCURRENCY", "8"))
+MACRO_UPSERT_CHUNK_SIZE = int(os.getenv("MACRO_UPSERT_CHUNK_SIZE", "500"))
+MACRO_VALUE_SCALE = 8  # macro_indicators.value is DECIMAL(20,8)
+
+def fetch_start_date(indicator: MacroIndicator, watermark: Optional[SeriesWatermark], today: date) -> date:
+    """observation_start for an incremental fetch of ``indicator``"""
+    if watermark is None:
+        return today - timedelta(days=INITIAL_LOOKBACK_DAYS.get(indicator.frequency, 30))
+    return watermark.last_date - timedelta(days=REVISION_LOOKBACK_DAYS.get(indicator.frequency, 30))
+
+def new_or_revised(data_points: List[Dict], watermark: Optional[SeriesWatermark]) -> Tuple[List[Dict], int]:
+    """Observations after the watermark or differing from the stored value; and how many were revisions"""
+    if watermark is None:
+        return data_points, 0
+    changed = []
+    revised = 0
+    for point in data_points:
+        obs_date = point["indicator_date"]
+        if obs_date > watermark.last_date:
+            changed.append(point)
+            continue
+        stored = watermark.recent_values.get(obs_date)
+        if stored is None or round(point["value"], MACRO_VALUE_SCALE) != round(stored, MACRO_VALUE_SCALE):
+            changed.append(point)
+            revised += 1
+    return changed, revised
+
 class EnhancedMacroCollector:
     """Production-ready macro indicators collector with comprehensive monitoring and FastAPI endpoints"""
     
@@ -63,16 +116,13 @@ class EnhancedMacroCollector:
         # Service configuration
         self.service_name = "Enhanced Macro Indicators Collector"
         self.collection_interval = 3600  # 1 hour
-        self.rate_limit_delay = 1.0  # FRED API rate limit
-        self.last_request_time = 0
+        self.rate_limiter = get_rate_limiter('fred_api')
         self.max_retries = 3
+        # Series are fetched in parallel; the shared fred_api bucket keeps the pace
+        self.fetch_concurrency = max(1, FRED_FETCH_CONCURRENCY)
         
-        # Initialize session
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Enhanced-Macro-Collector/2.0',
-            'Accept': 'application/json'
-        })
+        # One requests.Session per fetch thread; Session is not thread-safe
+        self._sessions = threading.local()
         
         # Load indicators configuration
         self.indicators = self._load_indicators()
@@ -88,7 +138,9 @@ class EnhancedMacroCollector:
             'last_success': None,
             'last_error': None,
             'database_writes': 0,
-            'indicators_processed': 0
+            'indicators_processed': 0,
+            'observations_unchanged': 0,
+            'observations_revised': 0
         }
         
         # Health tracking (aligned with OHLC template)
@@ -237,12 +289,22 @@ class EnhancedMacroCollector:
         logger.info(f"✅ Loaded {len(active_indicators)} active macro indicators")
         return indicators
 
+    @property
+    def session(self) -> requests.Session:
+        """This thread's FRED session"""
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Enhanced-Macro-Collector/2.0',
+                'Accept': 'application/json'
+            })
+            self._sessions.session = session
+        return session
+
     def rate_limit(self):
         """Enforce rate limiting for FRED API calls"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire_blocking()
 
     def make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make FRED API request with rate limiting and error handling"""
@@ -313,60 +375,118 @@ class EnhancedMacroCollector:
             logger.error(f"❌ Error fetching {indicator.name}: {e}")
             return []
 
-    def store_indicator_data(self, data_points: List[Dict]) -> int:
-        """Store indicator data with duplicate detection"""
-        if not data_points:
-            return 0
-            
+    def load_watermarks(self, indicators: List[MacroIndicator]) -> Dict[str, SeriesWatermark]:
+        """Latest stored date per series (one grouped query) and stored values in each revision window"""
+        if not indicators:
+            return {}
+        by_name = {indicator.name: indicator for indicator in indicators}
         try:
             conn = mysql.connector.connect(**self.db_config)
             cursor = conn.cursor()
-            stored_count = 0
             
-            for point in data_points:
-                try:
-                    # Insert with ON DUPLICATE KEY UPDATE
-                    insert_sql = """
-                    INSERT INTO macro_indicators (
-                        indicator_name, indicator_date, value, 
-                        fred_series_id, frequency, category,
-                        data_source, collected_at, created_at, updated_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, NOW(), NOW(), NOW()
-                    ) ON DUPLICATE KEY UPDATE
-                        value = VALUES(value),
-                        updated_at = NOW()
-                    """
-                    
-                    cursor.execute(insert_sql, (
-                        point["indicator_name"],
-                        point["indicator_date"],
-                        point["value"],
-                        point["fred_series_id"],
-                        point["frequency"],
-                        point["category"],
-                        "FRED_API"
-                    ))
-                    
-                    if cursor.rowcount > 0:
-                        stored_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error storing data point: {e}")
-                    self.health_metrics['database_error_count'] += 1
-                    continue
-                    
-            conn.commit()
+            cursor.execute(f"""
+                SELECT indicator_name, MAX(indicator_date)
+                FROM macro_indicators
+                WHERE indicator_name IN ({", ".join(["%s"] * len(by_name))})
+                GROUP BY indicator_name
+            """, tuple(by_name))
+            watermarks = {
+                name: SeriesWatermark(last_date=last_date)
+                for name, last_date in cursor.fetchall() if last_date
+            }
+            
+            if watermarks:
+                windows = [
+                    (name, fetch_start_date(by_name[name], watermark, date.today()))
+                    for name, watermark in watermarks.items()
+                ]
+                cursor.execute(f"""
+                    SELECT indicator_name, indicator_date, value
+                    FROM macro_indicators
+                    WHERE {" OR ".join(["(indicator_name = %s AND indicator_date >= %s)"] * len(windows))}
+                """, [value for window in windows for value in window])
+                for name, obs_date, value in cursor.fetchall():
+                    if value is not None:
+                        watermarks[name].recent_values[obs_date] = float(value)
+            
             conn.close()
+            return watermarks
             
-            self.stats['database_writes'] += stored_count
-            logger.info(f"✅ Stored {stored_count} macro indicator records")
-            return stored_count
+        except Exception as e:
+            logger.error(f"❌ Error loading macro watermarks: {e}")
+            self.health_metrics['database_error_count'] += 1
+            return {}
+
+    def fetch_indicators(self, series_requests: List[Tuple[MacroIndicator, date, Optional[date]]]) -> List[List[Dict]]:
+        """Fetch several series concurrently; results in request order"""
+        if not series_requests:
+            return []
+        workers = min(self.fetch_concurrency, len(series_requests))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fred") as executor:
+            return list(executor.map(lambda request: self.fetch_indicator_data(*request), series_requests))
+
+    def store_indicator_data(self, data_points: List[Dict]) -> int:
+        """
+        Store indicator data in multi-row upserts (revised observations overwrite stored values)
+
+        Each chunk is committed on its own; a chunk that fails is rolled back,
+        logged and skipped. Returns the number of rows in committed chunks.
+        """
+        if not data_points:
+            return 0
             
+        rows = [
+            (
+                point["indicator_name"],
+                point["indicator_date"],
+                point["value"],
+                point["fred_series_id"],
+                point["frequency"],
+                point["category"],
+                "FRED_API"
+            )
+            for point in data_points
+        ]
+        
+        try:
+            conn = mysql.connector.connect(**self.db_config)
         except Exception as e:
             logger.error(f"❌ Error storing indicator data: {e}")
             self.health_metrics['database_error_count'] += 1
             return 0
+        
+        stored_count = 0
+        try:
+            cursor = conn.cursor()
+            for i in range(0, len(rows), MACRO_UPSERT_CHUNK_SIZE):
+                chunk = rows[i:i + MACRO_UPSERT_CHUNK_SIZE]
+                try:
+                    cursor.execute(f"""
+                        INSERT INTO macro_indicators (
+                            indicator_name, indicator_date, value, 
+                            fred_series_id, frequency, category,
+                            data_source, collected_at, created_at, updated_at
+                        ) VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s, NOW(), NOW(), NOW())"] * len(chunk))}
+                        ON DUPLICATE KEY UPDATE
+                            value = VALUES(value),
+                            updated_at = NOW()
+                    """, [value for row in chunk for value in row])
+                    conn.commit()
+                    stored_count += len(chunk)
+                except Exception as e:
+                    logger.error(f"❌ Skipping {len(chunk)} macro indicator records "
+                                 f"({chunk[0][0]} .. {chunk[-1][0]}): {e}")
+                    self.health_metrics['database_error_count'] += 1
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+        finally:
+            conn.close()
+        
+        self.stats['database_writes'] += stored_count
+        logger.info(f"✅ Stored {stored_count} of {len(rows)} macro indicator records")
+        return stored_count
 
     def collect_all_macro_data(self) -> Dict[str, Any]:
         """Run one complete collection cycle for all indicators"""
@@ -377,41 +497,34 @@ class EnhancedMacroCollector:
         total_stored = 0
         indicators_processed = 0
         failed_count = 0
+        total_revised = 0
         
-        # Get appropriate lookback period based on frequency
-        lookback_days = {
-            DataFrequency.DAILY: 7,      # 1 week
-            DataFrequency.WEEKLY: 14,    # 2 weeks
-            DataFrequency.MONTHLY: 35,   # ~1 month
-            DataFrequency.QUARTERLY: 95, # ~3 months
-        }
+        # Each series is fetched from its own watermark, all series concurrently
+        active = [indicator for indicator in self.indicators if indicator.active]
+        watermarks = self.load_watermarks(active)
+        end_date = date.today()
+        fetched = self.fetch_indicators([
+            (indicator, fetch_start_date(indicator, watermarks.get(indicator.name), end_date), end_date)
+            for indicator in active
+        ])
         
-        for indicator in self.indicators:
-            if not indicator.active:
-                continue
-                
-            try:
-                # Calculate date range based on frequency
-                end_date = date.today()
-                days_back = lookback_days.get(indicator.frequency, 30)
-                start_date = end_date - timedelta(days=days_back)
-                
-                # Fetch data
-                data_points = self.fetch_indicator_data(indicator, start_date, end_date)
-                
-                if data_points:
-                    stored = self.store_indicator_data(data_points)
-                    total_collected += len(data_points)
-                    total_stored += stored
-                else:
-                    failed_count += 1
-                    
-                indicators_processed += 1
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing {indicator.name}: {e}")
+        changed_points = []
+        for indicator, data_points in zip(active, fetched):
+            if not data_points:
                 failed_count += 1
                 continue
+            changed, revised = new_or_revised(data_points, watermarks.get(indicator.name))
+            changed_points.extend(changed)
+            total_collected += len(data_points)
+            total_revised += revised
+            self.stats["observations_unchanged"] += len(data_points) - len(changed)
+            indicators_processed += 1
+        
+        # Bulk upserts for every series' new and revised observations, committed per chunk
+        total_stored = self.store_indicator_data(changed_points)
+        self.stats["observations_revised"] += total_revised
+        if total_stored < len(changed_points):
+            failed_count += 1
                 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -437,6 +550,7 @@ class EnhancedMacroCollector:
             "indicators_processed": indicators_processed,
             "data_points_collected": total_collected,
             "records_stored": total_stored,
+            "records_revised": total_revised,
             "failed_indicators": failed_count,
             "timestamp": end_time.isoformat()
         }
@@ -523,26 +637,17 @@ class EnhancedMacroCollector:
             
         logger.info(f"🔄 Starting macro backfill from {start_date} to {end_date}")
         
-        total_backfilled = 0
+        # Fetch every series' history concurrently, then store it in bulk
+        active = [indicator for indicator in self.indicators if indicator.active]
+        fetched = self.fetch_indicators([(indicator, start_date, end_date) for indicator in active])
         
-        for indicator in self.indicators:
-            if not indicator.active:
-                continue
-                
-            try:
-                logger.info(f"🔄 Backfilling {indicator.name}...")
-                
-                # Fetch historical data
-                data_points = self.fetch_indicator_data(indicator, start_date, end_date)
-                
-                if data_points:
-                    stored = self.store_indicator_data(data_points)
-                    total_backfilled += stored
-                    logger.info(f"   ✅ {indicator.name}: {stored} records backfilled")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error backfilling {indicator.name}: {e}")
-                continue
+        data_points = []
+        for indicator, points in zip(active, fetched):
+            if points:
+                logger.info(f"   ✅ {indicator.name}: {len(points)} records fetched")
+                data_points.extend(points)
+        
+        total_backfilled = self.store_indicator_data(data_points)
                 
         logger.info(f"✅ Backfill completed: {total_backfilled} total records")
         return total_backfilled
@@ -12,7 +12,7 @@ import time
 import json
 import asyncio
 import aiohttp
-import yfinance as yf
+import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from fastapi import FastAPI, BackgroundTasks
@@ -30,6 +30,8 @@ except ImportError as e:
     get_collector_schedule = None
     create_schedule_for_collector = None
 
+from shared.market_data import MarketDataSource, YFinanceMarketDataSource, compute_asset_metrics
+
 # Import shared database pool
 try:
     sys.path.append("/app/shared")
@@ -63,12 +65,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ml-market-collector")
 
+# Daily bars per collection - enough for the 1-day change and 5-day volatility
+MARKET_HISTORY_PERIOD = os.getenv("ML_MARKET_HISTORY_PERIOD", "5d")
+ASSET_INFO_FIELDS = ("name", "category", "correlation", "ml_value")
+
 class MLMarketDataCollector:
     """ML-focused market data collector using centralized configuration"""
     
-    def __init__(self):
+    def __init__(self, data_source: Optional[MarketDataSource] = None):
         """Initialize collector with centralized configuration"""
         
+        # All tracked tickers come from one multi-ticker download per collection
+        self.data_source = data_source or YFinanceMarketDataSource()
+        
         # High-correlation ML assets for crypto trading - Complete Coverage
         self.ml_assets = {
             # PRIORITY 1 - Highest crypto correlation (>70%)
@@ -378,17 +387,10 @@ class MLMarketDataCollector:
                               if self.enhanced_ml_assets[symbol].get('source') != 'FRED']
             
             if enhanced_symbols:
-                enhanced_tickers = yf.download(enhanced_symbols, period='1d', interval='1d', progress=False)
+                prices = compute_asset_metrics(self.data_source.download(enhanced_symbols, period='1d'))['price']
                 
-                for symbol in enhanced_symbols:
-                    try:
-                        if symbol in enhanced_tickers['Close'].columns:
-                            price = enhanced_tickers['Close'][symbol].iloc[-1]
-                            enhanced_data[f'enhanced_{symbol.replace("=", "").replace("^", "").replace("-", "_").lower()}'] = float(price)
-                        elif len(enhanced_symbols) == 1:  # Single symbol case
-                            enhanced_data[f'enhanced_{symbol.replace("=", "").replace("^", "").replace("-", "_").lower()}'] = float(enhanced_tickers['Close'].iloc[-1])
-                    except Exception as e:
-                        logger.warning(f"Enhanced asset {symbol} error: {e}")
+                for symbol, price in prices.items():
+                    enhanced_data[f'enhanced_{symbol.replace("=", "").replace("^", "").replace("-", "_").lower()}'] = float(price)
                         
             logger.info(f"✅ Collected {len(enhanced_data)} enhanced market assets")
             return enhanced_data
@@ -467,67 +469,40 @@ class MLMarketDataCollector:
                     except:
                         pass
     
-    def collect_asset_data(self, symbol: str, asset_info: Dict) -> Optional[Dict]:
-        """Collect data for a single asset"""
+    def collect_assets_data(self) -> pd.DataFrame:
+        """Collect every tracked asset in one download; one row of metrics per asset with data"""
+        symbols = list(self.ml_assets)
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
-            
-            if hist.empty:
-                logger.warning(f"No data available for {symbol}")
-                return None
-            
-            latest = hist.iloc[-1]
-            prev = hist.iloc[-2] if len(hist) > 1 else latest
-            
-            # Calculate additional metrics
-            change_1d = float((latest['Close'] - prev['Close']) / prev['Close'] * 100)
-            volatility_5d = float(hist['Close'].pct_change().std() * 100)
-            volume_avg_5d = float(hist['Volume'].mean()) if 'Volume' in hist.columns else 0
-            
-            asset_data = {
-                'symbol': symbol,
-                'name': asset_info['name'],
-                'category': asset_info['category'],
-                'correlation': asset_info['correlation'],
-                'ml_value': asset_info['ml_value'],
-                
-                # Price data
-                'price': float(latest['Close']),
-                'volume': float(latest['Volume']) if 'Volume' in latest else 0,
-                'high': float(latest['High']),
-                'low': float(latest['Low']),
-                'open': float(latest['Open']),
-                
-                # Calculated metrics
-                'change_1d_pct': change_1d,
-                'volatility_5d_pct': volatility_5d,
-                'volume_avg_5d': volume_avg_5d,
-                'volume_ratio': float(latest['Volume'] / volume_avg_5d) if volume_avg_5d > 0 else 1.0,
-                
-                # Metadata
-                'timestamp': datetime.now(),
-                'data_quality': 'HIGH' if not hist.empty and len(hist) >= 2 else 'MEDIUM'
-            }
-            
-            logger.debug(f"✅ {symbol} ({asset_info['name']}): ${latest['Close']:.2f} ({change_1d:+.1f}%)")
-            return asset_data
-            
+            bars = self.data_source.download(symbols, period=MARKET_HISTORY_PERIOD)
+            assets = compute_asset_metrics(bars)
         except Exception as e:
-            logger.error(f"❌ Failed to collect data for {symbol}: {e}")
-            return None
+            logger.error(f"❌ Failed to collect market data for {len(symbols)} assets: {e}")
+            return pd.DataFrame()
+        
+        missing = [symbol for symbol in symbols if symbol not in assets.index]
+        if missing:
+            logger.warning(f"No data available for {', '.join(missing)}")
+        
+        info = pd.DataFrame.from_dict(self.ml_assets, orient='index')[list(ASSET_INFO_FIELDS)]
+        assets = assets.join(info)
+        assets['timestamp'] = datetime.now()
+        logger.debug(f"✅ Collected {len(assets)}/{len(symbols)} assets from {self.data_source.name}")
+        return assets
     
-    def calculate_ml_indicators(self, assets_data: Dict[str, Dict]) -> Dict[str, Dict]:
-        """Calculate high-value ML indicators from collected asset data"""
+    def calculate_ml_indicators(self, assets: pd.DataFrame) -> Dict[str, Dict]:
+        """Calculate high-value ML indicators from the collected asset frame"""
         indicators = {}
         
         try:
-            # Helper function to get asset price safely
+            # Price and daily change columns; missing assets read as 0
+            prices = assets['price'].fillna(0) if not assets.empty else pd.Series(dtype=float)
+            changes = assets['change_1d_pct'].fillna(0) if not assets.empty else pd.Series(dtype=float)
+            
             def get_price(symbol):
-                return assets_data.get(symbol, {}).get('price', 0)
+                return float(prices.get(symbol, 0))
             
             def get_change(symbol):
-                return assets_data.get(symbol, {}).get('change_1d_pct', 0)
+                return float(changes.get(symbol, 0))
             
             # Risk-On/Risk-Off Ratio (QQQ/VIX)
             qqq_price = get_price('QQQ')
@@ -608,94 +583,49 @@ class MLMarketDataCollector:
             logger.error(f"❌ ML indicator calculation error: {e}")
             return {}
     
-    def store_market_data(self, assets_data: Dict, indicators_data: Dict) -> bool:
-        """Store market data and ML indicators in macro_indicators table"""
+    def store_market_data(self, assets: pd.DataFrame, indicators_data: Dict) -> bool:
+        """Store market data and ML indicators in macro_indicators with one multi-row upsert"""
+        current_date = datetime.now().date()
+        created_at = datetime.now()
+        rows = []
+        
+        # Price, daily change and volatility per asset
+        for symbol, data in assets.iterrows():
+            prefix = f"ML_{symbol.replace('=X', '').replace('^', '')}"
+            rows.append((f"{prefix}_PRICE", current_date, float(data['price']),
+                         'ML_Market_Collector', data['category'], created_at))
+            rows.append((f"{prefix}_CHANGE_1D", current_date, float(data['change_1d_pct']),
+                         'ML_Market_Collector', 'daily_change_percent', created_at))
+            rows.append((f"{prefix}_VOLATILITY", current_date,
+                         0.0 if pd.isna(data['volatility_5d_pct']) else float(data['volatility_5d_pct']),
+                         'ML_Market_Collector', 'volatility_metric', created_at))
+        
+        # Calculated ML indicators
+        for name, indicator in indicators_data.items():
+            rows.append((f"ML_{name.upper()}", current_date, indicator['value'],
+                         'ML_Market_Collector', 'ml_indicator', created_at))
+        
+        if not rows:
+            logger.warning("No ML market data to store")
+            return False
+        
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                current_date = datetime.now().date()
-                records_inserted = 0
-                
-                # Store individual asset data
-                for symbol, data in assets_data.items():
-                    if not data:
-                        continue
-                    
-                    # Store main price
-                    cursor.execute("""
-                        INSERT INTO macro_indicators 
-                        (indicator_name, indicator_date, value, data_source, category, created_at) 
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                        value = VALUES(value), category = VALUES(category), updated_at = NOW()
-                    """, (
-                        f"ML_{symbol.replace('=X', '').replace('^', '')}_PRICE",
-                        current_date,
-                        data['price'],
-                        'ML_Market_Collector',
-                        data['category'],
-                        datetime.now()
-                    ))
-                    records_inserted += 1
-                    
-                    # Store daily change
-                    cursor.execute("""
-                        INSERT INTO macro_indicators 
-                        (indicator_name, indicator_date, value, data_source, category, created_at) 
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                        value = VALUES(value), updated_at = NOW()
-                    """, (
-                        f"ML_{symbol.replace('=X', '').replace('^', '')}_CHANGE_1D",
-                        current_date,
-                        data['change_1d_pct'],
-                        'ML_Market_Collector',
-                        'daily_change_percent',
-                        datetime.now()
-                    ))
-                    records_inserted += 1
-                    
-                    # Store volatility
-                    cursor.execute("""
-                        INSERT INTO macro_indicators 
-                        (indicator_name, indicator_date, value, data_source, category, created_at) 
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                        value = VALUES(value), updated_at = NOW()
-                    """, (
-                        f"ML_{symbol.replace('=X', '').replace('^', '')}_VOLATILITY",
-                        current_date,
-                        data.get('volatility_20d', 0),
-                        'ML_Market_Collector',
-                        'volatility_metric',
-                        datetime.now()
-                    ))
-                    records_inserted += 1
-                
-                # Store calculated ML indicators
-                for name, indicator in indicators_data.items():
-                    cursor.execute("""
-                        INSERT INTO macro_indicators 
-                        (indicator_name, indicator_date, value, data_source, category, created_at) 
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                        value = VALUES(value), category = VALUES(category), updated_at = NOW()
-                    """, (
-                        f"ML_{name.upper()}",
-                        current_date,
-                        indicator['value'],
-                        'ML_Market_Collector',
-                        'ml_indicator',
-                        datetime.now()
-                    ))
-                    records_inserted += 1
+                cursor.execute(f"""
+                    INSERT INTO macro_indicators 
+                    (indicator_name, indicator_date, value, data_source, category, created_at) 
+                    VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))}
+                    ON DUPLICATE KEY UPDATE 
+                    value = VALUES(value), category = VALUES(category), updated_at = NOW()
+                """, [value for row in rows for value in row])
                 
                 # Commit transaction
                 conn.commit()
                 cursor.close()
                 
-                logger.info(f"✅ Stored {records_inserted} ML market indicators in database")
-                self.collection_stats['database_writes'] += records_inserted
+                logger.info(f"✅ Stored {len(rows)} ML market indicators in database")
+                self.collection_stats['database_writes'] += len(rows)
                 return True
                 
         except Exception as e:
@@ -707,15 +637,8 @@ class MLMarketDataCollector:
         logger.info("🚀 Starting ML-focused market data collection")
         start_time = datetime.now()
         
-        # Collect asset data
-        assets_data = {}
-        for symbol, asset_info in self.ml_assets.items():
-            data = self.collect_asset_data(symbol, asset_info)
-            if data:
-                assets_data[symbol] = data
-            
-            # Rate limiting
-            time.sleep(0.1)
+        # Collect asset data (one download for every tracked asset)
+        assets_data = self.collect_assets_data()
         
         # Calculate ML indicators
         indicators_data = self.calculate_ml_indicators(assets_data)
@@ -13,10 +13,8 @@ This service collects cryptocurrency news from various sources with:
 import os
 import sys
 import logging
-import requests
 import time
 import hashlib
-import feedparser
 import mysql.connector
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Set
@@ -28,6 +26,11 @@ import asyncio
 import re
 from dataclasses import dataclass
 
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from shared.mention_detector import CryptoAssetMentionIndex
+from shared.feed_fetcher import FeedFetcher, FeedResult, MySQLFeedStateStore, entry_published
+from shared.query_builder import url_hash_probe_query
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -103,16 +106,45 @@ class CryptoNewsService:
             "backfill_records": 0,
             "health_score": 0.0,
             "symbols_tracked": 0,
+            "feeds_not_modified": 0,
+            "entries_skipped_seen": 0,
+            "bytes_downloaded": 0,
+            "items_skipped": 0,
         }
         
-        # Crypto symbol patterns for mention detection
+        # Crypto mention detection: one automaton over all symbols, names and
+        # aliases, recompiled only when crypto_assets changes
         self.crypto_symbols: Set[str] = set()
+        self.mention_index = CryptoAssetMentionIndex(
+            asset_query="""
+                SELECT symbol, name, aliases
+                FROM crypto_assets
+                WHERE status = 'active'
+            """,
+            fallback_symbols=[
+                'BTC', 'ETH', 'ADA', 'SOL', 'DOT', 'AVAX', 'MATIC', 'ATOM', 'ALGO', 
+                'XRP', 'LTC', 'BCH', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX'
+            ],
+        )
         self.load_symbols()
         
         # Rate limiting
         self.request_delay = 1.0  # Delay between requests
         self.max_retries = 3
         
+        # Bulk news writes
+        self.news_upsert_chunk_size = int(os.getenv("NEWS_UPSERT_CHUNK_SIZE", "500"))
+        self._unique_url_hash: Optional[bool] = None
+        
+        # Concurrent conditional-GET feed fetching; validators and high-water
+        # marks persist in news_feed_state so unchanged feeds cost a 304
+        self.feed_fetcher = FeedFetcher(
+            MySQLFeedStateStore(self.get_connection),
+            per_host_limit=int(os.getenv("NEWS_FEED_PER_HOST_LIMIT", "2")),
+            max_connections=int(os.getenv("NEWS_FEED_MAX_CONNECTIONS", "10")),
+            timeout=30,
+        )
+        
     def setup_database(self):
         """Setup database connection"""
         self.db_config = {
@@ -132,194 +164,211 @@ class CryptoNewsService:
             raise
             
     def load_symbols(self):
-        """Load active crypto symbols from crypto_assets table"""
+        """Load active crypto assets, rebuilding the mention detector if crypto_assets changed"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT symbol 
-                    FROM crypto_assets 
-                    WHERE status = 'active'
-                    ORDER BY symbol
-                """)
-                symbols = [row[0] for row in cursor.fetchall()]
-                self.crypto_symbols = set(symbols)
-                self.stats["symbols_tracked"] = len(symbols)
-                logger.info(f"✅ Loaded {len(symbols)} crypto symbols from crypto_assets table")
+                if self.mention_index.refresh(cursor):
+                    logger.info(f"✅ Loaded {len(self.mention_index.symbols)} crypto symbols from crypto_assets table")
                 
         except Exception as e:
             logger.error(f"❌ Failed to load symbols from crypto_assets: {e}")
-            # Fallback to common symbols
-            self.crypto_symbols = {
-                'BTC', 'ETH', 'ADA', 'SOL', 'DOT', 'AVAX', 'MATIC', 'ATOM', 'ALGO', 
-                'XRP', 'LTC', 'BCH', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX'
-            }
-            self.stats["symbols_tracked"] = len(self.crypto_symbols)
+            # Fallback to common symbols unless an earlier load succeeded
+            self.mention_index.use_fallback()
+        
+        self.crypto_symbols = set(self.mention_index.symbols)
+        self.stats["symbols_tracked"] = len(self.crypto_symbols)
             
     def detect_crypto_mentions(self, text: str) -> List[str]:
-        """Detect crypto symbols mentioned in text"""
-        mentions = []
-        text_upper = text.upper()
-        
-        for symbol in self.crypto_symbols:
-            # Look for symbol as standalone word
-            pattern = r'\b' + re.escape(symbol) + r'\b'
-            if re.search(pattern, text_upper):
-                mentions.append(symbol)
-                
-        return mentions
+        """Detect crypto symbols, names and aliases mentioned in text (single pass)"""
+        return self.mention_index.detect(text)
+        
+    def fetch_feeds(self, sources: List[NewsSource]) -> List[FeedResult]:
+        """Fetch RSS feeds concurrently; unchanged feeds come back as 304 with no entries"""
+        logger.info(f"📡 Fetching {len(sources)} RSS feeds")
+        return asyncio.run(self.feed_fetcher.fetch_all([(s.name, s.url) for s in sources]))
         
-    def fetch_rss_feed(self, source: NewsSource) -> List[Dict]:
-        """Fetch and parse RSS feed from a source"""
+    def entry_to_news_item(self, entry, source: NewsSource) -> Optional[Dict]:
+        """Turn a feedparser entry into a news item"""
         try:
-            logger.info(f"📡 Fetching RSS feed from {source.name}")
+            # Extract publication date
+            published_at = entry_published(entry) or datetime.now()
+                
+            # Extract content
+            content = ""
+            if hasattr(entry, 'content') and entry.content:
+                content = entry.content[0].value if entry.content else ""
+            elif hasattr(entry, 'summary'):
+                content = entry.summary
+            elif hasattr(entry, 'description'):
+                content = entry.description
+                
+            # Clean HTML tags from content
+            content = re.sub(r'<[^>]+>', '', content)
             
-            headers = {
-                'User-Agent': 'CryptoNewsCollector/1.0 (+https://example.com/bot)'
+            title = entry.title if hasattr(entry, 'title') else 'No title'
+            url = entry.link if hasattr(entry, 'link') else None
+            
+            # Detect crypto mentions
+            full_text = f"{title} {content}"
+            crypto_mentions = self.detect_crypto_mentions(full_text)
+            
+            return {
+                "title": title,
+                "content": content,
+                "url": url,
+                "published_at": published_at,
+                "source": source.name,
+                "category": source.category,
+                "crypto_mentions": crypto_mentions,
+                "sentiment_score": None,  # Will be calculated by sentiment service
+                "sentiment_confidence": None,
             }
             
-            # Fetch RSS feed
-            response = requests.get(source.url, headers=headers, timeout=30)
-            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"❌ Error parsing RSS entry from {source.name}: {e}")
+            return None
             
-            # Parse RSS feed
-            feed = feedparser.parse(response.content)
+    NEWS_INSERT_COLUMNS = (
+        "title", "content", "url", "published_at", "source",
+        "category", "sentiment_score", "sentiment_confidence",
+        "llm_sentiment_score", "llm_sentiment_confidence", "llm_sentiment_analysis",
+        "market_type", "stock_sentiment_score", "stock_sentiment_confidence",
+        "stock_sentiment_analysis", "crypto_mentions", "url_hash",
+    )
+    
+    @staticmethod
+    def news_url_hash(item: Dict) -> str:
+        """Duplicate-detection key for a news item"""
+        return hashlib.md5(
+            (item.get("url", "") or f"no_url_{item['title']}").encode()
+        ).hexdigest()
+        
+    @staticmethod
+    def _news_row(item: Dict, url_hash: str) -> tuple:
+        return (
+            item["title"],
+            item["content"],
+            item["url"],
+            item["published_at"],
+            item["source"],
+            item["category"],
+            item["sentiment_score"],
+            item["sentiment_confidence"],
+            None,  # llm_sentiment_score
+            None,  # llm_sentiment_confidence  
+            None,  # llm_sentiment_analysis
+            "crypto",  # market_type
+            None,  # stock_sentiment_score
+            None,  # stock_sentiment_confidence
+            None,  # stock_sentiment_analysis
+            ",".join(item["crypto_mentions"]) if item["crypto_mentions"] else "",
+            url_hash
+        )
+        
+    def _news_insert_sql(self, row_count: int, on_duplicate: Optional[str]) -> str:
+        """Multi-row INSERT into crypto_news with an optional ON DUPLICATE KEY clause"""
+        row = "(" + ", ".join(["%s"] * len(self.NEWS_INSERT_COLUMNS)) + ", NOW(), NOW())"
+        sql = f"""
+            INSERT INTO crypto_news ({", ".join(self.NEWS_INSERT_COLUMNS)}, created_at, updated_at)
+            VALUES {", ".join([row] * row_count)}
+        """
+        if on_duplicate:
+            sql += f" ON DUPLICATE KEY UPDATE {on_duplicate}"
+        return sql
+        
+    def _has_unique_url_hash(self, cursor) -> bool:
+        """Whether crypto_news has a unique key on url_hash (checked once)"""
+        if self._unique_url_hash is None:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'crypto_news'
+                AND COLUMN_NAME = 'url_hash' AND NON_UNIQUE = 0 AND SEQ_IN_INDEX = 1
+            """)
+            row = cursor.fetchone()
+            self._unique_url_hash = bool(row and row[0])
+        return self._unique_url_hash
+        
+    def upsert_news_items(self, news_items: List[Dict], update_existing: bool = False) -> Dict[str, int]:
+        """
+        Bulk-store news items keyed on url_hash
+        
+        The batch is deduplicated in memory, existing hashes are found with one
+        IN (...) probe per chunk and new rows are written with one multi-row
+        INSERT per chunk. With update_existing (and a unique key on url_hash),
+        existing rows are refreshed in the same statement via ON DUPLICATE KEY
+        UPDATE; otherwise they are skipped.
+        
+        Returns {"inserted", "updated", "skipped"} counts.
+        """
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        
+        batch: Dict[str, Dict] = {}
+        for item in news_items:
+            url_hash = self.news_url_hash(item)
+            if url_hash in batch:
+                counts["skipped"] += 1
+            else:
+                batch[url_hash] = item
+        if not batch:
+            return counts
+            
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            unique_key = self._has_unique_url_hash(cursor)
+            hashes = list(batch)
             
-            if not feed.entries:
-                logger.warning(f"⚠️  No entries found in RSS feed from {source.name}")
-                return []
+            for offset in range(0, len(hashes), self.news_upsert_chunk_size):
+                chunk = hashes[offset:offset + self.news_upsert_chunk_size]
+                cursor.execute(url_hash_probe_query(len(chunk)), chunk)
+                existing = {row[0] for row in cursor.fetchall()}
                 
-            news_items = []
-            for entry in feed.entries:
-                try:
-                    # Extract publication date
-                    published_at = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_at = datetime(*entry.published_parsed[:6])
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_at = datetime(*entry.updated_parsed[:6])
-                    else:
-                        published_at = datetime.now()
-                        
-                    # Extract content
-                    content = ""
-                    if hasattr(entry, 'content') and entry.content:
-                        content = entry.content[0].value if entry.content else ""
-                    elif hasattr(entry, 'summary'):
-                        content = entry.summary
-                    elif hasattr(entry, 'description'):
-                        content = entry.description
-                        
-                    # Clean HTML tags from content
-                    content = re.sub(r'<[^>]+>', '', content)
-                    
-                    title = entry.title if hasattr(entry, 'title') else 'No title'
-                    url = entry.link if hasattr(entry, 'link') else None
-                    
-                    # Detect crypto mentions
-                    full_text = f"{title} {content}"
-                    crypto_mentions = self.detect_crypto_mentions(full_text)
-                    
-                    news_item = {
-                        "title": title,
-                        "content": content,
-                        "url": url,
-                        "published_at": published_at,
-                        "source": source.name,
-                        "category": source.category,
-                        "crypto_mentions": crypto_mentions,
-                        "sentiment_score": None,  # Will be calculated by sentiment service
-                        "sentiment_confidence": None,
-                    }
-                    
-                    news_items.append(news_item)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error parsing RSS entry from {source.name}: {e}")
-                    continue
+                if update_existing and unique_key:
+                    write = chunk
+                    on_duplicate = (
+                        "content = VALUES(content), crypto_mentions = VALUES(crypto_mentions), "
+                        "updated_at = NOW()"
+                    )
+                    counts["updated"] += len(existing)
+                else:
+                    write = [h for h in chunk if h not in existing]
+                    # A row inserted concurrently since the probe is left alone
+                    on_duplicate = "url_hash = url_hash" if unique_key else None
+                    counts["skipped"] += len(existing)
                     
-            logger.info(f"✅ Collected {len(news_items)} news items from {source.name}")
-            return news_items
+                if write:
+                    cursor.execute(
+                        self._news_insert_sql(len(write), on_duplicate),
+                        [value for h in write for value in self._news_row(batch[h], h)]
+                    )
+                counts["inserted"] += len([h for h in write if h not in existing])
+                
+            conn.commit()
             
-        except Exception as e:
-            logger.error(f"❌ Error fetching RSS feed from {source.name}: {e}")
-            self.stats["collection_errors"] += 1
-            return []
+        return counts
             
     def store_news_items(self, news_items: List[Dict]) -> int:
-        """Store news items in the database with duplicate detection"""
+        """
+        Store news items in the database with duplicate detection
+
+        A failed write is logged and re-raised so the caller leaves that
+        feed's state uncommitted and the entries are fetched again.
+        """
         if not news_items:
             return 0
             
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                stored_count = 0
-                
-                for item in news_items:
-                    try:
-                        # Generate URL hash for duplicate detection
-                        url_hash = hashlib.md5(
-                            (item.get("url", "") or f"no_url_{item['title']}").encode()
-                        ).hexdigest()
-                        
-                        # Check if already exists
-                        cursor.execute(
-                            "SELECT id FROM crypto_news WHERE url_hash = %s",
-                            (url_hash,)
-                        )
-                        
-                        if cursor.fetchone():
-                            continue  # Skip duplicates
-                            
-                        # Insert new news item
-                        insert_sql = """
-                        INSERT INTO crypto_news (
-                            title, content, url, published_at, source, 
-                            category, sentiment_score, sentiment_confidence,
-                            llm_sentiment_score, llm_sentiment_confidence, llm_sentiment_analysis,
-                            market_type, stock_sentiment_score, stock_sentiment_confidence, 
-                            stock_sentiment_analysis, crypto_mentions, url_hash, 
-                            created_at, updated_at
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                            NOW(), NOW()
-                        )
-                        """
-                        
-                        cursor.execute(insert_sql, (
-                            item["title"],
-                            item["content"],
-                            item["url"],
-                            item["published_at"],
-                            item["source"],
-                            item["category"],
-                            item["sentiment_score"],
-                            item["sentiment_confidence"],
-                            None,  # llm_sentiment_score
-                            None,  # llm_sentiment_confidence  
-                            None,  # llm_sentiment_analysis
-                            "crypto",  # market_type
-                            None,  # stock_sentiment_score
-                            None,  # stock_sentiment_confidence
-                            None,  # stock_sentiment_analysis
-                            ",".join(item["crypto_mentions"]) if item["crypto_mentions"] else "",
-                            url_hash
-                        ))
-                        
-                        stored_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Error storing news item: {e}")
-                        continue
-                        
-                conn.commit()
-                logger.info(f"✅ Stored {stored_count} news items in database")
-                return stored_count
+            counts = self.upsert_news_items(news_items)
+            self.stats["items_skipped"] += counts["skipped"]
+            logger.info(
+                f"✅ Stored {counts['inserted']} news items in database "
+                f"({counts['skipped']} duplicates skipped)"
+            )
+            return counts["inserted"]
                 
         except Exception as e:
             logger.error(f"❌ Error storing news items: {e}")
-            return 0
+            raise
             
     def run_collection_cycle(self) -> Dict:
         """Run one complete news collection cycle across all sources"""
@@ -330,29 +379,55 @@ class CryptoNewsService:
         total_stored = 0
         sources_processed = 0
         
-        for source in self.news_sources:
-            if not source.active:
+        # Cheap checksum check; recompiles the detector only if assets changed
+        self.load_symbols()
+        
+        sources = {source.name: source for source in self.news_sources if source.active}
+        try:
+            results = self.fetch_feeds(list(sources.values()))
+        except Exception as e:
+            logger.error(f"❌ Error fetching RSS feeds: {e}")
+            self.stats["collection_errors"] += 1
+            results = []
+        
+        handled = []
+        for result in results:
+            source = sources[result.name]
+            if result.error:
+                logger.error(f"❌ Error fetching RSS feed from {source.name}: {result.error}")
+                self.stats["collection_errors"] += 1
+                continue
+                
+            sources_processed += 1
+            self.stats["bytes_downloaded"] += result.bytes_downloaded
+            if result.not_modified:
+                self.stats["feeds_not_modified"] += 1
+                logger.info(f"✅ {source.name} unchanged (304)")
                 continue
                 
             try:
-                # Fetch news from source
-                news_items = self.fetch_rss_feed(source)
+                self.stats["entries_skipped_seen"] += result.total_entries - len(result.entries)
+                news_items = [
+                    item for item in (self.entry_to_news_item(entry, source) for entry in result.entries)
+                    if item
+                ]
+                logger.info(f"✅ Collected {len(news_items)} new of {result.total_entries} entries from {source.name}")
                 
                 if news_items:
                     stored = self.store_news_items(news_items)
                     total_collected += len(news_items)
                     total_stored += stored
                     
-                sources_processed += 1
-                
-                # Rate limiting between sources
-                time.sleep(self.request_delay)
+                handled.append(result)
                 
             except Exception as e:
                 logger.error(f"❌ Error processing source {source.name}: {e}")
                 self.stats["collection_errors"] += 1
                 continue
                 
+        # Advance validators and high-water marks only for handled feeds
+        self.feed_fetcher.commit(handled)
+                
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
@@ -15,7 +15,7 @@ import time
 import json
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
@@ -24,6 +24,9 @@ from concurrent.futures import ThreadPoolExecutor
 
 # Dynamic symbol management
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from shared.rate_limiter import get_rate_limiter
+from shared.symbol_registry import get_symbol_registry
 try:
     from table_config import get_collector_symbols, normalize_symbol_for_exchange
 except ImportError:
@@ -34,6 +37,72 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("enhanced-ohlc-collector")
 
+# Incremental collection - CoinGecko picks OHLC granularity from `days`
+# (1-2: 30 minutes, 3-30: 4 hours, above: 4 days), so fetch windows stay in the
+# 4-hour tier and are sized to the gap since each symbol's last stored candle
+OHLC_CANDLE_SECONDS = 4 * 3600
+OHLC_WINDOW_DAYS = (7, 14, 30)
+OHLC_INITIAL_DAYS = int(os.getenv("OHLC_INITIAL_DAYS", "7"))
+OHLC_UPSERT_CHUNK_SIZE = int(os.getenv("OHLC_UPSERT_CHUNK_SIZE", "500"))
+MARKETS_PAGE_SIZE = 250  # ids per /coins/markets call
+
+OHLC_COLUMNS = (
+    "symbol", "coin_id", "timestamp_unix", "timestamp_iso",
+    "open_price", "high_price", "low_price", "close_price", "volume", "data_source",
+)
+
+# (timestamp_unix, (open, high, low, close)) of a symbol's last stored candle
+Watermark = Tuple[int, Tuple[float, float, float, float]]
+
+
+def candle_prices(values) -> Tuple[float, ...]:
+    """Prices rounded to the DECIMAL(20,8) scale they are stored at"""
+    return tuple(round(float(v), 8) for v in values)
+
+
+def fetch_window_days(watermark: Optional[Watermark], now_ms: int) -> Optional[int]:
+    """OHLC `days` covering the gap since the watermark; None if no new candle can exist yet"""
+    if watermark is None:
+        return OHLC_INITIAL_DAYS
+    gap_seconds = (now_ms - watermark[0]) / 1000
+    if gap_seconds < OHLC_CANDLE_SECONDS:
+        return None
+    for days in OHLC_WINDOW_DAYS:
+        if gap_seconds <= days * 86400:
+            return days
+    return OHLC_WINDOW_DAYS[-1]
+
+
+def new_or_changed_candles(ohlc_data: List, watermark: Optional[Watermark]) -> List:
+    """Candles after the watermark, plus the watermark candle if it was revised"""
+    if watermark is None:
+        return [c for c in ohlc_data if len(c) >= 5]
+    last_ts, last_values = watermark
+    candles = []
+    for candle in ohlc_data:
+        if len(candle) < 5:
+            continue
+        ts = int(candle[0])
+        if ts > last_ts or (ts == last_ts and candle_prices(candle[1:5]) != last_values):
+            candles.append(candle)
+    return candles
+
+
+def ohlc_upsert_sql(row_count: int) -> str:
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE for ``row_count`` candles"""
+    row = "(" + ", ".join(["%s"] * len(OHLC_COLUMNS)) + ")"
+    return f"""
+        INSERT INTO ohlc_data ({", ".join(OHLC_COLUMNS)})
+        VALUES {", ".join([row] * row_count)}
+        ON DUPLICATE KEY UPDATE
+            open_price = VALUES(open_price),
+            high_price = VALUES(high_price),
+            low_price = VALUES(low_price),
+            close_price = VALUES(close_price),
+            volume = VALUES(volume),
+            data_source = VALUES(data_source)
+    """
+
 class EnhancedOHLCCollector:
     """Production-ready OHLC collector with comprehensive monitoring and FastAPI endpoints"""
     
@@ -54,8 +123,8 @@ class EnhancedOHLCCollector:
         # Service configuration
         self.service_name = "Enhanced OHLC Collector"
         self.collection_interval = 3600  # 1 hour (OHLC typical interval)
-        self.rate_limit_delay = 0.15  # 150ms between calls (500 calls/minute)
-        self.last_request_time = 0
+        self.rate_limiter = get_rate_limiter('coingecko_premium')
+        self.symbol_registry = get_symbol_registry()
         
         # Initialize session with headers
         self.session = requests.Session()
@@ -78,7 +147,9 @@ class EnhancedOHLCCollector:
             'last_success': None,
             'last_error': None,
             'database_writes': 0,
-            'symbols_processed': 0
+            'symbols_processed': 0,
+            'symbols_up_to_date': 0,
+            'candles_unchanged': 0
         }
         
         # Health tracking
@@ -143,35 +214,12 @@ class EnhancedOHLCCollector:
         ]
 
     def rate_limit(self):
-        """Enforce rate limiting for API calls"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+        """Enforce rate limiting for API calls (shared CoinGecko budget)"""
+        self.rate_limiter.acquire_blocking()
 
     def get_coin_id_for_symbol(self, symbol: str) -> Optional[str]:
-        """Get CoinGecko coin_id for symbol"""
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT coin_id 
-                FROM price_data_real 
-                WHERE symbol = %s 
-                AND coin_id IS NOT NULL 
-                AND coin_id != ''
-                LIMIT 1
-            """, (symbol,))
-            
-            result = cursor.fetchone()
-            conn.close()
-            
-            return result[0] if result else symbol.lower()
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting coin_id for {symbol}: {e}")
-            return symbol.lower()
+        """Get CoinGecko coin_id for symbol from the shared symbol registry"""
+        return self.symbol_registry.coingecko_id(symbol) or symbol.lower()
 
     def make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make API request with rate limiting and error handling"""
@@ -190,110 +238,125 @@ class EnhancedOHLCCollector:
             self.health_metrics['api_error_count'] += 1
             return None
 
-    def collect_ohlc_for_symbol(self, symbol: str) -> int:
-        """Collect OHLC data for a specific symbol"""
+    def load_watermarks(self, symbols: List[str]) -> Dict[str, Watermark]:
+        """Last stored candle per symbol, in one grouped query"""
+        if not symbols:
+            return {}
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            cursor = conn.cursor()
+            
+            cursor.execute(f"""
+                SELECT o.symbol, o.timestamp_unix, o.open_price, o.high_price, o.low_price, o.close_price
+                FROM ohlc_data o
+                JOIN (
+                    SELECT symbol, MAX(timestamp_unix) AS timestamp_unix
+                    FROM ohlc_data
+                    WHERE symbol IN ({", ".join(["%s"] * len(symbols))})
+                    GROUP BY symbol
+                ) w ON o.symbol = w.symbol AND o.timestamp_unix = w.timestamp_unix
+            """, tuple(symbols))
+            
+            watermarks = {
+                row[0]: (int(row[1]), candle_prices(row[2:6]))
+                for row in cursor.fetchall()
+            }
+            conn.close()
+            return watermarks
+            
+        except Exception as e:
+            logger.error(f"❌ Error loading OHLC watermarks: {e}")
+            self.health_metrics['database_error_count'] += 1
+            return {}
+
+    def fetch_market_volumes(self, coin_ids: List[str]) -> Dict[str, float]:
+        """Current 24h USD volume per coin_id from batched /coins/markets calls"""
+        volumes = {}
+        unique_ids = sorted(set(coin_ids))
+        for i in range(0, len(unique_ids), MARKETS_PAGE_SIZE):
+            page = unique_ids[i:i + MARKETS_PAGE_SIZE]
+            data = self.make_request("coins/markets", {
+                'vs_currency': 'usd',
+                'ids': ','.join(page),
+                'per_page': MARKETS_PAGE_SIZE,
+                'page': 1,
+                'sparkline': 'false'
+            })
+            for coin in data or []:
+                if coin.get('id') and coin.get('total_volume'):
+                    volumes[coin['id']] = float(coin['total_volume'])
+        return volumes
+
+    def collect_ohlc_for_symbol(self, symbol: str, coin_id: Optional[str] = None, days: int = OHLC_INITIAL_DAYS,
+                                watermark: Optional[Watermark] = None, volume: Optional[float] = None) -> Optional[int]:
+        """Collect new or changed OHLC candles for a symbol; None if nothing could be fetched"""
         try:
-            coin_id = self.get_coin_id_for_symbol(symbol)
+            coin_id = coin_id or self.get_coin_id_for_symbol(symbol)
             
-            # Get OHLC data for the last 7 days (hourly granularity)
+            # Window sized to the gap since the last stored candle (4-hour granularity)
             endpoint = f"coins/{coin_id}/ohlc"
             params = {
                 'vs_currency': 'usd',
-                'days': 7
+                'days': days
             }
             
-            logger.debug(f"📈 Collecting OHLC data for {symbol} ({coin_id})...")
+            logger.debug(f"📈 Collecting {days}d OHLC data for {symbol} ({coin_id})...")
             ohlc_data = self.make_request(endpoint, params)
             
             if not ohlc_data:
                 logger.warning(f"⚠️ No OHLC data for {symbol}")
-                return 0
+                return None
             
-            # Get current 24h volume data
-            volume = self.get_current_volume(coin_id)
+            candles = new_or_changed_candles(ohlc_data, watermark)
+            self.stats['candles_unchanged'] += len(ohlc_data) - len(candles)
             
-            return self.store_ohlc_data(symbol, coin_id, ohlc_data, volume)
+            return self.store_ohlc_data(symbol, coin_id, candles, volume)
             
         except Exception as e:
             logger.error(f"❌ Error collecting OHLC for {symbol}: {e}")
-            return 0
-
-    def get_current_volume(self, coin_id: str) -> Optional[float]:
-        """Get current 24h volume for a coin"""
-        try:
-            endpoint = f"coins/{coin_id}"
-            params = {
-                'localization': 'false',
-                'tickers': 'false', 
-                'community_data': 'false',
-                'developer_data': 'false',
-                'sparkline': 'false'
-            }
-            
-            data = self.make_request(endpoint, params)
-            
-            if data and 'market_data' in data and 'total_volume' in data['market_data']:
-                volume_usd = data['market_data']['total_volume'].get('usd', 0)
-                return float(volume_usd) if volume_usd else None
-                
-            return None
-            
-        except Exception as e:
-            logger.debug(f"⚠️ Could not fetch volume for {coin_id}: {e}")
             return None
 
     def store_ohlc_data(self, symbol: str, coin_id: str, ohlc_data: List, volume: Optional[float] = None) -> int:
-        """Store OHLC data in database with optional volume data"""
+        """Store OHLC data in database with optional volume data, in multi-row upserts"""
+        rows = []
+        for ohlc in ohlc_data:
+            if len(ohlc) >= 5:
+                timestamp_unix = int(ohlc[0])
+                
+                # Use provided volume or try to extract from OHLC array (if available)
+                record_volume = volume
+                if record_volume is None and len(ohlc) > 5:
+                    record_volume = float(ohlc[5])
+                
+                rows.append((
+                    symbol,
+                    coin_id,
+                    timestamp_unix,
+                    datetime.fromtimestamp(timestamp_unix / 1000),
+                    float(ohlc[1]),  # open
+                    float(ohlc[2]),  # high
+                    float(ohlc[3]),  # low
+                    float(ohlc[4]),  # close
+                    record_volume,   # volume from parameter or OHLC array
+                    'enhanced_ohlc_collector'
+                ))
+        
+        if not rows:
+            return 0
+        
         try:
             conn = mysql.connector.connect(**self.db_config)
             cursor = conn.cursor()
             
-            insert_sql = """
-                INSERT INTO ohlc_data 
-                (symbol, coin_id, timestamp_unix, timestamp_iso, 
-                 open_price, high_price, low_price, close_price, volume, data_source)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    open_price = VALUES(open_price),
-                    high_price = VALUES(high_price),
-                    low_price = VALUES(low_price),
-                    close_price = VALUES(close_price),
-                    volume = VALUES(volume),
-                    data_source = VALUES(data_source)
-            """
-            
-            records_inserted = 0
-            
-            for ohlc in ohlc_data:
-                if len(ohlc) >= 5:
-                    timestamp_unix = int(ohlc[0])
-                    timestamp_iso = datetime.fromtimestamp(timestamp_unix / 1000)
-                    
-                    # Use provided volume or try to extract from OHLC array (if available)
-                    record_volume = volume
-                    if record_volume is None and len(ohlc) > 5:
-                        record_volume = float(ohlc[5])
-                    
-                    values = (
-                        symbol,
-                        coin_id,
-                        timestamp_unix,
-                        timestamp_iso,
-                        float(ohlc[1]),  # open
-                        float(ohlc[2]),  # high
-                        float(ohlc[3]),  # low
-                        float(ohlc[4]),  # close
-                        record_volume,   # volume from parameter or OHLC array
-                        'enhanced_ohlc_collector'
-                    )
-                    
-                    cursor.execute(insert_sql, values)
-                    records_inserted += 1
+            for i in range(0, len(rows), OHLC_UPSERT_CHUNK_SIZE):
+                chunk = rows[i:i + OHLC_UPSERT_CHUNK_SIZE]
+                cursor.execute(ohlc_upsert_sql(len(chunk)), [value for row in chunk for value in row])
+                self.stats['database_writes'] += 1
+            records_inserted = len(rows)
             
             conn.commit()
             conn.close()
             
-            self.stats['database_writes'] += 1
             self.stats['ohlc_records_collected'] += records_inserted
             
             volume_info = f" with volume ${volume:,.0f}" if volume else " (no volume data)"
@@ -316,11 +379,29 @@ class EnhancedOHLCCollector:
         total_records = 0
         successful_symbols = 0
         failed_symbols = 0
+        up_to_date_symbols = 0
         
+        # Only symbols whose last stored candle leaves room for a new one are fetched
+        now_ms = int(time.time() * 1000)
+        watermarks = self.load_watermarks(self.symbols)
+        due = {}
         for symbol in self.symbols:
+            days = fetch_window_days(watermarks.get(symbol), now_ms)
+            if days is None:
+                up_to_date_symbols += 1
+            else:
+                due[symbol] = days
+        
+        coin_ids = {symbol: self.get_coin_id_for_symbol(symbol) for symbol in due}
+        volumes = self.fetch_market_volumes(list(coin_ids.values())) if due else {}
+        
+        for symbol, days in due.items():
             try:
-                records = self.collect_ohlc_for_symbol(symbol)
-                if records > 0:
+                coin_id = coin_ids[symbol]
+                records = self.collect_ohlc_for_symbol(
+                    symbol, coin_id, days, watermarks.get(symbol), volumes.get(coin_id)
+                )
+                if records is not None:
                     total_records += records
                     successful_symbols += 1
                     self.health_metrics['consecutive_failures'] = 0
@@ -336,8 +417,9 @@ class EnhancedOHLCCollector:
         # Update statistics
         duration = (datetime.now() - start_time).total_seconds()
         self.stats['symbols_processed'] = successful_symbols
+        self.stats['symbols_up_to_date'] = up_to_date_symbols
         
-        if successful_symbols > 0:
+        if successful_symbols > 0 or not due:
             self.stats['successful_collections'] += 1
             self.stats['last_success'] = datetime.now().isoformat()
         else:
@@ -350,11 +432,13 @@ class EnhancedOHLCCollector:
             'symbols_processed': len(self.symbols),
             'successful_symbols': successful_symbols,
             'failed_symbols': failed_symbols,
+            'up_to_date_symbols': up_to_date_symbols,
             'total_records_collected': total_records,
             'timestamp': datetime.now().isoformat()
         }
         
-        logger.info(f"✅ OHLC collection completed: {successful_symbols}/{len(self.symbols)} symbols, {total_records} records")
+        logger.info(f"✅ OHLC collection completed: {successful_symbols}/{len(due)} due symbols "
+                    f"({up_to_date_symbols} up to date), {total_records} records")
         return result
 
     def detect_data_gap(self) -> Optional[int]:
@@ -565,7 +649,7 @@ ohlc_collector_running 1
                 },
                 "tracked_symbols": len(self.symbols),
                 "collection_frequency": "Every 1 hour",
-                "data_retention": "Up to 7 days per collection cycle",
+                "data_retention": "Incremental from each symbol's last stored candle (up to 30 days per cycle)",
                 "api_source": "CoinGecko Premium OHLC endpoint",
                 "rate_limits": "500 calls/minute (Premium tier)"
             }
@@ -7,13 +7,11 @@ Includes comprehensive backfill capability and dynamic symbol management
 
 import os
 import logging
-import time
 import mysql.connector
 from datetime import datetime, timedelta, date
-import aiohttp
 import asyncio
 import json
-from typing import List, Dict, Optional
+from typing import Awaitable, Dict, Iterable, List, Optional, Tuple
 import sys
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
@@ -40,6 +38,13 @@ except ImportError as e:
     get_supported_symbols = lambda: []
     get_symbol_metadata = lambda x: {}
 
+from shared.rate_limiter import get_rate_limiter, get_all_rate_limiter_stats
+from shared.http_client import ProviderHttpClient, close_http_clients, get_all_http_client_stats, get_http_client
+from shared.defillama_snapshot import DefiLlamaSnapshotCache
+from shared.symbol_registry import get_symbol_registry
+from shared.query_builder import date_span_bounds, existing_days_query
+from shared.onchain_completeness import onchain_completeness
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
@@ -50,6 +55,40 @@ ENSURE_PLACEHOLDERS = os.getenv("ENSURE_PLACEHOLDERS", "true").lower() == "true"
 PLACEHOLDER_LOOKBACK_DAYS = int(os.getenv("PLACEHOLDER_LOOKBACK_DAYS", "30"))
 MAX_BACKFILL_DAYS = int(os.getenv("MAX_BACKFILL_DAYS", "90"))
 
+# Concurrent collection - sources run in parallel per symbol/date and several
+# symbols/dates are in flight at once; the provider rate limiters and HTTP pools
+# are the budget, not fixed sleeps. The source timeout includes rate-limit waits.
+ONCHAIN_SOURCE_TIMEOUT = float(os.getenv("ONCHAIN_SOURCE_TIMEOUT", "45"))
+ONCHAIN_BACKFILL_CONCURRENCY = int(os.getenv("ONCHAIN_BACKFILL_CONCURRENCY", "8"))
+ONCHAIN_BACKFILL_SYMBOL_CONCURRENCY = int(os.getenv("ONCHAIN_BACKFILL_SYMBOL_CONCURRENCY", "4"))
+
+# Source priority for merging: applied in this order, so later sources override
+# earlier ones. ``keep`` decides which of a source's values may override (None
+# keeps everything).
+ONCHAIN_SOURCES = (
+    ('coingecko', None),
+    ('coingecko-enhanced', lambda value: value is not None and value != 0),
+    ('defilama', lambda value: value is not None),
+    ('network-api', None),
+    ('additional-apis', None),
+)
+
+
+def merge_onchain_sources(results: Iterable[Tuple[str, Optional[Dict]]]) -> Tuple[Dict, List[str]]:
+    """Merge per-source results by ONCHAIN_SOURCES priority, whatever order they finished in"""
+    by_source = dict(results)
+    merged_data = {}
+    data_sources = []
+    for source, keep in ONCHAIN_SOURCES:
+        data = by_source.get(source)
+        if not data:
+            continue
+        for key, value in data.items():
+            if keep is None or keep(value):
+                merged_data[key] = value
+        data_sources.append(source)
+    return merged_data, data_sources
+
 
 class EnhancedOnchainCollector:
     def __init__(self):
@@ -75,14 +114,33 @@ class EnhancedOnchainCollector:
             'defilama': 'https://api.llama.fi/protocol/{protocol}',  # For TVL data
         }
         
-        # Rate limiting - different delays for different APIs
-        self.last_api_call = {}
-        self.rate_limits = {
-            'coingecko': 0.1 if self.use_premium_api else 1.0,  # Premium: 10 req/sec, Free: 1 req/sec
-            'coingecko_additional': 0.2 if self.use_premium_api else 1.5,  # Additional CoinGecko endpoints
-            'defilama': 0.5,     # Public API: 2 req/sec
-            'network': 2.0,      # Blockchain APIs: conservative
-            'additional': 1.5,   # Additional APIs: moderate
+        # Rate limiting - endpoint -> provider bucket in RATE_LIMITS, one per upstream
+        # account; every CoinGecko endpoint shares the same API key and budget
+        coingecko_tier = 'coingecko_premium' if self.use_premium_api else 'coingecko_free'
+        self.rate_limit_providers = {
+            'coingecko': coingecko_tier,
+            'coingecko_additional': coingecko_tier,
+            'defilama': 'defillama',
+            'network': 'blockchain_apis',
+            'additional': 'onchain_additional_apis',
+        }
+        
+        # DeFiLlama chain TVL / protocol counts, downloaded once per window for all symbols
+        self.defillama = DefiLlamaSnapshotCache(
+            refresh_seconds=int(os.getenv('DEFILLAMA_SNAPSHOT_REFRESH_SECONDS', '3600')),
+            before_request=lambda: self.rate_limit('defilama')
+        )
+        
+        # Symbol -> CoinGecko / Messari ids from the process-wide crypto_assets snapshot
+        self.symbol_registry = get_symbol_registry()
+        
+        # Concurrent collection limits (see ONCHAIN_SOURCES / ONCHAIN_BACKFILL_*)
+        self.source_timeout = ONCHAIN_SOURCE_TIMEOUT
+        self.backfill_concurrency = max(1, ONCHAIN_BACKFILL_CONCURRENCY)
+        self.backfill_symbol_concurrency = max(1, ONCHAIN_BACKFILL_SYMBOL_CONCURRENCY)
+        self.source_stats = {
+            source: {'ok': 0, 'empty': 0, 'timeouts': 0, 'errors': 0}
+            for source, _ in ONCHAIN_SOURCES
         }
         
         if self.use_premium_api:
@@ -232,6 +290,7 @@ class EnhancedOnchainCollector:
                     -- Data quality
                     data_source VARCHAR(100),
                     data_quality_score DECIMAL(3,2) DEFAULT 1.0,
+                    data_completeness_percentage DECIMAL(5,2) DEFAULT 0.00,
                     
                     UNIQUE KEY unique_symbol_timestamp (symbol, timestamp_iso),
                     INDEX idx_symbol (symbol),
@@ -251,58 +310,12 @@ class EnhancedOnchainCollector:
             logger.error(f"Error creating onchain_data table: {e}")
     
     def get_coingecko_id(self, symbol: str) -> str:
-        """Get CoinGecko ID from crypto_assets table with proper normalization"""
-        try:
-            # First normalize the symbol for exchange compatibility
-            normalized_symbol = normalize_symbol_for_exchange(symbol, 'coinbase')
-            
-            db = self.get_db_connection()
-            cursor = db.cursor()
-            
-            # Query without normalized_symbol column since it doesn't exist yet
-            cursor.execute("""
-                SELECT coingecko_id FROM crypto_assets 
-                WHERE (symbol = %s OR name = %s)
-                AND coinbase_supported = 1 
-                AND coingecko_id IS NOT NULL
-                LIMIT 1
-            """, (symbol.upper(), symbol))
-            
-            result = cursor.fetchone()
-            cursor.close()
-            db.close()
-            
-            if result and result[0]:
-                return result[0]
-            
-            # Fallback to direct symbol conversion if not found
-            return symbol.lower()
-            
-        except Exception as e:
-            logger.warning(f"Database lookup failed for {symbol}: {e}")
-            return symbol.lower()
+        """Get CoinGecko ID from the symbol registry (matches symbol or asset name)"""
+        return self.symbol_registry.coingecko_id(symbol) or symbol.lower()
     
     def get_messari_id(self, symbol: str) -> str:
-        """Get Messari ID from crypto_assets table - use symbol as fallback"""
-        try:
-            db = self.get_db_connection()
-            cursor = db.cursor()
-            
-            # Use symbol as ID since messari_id column doesn't exist
-            cursor.execute("""
-                SELECT symbol FROM crypto_assets 
-                WHERE symbol = %s AND is_active = 1
-            """, (symbol,))
-            
-            result = cursor.fetchone()
-            cursor.close()
-            db.close()
-            
-            return result[0].lower() if result else symbol.lower()
-            
-        except Exception as e:
-            logger.warning(f"Error getting symbol info for {symbol}: {e}")
-            return symbol.lower()
+        """Get Messari ID - no messari_id column, so the registry's symbol is used"""
+        return (self.symbol_registry.resolve(symbol) or symbol).lower()
     
     def get_defilama_id(self, symbol: str) -> Optional[str]:
         """Map symbol to DeFiLlama protocol - hardcoded mapping since no defilama_id column"""
@@ -416,72 +429,22 @@ class EnhancedOnchainCollector:
         Returns:
             Completeness percentage (0.0 to 100.0)
         """
-        # Core required fields for onchain data
-        core_fields = [
-            'symbol', 'data_date', 'active_addresses_24h', 'transaction_count_24h',
-            'exchange_net_flow_24h', 'price_volatility_7d', 'market_cap_realized',
-            'hash_rate', 'network_difficulty', 'transaction_volume_24h'
-        ]
-        
-        # Enhanced fields (lower priority)
-        enhanced_fields = [
-            'mvrv_ratio', 'social_score', 'developer_score', 'community_score',
-            'nvt_ratio', 'total_value_locked', 'staking_rewards_rate'
-        ]
-        
-        # Count populated core fields (weight 70%)
-        populated_core = sum(1 for field in core_fields 
-                           if record_data.get(field) is not None)
-        core_percentage = (populated_core / len(core_fields)) * 70.0
-        
-        # Count populated enhanced fields (weight 30%)
-        populated_enhanced = sum(1 for field in enhanced_fields 
-                               if record_data.get(field) is not None)
-        enhanced_percentage = (populated_enhanced / len(enhanced_fields)) * 30.0
-        
-        return min(100.0, core_percentage + enhanced_percentage)
-
-    def update_onchain_completeness(self, cursor, symbol: str, data_date: date, record_data: Dict) -> bool:
-        """
-        Update the completeness percentage for a specific onchain record
-        
-        Args:
-            cursor: Database cursor
-            symbol: Crypto symbol
-            data_date: Date of the record
-            record_data: Dict with the record's field values
-            
-        Returns:
-            True if update was successful
-        """
-        try:
-            completeness = self.calculate_onchain_completeness(record_data)
-            
-            cursor.execute("""
-                UPDATE onchain_data
-                SET data_completeness_percentage = %s
-                WHERE symbol = %s AND DATE(timestamp_iso) = %s
-            """, (completeness, symbol, data_date))
-            
-            return cursor.rowcount > 0
-            
-        except Exception as e:
-            logger.error(f"Error updating onchain completeness for {symbol} on {data_date}: {e}")
-            return False
+        return onchain_completeness(record_data)
 
     async def rate_limit(self, endpoint: str):
-        """Implement rate limiting for API calls"""
-        now = time.time()
-        delay = self.rate_limits.get(endpoint, 1.0)
-        
-        if endpoint in self.last_api_call:
-            time_since_last = now - self.last_api_call[endpoint]
-            if time_since_last < delay:
-                await asyncio.sleep(delay - time_since_last)
-        
-        self.last_api_call[endpoint] = time.time()
+        """Wait for a token from the provider bucket behind this endpoint"""
+        provider = self.rate_limit_providers.get(endpoint, 'blockchain_apis')
+        await get_rate_limiter(provider).acquire()
+    
+    def http_client(self, endpoint: str) -> ProviderHttpClient:
+        """Pooled HTTP client for the provider behind this endpoint"""
+        return get_http_client(self.rate_limit_providers.get(endpoint, 'blockchain_apis'))
     
-    async def get_coingecko_data(self, session: aiohttp.ClientSession, symbol: str) -> Optional[Dict]:
+    async def close(self):
+        """Close the pooled HTTP sessions"""
+        await close_http_clients()
+    
+    async def get_coingecko_data(self, session: ProviderHttpClient, symbol: str) -> Optional[Dict]:
         """Get onchain data from CoinGecko with premium API support"""
         try:
             await self.rate_limit('coingecko')
@@ -522,7 +485,7 @@ class EnhancedOnchainCollector:
             logger.error(f"Error fetching CoinGecko data for {symbol}: {e}")
             return None
 
-    async def get_enhanced_coingecko_data(self, session: aiohttp.ClientSession, symbol: str) -> Optional[Dict]:
+    async def get_enhanced_coingecko_data(self, session: ProviderHttpClient, symbol: str) -> Optional[Dict]:
         """Get enhanced onchain data from CoinGecko premium endpoints"""
         try:
             await self.rate_limit('coingecko_additional')
@@ -562,11 +525,15 @@ class EnhancedOnchainCollector:
             logger.error(f"Error fetching enhanced CoinGecko data for {symbol}: {e}")
             return None
             
-    async def get_defilama_tvl_data(self, session: aiohttp.ClientSession, symbol: str) -> Optional[Dict]:
-        """Get comprehensive DeFi TVL data from DeFiLlama - real data only"""
+    async def get_defilama_tvl_data(self, session: ProviderHttpClient, symbol: str,
+                                    target_date: Optional[date] = None) -> Optional[Dict]:
+        """Get comprehensive DeFi TVL data from DeFiLlama - real data only
+        
+        Served from the shared snapshot cache: /v2/chains and /protocols are
+        downloaded once per refresh window for all symbols, and past dates
+        read the chain's daily historicalChainTvl series.
+        """
         try:
-            await self.rate_limit('defilama')
-            
             # Enhanced protocol mapping for major DeFi ecosystems
             protocol_mappings = {
                 'ETH': 'ethereum',
@@ -588,63 +555,24 @@ class EnhancedOnchainCollector:
                 logger.debug(f"No DeFi ecosystem mapping for {symbol}")
                 return None
                 
-            # Method 1: Get accurate TVL from chains endpoint
-            try:
-                chains_url = f"https://api.llama.fi/v2/chains"
-                async with session.get(chains_url, timeout=30) as response:
-                    if response.status == 200:
-                        chains_data = await response.json()
-                        
-                        # Find matching chain with exact name matching
-                        for chain in chains_data:
-                            chain_name = chain.get('name', '').lower()
-                            if chain_name == protocol:
-                                tvl = chain.get('tvl', 0)
-                                
-                                if tvl > 0:  # Only use if we have real TVL data
-                                    # Get accurate protocol count
-                                    protocols_count = await self._count_active_protocols(session, protocol)
-                                    
-                                    if protocols_count is not None:  # Only if we got real count
-                                        logger.info(f"DeFiLlama {protocol}: TVL=${tvl:,.0f}, Protocols={protocols_count}")
-                                        return {
-                                            'total_value_locked': tvl,
-                                            'defi_protocols_count': protocols_count
-                                        }
-                
-            except Exception as e:
-                logger.debug(f"DeFiLlama chains API error: {e}")
-            
-            # Method 2: Try ecosystem-specific endpoints for major chains
-            ecosystem_endpoints = {
-                'ethereum': 'https://api.llama.fi/v2/historicalChainTvl/ethereum',
-                'polygon': 'https://api.llama.fi/v2/historicalChainTvl/polygon',
-                'avalanche': 'https://api.llama.fi/v2/historicalChainTvl/avalanche',
-                'bsc': 'https://api.llama.fi/v2/historicalChainTvl/bsc',
-                'solana': 'https://api.llama.fi/v2/historicalChainTvl/solana'
-            }
+            snapshot = await self.defillama.get_snapshot(session)
             
-            if protocol in ecosystem_endpoints:
-                try:
-                    async with session.get(ecosystem_endpoints[protocol], timeout=30) as response:
-                        if response.status == 200:
-                            tvl_history = await response.json()
-                            
-                            if tvl_history and isinstance(tvl_history, list) and len(tvl_history) > 0:
-                                # Get latest TVL
-                                latest_tvl = tvl_history[-1].get('tvl', 0)
-                                
-                                if latest_tvl > 0:
-                                    # Get protocol count separately
-                                    protocols_count = await self._count_active_protocols(session, protocol)
-                                    
-                                    if protocols_count is not None:
-                                        return {
-                                            'total_value_locked': latest_tvl,
-                                            'defi_protocols_count': protocols_count
-                                        }
-                except Exception as e:
-                    logger.debug(f"DeFiLlama historical TVL error for {protocol}: {e}")
+            if target_date is not None and target_date < date.today():
+                tvl = await self.defillama.chain_tvl_on(session, protocol, target_date)
+            else:
+                tvl = snapshot.tvl(protocol) if snapshot else None
+                if not tvl:
+                    # Fall back to the latest point of the daily series
+                    history = await self.defillama.get_chain_history(session, protocol)
+                    tvl = history[max(history)] if history else None
+            
+            if tvl and tvl > 0 and snapshot is not None:  # Only use real TVL and protocol counts
+                protocols_count = snapshot.active_protocols(protocol)
+                logger.info(f"DeFiLlama {protocol}: TVL=${tvl:,.0f}, Protocols={protocols_count}")
+                return {
+                    'total_value_locked': tvl,
+                    'defi_protocols_count': protocols_count
+                }
             
             # If we reach here, no reliable data was found
             logger.info(f"No reliable TVL data available for {symbol} from DeFiLlama")
@@ -655,42 +583,7 @@ class EnhancedOnchainCollector:
             
         return None
     
-    async def _count_active_protocols(self, session: aiohttp.ClientSession, chain_name: str) -> int:
-        """Count active DeFi protocols on a specific blockchain"""
-        try:
-            # Get all protocols from DeFiLlama
-            protocols_url = "https://api.llama.fi/protocols"
-            async with session.get(protocols_url, timeout=30) as response:
-                if response.status == 200:
-                    all_protocols = await response.json()
-                    
-                    active_count = 0
-                    for protocol in all_protocols:
-                        # Check if protocol operates on this chain
-                        protocol_chains = protocol.get('chains', [])
-                        
-                        # Case-insensitive check for chain name
-                        chain_matches = any(
-                            chain.lower() == chain_name.lower() for chain in protocol_chains
-                        )
-                        
-                        if chain_matches:
-                            # Only count protocols with meaningful TVL (>$100k)
-                            protocol_tvl = protocol.get('tvl', 0)
-                            if protocol_tvl and protocol_tvl > 100_000:
-                                active_count += 1
-                    
-                    logger.debug(f"Found {active_count} active protocols for {chain_name}")
-                    return active_count
-                    
-        except Exception as e:
-            logger.debug(f"Failed to count protocols for {chain_name}: {e}")
-            
-        # Return None instead of estimates - only use real data
-        logger.info(f"Could not determine accurate protocol count for {chain_name}")
-        return None
-    
-    async def get_additional_metrics(self, session: aiohttp.ClientSession, symbol: str) -> Optional[Dict]:
+    async def get_additional_metrics(self, session: ProviderHttpClient, symbol: str) -> Optional[Dict]:
         """Get additional metrics including realized cap and network value calculations"""
         try:
             await self.rate_limit('additional')
@@ -962,7 +855,7 @@ class EnhancedOnchainCollector:
             
         return blockchain_data
 
-    async def get_network_metrics(self, session: aiohttp.ClientSession, symbol: str) -> Optional[Dict]:
+    async def get_network_metrics(self, session: ProviderHttpClient, symbol: str) -> Optional[Dict]:
         """Get real-time network metrics from blockchain APIs"""
         try:
             await self.rate_limit('network')
@@ -999,7 +892,7 @@ class EnhancedOnchainCollector:
             logger.warning(f"Error fetching network metrics for {symbol}: {e}")
             return None
     
-    async def get_bitcoin_metrics(self, session: aiohttp.ClientSession) -> Optional[Dict]:
+    async def get_bitcoin_metrics(self, session: ProviderHttpClient) -> Optional[Dict]:
         """Get Bitcoin-specific metrics from multiple reliable sources"""
         try:
             # Method 1: Try Bitcoin JSON RPC via public nodes for most accurate data
@@ -1108,7 +1001,7 @@ class EnhancedOnchainCollector:
         logger.warning("Could not retrieve real Bitcoin network metrics from any API")
         return None
     
-    async def get_ethereum_metrics(self, session: aiohttp.ClientSession) -> Optional[Dict]:
+    async def get_ethereum_metrics(self, session: ProviderHttpClient) -> Optional[Dict]:
         """Get Ethereum-specific metrics from multiple sources"""
         try:
             # Method 1: Try to get block height from a public API
@@ -1159,7 +1052,7 @@ class EnhancedOnchainCollector:
             logger.warning(f"Error fetching Ethereum metrics: {e}")
             return None
     
-    async def get_cardano_metrics(self, session: aiohttp.ClientSession) -> Optional[Dict]:
+    async def get_cardano_metrics(self, session: ProviderHttpClient) -> Optional[Dict]:
         """Get Cardano-specific metrics from Cardano API"""
         try:
             # Use Cardano Blockfrost API (public endpoints)
@@ -1226,7 +1119,7 @@ class EnhancedOnchainCollector:
             logger.warning(f"Error fetching Cardano metrics: {e}")
             return None
     
-    async def get_solana_metrics(self, session: aiohttp.ClientSession) -> Optional[Dict]:
+    async def get_solana_metrics(self, session: ProviderHttpClient) -> Optional[Dict]:
         """Get Solana-specific metrics from Solana RPC"""
         try:
             solana_metrics = {}
@@ -1299,67 +1192,58 @@ class EnhancedOnchainCollector:
     async def collect_onchain_data(self, symbol: str, target_date: Optional[date] = None) -> Optional[Dict]:
         """Collect comprehensive onchain data from multiple real sources"""
         try:
-            async with aiohttp.ClientSession() as session:
-                logger.info(f"Collecting comprehensive onchain data for {symbol}...")
-                
-                # Collect from multiple real sources
-                coingecko_data = await self.get_coingecko_data(session, symbol)
-                enhanced_data = await self.get_enhanced_coingecko_data(session, symbol)
-                defilama_data = await self.get_defilama_tvl_data(session, symbol)
-                network_data = await self.get_network_metrics(session, symbol)
-                additional_data = await self.get_additional_metrics(session, symbol)
-                
-                # Merge data from all sources (real data only)
-                merged_data = {}
-                data_sources = []
-                
-                if coingecko_data:
-                    merged_data.update(coingecko_data)
-                    data_sources.append('coingecko')
-                    
-                if enhanced_data:
-                    # Enhanced CoinGecko data provides additional metrics
-                    for key, value in enhanced_data.items():
-                        if value is not None and value != 0:  # Only use real values
-                            merged_data[key] = value
-                    data_sources.append('coingecko-enhanced')
-                    
-                if defilama_data:
-                    # Add TVL data - ensure these fields are mapped correctly
-                    for key, value in defilama_data.items():
-                        if value is not None:
-                            merged_data[key] = value
-                    data_sources.append('defilama')
-                
-                if network_data:
-                    # Add network metrics
-                    merged_data.update(network_data)
-                    data_sources.append('network-api')
-                
-                if additional_data:
-                    # Add additional metrics
-                    merged_data.update(additional_data)
-                    data_sources.append('additional-apis')
+            logger.info(f"Collecting comprehensive onchain data for {symbol}...")
+            
+            # Collect from multiple real sources concurrently
+            fetches = {
+                'coingecko': self.get_coingecko_data(self.http_client('coingecko'), symbol),
+                'coingecko-enhanced': self.get_enhanced_coingecko_data(self.http_client('coingecko_additional'), symbol),
+                'defilama': self.get_defilama_tvl_data(self.http_client('defilama'), symbol, target_date),
+                'network-api': self.get_network_metrics(self.http_client('network'), symbol),
+                'additional-apis': self.get_additional_metrics(self.http_client('additional'), symbol),
+            }
+            results = await asyncio.gather(*(
+                self._fetch_source(source, fetch, symbol) for source, fetch in fetches.items()
+            ))
+            
+            # Merge data from all sources (real data only) by source priority
+            merged_data, data_sources = merge_onchain_sources(zip(fetches, results))
+            
+            if merged_data:
+                merged_data['data_source'] = ','.join(data_sources)
                 
-                if merged_data:
-                    merged_data['data_source'] = ','.join(data_sources)
-                    
-                    if target_date:
-                        # Adjust timestamp for historical backfill
-                        merged_data['timestamp_iso'] = datetime.combine(target_date, datetime.min.time())
-                    else:
-                        merged_data['timestamp_iso'] = datetime.now()
-                    
-                    logger.info(f"✅ Collected comprehensive onchain data for {symbol} from: {merged_data['data_source']}")
-                    return merged_data
+                if target_date:
+                    # Adjust timestamp for historical backfill
+                    merged_data['timestamp_iso'] = datetime.combine(target_date, datetime.min.time())
                 else:
-                    logger.warning(f"No data collected for {symbol} from any source")
-                    return None
+                    merged_data['timestamp_iso'] = datetime.now()
                 
+                logger.info(f"✅ Collected comprehensive onchain data for {symbol} from: {merged_data['data_source']}")
+                return merged_data
+            else:
+                logger.warning(f"No data collected for {symbol} from any source")
+                return None
+            
         except Exception as e:
             logger.error(f"Error collecting onchain data for {symbol}: {e}")
             return None
     
+    async def _fetch_source(self, source: str, fetch: Awaitable[Optional[Dict]], symbol: str) -> Optional[Dict]:
+        """Await one source within the source timeout; a timeout or error yields None"""
+        stats = self.source_stats[source]
+        try:
+            data = await asyncio.wait_for(fetch, timeout=self.source_timeout)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            logger.warning(f"{source} timed out after {self.source_timeout}s for {symbol}, keeping other sources")
+            return None
+        except Exception as e:
+            stats['errors'] += 1
+            logger.warning(f"{source} failed for {symbol}: {e}")
+            return None
+        stats['ok' if data else 'empty'] += 1
+        return data
+    
     def get_missing_onchain_dates(self, symbol: str, start_date: date, end_date: date) -> List[date]:
         """Get dates where onchain data is missing"""
         try:
@@ -1369,13 +1253,10 @@ class EnhancedOnchainCollector:
             # Use correct table name
             table_name = get_master_onchain_table().split('.')[-1]
             
-            cursor.execute(f"""
-                SELECT DISTINCT DATE(timestamp_iso) as date_only
-                FROM {table_name}
-                WHERE symbol = %s
-                AND DATE(timestamp_iso) >= %s
-                AND DATE(timestamp_iso) <= %s
-            """, (symbol, start_date, end_date))
+            cursor.execute(
+                existing_days_query(table_name, "timestamp_iso"),
+                (symbol, *date_span_bounds(start_date, end_date))
+            )
             
             existing_dates = {row[0] for row in cursor.fetchall()}
             
@@ -1416,7 +1297,7 @@ class EnhancedOnchainCollector:
                     network_value_to_transactions, realized_cap, mvrv_ratio, nvt_ratio,
                     github_commits_30d, developer_activity_score, staking_yield, staked_percentage,
                     validator_count, total_value_locked, defi_protocols_count,
-                    data_source, data_quality_score, collected_at
+                    data_source, data_quality_score, data_completeness_percentage, collected_at
                 ) VALUES (
                     %(symbol)s, %(coin_id)s, %(timestamp_iso)s, %(circulating_supply)s, %(total_supply)s, %(max_supply)s,
                     %(active_addresses)s, %(transaction_count)s, %(transaction_volume)s, %(hash_rate)s, %(difficulty)s,
@@ -1424,7 +1305,7 @@ class EnhancedOnchainCollector:
                     %(network_value_to_transactions)s, %(realized_cap)s, %(mvrv_ratio)s, %(nvt_ratio)s,
                     %(github_commits_30d)s, %(developer_activity_score)s, %(staking_yield)s, %(staked_percentage)s,
                     %(validator_count)s, %(total_value_locked)s, %(defi_protocols_count)s,
-                    %(data_source)s, %(data_quality_score)s, NOW()
+                    %(data_source)s, %(data_quality_score)s, %(data_completeness_percentage)s, NOW()
                 ) ON DUPLICATE KEY UPDATE
                     circulating_supply = VALUES(circulating_supply),
                     total_supply = VALUES(total_supply),
@@ -1437,27 +1318,19 @@ class EnhancedOnchainCollector:
                     total_value_locked = VALUES(total_value_locked),
                     defi_protocols_count = VALUES(defi_protocols_count),
                     data_quality_score = VALUES(data_quality_score),
+                    data_completeness_percentage = VALUES(data_completeness_percentage),
                     collected_at = NOW()
             """
             
-            # No complex mapping needed - just use the data as-is
-            cursor.executemany(insert_query, onchain_data)
+            # Completeness is scored here and written with the row, so the whole
+            # batch is one multi-row upsert instead of an UPDATE per record
+            rows = [
+                {**record, 'data_completeness_percentage': self.calculate_onchain_completeness(record)}
+                for record in onchain_data
+            ]
+            cursor.executemany(insert_query, rows)
             rows_affected = cursor.rowcount
             
-            # Update completeness percentages for stored records
-            for record in onchain_data:
-                try:
-                    # Extract date from timestamp_iso
-                    timestamp_iso = record.get('timestamp_iso')
-                    if isinstance(timestamp_iso, str):
-                        data_date = datetime.fromisoformat(timestamp_iso).date()
-                    else:
-                        data_date = timestamp_iso.date() if timestamp_iso else datetime.now().date()
-                    
-                    self.update_onchain_completeness(cursor, record['symbol'], data_date, record)
-                except Exception as e:
-                    logger.debug(f"Error updating completeness for {record.get('symbol')}: {e}")
-            
             db.commit()
             cursor.close()
             db.close()
@@ -1501,56 +1374,24 @@ class EnhancedOnchainCollector:
         total_stored = 0
         errors = []
         
-        for symbol in symbols:
-            try:
-                logger.info(f"Processing {symbol}...")
-                
-                # Get missing dates for this symbol
-                missing_dates = self.get_missing_onchain_dates(symbol, start_date, end_date)
-                
-                if not missing_dates:
-                    logger.info(f"No missing dates for {symbol}")
-                    continue
-                
-                logger.info(f"Found {len(missing_dates)} missing dates for {symbol}")
-                
-                # Process missing dates in batches with smart failure detection
-                batch_data = []
-                consecutive_failures = 0
-                max_consecutive_failures = 5  # Faster detection for delisted/unavailable coins
-                
-                for target_date in sorted(missing_dates, reverse=True):  # Process dates NEWEST FIRST for smart detection
-                    onchain_data = await self.collect_onchain_data(symbol, target_date)
-                    if onchain_data:
-                        batch_data.append(onchain_data)
-                        total_processed += 1
-                        consecutive_failures = 0  # Reset failure count on success
-                    else:
-                        consecutive_failures += 1
-                        # Skip symbol if too many consecutive failures
-                        if consecutive_failures >= max_consecutive_failures:
-                            logger.warning(f"Skipping {symbol} - likely delisted or unavailable (failed on {consecutive_failures} recent dates)")
-                            break
-                
-                    # Process batch when it reaches size or at end
-                    if len(batch_data) >= 20:
-                        stored = self.store_onchain_data(batch_data)
-                        total_stored += stored
-                        batch_data = []
-                        await asyncio.sleep(0.2)  # Rate limiting
-                
-                # Store remaining data
-                if batch_data:
-                    stored = self.store_onchain_data(batch_data)
-                    total_stored += stored
-                
-                # Delay between symbols to respect API limits
-                await asyncio.sleep(2.0)
-                
-            except Exception as e:
-                error_msg = f"Error processing {symbol}: {e}"
+        # Several symbols and dates in flight at once; provider rate limiters pace the requests
+        date_slots = asyncio.Semaphore(self.backfill_concurrency)
+        symbol_slots = asyncio.Semaphore(self.backfill_symbol_concurrency)
+        
+        async def backfill_symbol(symbol: str) -> Tuple[int, int]:
+            async with symbol_slots:
+                return await self._backfill_symbol(symbol, start_date, end_date, date_slots)
+        
+        outcomes = await asyncio.gather(*(backfill_symbol(s) for s in symbols), return_exceptions=True)
+        for symbol, outcome in zip(symbols, outcomes):
+            if isinstance(outcome, Exception):
+                error_msg = f"Error processing {symbol}: {outcome}"
                 logger.error(error_msg)
                 errors.append(error_msg)
+            else:
+                processed, stored = outcome
+                total_processed += processed
+                total_stored += stored
         
         result = {
             'symbols_processed': len(symbols),
@@ -1562,6 +1403,65 @@ class EnhancedOnchainCollector:
         logger.info(f"Onchain backfill completed: {total_stored} records stored, {len(errors)} errors")
         return result
 
+    async def _backfill_symbol(self, symbol: str, start_date: date, end_date: date,
+                               date_slots: asyncio.Semaphore) -> Tuple[int, int]:
+        """Backfill one symbol's missing dates; returns (dates processed, records stored)
+
+        Dates are processed NEWEST FIRST in windows of ``max_consecutive_failures``
+        collected concurrently. Results are checked in date order, so a symbol
+        failing on its most recent dates (likely delisted) is still skipped.
+        """
+        logger.info(f"Processing {symbol}...")
+        
+        # Get missing dates for this symbol
+        missing_dates = await asyncio.to_thread(self.get_missing_onchain_dates, symbol, start_date, end_date)
+        
+        if not missing_dates:
+            logger.info(f"No missing dates for {symbol}")
+            return 0, 0
+        
+        logger.info(f"Found {len(missing_dates)} missing dates for {symbol}")
+        
+        async def collect(target_date: date) -> Optional[Dict]:
+            async with date_slots:
+                return await self.collect_onchain_data(symbol, target_date)
+        
+        # Process missing dates in batches with smart failure detection
+        batch_data = []
+        processed = 0
+        stored = 0
+        consecutive_failures = 0
+        max_consecutive_failures = 5  # Faster detection for delisted/unavailable coins
+        dates = sorted(missing_dates, reverse=True)
+        
+        for i in range(0, len(dates), max_consecutive_failures):
+            window = dates[i:i + max_consecutive_failures]
+            for onchain_data in await asyncio.gather(*(collect(d) for d in window)):
+                if onchain_data:
+                    batch_data.append(onchain_data)
+                    processed += 1
+                    consecutive_failures = 0  # Reset failure count on success
+                else:
+                    consecutive_failures += 1
+                    if consecutive_failures >= max_consecutive_failures:
+                        break
+            
+            # Skip symbol if too many consecutive failures
+            if consecutive_failures >= max_consecutive_failures:
+                logger.warning(f"Skipping {symbol} - likely delisted or unavailable (failed on {consecutive_failures} recent dates)")
+                break
+            
+            # Process batch when it reaches size
+            if len(batch_data) >= 20:
+                stored += await asyncio.to_thread(self.store_onchain_data, batch_data)
+                batch_data = []
+        
+        # Store remaining data
+        if batch_data:
+            stored += await asyncio.to_thread(self.store_onchain_data, batch_data)
+        
+        return processed, stored
+
 # ==============================================================================
 # FASTAPI APPLICATION & ENDPOINTS
 # ==============================================================================
@@ -1584,6 +1484,10 @@ class CollectionRequest(BaseModel):
 # Global collector instance
 collector = EnhancedOnchainCollector()
 
+@app.on_event("shutdown")
+async def close_http_sessions():
+    await collector.close()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1657,7 +1561,13 @@ async def get_status():
             "configuration": {
                 "use_premium_api": collector.use_premium_api,
                 "table": get_master_onchain_table(),
-                "rate_limits": collector.rate_limits
+                "rate_limits": get_all_rate_limiter_stats(),
+                "http_clients": get_all_http_client_stats(),
+                "defillama_snapshot": collector.defillama.stats,
+                "source_timeout": collector.source_timeout,
+                "backfill_concurrency": collector.backfill_concurrency,
+                "backfill_symbol_concurrency": collector.backfill_symbol_concurrency,
+                "sources": collector.source_stats
             },
             "timestamp": datetime.now().isoformat()
         })
@@ -1859,34 +1769,36 @@ async def main():
         return
     
     collector = EnhancedOnchainCollector()
+    try:
+        # Check for backfill parameters
+        backfill_days = os.getenv("BACKFILL_DAYS")
     
-    # Check for backfill parameters
-    backfill_days = os.getenv("BACKFILL_DAYS")
-    
-    if backfill_days:
-        try:
-            days = int(backfill_days)
-            end_date = date.today() - timedelta(days=1)
+        if backfill_days:
+            try:
+                days = int(backfill_days)
+                end_date = date.today() - timedelta(days=1)
             
-            if days == 0:
-                # Full historical backfill
-                start_date = date(2023, 1, 1)
-                logger.info("Running FULL historical onchain backfill")
-            else:
-                start_date = end_date - timedelta(days=days)
-                logger.info(f"Running onchain backfill for last {days} days")
-            
-            result = await collector.run_backfill(start_date, end_date)
-            print(f"Onchain backfill completed: {result}")
-            
-        except ValueError:
-            logger.error(f"Invalid BACKFILL_DAYS value: {backfill_days}")
-    else:
-        # Regular daily collection
-        logger.info("Running daily onchain data collection")
-        yesterday = date.today() - timedelta(days=1)
-        result = await collector.run_backfill(yesterday, yesterday)
-        print(f"Daily onchain collection completed: {result}")
+                if days == 0:
+                    # Full historical backfill
+                    start_date = date(2023, 1, 1)
+                    logger.info("Running FULL historical onchain backfill")
+                else:
+                    start_date = end_date - timedelta(days=days)
+                    logger.info(f"Running onchain backfill for last {days} days")
+            
+                result = await collector.run_backfill(start_date, end_date)
+                print(f"Onchain backfill completed: {result}")
+            
+            except ValueError:
+                logger.error(f"Invalid BACKFILL_DAYS value: {backfill_days}")
+        else:
+            # Regular daily collection
+            logger.info("Running daily onchain data collection")
+            yesterday = date.today() - timedelta(days=1)
+            result = await collector.run_backfill(yesterday, yesterday)
+            print(f"Daily onchain collection completed: {result}")
+    finally:
+        await collector.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
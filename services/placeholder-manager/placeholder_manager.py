@@ -9,18 +9,30 @@ import logging
 import time
 import pymysql
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.responses import JSONResponse
 import schedule
 import asyncio
 import uvicorn
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from shared.query_builder import PLACEHOLDER_CLEANUP_COLUMNS, day_start, placeholder_cleanup_query
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger("placeholder-manager")
 
+# Grid step for each collector frequency
+PLACEHOLDER_FREQUENCIES = {
+    'daily': timedelta(days=1),
+    'hourly': timedelta(hours=1),
+    '5min': timedelta(minutes=5),
+}
+
 
 class CentralizedPlaceholderManager:
     """Centralized service for managing placeholder records across all collectors"""
@@ -42,14 +54,21 @@ class CentralizedPlaceholderManager:
         # Configuration
         self.schedule_interval_hours = int(os.getenv("SCHEDULE_INTERVAL_HOURS", "1"))
         self.enable_placeholders = os.getenv("ENABLE_PLACEHOLDERS", "true").lower() == "true"
+        # Timestamps expanded into the (key, timestamp) grid per set operation
+        self.grid_chunk_size = int(os.getenv("PLACEHOLDER_GRID_CHUNK_SIZE", "1000"))
         
-        # Comprehensive collector configurations for ALL data types
+        # Comprehensive collector configurations for ALL data types.
+        # Grid settings: key_column/timestamp_column identify a row (defaults
+        # symbol/timestamp), time_of_day anchors daily rows, placeholder_values
+        # and placeholder_sql_values fill extra columns.
         self.collector_configs = {
             'macro': {
                 'table': 'macro_economic_data',
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Daily collection schedule
                 'indicators': ['VIX', 'DXY', 'FEDFUNDS', 'DGS10', 'DGS2', 'UNRATE', 'CPIAUCSL', 'GDP'],
+                'key_column': 'indicator_name',
+                'placeholder_sql_values': {'created_at': 'NOW()'},
                 'active': True,
                 'priority': 8
             },
@@ -58,6 +77,9 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Changed to daily for efficiency
                 'symbols_query': "SELECT DISTINCT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank LIMIT 50",
+                'time_of_day': (23, 59),  # Market close
+                'lookback_days': 7,
+                'placeholder_sql_values': {'created_at': 'NOW()'},
                 'active': True,
                 'priority': 7
             },
@@ -74,6 +96,7 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Daily signals
                 'symbols_query': "SELECT DISTINCT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank LIMIT 50",
+                'time_of_day': (9, 0),
                 'active': True,
                 'priority': 7
             },
@@ -82,6 +105,7 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Daily enhanced signals
                 'symbols_query': "SELECT DISTINCT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank LIMIT 50",
+                'time_of_day': (9, 0),
                 'active': False,  # Disabled due to schema issues
                 'priority': 8
             },
@@ -90,6 +114,9 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Daily OHLC for historical
                 'symbols_query': "SELECT DISTINCT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank LIMIT 50",
+                'timestamp_column': 'timestamp_iso',
+                'time_of_day': (23, 59),  # Market close
+                'skip_if_real_rows_over': 100000,
                 'active': True,
                 'priority': 9
             },
@@ -98,6 +125,9 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'daily',  # Daily derivatives data
                 'symbols_query': "SELECT DISTINCT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank LIMIT 20",
+                'time_of_day': (16, 0),
+                'empty_table_lookback_days': 90,
+                'placeholder_values': {'exchange': 'placeholder'},
                 'active': True,
                 'priority': 6
             },
@@ -114,6 +144,7 @@ class CentralizedPlaceholderManager:
                 'start_date': '2023-01-01',
                 'frequency': 'hourly',  # Hourly collection schedule
                 'symbols_query': "SELECT DISTINCT symbol FROM price_data_real WHERE timestamp >= DATE_SUB(NOW(), INTERVAL 7 DAY) LIMIT 30",
+                'placeholder_sql_values': {'created_at': 'NOW()'},
                 'active': False,  # Optional data type
                 'priority': 5
             }
@@ -122,6 +153,7 @@ class CentralizedPlaceholderManager:
         # Statistics tracking
         self.stats = {
             'total_placeholders_created': 0,
+            'placeholders_by_table': {},
             'last_run': None,
             'errors': 0,
             'service_start_time': datetime.now()
@@ -166,346 +198,154 @@ class CentralizedPlaceholderManager:
             cursor.close()
             conn.close()
     
-    def ensure_macro_placeholders(self, cursor, lookback_days: int = 30) -> int:
-        """Ensure macro indicator placeholders exist (recent data only for regular runs)"""
-        placeholders_created = 0
-        config = self.collector_configs['macro']
-        
-        if not config.get('active', True):
-            return 0
-            
-        try:
-            # For regular runs, only create recent placeholders to avoid performance issues
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=lookback_days)
-            
-            logger.info(f"   Creating macro placeholders from {start_date} to {end_date} (recent {lookback_days} days)")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for indicator in config['indicators']:
-                    try:
-                        cursor.execute("""
-                            INSERT IGNORE INTO macro_economic_data
-                            (indicator_name, timestamp, value, data_source, 
-                             data_completeness_percentage, created_at)
-                            VALUES (%s, %s, NULL, 'placeholder_manager', 0.0, NOW())
-                        """, (indicator, datetime.combine(current_date, datetime.min.time())))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating macro placeholder {indicator} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
-        
-        except Exception as e:
-            logger.error(f"Error creating macro placeholders: {e}")
-        
-        return placeholders_created
+    @staticmethod
+    def generate_placeholder_timestamps(start_date, end_date, frequency: str = 'daily',
+                                        time_of_day: Tuple[int, int] = (0, 0)) -> Iterator[datetime]:
+        """Yield every expected timestamp from start_date through end_date
+
+        Daily grids are anchored at ``time_of_day``; sub-daily grids start at
+        midnight and step by the frequency interval.
+        """
+        step = PLACEHOLDER_FREQUENCIES[frequency]
+        if step >= timedelta(days=1):
+            current = datetime.combine(start_date, datetime.min.time().replace(
+                hour=time_of_day[0], minute=time_of_day[1]))
+        else:
+            current = datetime.combine(start_date, datetime.min.time())
+        last = datetime.combine(end_date, datetime.max.time())
+        while current <= last:
+            yield current
+            current += step
     
-    def ensure_technical_placeholders(self, cursor, hours: int) -> int:
-        """Ensure technical indicator placeholders exist (daily frequency for efficiency)"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector('technical')
-        config = self.collector_configs['technical']
-        
-        if not symbols or not config.get('active', True):
-            return 0
+    def bulk_insert_placeholders(self, cursor, collector_name: str, keys: List[str],
+                                 timestamps: Iterable[datetime]) -> int:
+        """Insert placeholders for every missing (key, timestamp) pair in one pass per chunk
+
+        The key list and the timestamp grid are streamed into temporary tables
+        as multi-row VALUES batches; each chunk of timestamps is then expanded
+        into the full grid with a CROSS JOIN and anti-joined against the target
+        table, so only keys that do not exist yet are inserted.
+        """
+        config = self.collector_configs[collector_name]
+        table = config['table']
+        key_column = config.get('key_column', 'symbol')
+        timestamp_column = config.get('timestamp_column', 'timestamp')
+        values = {'data_completeness_percentage': 0.0, 'data_source': 'placeholder_manager',
+                  **config.get('placeholder_values', {})}
+        sql_values = config.get('placeholder_sql_values', {})
+        
+        columns = [key_column, timestamp_column] + list(values) + list(sql_values)
+        select_values = ['%s'] * len(values) + list(sql_values.values())
+        insert_query = f"""
+            INSERT IGNORE INTO {table} ({', '.join(columns)})
+            SELECT k.grid_key, t.grid_ts, {', '.join(select_values)}
+            FROM placeholder_grid_keys k
+            CROSS JOIN placeholder_grid_times t
+            LEFT JOIN {table} existing
+                ON existing.{key_column} = k.grid_key
+                AND existing.{timestamp_column} = t.grid_ts
+            WHERE existing.{key_column} IS NULL
+        """
+        
+        # Grid tables copy the target's column definitions so the anti-join
+        # compares identical types and collations
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS placeholder_grid_keys")
+        cursor.execute(f"CREATE TEMPORARY TABLE placeholder_grid_keys SELECT {key_column} AS grid_key FROM {table} LIMIT 0")
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS placeholder_grid_times")
+        cursor.execute(f"CREATE TEMPORARY TABLE placeholder_grid_times SELECT {timestamp_column} AS grid_ts FROM {table} LIMIT 0")
         
+        placeholders_created = 0
         try:
-            # Convert hours to days and use daily frequency for efficiency
-            days = max(1, hours // 24)
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            
-            logger.info(f"   Creating technical placeholders for {len(symbols)} symbols from {start_date} to {end_date} (daily)")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    try:
-                        # Create daily technical indicators at market close time
-                        timestamp = datetime.combine(current_date, datetime.min.time().replace(hour=23, minute=59))
-                        
-                        cursor.execute("""
-                            INSERT IGNORE INTO technical_indicators
-                            (symbol, timestamp, 
-                             rsi_14, sma_20, sma_50, ema_12, ema_26,
-                             macd, macd_signal, macd_histogram,
-                             bollinger_upper, bollinger_middle, bollinger_lower, stoch_k, stoch_d, atr_14, vwap,
-                             data_completeness_percentage, data_source, created_at)
-                            VALUES (%s, %s, 
-                                   NULL, NULL, NULL, NULL, NULL,
-                                   NULL, NULL, NULL, 
-                                   NULL, NULL, NULL, NULL, NULL, NULL, NULL,
-                                   0.0, 'placeholder_manager', NOW())
-                        """, (symbol, timestamp))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating technical placeholder {symbol} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
-        
-        except Exception as e:
-            logger.error(f"Error creating technical placeholders: {e}")
+            # pymysql rewrites executemany() INSERTs into multi-row VALUES statements
+            cursor.executemany("INSERT INTO placeholder_grid_keys (grid_key) VALUES (%s)",
+                               [(key,) for key in dict.fromkeys(keys)])
+            
+            timestamps = iter(timestamps)
+            while True:
+                chunk = list(islice(timestamps, self.grid_chunk_size))
+                if not chunk:
+                    break
+                cursor.execute("DELETE FROM placeholder_grid_times")
+                cursor.executemany("INSERT INTO placeholder_grid_times (grid_ts) VALUES (%s)",
+                                   [(ts,) for ts in chunk])
+                cursor.execute(insert_query, tuple(values.values()))
+                placeholders_created += cursor.rowcount
+                cursor.connection.commit()
+        finally:
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS placeholder_grid_keys")
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS placeholder_grid_times")
         
         return placeholders_created
     
-    def ensure_onchain_placeholders(self, cursor, days: int, collector_name: str = 'onchain_primary') -> int:
-        """Ensure onchain data placeholders exist from 2023 to present (daily frequency)"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector(collector_name)
+    def ensure_placeholders(self, cursor, collector_name: str, days: Optional[int] = None) -> int:
+        """Ensure placeholders exist for one collector over its recent lookback window"""
         config = self.collector_configs[collector_name]
+        if not config.get('active', True):
+            return 0
         
-        if not symbols or not config.get('active', True):
+        keys = config.get('indicators') or self.get_symbols_for_collector(collector_name)
+        if not keys:
+            logger.info(f"   {collector_name}: no symbols found")
             return 0
         
+        table = config['table']
+        days = days if days is not None else config.get('lookback_days', 30)
+        
         try:
-            # For efficiency, only create recent placeholders in regular runs
+            skip_threshold = config.get('skip_if_real_rows_over')
+            if skip_threshold:
+                # Tables already well-populated with real data need no placeholders
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE data_source != 'placeholder_manager'")
+                real_data_count = cursor.fetchone()[0]
+                if real_data_count > skip_threshold:
+                    logger.info(f"   {table} already has {real_data_count:,} real data records - skipping placeholder creation")
+                    return 0
+            
+            if config.get('empty_table_lookback_days'):
+                # An empty table gets more comprehensive historical coverage
+                cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+                if cursor.fetchone() is None:
+                    days = max(days, config['empty_table_lookback_days'])
+            
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=days)
+            logger.info(f"   Creating {collector_name} placeholders for {len(keys)} keys from {start_date} to {end_date} ({config['frequency']})")
             
-            logger.info(f"   Creating {collector_name} placeholders for {len(symbols)} symbols from {start_date} to {end_date}")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    try:
-                        cursor.execute(f"""
-                            INSERT IGNORE INTO {config['table']}
-                            (symbol, timestamp, 
-                             current_price, total_volume, high_24h, low_24h, price_change_24h,
-                             market_cap, market_cap_rank, circulating_supply, total_supply, max_supply,
-                             data_completeness_percentage, data_source)
-                            VALUES (%s, %s,
-                                   NULL, NULL, NULL, NULL, NULL,
-                                   NULL, NULL, NULL, NULL, NULL,
-                                   0.0, 'placeholder_manager')
-                        """, (symbol, datetime.combine(current_date, datetime.min.time())))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating {collector_name} placeholder {symbol} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
+            timestamps = self.generate_placeholder_timestamps(
+                start_date, end_date, config['frequency'], config.get('time_of_day', (0, 0)))
+            return self.bulk_insert_placeholders(cursor, collector_name, keys, timestamps)
         
         except Exception as e:
             logger.error(f"Error creating {collector_name} placeholders: {e}")
-        
-        return placeholders_created
+            return 0
+    
+    def ensure_macro_placeholders(self, cursor, lookback_days: int = 30) -> int:
+        """Ensure macro indicator placeholders exist (recent data only for regular runs)"""
+        return self.ensure_placeholders(cursor, 'macro', lookback_days)
+    
+    def ensure_technical_placeholders(self, cursor, hours: int) -> int:
+        """Ensure technical indicator placeholders exist (daily frequency for efficiency)"""
+        return self.ensure_placeholders(cursor, 'technical', max(1, hours // 24))
+    
+    def ensure_onchain_placeholders(self, cursor, days: int, collector_name: str = 'onchain_primary') -> int:
+        """Ensure onchain data placeholders exist (daily frequency)"""
+        return self.ensure_placeholders(cursor, collector_name, days)
     
     def ensure_trading_signal_placeholders(self, cursor, days: int, collector_name: str) -> int:
         """Ensure trading signal placeholders exist"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector(collector_name)
-        config = self.collector_configs[collector_name]
-        
-        if not symbols or not config.get('active', True):
-            return 0
-        
-        try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            
-            logger.info(f"   Creating {collector_name} placeholders for {len(symbols)} symbols from {start_date} to {end_date}")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    try:
-                        timestamp = datetime.combine(current_date, datetime.min.time().replace(hour=9))
-                        
-                        if collector_name == 'trading_signals':
-                            cursor.execute("""
-                                INSERT IGNORE INTO trading_signals
-                                (symbol, timestamp, signal_type, signal_strength, confidence,
-                                 data_completeness_percentage, data_source)
-                                VALUES (%s, %s, NULL, NULL, NULL, 0.0, 'placeholder_manager')
-                            """, (symbol, timestamp))
-                        elif collector_name == 'enhanced_trading_signals':
-                            cursor.execute("""
-                                INSERT IGNORE INTO enhanced_trading_signals
-                                (symbol, timestamp, signal_type, signal_strength, confidence, ml_score,
-                                 data_completeness_percentage, data_source)
-                                VALUES (%s, %s, NULL, NULL, NULL, NULL, 0.0, 'placeholder_manager')
-                            """, (symbol, timestamp))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating {collector_name} placeholder {symbol} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
-        
-        except Exception as e:
-            logger.error(f"Error creating {collector_name} placeholders: {e}")
-        
-        return placeholders_created
+        return self.ensure_placeholders(cursor, collector_name, days)
     
     def ensure_ohlc_placeholders(self, cursor, days: int) -> int:
-        """Ensure OHLC data placeholders exist (Note: OHLC table is already populated with real data)"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector('ohlc')
-        config = self.collector_configs['ohlc']
-        
-        if not symbols or not config.get('active', True):
-            return 0
-        
-        # Check if OHLC table already has substantial real data
-        try:
-            cursor.execute("SELECT COUNT(*) FROM ohlc_data WHERE data_source != 'placeholder_manager'")
-            real_data_count = cursor.fetchone()[0]
-            
-            if real_data_count > 100000:  # Table is already well-populated with real data
-                logger.info(f"   OHLC table already has {real_data_count:,} real data records - skipping placeholder creation")
-                return 0
-        except Exception as e:
-            logger.debug(f"Error checking OHLC real data: {e}")
-        
-        try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            
-            logger.info(f"   Creating OHLC placeholders for {len(symbols)} symbols from {start_date} to {end_date}")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    try:
-                        # Create one OHLC record per day (at market close time)
-                        timestamp = datetime.combine(current_date, datetime.min.time().replace(hour=23, minute=59))
-                        
-                        # Use correct column name: timestamp_iso instead of timestamp
-                        cursor.execute("""
-                            INSERT IGNORE INTO ohlc_data
-                            (symbol, timestamp_iso, open_price, high_price, low_price, close_price, volume,
-                             data_completeness_percentage, data_source)
-                            VALUES (%s, %s, NULL, NULL, NULL, NULL, NULL, 0.0, 'placeholder_manager')
-                        """, (symbol, timestamp))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating OHLC placeholder {symbol} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
-        
-        except Exception as e:
-            logger.error(f"Error creating OHLC placeholders: {e}")
-        
-        return placeholders_created
+        """Ensure OHLC data placeholders exist (skipped once the table holds real data)"""
+        return self.ensure_placeholders(cursor, 'ohlc', days)
     
     def ensure_derivatives_placeholders(self, cursor, days: int) -> int:
-        """Ensure derivatives ML placeholders exist"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector('derivatives')
-        config = self.collector_configs['derivatives']
-        
-        if not symbols or not config.get('active', True):
-            logger.info(f"   Derivatives: No symbols found or collector inactive")
-            return 0
-        
-        try:
-            # Check if derivatives table is empty (needs placeholders)
-            cursor.execute("SELECT COUNT(*) FROM crypto_derivatives_ml")
-            total_records = cursor.fetchone()[0]
-            
-            if total_records == 0:
-                logger.info(f"   Derivatives table is empty - creating placeholders for {len(symbols)} symbols")
-                # For empty table, create more comprehensive historical coverage
-                end_date = datetime.now().date()
-                start_date = end_date - timedelta(days=max(days, 90))  # At least 90 days for empty table
-            else:
-                logger.info(f"   Derivatives table has {total_records} records - creating recent placeholders only")
-                end_date = datetime.now().date()
-                start_date = end_date - timedelta(days=days)
-            
-            logger.info(f"   Creating derivatives placeholders for {len(symbols)} symbols from {start_date} to {end_date}")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    try:
-                        timestamp = datetime.combine(current_date, datetime.min.time().replace(hour=16))
-                        
-                        # Use actual column names from the derivatives table structure
-                        cursor.execute("""
-                            INSERT IGNORE INTO crypto_derivatives_ml
-                            (symbol, timestamp, exchange, funding_rate, predicted_funding_rate,
-                             open_interest_usdt, ml_funding_momentum_score, ml_liquidation_risk_score,
-                             data_completeness_percentage, data_source)
-                            VALUES (%s, %s, 'placeholder', NULL, NULL, NULL, NULL, NULL, 0.0, 'placeholder_manager')
-                        """, (symbol, timestamp))
-                        
-                        if cursor.rowcount > 0:
-                            placeholders_created += 1
-                            
-                    except Exception as e:
-                        logger.debug(f"Error creating derivatives placeholder {symbol} {current_date}: {e}")
-                
-                current_date += timedelta(days=1)
-                
-                # Commit every 1000 records for large batches
-                if placeholders_created % 1000 == 0 and placeholders_created > 0:
-                    cursor.connection.commit()
-                    logger.info(f"   Derivatives progress: {placeholders_created} placeholders created...")
-        
-        except Exception as e:
-            logger.error(f"Error creating derivatives placeholders: {e}")
-        
-        return placeholders_created
+        """Ensure derivatives ML placeholders exist (at least 90 days for an empty table)"""
+        return self.ensure_placeholders(cursor, 'derivatives', days)
     
     def ensure_sentiment_placeholders(self, cursor, days: int) -> int:
-        """Ensure sentiment analysis placeholders exist"""
-        placeholders_created = 0
-        symbols = self.get_symbols_for_collector('sentiment')
-        
-        if not symbols:
-            return 0
-        
-        try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            
-            logger.info(f"   Creating sentiment placeholders for {len(symbols)} symbols from {start_date} to {end_date}")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                for symbol in symbols:
-                    # Create hourly placeholders for sentiment data
-                    for hour in range(24):
-                        try:
-                            timestamp = datetime.combine(current_date, datetime.min.time().replace(hour=hour))
-                            
-                            cursor.execute("""
-                                INSERT IGNORE INTO sentiment_analysis_results
-                                (symbol, timestamp, 
-                                 sentiment_score, confidence_level, data_source,
-                                 data_completeness_percentage, created_at)
-                                VALUES (%s, %s, NULL, NULL, 'placeholder_manager', 0.0, NOW())
-                            """, (symbol, timestamp))
-                            
-                            if cursor.rowcount > 0:
-                                placeholders_created += 1
-                                
-                        except Exception as e:
-                            logger.debug(f"Error creating sentiment placeholder {symbol} {timestamp}: {e}")
-                
-                current_date += timedelta(days=1)
-        
-        except Exception as e:
-            logger.error(f"Error creating sentiment placeholders: {e}")
-        
-        return placeholders_created
+        """Ensure hourly sentiment analysis placeholders exist"""
+        return self.ensure_placeholders(cursor, 'sentiment', days)
     
     def ensure_comprehensive_placeholders(self) -> Dict[str, int]:
         """Ensure all expected placeholder records exist across all active collectors"""
@@ -533,28 +373,14 @@ class CentralizedPlaceholderManager:
                 try:
                     logger.info(f"   Processing {collector_name} (priority {config.get('priority', 5)})...")
                     
-                    if collector_name == 'macro':
-                        created = self.ensure_macro_placeholders(cursor, 30)
-                    elif collector_name == 'technical':
-                        created = self.ensure_technical_placeholders(cursor, 168)  # 7 days in hours
-                    elif collector_name.startswith('onchain'):
-                        created = self.ensure_onchain_placeholders(cursor, 30, collector_name)
-                    elif collector_name.startswith('trading'):
-                        created = self.ensure_trading_signal_placeholders(cursor, 30, collector_name)
-                    elif collector_name == 'ohlc':
-                        created = self.ensure_ohlc_placeholders(cursor, 30)
-                    elif collector_name == 'derivatives':
-                        created = self.ensure_derivatives_placeholders(cursor, 30)
-                    elif collector_name == 'sentiment':
-                        created = self.ensure_sentiment_placeholders(cursor, 30)
-                    else:
-                        logger.warning(f"Unknown collector type: {collector_name}")
-                        created = 0
-                    
+                    created = self.ensure_placeholders(cursor, collector_name)
                     results[collector_name] = created
                     
+                    table_counts = self.stats['placeholders_by_table']
+                    table_counts[config['table']] = table_counts.get(config['table'], 0) + created
+                    
                     if created > 0:
-                        logger.info(f"   ✅ {collector_name}: {created} placeholders created")
+                        logger.info(f"   ✅ {collector_name} ({config['table']}): {created} placeholders created")
                     
                 except Exception as e:
                     logger.error(f"Error processing {collector_name}: {e}")
@@ -676,22 +502,11 @@ class CentralizedPlaceholderManager:
             cursor = conn.cursor()
             total_cleaned = 0
             
-            # Define cleanup queries for each table
-            cleanup_queries = [
-                ("macro_indicators", "indicator_date"),
-                ("technical_indicators", "DATE(timestamp)"),
-                ("crypto_onchain_data", "data_date"),
-                ("sentiment_analysis_results", "DATE(timestamp)")
-            ]
+            cutoff = day_start(datetime.now().date() - timedelta(days=days_old))
             
-            for table, date_field in cleanup_queries:
+            for table, date_field in PLACEHOLDER_CLEANUP_COLUMNS.items():
                 try:
-                    cursor.execute(f"""
-                        DELETE FROM {table} 
-                        WHERE data_completeness_percentage = 0 
-                        AND data_source LIKE '%placeholder%'
-                        AND {date_field} < DATE_SUB(CURDATE(), INTERVAL %s DAY)
-                    """, (days_old,))
+                    cursor.execute(placeholder_cleanup_query(table, date_field), (cutoff,))
                     
                     cleaned = cursor.rowcount
                     total_cleaned += cleaned
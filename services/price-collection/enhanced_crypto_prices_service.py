@@ -12,8 +12,8 @@ import json
 import sys
 import argparse
 import os
-from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, timedelta, date, timezone
+from typing import List, Dict, Any, Optional, Tuple, Union
 from contextlib import asynccontextmanager
 from pathlib import Path
 import mysql.connector
@@ -21,7 +21,11 @@ import mysql.connector
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
 import uvicorn
-import aiohttp
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from shared.rate_limiter import get_rate_limiter
+from shared.http_client import close_http_clients, get_http_client
+from shared.query_builder import date_span_bounds, existing_days_query
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -240,9 +244,23 @@ class EnhancedCryptoPricesService:
             'x-cg-pro-api-key': self.api_key
         }
         
-        # Premium rate limiting (300 requests/minute)
-        self.requests_per_minute = 300
-        self.request_times = []
+        # Premium rate limiting, shared with every other CoinGecko client
+        self.rate_limiter = get_rate_limiter("coingecko_premium")
+        
+        # Batched /simple/price settings: ids per request and a URL length budget
+        self.price_batch_max_ids = int(os.getenv("COINGECKO_PRICE_BATCH_SIZE", "250"))
+        self.price_batch_max_url_length = int(os.getenv("COINGECKO_PRICE_BATCH_URL_LENGTH", "1800"))
+        
+        # Most Coinbase spot requests in flight during the per-symbol fallback
+        self.coinbase_fallback_concurrency = int(os.getenv("COINBASE_FALLBACK_CONCURRENCY", "5"))
+        
+        # Historical backfill: longest date span fetched by one /market_chart/range call
+        self.backfill_max_range_days = int(os.getenv("COINGECKO_BACKFILL_MAX_RANGE_DAYS", "365"))
+        self.backfill_upsert_batch_size = int(os.getenv("BACKFILL_UPSERT_BATCH_SIZE", "1000"))
+        
+        # Process-wide pooled HTTP clients, one keep-alive pool per provider
+        self.coingecko_http = get_http_client("coingecko_premium")
+        self.coinbase_http = get_http_client("coinbase")
         
         # Initialize crypto definitions
         self.crypto_definitions = DatabaseCryptoDefinitions()
@@ -272,77 +290,180 @@ class EnhancedCryptoPricesService:
             self.api_calls_today = 0
             self.daily_reset = today
 
+    async def close(self):
+        """Close the pooled HTTP sessions"""
+        await close_http_clients()
+
     async def get_current_price_coinbase(self, symbol: str) -> Optional[float]:
         """Get current price from Coinbase API"""
         try:
             url = f"{self.coinbase_base_url}/exchange-rates?currency={symbol}"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        price = float(data["data"]["rates"]["USD"])
-                        return price
-                    elif response.status == 404:
-                        # Symbol not supported by Coinbase
-                        return None
-                    else:
-                        logger.warning(
-                            f"Coinbase API error for {symbol}: {response.status}"
-                        )
-                        return None
+            async with self.coinbase_http.get(url, timeout=10) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    price = float(data["data"]["rates"]["USD"])
+                    return price
+                elif response.status == 404:
+                    # Symbol not supported by Coinbase
+                    return None
+                else:
+                    logger.warning(
+                        f"Coinbase API error for {symbol}: {response.status}"
+                    )
+                    return None
         except Exception as e:
             logger.debug(f"Coinbase API failed for {symbol}: {e}")
             return None
 
-    def _check_rate_limit(self):
-        """Check and enforce rate limiting for premium API"""
-        current_time = time.time()
-        # Remove requests older than 1 minute
-        self.request_times = [t for t in self.request_times if current_time - t < 60]
-        
-        if len(self.request_times) >= self.requests_per_minute:
-            sleep_time = 60 - (current_time - self.request_times[0])
-            logger.warning(f"⏱️ Rate limit reached, sleeping {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-            self.request_times = [t for t in self.request_times if time.time() - t < 60]
-        
-        self.request_times.append(current_time)
+    async def _check_rate_limit(self):
+        """Wait for a token from the shared CoinGecko premium budget"""
+        await self.rate_limiter.acquire()
 
-    async def get_coingecko_price(
-        self, coin_id: str, vs_currency: str = "usd"
-    ) -> Optional[Dict]:
-        """Get price data from CoinGecko Premium API"""
+    async def _fetch_simple_price(
+        self, coin_ids: List[str], vs_currency: str = "usd"
+    ) -> Optional[Dict[str, Dict]]:
+        """Call /simple/price once for a comma-separated group of CoinGecko IDs
+
+        Returns None when the request itself failed, as opposed to an empty
+        dict when CoinGecko answered but knew none of the IDs.
+        """
+        label = coin_ids[0] if len(coin_ids) == 1 else f"{len(coin_ids)} ids"
         try:
             url = f"{self.base_url}/simple/price"
             params = {
-                "ids": coin_id,
+                "ids": ",".join(coin_ids),
                 "vs_currencies": vs_currency,
                 "include_24hr_change": "true",
                 "include_market_cap": "true",
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, headers=self.headers, timeout=15) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if coin_id in data:
-                            self.api_calls_today += 1
-                            self.last_api_call = datetime.now().isoformat()
-                            return data[coin_id]
-                    elif response.status == 429:
-                        logger.warning(f"CoinGecko rate limited for {coin_id}")
-                        retry_after = int(response.headers.get('Retry-After', 60))
-                        await asyncio.sleep(retry_after)
-                        return None
-                    else:
-                        logger.warning(
-                            f"CoinGecko API error for {coin_id}: {response.status}"
-                        )
-                        return None
+            await self._check_rate_limit()
+            async with self.coingecko_http.get(url, params=params, headers=self.headers, timeout=15) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    self.api_calls_today += 1
+                    self.last_api_call = datetime.now().isoformat()
+                    return data or {}
+                elif response.status == 429:
+                    # Fail the chunk now; the shared limiter paces the next cycle
+                    logger.warning(f"CoinGecko rate limited for {label}")
+                    return None
+                else:
+                    logger.warning(
+                        f"CoinGecko API error for {label}: {response.status}"
+                    )
+                    return None
         except Exception as e:
-            logger.debug(f"CoinGecko API failed for {coin_id}: {e}")
+            logger.debug(f"CoinGecko API failed for {label}: {e}")
             return None
 
+    async def get_coingecko_price(
+        self, coin_id: str, vs_currency: str = "usd"
+    ) -> Optional[Dict]:
+        """Get price data from CoinGecko Premium API"""
+        data = await self._fetch_simple_price([coin_id], vs_currency)
+        return data.get(coin_id) if data else None
+
+    def _chunk_coin_ids(self, coin_ids: List[str]) -> List[List[str]]:
+        """Split IDs into groups that respect the per-request ID and URL length limits"""
+        chunks = []
+        current = []
+        current_length = 0
+
+        for coin_id in coin_ids:
+            # +3 accounts for the URL-encoded comma separator (%2C)
+            added_length = len(coin_id) + (3 if current else 0)
+            if current and (
+                len(current) >= self.price_batch_max_ids
+                or current_length + added_length > self.price_batch_max_url_length
+            ):
+                chunks.append(current)
+                current = []
+                current_length = 0
+                added_length = len(coin_id)
+            current.append(coin_id)
+            current_length += added_length
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def get_coingecko_prices_batch(
+        self, coin_ids: List[str], vs_currency: str = "usd"
+    ) -> Dict[str, Dict]:
+        """Get price data for many CoinGecko IDs with one request per chunk
+
+        IDs that a successful chunk response omits are retried individually;
+        IDs from a failed chunk are not, so an outage or 429 is not amplified
+        into hundreds of single-ID requests.
+        """
+        unique_ids = list(dict.fromkeys(coin_id for coin_id in coin_ids if coin_id))
+        if not unique_ids:
+            return {}
+
+        chunks = self._chunk_coin_ids(unique_ids)
+        chunk_results = await asyncio.gather(
+            *(self._fetch_simple_price(chunk, vs_currency) for chunk in chunks)
+        )
+
+        results = {}
+        missing_ids = []
+        for chunk, data in zip(chunks, chunk_results):
+            if data is None:
+                continue
+            for coin_id in chunk:
+                if data.get(coin_id):
+                    results[coin_id] = data[coin_id]
+                else:
+                    missing_ids.append(coin_id)
+
+        if missing_ids:
+            logger.info(
+                f"Retrying {len(missing_ids)} ids missing from {len(chunks)} batched price requests"
+            )
+            singles = await asyncio.gather(
+                *(self.get_coingecko_price(coin_id, vs_currency) for coin_id in missing_ids)
+            )
+            for coin_id, coin_data in zip(missing_ids, singles):
+                if coin_data:
+                    results[coin_id] = coin_data
+
+        return results
+
+    def _build_coingecko_price_data(
+        self, symbol: str, coin_id: str, coin_name: str, cg_data: Dict, vs_currency: str
+    ) -> Dict:
+        """Convert a /simple/price entry into the service's price record"""
+        return {
+            "coin_id": coin_id,
+            "symbol": symbol,
+            "name": coin_name,
+            "current_price": cg_data.get(vs_currency, 0),
+            "price_change_24h": cg_data.get(f"{vs_currency}_24h_change"),
+            "price_change_percentage_24h": cg_data.get(
+                f"{vs_currency}_24h_change"
+            ),
+            "market_cap": cg_data.get(f"{vs_currency}_market_cap"),
+            "last_updated": datetime.now().isoformat(),
+            "data_source": "coingecko",
+        }
+
+    def _build_coinbase_price_data(
+        self, symbol: str, coin_id: Optional[str], coin_name: str, price: float
+    ) -> Dict:
+        """Build a price record from a Coinbase spot rate"""
+        return {
+            "coin_id": coin_id or symbol.lower(),
+            "symbol": symbol,
+            "name": coin_name,
+            "current_price": price,
+            "price_change_24h": None,
+            "price_change_percentage_24h": None,
+            "market_cap": None,
+            "last_updated": datetime.now().isoformat(),
+            "data_source": "coinbase",
+        }
+
     async def get_price_for_symbol(
         self, symbol: str, vs_currency: str = "usd"
     ) -> Optional[Dict]:
@@ -363,35 +484,17 @@ class EnhancedCryptoPricesService:
         if coingecko_id:
             cg_data = await self.get_coingecko_price(coingecko_id, vs_currency)
             if cg_data:
-                price_data = {
-                    "coin_id": coingecko_id,
-                    "symbol": symbol,
-                    "name": coin_name,
-                    "current_price": cg_data.get(vs_currency, 0),
-                    "price_change_24h": cg_data.get(f"{vs_currency}_24h_change"),
-                    "price_change_percentage_24h": cg_data.get(
-                        f"{vs_currency}_24h_change"
-                    ),
-                    "market_cap": cg_data.get(f"{vs_currency}_market_cap"),
-                    "last_updated": datetime.now().isoformat(),
-                    "data_source": "coingecko",
-                }
+                price_data = self._build_coingecko_price_data(
+                    symbol, coingecko_id, coin_name, cg_data, vs_currency
+                )
 
         # Fallback to Coinbase if CoinGecko fails
         if not price_data:
             coinbase_price = await self.get_current_price_coinbase(symbol)
             if coinbase_price:
-                price_data = {
-                    "coin_id": coingecko_id or symbol.lower(),
-                    "symbol": symbol,
-                    "name": coin_name,
-                    "current_price": coinbase_price,
-                    "price_change_24h": None,
-                    "price_change_percentage_24h": None,
-                    "market_cap": None,
-                    "last_updated": datetime.now().isoformat(),
-                    "data_source": "coinbase",
-                }
+                price_data = self._build_coinbase_price_data(
+                    symbol, coingecko_id, coin_name, coinbase_price
+                )
 
         # Cache the result
         if price_data:
@@ -408,42 +511,66 @@ class EnhancedCryptoPricesService:
         symbols = crypto_definitions.get_coinbase_symbols()
         logger.info(f"Fetching prices for {len(symbols)} symbols...")
 
-        # Process symbols in batches to avoid overwhelming APIs
-        batch_size = 25
         all_prices = []
         cache_hits = 0
-        api_calls = 0
-
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i : i + batch_size]
-            logger.info(
-                f"Processing batch {i//batch_size + 1}/{(len(symbols) + batch_size - 1)//batch_size}: {batch[:5]}..."
+        api_calls_before = self.api_calls_today
+
+        # Serve fresh cache entries and group the rest by CoinGecko ID
+        symbols_by_id: Dict[str, List[str]] = {}
+        unresolved = []
+        for symbol in symbols:
+            cache_key = f"{symbol}_{vs_currency}"
+            if self._is_cache_valid(cache_key):
+                all_prices.append(self.cache[cache_key]["data"])
+                cache_hits += 1
+                continue
+            coingecko_id = crypto_definitions.get_coingecko_id(symbol)
+            if coingecko_id:
+                symbols_by_id.setdefault(coingecko_id, []).append(symbol)
+            else:
+                unresolved.append(symbol)
+
+        # One /simple/price request per chunk of IDs, fanned back out per symbol
+        cg_prices = await self.get_coingecko_prices_batch(list(symbols_by_id), vs_currency)
+
+        for coingecko_id, id_symbols in symbols_by_id.items():
+            cg_data = cg_prices.get(coingecko_id)
+            for symbol in id_symbols:
+                if cg_data:
+                    price_data = self._build_coingecko_price_data(
+                        symbol, coingecko_id, crypto_definitions.get_coin_name(symbol),
+                        cg_data, vs_currency
+                    )
+                    self.cache[f"{symbol}_{vs_currency}"] = {"data": price_data, "timestamp": time.time()}
+                    all_prices.append(price_data)
+                else:
+                    unresolved.append(symbol)
+
+        # Coinbase fallback for anything CoinGecko could not price
+        if unresolved:
+            semaphore = asyncio.Semaphore(max(1, self.coinbase_fallback_concurrency))
+
+            async def coinbase_price_bounded(symbol: str):
+                async with semaphore:
+                    return await self.get_current_price_coinbase(symbol)
+
+            coinbase_results = await asyncio.gather(
+                *(coinbase_price_bounded(symbol) for symbol in unresolved),
+                return_exceptions=True,
             )
-
-            # Process batch concurrently but with rate limiting
-            batch_tasks = []
-            for symbol in batch:
-                batch_tasks.append(self.get_price_for_symbol(symbol, vs_currency))
-
-            # Execute batch with small delay between batches
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.warning(f"Error in batch processing: {result}")
+            for symbol, coinbase_price in zip(unresolved, coinbase_results):
+                if isinstance(coinbase_price, Exception):
+                    logger.warning(f"Error in Coinbase fallback for {symbol}: {coinbase_price}")
                     continue
+                if coinbase_price:
+                    price_data = self._build_coinbase_price_data(
+                        symbol, crypto_definitions.get_coingecko_id(symbol),
+                        crypto_definitions.get_coin_name(symbol), coinbase_price
+                    )
+                    self.cache[f"{symbol}_{vs_currency}"] = {"data": price_data, "timestamp": time.time()}
+                    all_prices.append(price_data)
 
-                if result:
-                    all_prices.append(result)
-                    if result.get("data_source") == "cache":
-                        cache_hits += 1
-                    else:
-                        api_calls += 1
-
-            # Rate limiting between batches
-            if i + batch_size < len(symbols):
-                await asyncio.sleep(1)  # 1 second between batches
-
+        api_calls = self.api_calls_today - api_calls_before + len(unresolved)
         processing_time = (time.time() - start_time) * 1000
 
         logger.info(f"Collected prices for {len(all_prices)}/{len(symbols)} symbols")
@@ -539,14 +666,12 @@ class EnhancedCryptoPricesService:
             db = mysql.connector.connect(**self.db_config)
             cursor = db.cursor()
             
-            # Get existing dates for this symbol
-            cursor.execute("""
-                SELECT DISTINCT DATE(timestamp) as date_only
-                FROM price_data_real
-                WHERE symbol = %s 
-                AND DATE(timestamp) BETWEEN %s AND %s
-                ORDER BY date_only
-            """, (symbol, start_date, end_date))
+            # Get existing dates for this symbol (timestamp holds epoch seconds,
+            # timestamp_iso is the indexed datetime)
+            cursor.execute(
+                existing_days_query("price_data_real", "timestamp_iso"),
+                (symbol, *date_span_bounds(start_date, end_date))
+            )
             
             existing_dates = {row[0] for row in cursor.fetchall()}
             cursor.close()
@@ -568,6 +693,126 @@ class EnhancedCryptoPricesService:
             logger.error(f"Error identifying missing dates for {symbol}: {e}")
             return []
 
+    @staticmethod
+    def _coalesce_date_ranges(dates: List[date], max_days: Optional[int] = None) -> List[Tuple[date, date]]:
+        """Group dates into inclusive (start, end) runs of consecutive days
+
+        Runs longer than ``max_days`` are split so no single request spans more
+        than that many days.
+        """
+        ranges = []
+        for current in sorted(set(dates)):
+            if ranges:
+                range_start, range_end = ranges[-1]
+                span = (current - range_start).days + 1
+                if current == range_end + timedelta(days=1) and (not max_days or span <= max_days):
+                    ranges[-1] = (range_start, current)
+                    continue
+            ranges.append((current, current))
+        return ranges
+
+    async def fetch_market_chart_range(
+        self, coingecko_id: str, start: date, end: date, vs_currency: str = "usd"
+    ) -> Optional[Dict[str, List]]:
+        """Fetch prices, market caps and volumes for ``start`` through ``end`` (inclusive, UTC)
+
+        Returns None when the request failed.
+        """
+        day_start = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+        day_after_end = datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        url = f"{self.base_url}/coins/{coingecko_id}/market_chart/range"
+        params = {
+            "vs_currency": vs_currency,
+            "from": int(day_start.timestamp()),
+            "to": int(day_after_end.timestamp()) - 1,
+        }
+        
+        try:
+            await self._check_rate_limit()
+            async with self.coingecko_http.get(url, params=params, headers=self.headers, timeout=30) as response:
+                if response.status == 200:
+                    self.api_calls_today += 1
+                    self.last_api_call = datetime.now().isoformat()
+                    return await response.json()
+                elif response.status == 429:
+                    # Fail the range now; the shared limiter paces the next request
+                    logger.warning(f"CoinGecko rate limited for {coingecko_id} range {start} to {end}")
+                    return None
+                else:
+                    logger.warning(f"CoinGecko market_chart/range error for {coingecko_id}: {response.status}")
+                    return None
+        except Exception as e:
+            logger.error(f"Error fetching market chart range for {coingecko_id} ({start} to {end}): {e}")
+            return None
+
+    @staticmethod
+    def _resample_market_chart(chart: Dict[str, List], bucket_seconds: int = 86400) -> Dict[int, Dict[str, float]]:
+        """Resample a market_chart payload to fixed UTC buckets
+
+        CoinGecko returns 5-minute, hourly or daily points depending on the
+        requested span. Each bucket keeps the first point at or after its start,
+        matching the 00:00 UTC snapshot served by /coins/{id}/history.
+        Returns {bucket_start_unix: {"price", "market_cap", "volume"}}.
+        """
+        buckets: Dict[int, Dict[str, float]] = {}
+        series = (("price", "prices"), ("market_cap", "market_caps"), ("volume", "total_volumes"))
+        for field_name, key in series:
+            for point in chart.get(key) or []:
+                if len(point) < 2 or point[1] is None:
+                    continue
+                timestamp = int(point[0] // 1000)
+                bucket = timestamp - timestamp % bucket_seconds
+                values = buckets.setdefault(bucket, {})
+                # Points arrive in time order; keep the earliest in the bucket
+                if field_name not in values:
+                    values[field_name] = float(point[1])
+        return buckets
+
+    def _build_backfill_rows(
+        self, symbol: str, coingecko_id: str, coin_name: str,
+        chart: Dict[str, List], start: date, end: date
+    ) -> List[Dict[str, Any]]:
+        """Turn one range response into daily rows for store_historical_data"""
+        buckets = self._resample_market_chart(chart)
+        created_at = datetime.now()
+        rows = []
+        previous_price = None
+        
+        for bucket in sorted(buckets):
+            values = buckets[bucket]
+            price = values.get("price")
+            bucket_date = datetime.fromtimestamp(bucket, tz=timezone.utc).date()
+            if not price or not (start <= bucket_date <= end):
+                continue
+            
+            price_change = price_change_pct = None
+            if previous_price:
+                price_change = price - previous_price
+                price_change_pct = price_change / previous_price * 100
+            previous_price = price
+            
+            rows.append({
+                'symbol': symbol,
+                'coin_id': coingecko_id,
+                'name': coin_name,
+                'timestamp': bucket,
+                'timestamp_iso': datetime.combine(bucket_date, datetime.min.time()),
+                'current_price': price,
+                'market_cap': values.get("market_cap"),
+                'volume_usd_24h': values.get("volume"),
+                'price_change_24h': price_change,
+                'price_change_percentage_24h': price_change_pct,
+                'market_cap_rank': None,
+                'circulating_supply': None,
+                'total_supply': None,
+                'max_supply': None,
+                'ath': None,
+                'atl': None,
+                'created_at': created_at
+            })
+        
+        return rows
+
     async def collect_historical_data(self, symbol: str, coingecko_id: str, target_date: date) -> Dict[str, Any]:
         """Collect historical price data for a specific symbol and date"""
         try:
@@ -578,39 +823,38 @@ class EnhancedCryptoPricesService:
                 'localization': 'false'
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract price data
-                        market_data = data.get('market_data', {})
-                        
-                        target_datetime = datetime.combine(target_date, datetime.min.time())
-                        price_data = {
-                            'symbol': symbol,
-                            'coin_id': coingecko_id,  # Add the required coin_id field
-                            'name': data.get('name', symbol),  # Add the required name field
-                            'timestamp': int(target_datetime.timestamp()),
-                            'timestamp_iso': target_datetime,  # Add the required timestamp_iso field
-                            'current_price': market_data.get('current_price', {}).get('usd', 0),
-                            'market_cap': market_data.get('market_cap', {}).get('usd', 0),
-                            'volume_usd_24h': market_data.get('total_volume', {}).get('usd', 0),
-                            'price_change_24h': market_data.get('price_change_24h', {}).get('usd', 0),
-                            'price_change_percentage_24h': market_data.get('price_change_percentage_24h', {}).get('usd', 0),
-                            'market_cap_rank': market_data.get('market_cap_rank'),
-                            'circulating_supply': market_data.get('circulating_supply'),
-                            'total_supply': market_data.get('total_supply'),
-                            'max_supply': market_data.get('max_supply'),
-                            'ath': market_data.get('ath', {}).get('usd'),
-                            'atl': market_data.get('atl', {}).get('usd'),
-                            'created_at': datetime.now()
-                        }
-                        
-                        return {'status': 'success', 'data': price_data}
-                    else:
-                        return {'status': 'error', 'error': f'API returned {response.status}'}
-                        
+            async with self.coingecko_http.get(url, params=params, headers=self.headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Extract price data
+                    market_data = data.get('market_data', {})
+                    
+                    target_datetime = datetime.combine(target_date, datetime.min.time())
+                    price_data = {
+                        'symbol': symbol,
+                        'coin_id': coingecko_id,  # Add the required coin_id field
+                        'name': data.get('name', symbol),  # Add the required name field
+                        'timestamp': int(target_datetime.timestamp()),
+                        'timestamp_iso': target_datetime,  # Add the required timestamp_iso field
+                        'current_price': market_data.get('current_price', {}).get('usd', 0),
+                        'market_cap': market_data.get('market_cap', {}).get('usd', 0),
+                        'volume_usd_24h': market_data.get('total_volume', {}).get('usd', 0),
+                        'price_change_24h': market_data.get('price_change_24h', {}).get('usd', 0),
+                        'price_change_percentage_24h': market_data.get('price_change_percentage_24h', {}).get('usd', 0),
+                        'market_cap_rank': market_data.get('market_cap_rank'),
+                        'circulating_supply': market_data.get('circulating_supply'),
+                        'total_supply': market_data.get('total_supply'),
+                        'max_supply': market_data.get('max_supply'),
+                        'ath': market_data.get('ath', {}).get('usd'),
+                        'atl': market_data.get('atl', {}).get('usd'),
+                        'created_at': datetime.now()
+                    }
+                    
+                    return {'status': 'success', 'data': price_data}
+                else:
+                    return {'status': 'error', 'error': f'API returned {response.status}'}
+                    
         except Exception as e:
             logger.error(f"Error collecting historical data for {symbol} on {target_date}: {e}")
             return {'status': 'error', 'error': str(e)}
@@ -641,8 +885,14 @@ class EnhancedCryptoPricesService:
                     created_at = VALUES(created_at)
             """
             
-            cursor.executemany(insert_query, historical_data)
-            rows_affected = cursor.rowcount
+            # mysql-connector rewrites executemany() INSERTs into multi-row
+            # statements; chunking keeps each statement under max_allowed_packet
+            rows_affected = 0
+            batch_size = self.backfill_upsert_batch_size
+            for i in range(0, len(historical_data), batch_size):
+                cursor.executemany(insert_query, historical_data[i:i + batch_size])
+                rows_affected += cursor.rowcount
+            db.commit()
             
             cursor.close()
             db.close()
@@ -655,97 +905,108 @@ class EnhancedCryptoPricesService:
             return 0
 
     async def run_backfill(self, start_date: date, end_date: date, symbols: List[str] = None, batch_size: int = 5) -> Dict[str, Any]:
-        """Run historical backfill for specified date range and symbols"""
+        """Run historical backfill for specified date range and symbols
+
+        Each symbol's missing dates are coalesced into contiguous ranges and
+        every range is fetched with one /market_chart/range call, so a year of
+        gaps costs a request or two per symbol instead of one per day.
+        Symbols in a batch are fetched concurrently; the shared rate limiter
+        keeps the combined request rate within the CoinGecko budget.
+        """
         logger.info(f"Starting backfill from {start_date} to {end_date}")
         
-        if symbols is None:
+        if not symbols:
             symbols = crypto_definitions.get_coinbase_symbols()
             logger.info(f"Using all {len(symbols)} available symbols")
         
-        total_missing = 0
-        total_collected = 0
+        # Resolve CoinGecko IDs once for the whole run
+        coingecko_mapping = crypto_definitions.get_coingecko_symbols_mapping()
+        
+        totals = {'missing': 0, 'collected': 0, 'ranges': 0, 'requests': 0}
         total_stored = 0
         failed_collections = []
-        dates_processed = 0
+        
+        async def backfill_symbol(symbol: str) -> List[Dict]:
+            coingecko_id = coingecko_mapping.get(symbol)
+            if not coingecko_id:
+                logger.warning(f"No CoinGecko ID found for {symbol}")
+                return []
+            
+            missing_dates = await asyncio.to_thread(self.get_missing_dates, symbol, start_date, end_date)
+            totals['missing'] += len(missing_dates)
+            if not missing_dates:
+                return []
+            
+            rows = []
+            coin_name = crypto_definitions.get_coin_name(symbol)
+            for range_start, range_end in self._coalesce_date_ranges(missing_dates, self.backfill_max_range_days):
+                totals['ranges'] += 1
+                totals['requests'] += 1
+                chart = await self.fetch_market_chart_range(coingecko_id, range_start, range_end)
+                if chart is None:
+                    failed_collections.append({
+                        'symbol': symbol,
+                        'date_range': f"{range_start} to {range_end}",
+                        'error': 'market_chart/range request failed'
+                    })
+                    logger.warning(f"❌ Failed {symbol} for {range_start} to {range_end}")
+                    continue
+                
+                range_rows = self._build_backfill_rows(
+                    symbol, coingecko_id, coin_name, chart, range_start, range_end
+                )
+                rows.extend(range_rows)
+                logger.debug(f"✅ Collected {len(range_rows)} days of {symbol} for {range_start} to {range_end}")
+            
+            totals['collected'] += len(rows)
+            return rows
         
         # Process symbols in batches to avoid overwhelming the API
         for i in range(0, len(symbols), batch_size):
             batch_symbols = symbols[i:i + batch_size]
             logger.info(f"Processing batch {i//batch_size + 1}: {len(batch_symbols)} symbols")
             
-            batch_data = []
+            results = await asyncio.gather(
+                *(backfill_symbol(symbol) for symbol in batch_symbols), return_exceptions=True
+            )
             
-            for symbol in batch_symbols:
-                try:
-                    # Get CoinGecko ID for symbol
-                    coingecko_mapping = crypto_definitions.get_coingecko_symbols_mapping()
-                    coingecko_id = coingecko_mapping.get(symbol)
-                    
-                    if not coingecko_id:
-                        logger.warning(f"No CoinGecko ID found for {symbol}")
-                        continue
-                    
-                    # Find missing dates for this symbol
-                    missing_dates = self.get_missing_dates(symbol, start_date, end_date)
-                    total_missing += len(missing_dates)
-                    
-                    if not missing_dates:
-                        continue
-                    
-                    # Collect historical data for missing dates (limit to avoid API overload)
-                    for target_date in missing_dates[:3]:  # Limit to 3 dates per symbol per batch
-                        self._check_rate_limit()  # Check rate limit before each request
-                        
-                        result = await self.collect_historical_data(symbol, coingecko_id, target_date)
-                        dates_processed += 1
-                        
-                        if result['status'] == 'success':
-                            batch_data.append(result['data'])
-                            total_collected += 1
-                            logger.debug(f"✅ Collected {symbol} for {target_date}")
-                        else:
-                            failed_collections.append({
-                                'symbol': symbol,
-                                'date': str(target_date),
-                                'error': result.get('error', 'Unknown error')
-                            })
-                            logger.warning(f"❌ Failed {symbol} for {target_date}: {result.get('error')}")
-                        
-                        # Rate limiting - wait between requests for premium API
-                        await asyncio.sleep(0.2)  # 200ms delay between requests
-                
-                except Exception as e:
-                    logger.error(f"Error processing {symbol}: {e}")
+            batch_data = []
+            for symbol, result in zip(batch_symbols, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing {symbol}: {result}")
                     failed_collections.append({
                         'symbol': symbol,
-                        'error': str(e)
+                        'error': str(result)
                     })
+                else:
+                    batch_data.extend(result)
             
             # Store batch data
             if batch_data:
-                stored_count = self.store_historical_data(batch_data)
+                stored_count = await asyncio.to_thread(self.store_historical_data, batch_data)
                 total_stored += stored_count
                 logger.info(f"Batch complete: {stored_count} records stored")
-            
-            # Wait between batches for rate limiting
-            await asyncio.sleep(2.0)  # 2 seconds between batches
         
         result = {
             'status': 'completed',
             'date_range': f"{start_date} to {end_date}",
             'symbols_processed': len(symbols),
-            'dates_processed': dates_processed,
-            'total_missing_dates': total_missing,
-            'total_collected': total_collected,
+            'dates_processed': totals['collected'],
+            'ranges_fetched': totals['ranges'],
+            'api_requests': totals['requests'],
+            'total_missing_dates': totals['missing'],
+            'total_collected': totals['collected'],
             'total_stored': total_stored,
             'failed_collections': failed_collections,
-            'success_rate': (total_collected / max(total_missing, 1)) * 100
+            'success_rate': (totals['collected'] / max(totals['missing'], 1)) * 100
         }
         
-        logger.info(f"Backfill completed: {total_stored} records stored, {len(failed_collections)} failures")
+        logger.info(
+            f"Backfill completed: {total_stored} records stored from {totals['requests']} requests, "
+            f"{len(failed_collections)} failures"
+        )
         return result
 
-
 # =============================================================================
 # Service Initialization
 # =============================================================================
@@ -762,6 +1023,7 @@ async def lifespan(app: FastAPI):
     symbols = crypto_definitions.get_coinbase_symbols()
     logger.info(f"📊 Loaded {len(symbols)} Coinbase-supported symbols")
     yield
+    await enhanced_service.close()
     logger.info("⚡ Shutting down Enhanced Crypto Prices Service")
 
 
@@ -925,8 +1187,9 @@ async def run_backfill(request: BackfillRequest):
             "message": f"Backfill completed for period {start_date} to {end_date}",
             "dates_processed": result.get('dates_processed', 0),
             "symbols_processed": result.get('symbols_processed', 0),
-            "records_created": result.get('records_created', 0),
-            "errors_encountered": result.get('errors', [])
+            "api_requests": result.get('api_requests', 0),
+            "records_created": result.get('total_stored', 0),
+            "errors_encountered": result.get('failed_collections', [])
         }
         
     except ValueError as e:
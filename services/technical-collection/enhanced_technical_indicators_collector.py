@@ -8,18 +8,20 @@ Includes production-grade API endpoints, health scoring, and automated gap detec
 import os
 import sys
 import logging
+import math
+import argparse
 import mysql.connector
 import asyncio
 import time
 import json
 from datetime import datetime, timedelta, date
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 import schedule
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Dynamic symbol management
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared'))
@@ -28,15 +30,100 @@ try:
 except ImportError:
     logger.warning("Could not import centralized table_config, using fallback")
     get_collector_symbols = None
+from indicator_engine import IndicatorEngine
+from health_monitor import HealthSampler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("technical-indicators-collector")
 
+# Historical recompute: price rows streamed per chunk, rows of earlier history
+# replayed ahead of each chunk so EMAs/RSI converge, symbols processed in parallel
+RECOMPUTE_CHUNK_ROWS = int(os.getenv("TECHNICAL_RECOMPUTE_CHUNK_ROWS", "5000"))
+RECOMPUTE_WARMUP_ROWS = int(os.getenv("TECHNICAL_RECOMPUTE_WARMUP_ROWS", "300"))
+RECOMPUTE_WORKERS = int(os.getenv("TECHNICAL_RECOMPUTE_WORKERS", "4"))
+RECOMPUTE_UPSERT_CHUNK_SIZE = 1000
+# Stored values within this relative difference of a recomputed value are current
+RECOMPUTE_REL_TOLERANCE = 1e-8
+MIN_INDICATOR_PRICES = 20
+
+# /health, /status and /metrics serve a gap measurement sampled this often
+HEALTH_SAMPLE_INTERVAL = int(os.getenv("HEALTH_SAMPLE_INTERVAL", "30"))
+
+# technical_indicators column -> key in an indicator row
+INDICATOR_COLUMNS = {
+    "price": "current_price",
+    "rsi_14": "rsi_14",
+    "sma_20": "sma_20",
+    "sma_50": "sma_50",
+    "ema_12": "ema_12",
+    "ema_26": "ema_26",
+    "macd": "macd",
+    "macd_signal": "macd_signal",
+    "macd_histogram": "macd_histogram",
+    "bb_upper": "bb_upper",
+    "bb_middle": "bb_middle",
+    "bb_lower": "bb_lower",
+}
+# Indicator row key -> IndicatorEngine series name, where they differ
+ENGINE_SERIES = {"macd": "macd_line"}
+
+
+def technical_indicator_rows(symbol: str, timestamps: Sequence[Any], prices: Sequence[float],
+                             engine: IndicatorEngine) -> List[Dict]:
+    """
+    Indicator rows for every timestamp of a chronological price series, from one
+    vectorized pass. Rows with fewer than ``MIN_INDICATOR_PRICES`` prices of
+    history are omitted; indicators not yet defined (e.g. SMA 50 on the 30th
+    price) are None.
+    """
+    closes = np.asarray(prices, dtype=float)
+    series = engine.compute_series(closes, closes, closes)
+    values = {
+        key: series[ENGINE_SERIES.get(key, key)]
+        for key in INDICATOR_COLUMNS.values() if key != "current_price"
+    }
+
+    rows = []
+    for i in range(MIN_INDICATOR_PRICES - 1, len(closes)):
+        row = {'symbol': symbol, 'timestamp_iso': timestamps[i], 'current_price': float(closes[i])}
+        for key, column in values.items():
+            row[key] = None if np.isnan(column[i]) else round(float(column[i]), 6)
+        rows.append(row)
+    return rows
+
+
+def indicator_row_is_current(row: Dict, stored: Optional[Dict]) -> bool:
+    """True when a stored technical_indicators row already holds ``row``'s values"""
+    if stored is None:
+        return False
+    for column, key in INDICATOR_COLUMNS.items():
+        new, old = row[key], stored.get(column)
+        if new is None or old is None:
+            if new is not old:
+                return False
+        elif not math.isclose(new, float(old), rel_tol=RECOMPUTE_REL_TOLERANCE, abs_tol=1e-6):
+            return False
+    return True
+
+
+def indicator_upsert_sql(row_count: int) -> str:
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE for ``row_count`` indicator rows"""
+    columns = ["symbol", "timestamp_iso", *INDICATOR_COLUMNS]
+    row = "(" + ", ".join(["%s"] * len(columns)) + ", NOW())"
+    updates = ",\n            ".join(f"{c} = VALUES({c})" for c in INDICATOR_COLUMNS)
+    return f"""
+        INSERT INTO technical_indicators ({", ".join(columns)}, created_at)
+        VALUES {", ".join([row] * row_count)}
+        ON DUPLICATE KEY UPDATE
+            {updates},
+            created_at = NOW()
+    """
+
 class TechnicalIndicatorsCollector:
     """Production-ready technical indicators collector with comprehensive ML features"""
     
-    def __init__(self):
+    def __init__(self, start_scheduler: bool = True):
         # Database configuration
         self.db_config = {
             "host": os.getenv("MYSQL_HOST", "172.22.32.1"),
@@ -58,9 +145,22 @@ class TechnicalIndicatorsCollector:
             'symbols_processed': 0,
             'indicators_calculated': 0,
             'database_writes': 0,
-            'last_collection': None
+            'last_collection': None,
+            'history_rows_written': 0,
+            'last_recompute': None
         }
         
+        # Same indicator definitions for the live cycle and historical recompute
+        self.indicator_engine = IndicatorEngine(
+            sma_periods=(20, 50), ema_periods=(12, 26), rsi_periods=(14,),
+            bollinger_period=20, bollinger_std=2, macd_periods=(12, 26, 9)
+        )
+        self._checkpoint_table_ready = False
+        
+        # Gap detection queries MySQL, so it runs in the background instead of per request
+        self.health_sampler = HealthSampler(interval=HEALTH_SAMPLE_INTERVAL)
+        self.health_sampler.add_probe('gap_hours', self._probe_gap_hours)
+        
         # Load symbols
         self._load_symbols_from_database()
         
@@ -68,8 +168,10 @@ class TechnicalIndicatorsCollector:
         self.app = FastAPI(title=self.service_name, version="1.0.0")
         self._setup_routes()
         
-        # Background scheduler
-        self._setup_scheduler()
+        # Background scheduler (not needed when run as a one-off recompute job)
+        if start_scheduler:
+            self.health_sampler.start_in_thread()
+            self._setup_scheduler()
         
     def _load_symbols_from_database(self):
         """Load active crypto symbols that have recent price data"""
@@ -140,83 +242,6 @@ class TechnicalIndicatorsCollector:
             logger.error(f"Database connection failed: {e}")
             raise
     
-    def calculate_ema(self, prices: List[float], period: int) -> float:
-        """Calculate Exponential Moving Average"""
-        if len(prices) < period:
-            return sum(prices) / len(prices) if prices else 0
-        
-        multiplier = 2 / (period + 1)
-        ema = sum(prices[:period]) / period  # Start with SMA
-        
-        for price in prices[period:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
-
-    def calculate_sma(self, prices: List[float], period: int) -> float:
-        """Calculate Simple Moving Average"""
-        if len(prices) < period:
-            return sum(prices) / len(prices) if prices else 0
-        return sum(prices[-period:]) / period
-
-    def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
-        """Calculate Relative Strength Index"""
-        if len(prices) < period + 1:
-            return 50.0  # Neutral RSI
-        
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-
-    def calculate_macd(self, prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, float]:
-        """Calculate MACD (Moving Average Convergence Divergence)"""
-        if len(prices) < slow:
-            return {'macd': 0, 'signal': 0, 'histogram': 0}
-        
-        ema_fast = self.calculate_ema(prices, fast)
-        ema_slow = self.calculate_ema(prices, slow)
-        macd_line = ema_fast - ema_slow
-        
-        # For signal line, use simplified calculation
-        signal_line = macd_line * 0.9  # Approximate signal
-        histogram = macd_line - signal_line
-        
-        return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
-        }
-
-    def calculate_bollinger_bands(self, prices: List[float], period: int = 20, std_dev: float = 2) -> Dict[str, float]:
-        """Calculate Bollinger Bands"""
-        if len(prices) < period:
-            avg_price = sum(prices) / len(prices) if prices else 0
-            return {
-                'bb_upper': avg_price * 1.02,
-                'bb_middle': avg_price,
-                'bb_lower': avg_price * 0.98
-            }
-        
-        sma = self.calculate_sma(prices, period)
-        recent_prices = prices[-period:]
-        std = np.std(recent_prices)
-        
-        return {
-            'bb_upper': sma + (std_dev * std),
-            'bb_middle': sma,
-            'bb_lower': sma - (std_dev * std)
-        }
-
     def get_price_data(self, symbol: str, days_back: int = 50) -> List[Dict]:
         """Get price data for technical indicator calculations"""
         try:
@@ -259,46 +284,20 @@ class TechnicalIndicatorsCollector:
                 return None
             
             # Extract prices (handle None values)
-            prices = []
-            for row in price_data:
-                if row['current_price'] is not None:
-                    prices.append(float(row['current_price']))
-            
-            if len(prices) < 20:
-                logger.warning(f"Insufficient valid prices for {symbol}: {len(prices)} points")
+            valid = [row for row in price_data if row['current_price'] is not None]
+
+            if len(valid) < MIN_INDICATOR_PRICES:
+                logger.warning(f"Insufficient valid prices for {symbol}: {len(valid)} points")
                 return None
-            
-            # Calculate all indicators
-            rsi_14 = self.calculate_rsi(prices, 14)
-            sma_20 = self.calculate_sma(prices, 20)
-            sma_50 = self.calculate_sma(prices, 50)
-            ema_12 = self.calculate_ema(prices, 12)
-            ema_26 = self.calculate_ema(prices, 26)
-            
-            macd_data = self.calculate_macd(prices)
-            bb_data = self.calculate_bollinger_bands(prices)
-            
-            # Get current price and timestamp
-            latest_data = price_data[-1]
-            current_price = float(latest_data['current_price'])
-            timestamp_iso = latest_data['timestamp_iso']
-            
-            return {
-                'symbol': symbol,
-                'timestamp_iso': timestamp_iso,
-                'current_price': current_price,
-                'rsi_14': round(rsi_14, 6),
-                'sma_20': round(sma_20, 6),
-                'sma_50': round(sma_50, 6),
-                'ema_12': round(ema_12, 6),
-                'ema_26': round(ema_26, 6),
-                'macd': round(macd_data['macd'], 6),
-                'macd_signal': round(macd_data['signal'], 6),
-                'macd_histogram': round(macd_data['histogram'], 6),
-                'bb_upper': round(bb_data['bb_upper'], 6),
-                'bb_middle': round(bb_data['bb_middle'], 6),
-                'bb_lower': round(bb_data['bb_lower'], 6)
-            }
+
+            # Same vectorized definitions as the historical recompute; keep the latest row
+            rows = technical_indicator_rows(
+                symbol,
+                [row['timestamp_iso'] for row in valid],
+                [float(row['current_price']) for row in valid],
+                self.indicator_engine
+            )
+            return rows[-1]
             
         except Exception as e:
             logger.error(f"Error calculating indicators for {symbol}: {e}")
@@ -352,6 +351,187 @@ class TechnicalIndicatorsCollector:
             logger.error(f"❌ Error storing technical indicators: {e}")
             return 0
 
+    def _ensure_checkpoint_table(self, cursor):
+        if self._checkpoint_table_ready:
+            return
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS technical_recompute_checkpoints (
+                symbol VARCHAR(20) NOT NULL PRIMARY KEY,
+                range_start DATETIME NOT NULL,
+                range_end DATETIME NOT NULL,
+                last_timestamp DATETIME NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """)
+        self._checkpoint_table_ready = True
+
+    def _load_checkpoint(self, cursor, symbol: str, start: datetime, end: datetime) -> Optional[datetime]:
+        """Last recomputed price timestamp of an earlier run over the same [start, end) range"""
+        cursor.execute(
+            "SELECT range_start, range_end, last_timestamp FROM technical_recompute_checkpoints WHERE symbol = %s",
+            (symbol,)
+        )
+        row = cursor.fetchone()
+        if row and row[0] == start and row[1] == end:
+            return row[2]
+        return None
+
+    def _save_checkpoint(self, cursor, symbol: str, start: datetime, end: datetime, last_timestamp: datetime):
+        cursor.execute("""
+            INSERT INTO technical_recompute_checkpoints (symbol, range_start, range_end, last_timestamp)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                range_start = VALUES(range_start),
+                range_end = VALUES(range_end),
+                last_timestamp = VALUES(last_timestamp)
+        """, (symbol, start, end, last_timestamp))
+
+    def _load_stored_indicators(self, cursor, symbol: str, first: datetime, last: datetime) -> Dict[Any, Dict]:
+        """Stored indicator rows for [first, last], keyed by timestamp"""
+        columns = list(INDICATOR_COLUMNS)
+        cursor.execute(f"""
+            SELECT timestamp_iso, {", ".join(columns)}
+            FROM technical_indicators
+            WHERE symbol = %s AND timestamp_iso >= %s AND timestamp_iso <= %s
+        """, (symbol, first, last))
+        return {row[0]: dict(zip(columns, row[1:])) for row in cursor.fetchall()}
+
+    def _upsert_indicator_rows(self, cursor, rows: List[Dict]) -> int:
+        """Write indicator rows with one multi-row upsert per chunk"""
+        for i in range(0, len(rows), RECOMPUTE_UPSERT_CHUNK_SIZE):
+            chunk = rows[i:i + RECOMPUTE_UPSERT_CHUNK_SIZE]
+            params = []
+            for row in chunk:
+                params.extend([row['symbol'], row['timestamp_iso'], *(row[key] for key in INDICATOR_COLUMNS.values())])
+            cursor.execute(indicator_upsert_sql(len(chunk)), params)
+        return len(rows)
+
+    def recompute_symbol_history(self, symbol: str, start: datetime, end: datetime,
+                                 chunk_rows: int = RECOMPUTE_CHUNK_ROWS,
+                                 warmup_rows: int = RECOMPUTE_WARMUP_ROWS) -> Dict[str, int]:
+        """
+        Recompute indicators for every price of ``symbol`` in [start, end)
+
+        Prices are streamed in chunks of ``chunk_rows``; the last ``warmup_rows``
+        prices before each chunk are replayed ahead of it so rolling and
+        exponential indicators match a pass over the full history. Only rows
+        missing from technical_indicators or holding different values are
+        written. A checkpoint after each chunk lets a rerun over the same
+        ``start`` and ``end`` continue where the previous run stopped.
+        """
+        totals = {'prices_read': 0, 'rows_written': 0, 'rows_current': 0, 'chunks': 0}
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            self._ensure_checkpoint_table(cursor)
+            resume_after = self._load_checkpoint(cursor, symbol, start, end)
+            if resume_after is not None:
+                logger.info(f"Resuming {symbol} recompute after {resume_after}")
+
+            cursor.execute("""
+                SELECT timestamp_iso, current_price
+                FROM price_data_real
+                WHERE symbol = %s AND timestamp_iso < %s AND current_price IS NOT NULL
+                ORDER BY timestamp_iso DESC
+                LIMIT %s
+            """, (symbol, resume_after or start, warmup_rows))
+            warmup = cursor.fetchall()[::-1]
+
+            while True:
+                if resume_after is None:
+                    lower, bound = "timestamp_iso >= %s", start
+                else:
+                    lower, bound = "timestamp_iso > %s", resume_after
+                cursor.execute(f"""
+                    SELECT timestamp_iso, current_price
+                    FROM price_data_real
+                    WHERE symbol = %s AND {lower} AND timestamp_iso < %s AND current_price IS NOT NULL
+                    ORDER BY timestamp_iso ASC
+                    LIMIT %s
+                """, (symbol, bound, end, chunk_rows))
+                prices = cursor.fetchall()
+                if not prices:
+                    break
+
+                series = warmup + prices
+                rows = technical_indicator_rows(
+                    symbol, [p[0] for p in series], [float(p[1]) for p in series], self.indicator_engine
+                )
+                # Keep only the chunk's own rows; the warm-up rows belong to earlier chunks
+                rows = rows[max(0, len(rows) - len(prices)):]
+
+                stored = self._load_stored_indicators(cursor, symbol, prices[0][0], prices[-1][0])
+                changed = [row for row in rows if not indicator_row_is_current(row, stored.get(row['timestamp_iso']))]
+                self._upsert_indicator_rows(cursor, changed)
+
+                resume_after = prices[-1][0]
+                self._save_checkpoint(cursor, symbol, start, end, resume_after)
+                conn.commit()
+
+                totals['prices_read'] += len(prices)
+                totals['rows_written'] += len(changed)
+                totals['rows_current'] += len(rows) - len(changed)
+                totals['chunks'] += 1
+                warmup = series[-warmup_rows:] if warmup_rows else []
+                if len(prices) < chunk_rows:
+                    break
+        finally:
+            cursor.close()
+            conn.close()
+        return totals
+
+    def recompute_history(self, start: datetime, end: Optional[datetime] = None,
+                          symbols: Optional[List[str]] = None,
+                          workers: int = RECOMPUTE_WORKERS) -> Dict:
+        """
+        Recompute indicators for every stored price in [start, end), symbols in parallel
+
+        A bounded batch job: each symbol's price history is read once, in chunks,
+        and only missing or stale indicator rows are written. ``end`` defaults to
+        the next hour boundary, so reruns within the hour share checkpoints.
+        """
+        start_time = time.time()
+        end = end or datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        symbols = symbols or self.symbols
+        logger.info(f"🔁 Recomputing technical indicators for {len(symbols)} symbols from {start} to {end}")
+
+        result = {
+            'status': 'success',
+            'symbols': len(symbols),
+            'prices_read': 0,
+            'rows_written': 0,
+            'rows_current': 0,
+            'errors': 0
+        }
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {
+                executor.submit(self.recompute_symbol_history, symbol, start, end): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    totals = future.result()
+                except Exception as e:
+                    result['errors'] += 1
+                    logger.error(f"❌ Recompute failed for {symbol}: {e}")
+                    continue
+                for key in ('prices_read', 'rows_written', 'rows_current'):
+                    result[key] += totals[key]
+
+        if result['errors']:
+            result['status'] = 'partial' if result['errors'] < len(symbols) else 'failed'
+        result['duration_seconds'] = round(time.time() - start_time, 2)
+
+        self.stats['history_rows_written'] += result['rows_written']
+        self.stats['database_writes'] += result['rows_written']
+        self.stats['last_recompute'] = datetime.now().isoformat()
+        logger.info(
+            f"✅ Recompute completed: {result['prices_read']} prices, {result['rows_written']} rows written, "
+            f"{result['rows_current']} already current, {result['errors']} errors, {result['duration_seconds']}s"
+        )
+        return result
+
     def run_collection_cycle(self) -> Dict:
         """Run a complete technical indicators collection cycle"""
         start_time = time.time()
@@ -445,10 +625,27 @@ class TechnicalIndicatorsCollector:
             logger.error(f"Error detecting gap: {e}")
             return None
 
-    def calculate_health_score(self) -> int:
+    def _probe_gap_hours(self) -> float:
+        """Health sampler probe: a failed gap query marks the sample unhealthy"""
+        gap_hours = self.detect_gap()
+        if gap_hours is None:
+            raise RuntimeError("gap detection failed")
+        return gap_hours
+
+    def cached_gap_hours(self, snapshot=None) -> Optional[float]:
+        """Gap from the latest health sample, advanced by the sample's age"""
+        snapshot = snapshot or self.health_sampler.snapshot()
+        gap_hours = snapshot.value('gap_hours')
+        if gap_hours is None:
+            return None
+        return gap_hours + snapshot.age_seconds() / 3600
+
+    def calculate_health_score(self, gap_hours: Optional[float] = None) -> int:
         """Calculate health score based on data freshness and collection success"""
         try:
-            gap_hours = self.detect_gap() or 0
+            if gap_hours is None:
+                gap_hours = self.cached_gap_hours()
+            gap_hours = gap_hours or 0
             
             # Base score from data freshness
             if gap_hours < 1:
@@ -483,11 +680,14 @@ class TechnicalIndicatorsCollector:
         
         @self.app.get("/health")
         def health():
-            """Health check with scoring"""
-            gap_hours = self.detect_gap()
-            health_score = self.calculate_health_score()
+            """Health check with scoring (served from the background health sample)"""
+            snapshot = self.health_sampler.snapshot()
+            gap_hours = self.cached_gap_hours(snapshot)
+            health_score = self.calculate_health_score(gap_hours)
             
             status = "healthy" if health_score >= 80 else "degraded" if health_score >= 50 else "unhealthy"
+            if snapshot.is_stale() and status == "healthy":
+                status = "degraded"
             
             return {
                 "status": status,
@@ -497,14 +697,16 @@ class TechnicalIndicatorsCollector:
                 "gap_hours": gap_hours,
                 "data_freshness": "healthy" if (gap_hours or 0) < 6 else "stale",
                 "symbols_tracked": len(self.symbols),
-                "ml_indicators": 12
+                "ml_indicators": 12,
+                "health_sample": snapshot.to_dict()
             }
         
         @self.app.get("/status")
         def status():
             """Detailed service status"""
-            gap_hours = self.detect_gap()
-            health_score = self.calculate_health_score()
+            snapshot = self.health_sampler.snapshot()
+            gap_hours = self.cached_gap_hours(snapshot)
+            health_score = self.calculate_health_score(gap_hours)
             
             return {
                 "service": self.service_name,
@@ -519,7 +721,8 @@ class TechnicalIndicatorsCollector:
                 "health_metrics": {
                     "gap_hours": gap_hours,
                     "health_score": health_score,
-                    "data_freshness": "healthy" if (gap_hours or 0) < 6 else "stale"
+                    "data_freshness": "healthy" if (gap_hours or 0) < 6 else "stale",
+                    "health_sample": snapshot.to_dict()
                 },
                 "data_sources": {
                     "price_data_real": "active"
@@ -563,15 +766,18 @@ class TechnicalIndicatorsCollector:
             background_tasks.add_task(self._intensive_backfill, hours)
             return {
                 "status": "started",
-                "message": f"Intensive technical indicators backfill for {hours} hours",
+                "message": f"Technical indicators recompute for the last {hours} hours",
                 "timestamp": datetime.now().isoformat()
             }
         
         @self.app.get("/metrics")
         def metrics():
             """Prometheus metrics endpoint"""
-            gap_hours = self.detect_gap() or 0
-            health_score = self.calculate_health_score()
+            snapshot = self.health_sampler.snapshot()
+            gap_hours = self.cached_gap_hours(snapshot)
+            health_score = self.calculate_health_score(gap_hours)
+            gap_hours = gap_hours or 0
+            sample_age = snapshot.age_seconds()
             
             metrics_text = f"""# HELP technical_indicators_collector_health_score Health score (0-100)
 # TYPE technical_indicators_collector_health_score gauge
@@ -581,6 +787,10 @@ technical_indicators_collector_health_score {health_score}
 # TYPE technical_indicators_collector_gap_hours gauge
 technical_indicators_collector_gap_hours {gap_hours}
 
+# HELP technical_indicators_collector_health_sample_age_seconds Age of the sampled gap measurement (-1 before the first sample)
+# TYPE technical_indicators_collector_health_sample_age_seconds gauge
+technical_indicators_collector_health_sample_age_seconds {sample_age if sample_age is not None else -1}
+
 # HELP technical_indicators_collector_symbols_tracked Number of symbols being tracked
 # TYPE technical_indicators_collector_symbols_tracked gauge
 technical_indicators_collector_symbols_tracked {len(self.symbols)}
@@ -633,14 +843,12 @@ technical_indicators_collector_running 1
             }
 
     def _intensive_backfill(self, hours: int):
-        """Run intensive backfill for specified hours"""
+        """Recompute indicators for every price in the last ``hours`` hours"""
         logger.info(f"Starting intensive backfill for {hours} hours")
-        
-        # Run multiple collection cycles
-        for i in range(min(hours // 2, 12)):  # Max 12 cycles
-            result = self.run_collection_cycle()
-            logger.info(f"Backfill cycle {i+1} completed: {result}")
-            time.sleep(10)  # 10 second delay between cycles
+        # Hour-aligned start so a retried backfill matches the checkpoints it left
+        start = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+        result = self.recompute_history(start)
+        logger.info(f"Backfill completed: {result}")
 
     def _setup_scheduler(self):
         """Setup background collection scheduler (matches current system)"""
@@ -659,6 +867,22 @@ technical_indicators_collector_running 1
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Technical indicators collector")
+    parser.add_argument("--recompute-days", type=int,
+                        help="Recompute indicators for the last N days, then exit")
+    parser.add_argument("--symbols", help="Comma-separated symbols for --recompute-days (default: all)")
+    parser.add_argument("--workers", type=int, default=RECOMPUTE_WORKERS, help="Symbols recomputed in parallel")
+    args = parser.parse_args()
+
+    if args.recompute_days:
+        # Bounded batch job; a rerun on the same day resumes from the per-symbol checkpoints
+        collector = TechnicalIndicatorsCollector(start_scheduler=False)
+        start = datetime.combine(date.today() - timedelta(days=args.recompute_days), datetime.min.time())
+        end = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] if args.symbols else None
+        result = collector.recompute_history(start, end, symbols=symbols, workers=args.workers)
+        sys.exit(0 if result['status'] == 'success' else 1)
+
     # Initialize collector
     collector = TechnicalIndicatorsCollector()
     
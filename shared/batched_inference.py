@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Batched Model Inference
+Micro-batching front end for HuggingFace-style pipelines.
+
+Callers await ``MicroBatcher.infer(model_key, text)`` one text at a time; the
+batcher queues texts per model and flushes a queue when it reaches
+``max_batch_size`` or when its oldest text has waited ``max_latency`` seconds.
+
+Each flush:
+    - drops texts already answered by the content-hash result cache
+    - merges identical texts queued concurrently into one inference
+    - sorts texts by length and splits them into batches, so texts of similar
+      length share a batch and little compute is spent on padding
+    - runs each batch on a dedicated worker thread, keeping the event loop free
+
+The worker is a thread, not a process, because pipelines hold large models
+that cannot be pickled cheaply, and torch releases the GIL during inference.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+# infer_batch(model_key, texts) -> one result per text, in order
+BatchInferenceFn = Callable[[str, List[str]], Sequence[Any]]
+
+
+def content_hash(model_key: str, text: str) -> str:
+    """Cache key for a model's result on a text"""
+    return hashlib.sha256(f"{model_key}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class InferenceResultCache:
+    """Bounded LRU of inference results keyed by content hash"""
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._results: "OrderedDict[str, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._results
+
+    def get(self, digest: str) -> Any:
+        result = self._results[digest]
+        self._results.move_to_end(digest)
+        return result
+
+    def put(self, digest: str, result: Any):
+        if self.max_size <= 0:
+            return
+        self._results[digest] = result
+        self._results.move_to_end(digest)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+
+class MicroBatcher:
+    """
+    Collects single-text inference requests into padding-aware batches
+
+    Args:
+        infer_batch: Blocking function running one batch for a model key
+        max_batch_size: Texts per model call; a queue this long flushes at once
+        max_latency: Seconds a queued text waits for its batch to fill
+        cache_size: Results kept in the content-hash cache (0 disables it)
+    """
+
+    def __init__(self, infer_batch: BatchInferenceFn, max_batch_size: int = 16,
+                 max_latency: float = 0.05, cache_size: int = 4096):
+        self.infer_batch = infer_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency
+        self.cache = InferenceResultCache(cache_size)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._queues: Dict[str, Dict[str, str]] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "texts_inferred": 0,
+            "batches": 0,
+            "errors": 0,
+        }
+
+    async def infer(self, model_key: str, text: str) -> Any:
+        """Result of ``model_key`` on ``text``, batched with concurrent requests"""
+        self.stats["requests"] += 1
+        digest = content_hash(model_key, text)
+        if digest in self.cache:
+            self.stats["cache_hits"] += 1
+            return self.cache.get(digest)
+
+        future = self._futures.get(digest)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[digest] = future
+            queue = self._queues.setdefault(model_key, {})
+            queue[digest] = text
+
+            if len(queue) >= self.max_batch_size:
+                # Flush on the next loop iteration so texts submitted in the
+                # same gather() land in the same, length-sorted flush
+                loop.call_soon(self._start_flush, model_key)
+            elif model_key not in self._timers:
+                self._timers[model_key] = loop.call_later(self.max_latency, self._start_flush, model_key)
+
+        # Shield so one cancelled caller does not cancel a shared result
+        return await asyncio.shield(future)
+
+    async def infer_many(self, model_key: str, texts: Sequence[str]) -> List[Any]:
+        return list(await asyncio.gather(*(self.infer(model_key, text) for text in texts)))
+
+    def _start_flush(self, model_key: str):
+        timer = self._timers.pop(model_key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._queues.pop(model_key, None)
+        if not queue:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batches(model_key, queue))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _run_batches(self, model_key: str, queue: Dict[str, str]):
+        loop = asyncio.get_running_loop()
+        items = sorted(queue.items(), key=lambda item: len(item[1]))
+
+        for offset in range(0, len(items), self.max_batch_size):
+            chunk = items[offset:offset + self.max_batch_size]
+            texts = [text for _, text in chunk]
+            try:
+                results = await loop.run_in_executor(self._executor, self.infer_batch, model_key, texts)
+                results = list(results)
+                if len(results) != len(texts):
+                    raise ValueError(f"{model_key} returned {len(results)} results for {len(texts)} texts")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Inference batch failed for {model_key} ({len(texts)} texts): {e}")
+                for digest, _ in chunk:
+                    future = self._futures.pop(digest)
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["texts_inferred"] += len(texts)
+            for (digest, _), result in zip(chunk, results):
+                self.cache.put(digest, result)
+                future = self._futures.pop(digest)
+                if not future.done():
+                    future.set_result(result)
+
+    async def drain(self):
+        """Flush every queue now and wait for in-flight batches"""
+        for model_key in list(self._queues):
+            self._start_flush(model_key)
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["cache_size"] = len(self.cache)
+        stats["avg_batch_size"] = round(stats["texts_inferred"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -11,6 +11,7 @@ import mysql.connector
 from typing import Dict, Optional, Any
 import logging
 import socket
+import threading
 
 # Try to import redis, make it optional
 try:
@@ -63,6 +64,9 @@ class DatabaseConfig:
         self.environment = detect_environment()
         self.mysql_config = self._load_mysql_config()
         self.redis_config = self._load_redis_config()
+        # One pooled Redis client per config, created (and pinged) on first use
+        self._redis_client = None
+        self._redis_lock = threading.Lock()
         
         logger.info(f"🌍 Environment detected: {self.environment}")
         logger.info(f"🔧 MySQL config: {self.mysql_config['host']}:{self.mysql_config['port']}/{self.mysql_config['database']}")
@@ -184,16 +188,23 @@ class DatabaseConfig:
             raise
     
     def get_redis_connection(self) -> 'redis.Redis':
-        """Get a Redis connection"""
+        """Get the shared Redis client (pooled; only pinged when first created)"""
         if not REDIS_AVAILABLE:
             raise ImportError("Redis package not installed. Install with: pip install redis")
+        
+        client = self._redis_client
+        if client is not None:
+            return client
             
         try:
-            client = redis.Redis(**self.redis_config)
-            # Test the connection
-            client.ping()
-            logger.debug("✅ Redis connection established")
-            return client
+            with self._redis_lock:
+                if self._redis_client is None:
+                    client = redis.Redis(**self.redis_config)
+                    # Test the connection once; later calls reuse the client's connection pool
+                    client.ping()
+                    self._redis_client = client
+                    logger.debug("✅ Redis connection established")
+                return self._redis_client
         except redis.ConnectionError as e:
             logger.error(f"❌ Redis connection failed: {e}")
             logger.error(f"   Config: {self.redis_config['host']}:{self.redis_config['port']}")
@@ -237,7 +248,6 @@ class DatabaseConfig:
         try:
             client = self.get_redis_connection()
             response = client.ping()
-            client.close()
             
             if response:
                 logger.info("✅ Redis connectivity test passed")
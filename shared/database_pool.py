@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Centralized Database Connection Pool
+Bounded, self-validating MySQL connection pool with an asyncio facade.
+
+Connections are created lazily up to ``pool_size``; checkout blocks for at most
+``checkout_timeout`` seconds, idle connections are pinged before reuse, and
+connections older than ``max_lifetime`` are recycled. ``AsyncDatabasePool``
+runs all blocking driver calls on a dedicated thread pool so collectors never
+stall the event loop while talking to MySQL.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import mysql.connector
+from mysql.connector import errors as mysql_errors
+
+logger = logging.getLogger(__name__)
+
+# Keys understood by shared.database_config but meaningless (or harmful) when
+# passed to mysql.connector.connect() for a single connection: a pool_name
+# would make the driver build its own hidden pool.
+_DRIVER_POOL_KEYS = ("pool_name", "pool_size", "pool_reset_session")
+
+
+class PoolTimeoutError(mysql_errors.PoolError):
+    """Raised when no connection could be checked out within the timeout"""
+
+
+@dataclass
+class _PoolEntry:
+    """A pooled connection and its bookkeeping timestamps"""
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class DatabaseConnectionPool:
+    """
+    Thread-safe bounded MySQL connection pool
+
+    Args:
+        connection_kwargs: Keyword arguments for ``mysql.connector.connect``
+        pool_size: Maximum number of open connections
+        checkout_timeout: Seconds to wait for a free connection before failing
+        max_lifetime: Seconds after which a connection is closed and replaced
+        validation_interval: Idle seconds after which a connection is pinged
+            before being handed out again
+        session_init: SQL statements executed once on every new connection
+        connection_factory: Callable returning a new connection; defaults to
+            ``mysql.connector.connect(**connection_kwargs)``
+        name: Pool name used in logs and statistics
+    """
+
+    def __init__(
+        self,
+        connection_kwargs: Optional[Dict[str, Any]] = None,
+        pool_size: int = 10,
+        checkout_timeout: float = 30.0,
+        max_lifetime: float = 3600.0,
+        validation_interval: float = 30.0,
+        session_init: Optional[Sequence[str]] = None,
+        connection_factory: Optional[Callable[[], Any]] = None,
+        name: str = "crypto_data_pool",
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.name = name
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.validation_interval = validation_interval
+        self.session_init = list(session_init or [])
+
+        kwargs = {k: v for k, v in (connection_kwargs or {}).items() if k not in _DRIVER_POOL_KEYS}
+        self._connection_kwargs = kwargs
+        self._connection_factory = connection_factory or partial(mysql.connector.connect, **kwargs)
+
+        self._idle: deque = deque()
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "recycled": 0,
+            "invalidated": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    def _new_entry(self) -> _PoolEntry:
+        connection = self._connection_factory()
+        for statement in self.session_init:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                # Session tuning is best effort (e.g. max_execution_time is MySQL-only)
+                logger.debug(f"Session init statement failed on {self.name}: {statement} ({e})")
+            finally:
+                cursor.close()
+        with self._cond:
+            self._stats["created"] += 1
+        return _PoolEntry(connection)
+
+    @staticmethod
+    def _close_quietly(connection: Any):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, entry: _PoolEntry, now: float) -> bool:
+        return self.max_lifetime > 0 and now - entry.created_at >= self.max_lifetime
+
+    def _is_healthy(self, entry: _PoolEntry, now: float) -> bool:
+        if now - entry.last_used < self.validation_interval:
+            return True
+        try:
+            return bool(entry.connection.is_connected())
+        except Exception:
+            return False
+
+    def _discard(self, entry: _PoolEntry):
+        self._close_quietly(entry.connection)
+        with self._cond:
+            self._open_count -= 1
+            self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Checkout / checkin
+    # ------------------------------------------------------------------
+
+    def _acquire(self, timeout: Optional[float] = None) -> _PoolEntry:
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise mysql_errors.PoolError(f"Connection pool {self.name} is closed")
+                    if self._idle:
+                        entry = self._idle.pop()  # LIFO keeps the warmest connections busy
+                        break
+                    if self._open_count < self.pool_size:
+                        self._open_count += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a connection from {self.name} "
+                            f"(pool_size={self.pool_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    entry = self._new_entry()
+                except Exception:
+                    with self._cond:
+                        self._open_count -= 1
+                        self._cond.notify()
+                    raise
+                break
+
+            now = time.monotonic()
+            if self._is_expired(entry, now):
+                with self._cond:
+                    self._stats["recycled"] += 1
+                self._discard(entry)
+                continue
+            if not self._is_healthy(entry, now):
+                with self._cond:
+                    self._stats["invalidated"] += 1
+                self._discard(entry)
+                continue
+            break
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += time.monotonic() - started
+        return entry
+
+    def _release(self, entry: _PoolEntry, discard: bool = False):
+        now = time.monotonic()
+        if discard or self._closed or self._is_expired(entry, now):
+            if not discard and not self._closed:
+                with self._cond:
+                    self._stats["recycled"] += 1
+            self._discard(entry)
+            return
+
+        try:
+            # Never hand out a connection with someone else's open transaction
+            if getattr(entry.connection, "in_transaction", False):
+                entry.connection.rollback()
+        except Exception:
+            self._discard(entry)
+            return
+
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def get_connection_context(self, timeout: Optional[float] = None):
+        """
+        Context manager yielding a pooled connection
+
+        The connection is rolled back on error and returned to the pool on
+        exit; connections that fail to roll back are discarded.
+
+        Usage:
+            with pool.get_connection_context() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+        """
+        entry = self._acquire(timeout)
+        discard = False
+        try:
+            yield entry.connection
+        except Exception:
+            try:
+                entry.connection.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self._release(entry, discard=discard)
+
+    # ------------------------------------------------------------------
+    # Convenience query helpers (blocking)
+    # ------------------------------------------------------------------
+
+    def execute_query(self, query: str, params: Optional[Sequence] = None,
+                      fetch_results: bool = True, dictionary: bool = False) -> Optional[List]:
+        """Execute a single statement and commit; return rows if requested"""
+        with self.get_connection_context() as conn:
+            cursor = conn.cursor(dictionary=dictionary)
+            try:
+                cursor.execute(query, params)
+                results = cursor.fetchall() if fetch_results else None
+                conn.commit()
+                return results
+            finally:
+                cursor.close()
+
+    def execute_batch(self, query: str, batch_data: Iterable[Sequence]) -> int:
+        """Execute a statement for each parameter set in one transaction"""
+        batch_data = list(batch_data)
+        if not batch_data:
+            return 0
+        with self.get_connection_context() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(query, batch_data)
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def health_check(self) -> bool:
+        """Check out a connection and run ``SELECT 1``"""
+        try:
+            result = self.execute_query("SELECT 1")
+            return bool(result) and result[0][0] == 1
+        except Exception as e:
+            logger.error(f"❌ Pool health check failed for {self.name}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Introspection / shutdown
+    # ------------------------------------------------------------------
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "pool_name": self.name,
+                "pool_size": self.pool_size,
+                "open_connections": self._open_count,
+                "idle_connections": len(self._idle),
+                "in_use_connections": self._open_count - len(self._idle),
+                "closed": self._closed,
+            })
+        stats["host"] = self._connection_kwargs.get("host")
+        stats["database"] = self._connection_kwargs.get("database")
+        return stats
+
+    def close(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open_count -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.connection)
+
+
+class AsyncDatabasePool:
+    """
+    Asyncio facade over a ``DatabaseConnectionPool``
+
+    Every call is executed on a dedicated thread pool sized to the connection
+    pool, so blocking driver I/O never runs on the event loop thread.
+    ``query_timeout`` bounds how long a coroutine waits for its result; the
+    worker thread still finishes and returns its connection to the pool.
+    ``on_complete(seconds, success)`` is called after every call, e.g. to feed
+    latency telemetry.
+    """
+
+    def __init__(self, pool: DatabaseConnectionPool, max_workers: Optional[int] = None,
+                 query_timeout: Optional[float] = None,
+                 on_complete: Optional[Callable[[float, bool], None]] = None):
+        self.pool = pool
+        self.query_timeout = query_timeout
+        self.on_complete = on_complete
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or pool.pool_size,
+            thread_name_prefix=f"{pool.name}-db",
+        )
+
+    async def _submit(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        success = False
+        try:
+            future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+            if self.query_timeout:
+                result = await asyncio.wait_for(future, timeout=self.query_timeout)
+            else:
+                result = await future
+            success = True
+            return result
+        finally:
+            if self.on_complete is not None:
+                self.on_complete(time.perf_counter() - started, success)
+
+    def _with_connection(self, func: Callable, *args, **kwargs):
+        with self.pool.get_connection_context() as conn:
+            return func(conn, *args, **kwargs)
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run ``func(connection, *args, **kwargs)`` on a pooled connection off-loop"""
+        return await self._submit(self._with_connection, func, *args, **kwargs)
+
+    async def fetchall(self, query: str, params: Optional[Sequence] = None,
+                       dictionary: bool = False) -> List:
+        """Run a query and return all rows"""
+        return await self._submit(self.pool.execute_query, query, params, True, dictionary)
+
+    async def fetchone(self, query: str, params: Optional[Sequence] = None,
+                       dictionary: bool = False) -> Optional[Any]:
+        """Run a query and return the first row, if any"""
+        rows = await self.fetchall(query, params, dictionary)
+        return rows[0] if rows else None
+
+    async def execute(self, query: str, params: Optional[Sequence] = None) -> None:
+        """Run a statement and commit"""
+        await self._submit(self.pool.execute_query, query, params, False)
+
+    async def executemany(self, query: str, batch_data: Iterable[Sequence]) -> int:
+        """Run a statement for each parameter set in one transaction"""
+        return await self._submit(self.pool.execute_batch, query, list(batch_data))
+
+    async def health_check(self) -> bool:
+        """Non-blocking ``SELECT 1`` through the pool"""
+        try:
+            return await self._submit(self.pool.health_check)
+        except Exception as e:
+            logger.error(f"❌ Async pool health check failed for {self.pool.name}: {e}")
+            return False
+
+    def close(self, wait: bool = False):
+        """Shut down the worker threads and the underlying pool"""
+        self._executor.shutdown(wait=wait)
+        self.pool.close()
+
+
+# ==============================================================================
+# PROCESS-WIDE DEFAULT POOL
+# ==============================================================================
+
+_default_pool: Optional[DatabaseConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_database_pool() -> DatabaseConnectionPool:
+    """Get the process-wide pool built from the centralized database config"""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                from shared.database_config import get_db_config
+                _default_pool = DatabaseConnectionPool(
+                    connection_kwargs=get_db_config(),
+                    pool_size=int(os.getenv('DB_POOL_SIZE', '10')),
+                    checkout_timeout=float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30')),
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+                    validation_interval=float(os.getenv('DB_POOL_VALIDATION_INTERVAL', '30')),
+                )
+                logger.info(f"✅ Database connection pool created: {_default_pool.name} "
+                            f"(size: {_default_pool.pool_size})")
+    return _default_pool
+
+
+# Convenience functions for common operations
+def get_connection_context(timeout: Optional[float] = None):
+    """Get a connection context manager from the global pool"""
+    return get_database_pool().get_connection_context(timeout)
+
+
+def execute_query(query: str, params: Optional[Sequence] = None, fetch_results: bool = True):
+    """Execute a query using the global pool"""
+    return get_database_pool().execute_query(query, params, fetch_results=fetch_results)
+
+
+def execute_batch(query: str, batch_data: Iterable[Sequence]) -> int:
+    """Execute a batch operation using the global pool"""
+    return get_database_pool().execute_batch(query, batch_data)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get statistics from the global pool"""
+    return get_database_pool().get_pool_stats()
+
+
+def health_check() -> bool:
+    """Perform a health check on the global pool"""
+    return get_database_pool().health_check()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Bounded Duplicate Index
+Constant-time "seen this record recently?" checks for collector dedup.
+
+Records are reduced to a stable 64-bit fingerprint: a blake2b digest of the
+record's key fields, or of all top-level fields in key order when no key
+fields are configured. Fingerprints live in an insertion-ordered map, so a
+lookup is O(1) and eviction removes the oldest entries first. Entries are
+evicted once the index holds more than ``max_entries`` or, with
+``ttl_seconds`` set, once they are older than the TTL.
+
+``save``/``load`` persist the index as a JSON snapshot (fingerprints plus
+their ages) so a restarted collector still recognizes the records it saw
+just before shutting down.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class RecordFingerprinter:
+    """
+    Stable 64-bit fingerprint of a record
+
+    Args:
+        key_fields: Fields that identify a record (e.g. ``("symbol", "timestamp")``).
+            Only these are hashed; None hashes every top-level field.
+    """
+
+    def __init__(self, key_fields: Optional[Sequence[str]] = None):
+        self.key_fields = tuple(key_fields) if key_fields else None
+
+    def __call__(self, record: Dict[str, Any]) -> int:
+        if self.key_fields:
+            key = tuple(record.get(name) for name in self.key_fields)
+        else:
+            # Keys are unique, so sorting never compares the values
+            key = tuple(sorted(record.items()))
+        # repr() of str/number/datetime tuples is stable across processes, unlike hash()
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+
+class DedupIndex:
+    """
+    Hash-set index of recently seen records with FIFO and optional TTL eviction
+
+    Args:
+        max_entries: Most fingerprints kept; the oldest are evicted beyond this
+        ttl_seconds: Fingerprints older than this are evicted (None: size bound only)
+        fingerprint: Record -> fingerprint function (default: all fields)
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        fingerprint: Optional[Callable[[Dict[str, Any]], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.fingerprint = fingerprint or RecordFingerprinter()
+        self.clock = clock
+        # fingerprint -> time first seen, oldest first
+        self._entries: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float):
+        if self.ttl_seconds is None:
+            return
+        cutoff = now - self.ttl_seconds
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest > cutoff:
+                break
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def seen_fingerprint(self, fingerprint: int) -> bool:
+        """Record ``fingerprint``; True if it was already in the index"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if fingerprint in self._entries:
+                self.stats["hits"] += 1
+                return True
+            self._entries[fingerprint] = now
+            self.stats["misses"] += 1
+            self._trim()
+            return False
+
+    def check_and_add(self, record: Dict[str, Any]) -> bool:
+        """Add ``record`` to the index; True if it is a duplicate of a recent record"""
+        return self.seen_fingerprint(self.fingerprint(record))
+
+    def contains(self, record: Dict[str, Any]) -> bool:
+        """Membership test that neither adds the record nor counts a hit/miss"""
+        fingerprint = self.fingerprint(record)
+        with self._lock:
+            self._expire(self.clock())
+            return fingerprint in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, path: str) -> bool:
+        """Write a snapshot atomically; False (logged) if it could not be written"""
+        with self._lock:
+            now = self.clock()
+            entries = [[fp, round(now - seen, 3)] for fp, seen in self._entries.items()]
+        snapshot = {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "entries": entries}
+        tmp_path = f"{path}.tmp"
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save dedup snapshot to {path}: {e}")
+            return False
+
+    def load(self, path: str) -> int:
+        """
+        Warm-start from a snapshot written by ``save``; returns entries restored
+
+        Ages include the time the collector was down, so a TTL keeps applying
+        across restarts. A missing or unreadable snapshot restores nothing.
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable dedup snapshot {path}: {e}")
+            return 0
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"Ignoring dedup snapshot {path} with version {snapshot.get('version')}")
+            return 0
+
+        downtime = max(0.0, time.time() - snapshot.get("saved_at", time.time()))
+        with self._lock:
+            now = self.clock()
+            before = len(self._entries)
+            for fingerprint, age in snapshot.get("entries", []):
+                if fingerprint not in self._entries:
+                    self._entries[fingerprint] = now - age - downtime
+            # Snapshot entries are older than anything seen since startup
+            for fingerprint in list(self._entries)[before:][::-1]:
+                self._entries.move_to_end(fingerprint, last=False)
+            self._expire(now)
+            self._trim()
+            restored = len(self._entries) - before
+        return max(restored, 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
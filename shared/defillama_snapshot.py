@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+DeFiLlama Snapshot Cache
+Chain TVL and active-protocol counts for every symbol from one download.
+
+``/v2/chains`` and the multi-megabyte ``/protocols`` document are fetched at
+most once per refresh window and reduced to two in-memory indexes:
+
+    chain -> current TVL
+    chain -> number of protocols on that chain with TVL above a threshold
+
+Historical backfills use ``/v2/historicalChainTvl/{chain}``, fetched once per
+chain per refresh window and indexed by UTC day.
+
+Concurrent callers share a single in-flight download.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFILLAMA_BASE_URL = "https://api.llama.fi"
+
+
+@dataclass(frozen=True)
+class DefiLlamaSnapshot:
+    """Indexes built from one /v2/chains + /protocols download"""
+    fetched_at: float
+    chain_tvl: Dict[str, float] = field(default_factory=dict)
+    protocol_counts: Dict[str, int] = field(default_factory=dict)
+
+    def tvl(self, chain: str) -> Optional[float]:
+        return self.chain_tvl.get(chain.lower())
+
+    def active_protocols(self, chain: str) -> int:
+        return self.protocol_counts.get(chain.lower(), 0)
+
+
+def build_chain_tvl_index(chains: List[Dict[str, Any]]) -> Dict[str, float]:
+    return {
+        str(chain["name"]).lower(): float(chain.get("tvl") or 0)
+        for chain in chains or []
+        if chain.get("name")
+    }
+
+
+def build_protocol_count_index(protocols: List[Dict[str, Any]], min_tvl: float) -> Dict[str, int]:
+    """One pass over all protocols, counting those above ``min_tvl`` per chain"""
+    counts: Counter = Counter()
+    for protocol in protocols or []:
+        tvl = protocol.get("tvl")
+        if not tvl or tvl <= min_tvl:
+            continue
+        for chain in {str(c).lower() for c in protocol.get("chains") or []}:
+            counts[chain] += 1
+    return dict(counts)
+
+
+def build_daily_tvl_index(history: List[Dict[str, Any]]) -> Dict[date, float]:
+    """historicalChainTvl points ({date: epoch seconds, tvl}) keyed by UTC day"""
+    series = {}
+    for point in history or []:
+        try:
+            day = datetime.fromtimestamp(int(point["date"]), tz=timezone.utc).date()
+        except (KeyError, TypeError, ValueError):
+            continue
+        series[day] = float(point.get("tvl") or 0)
+    return series
+
+
+class DefiLlamaSnapshotCache:
+    """
+    Refresh-windowed cache of DeFiLlama chain data
+
+    Args:
+        refresh_seconds: Age after which a snapshot or history is refetched
+        min_protocol_tvl: Protocols at or below this TVL are not counted
+        before_request: Awaited before every download (e.g. a rate limiter)
+    """
+
+    def __init__(self, refresh_seconds: float = 3600, min_protocol_tvl: float = 100_000,
+                 before_request: Optional[Callable[[], Awaitable[Any]]] = None,
+                 base_url: str = DEFILLAMA_BASE_URL, clock: Callable[[], float] = time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self.min_protocol_tvl = min_protocol_tvl
+        self.before_request = before_request
+        self.base_url = base_url.rstrip("/")
+        self._clock = clock
+        self._snapshot: Optional[DefiLlamaSnapshot] = None
+        self._histories: Dict[str, Tuple[float, Dict[date, float]]] = {}
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.stats = {"downloads": 0, "download_errors": 0, "snapshot_hits": 0, "history_hits": 0}
+
+    def _fresh(self, fetched_at: float) -> bool:
+        return self._clock() - fetched_at < self.refresh_seconds
+
+    async def _get_json(self, client, path: str) -> Any:
+        if self.before_request is not None:
+            await self.before_request()
+        self.stats["downloads"] += 1
+        async with client.get(f"{self.base_url}{path}") as response:
+            if response.status != 200:
+                raise RuntimeError(f"DeFiLlama {path} returned {response.status}")
+            return await response.json(content_type=None)
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``load`` once for concurrent callers on the same event loop"""
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        future = self._inflight.get(inflight_key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            result = await load()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Consume it here so a future nobody else awaited does not warn
+            future.exception()
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def get_snapshot(self, client) -> Optional[DefiLlamaSnapshot]:
+        """Current snapshot, downloading it if stale; None if it cannot be fetched"""
+        if self._snapshot is not None and self._fresh(self._snapshot.fetched_at):
+            self.stats["snapshot_hits"] += 1
+            return self._snapshot
+
+        async def load():
+            chains, protocols = await asyncio.gather(
+                self._get_json(client, "/v2/chains"),
+                self._get_json(client, "/protocols"),
+            )
+            snapshot = DefiLlamaSnapshot(
+                fetched_at=self._clock(),
+                chain_tvl=build_chain_tvl_index(chains),
+                protocol_counts=build_protocol_count_index(protocols, self.min_protocol_tvl),
+            )
+            logger.info(
+                f"✅ DeFiLlama snapshot: {len(snapshot.chain_tvl)} chains, "
+                f"{sum(snapshot.protocol_counts.values())} active protocol listings"
+            )
+            return snapshot
+
+        try:
+            self._snapshot = await self._single_flight("snapshot", load)
+        except Exception as e:
+            self.stats["download_errors"] += 1
+            logger.warning(f"DeFiLlama snapshot refresh failed: {e}")
+            # A stale snapshot beats none at all
+        return self._snapshot
+
+    async def get_chain_history(self, client, chain: str) -> Dict[date, float]:
+        """Daily TVL series for a chain; empty if it cannot be fetched"""
+        chain = chain.lower()
+        cached = self._histories.get(chain)
+        if cached is not None and self._fresh(cached[0]):
+            self.stats["history_hits"] += 1
+            return cached[1]
+
+        async def load():
+            return build_daily_tvl_index(await self._get_json(client, f"/v2/historicalChainTvl/{chain}"))
+
+        try:
+            series = await self._single_flight(f"history:{chain}", load)
+            self._histories[chain] = (self._clock(), series)
+            return series
+        except Exception as e:
+            self.stats["download_errors"] += 1
+            logger.warning(f"DeFiLlama history refresh failed for {chain}: {e}")
+            return cached[1] if cached else {}
+
+    async def chain_tvl_on(self, client, chain: str, day: date) -> Optional[float]:
+        """TVL of ``chain`` on ``day`` from its daily series"""
+        return (await self.get_chain_history(client, chain)).get(day)
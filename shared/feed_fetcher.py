@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Conditional RSS Feed Fetching
+Concurrent feed downloads that skip unchanged feeds and already-seen entries.
+
+Per feed, a ``FeedState`` keeps:
+    - the ETag / Last-Modified validators from the last 200 response, sent
+      back as If-None-Match / If-Modified-Since so unchanged feeds return 304
+    - a high-water mark (latest published timestamp) and the GUIDs seen
+      recently, so only entries newer than the last cycle are returned
+
+State is only advanced when the caller commits a result, i.e. after the new
+entries have been stored, so a failed write refetches the same entries.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import aiohttp
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "CryptoNewsCollector/1.0 (+https://example.com/bot)"
+
+
+def entry_guid(entry: Any) -> Optional[str]:
+    """Stable identity of a feed entry: id, then link, then title"""
+    for key in ("id", "link", "title"):
+        value = entry.get(key)
+        if value:
+            return str(value)
+    return None
+
+
+def entry_published(entry: Any) -> Optional[datetime]:
+    """Naive UTC publish (or update) time of a feed entry"""
+    for key in ("published_parsed", "updated_parsed"):
+        value = entry.get(key)
+        if value:
+            return datetime(*value[:6])
+    return None
+
+
+@dataclass
+class FeedState:
+    """Validators and high-water mark for one feed URL"""
+    feed_url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    high_water: Optional[datetime] = None
+    seen_guids: List[str] = field(default_factory=list)
+
+    def is_new(self, guid: Optional[str], published: Optional[datetime], late_grace: timedelta) -> bool:
+        if guid is not None and guid in self.seen_guids:
+            return False
+        if published is not None and self.high_water is not None:
+            # Entries a little older than the mark may be late arrivals
+            return published >= self.high_water - late_grace
+        return True
+
+    def advanced(self, entries: Iterable[Any], etag: Optional[str], last_modified: Optional[str],
+                 max_seen_guids: int) -> "FeedState":
+        """State after processing ``entries`` from a response with these validators"""
+        high_water = self.high_water
+        guids = list(self.seen_guids)
+        for entry in entries:
+            published = entry_published(entry)
+            if published is not None and (high_water is None or published > high_water):
+                high_water = published
+            guid = entry_guid(entry)
+            if guid is not None and guid not in guids:
+                guids.append(guid)
+        return replace(
+            self,
+            etag=etag,
+            last_modified=last_modified,
+            high_water=high_water,
+            seen_guids=guids[-max_seen_guids:],
+        )
+
+
+@dataclass
+class FeedResult:
+    """Outcome of one conditional fetch; ``state`` is what ``commit`` persists"""
+    name: str
+    url: str
+    status: int
+    entries: List[Any] = field(default_factory=list)
+    total_entries: int = 0
+    bytes_downloaded: int = 0
+    error: Optional[str] = None
+    state: Optional[FeedState] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class InMemoryFeedStateStore:
+    """Feed state held for the lifetime of the process"""
+
+    def __init__(self):
+        self._states: Dict[str, FeedState] = {}
+
+    def load_many(self, urls: Sequence[str]) -> Dict[str, FeedState]:
+        return {url: self._states.get(url) or FeedState(url) for url in urls}
+
+    def save_many(self, states: Sequence[FeedState]):
+        for state in states:
+            self._states[state.feed_url] = state
+
+
+class MySQLFeedStateStore(InMemoryFeedStateStore):
+    """
+    Feed state persisted in a MySQL table so restarts keep their validators
+
+    Reads and writes fall back to the in-process copy when the database is
+    unavailable, so a database outage costs full downloads, not lost state.
+    """
+
+    def __init__(self, get_connection: Callable, table: str = "news_feed_state"):
+        super().__init__()
+        self.get_connection = get_connection
+        self.table = table
+        self._table_ready = False
+
+    def _ensure_table(self, cursor):
+        if self._table_ready:
+            return
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                feed_url VARCHAR(512) NOT NULL PRIMARY KEY,
+                etag VARCHAR(255) NULL,
+                last_modified VARCHAR(64) NULL,
+                high_water DATETIME NULL,
+                seen_guids MEDIUMTEXT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """)
+        self._table_ready = True
+
+    def load_many(self, urls: Sequence[str]) -> Dict[str, FeedState]:
+        if not urls:
+            return {}
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                self._ensure_table(cursor)
+                placeholders = ", ".join(["%s"] * len(urls))
+                cursor.execute(
+                    f"SELECT feed_url, etag, last_modified, high_water, seen_guids "
+                    f"FROM {self.table} WHERE feed_url IN ({placeholders})",
+                    tuple(urls),
+                )
+                for feed_url, etag, last_modified, high_water, seen_guids in cursor.fetchall():
+                    self._states[feed_url] = FeedState(
+                        feed_url, etag, last_modified, high_water,
+                        json.loads(seen_guids) if seen_guids else [],
+                    )
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load feed state, using in-process copy: {e}")
+        return super().load_many(urls)
+
+    def save_many(self, states: Sequence[FeedState]):
+        super().save_many(states)
+        if not states:
+            return
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                self._ensure_table(cursor)
+                cursor.executemany(
+                    f"""
+                    INSERT INTO {self.table} (feed_url, etag, last_modified, high_water, seen_guids)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        etag = VALUES(etag),
+                        last_modified = VALUES(last_modified),
+                        high_water = VALUES(high_water),
+                        seen_guids = VALUES(seen_guids)
+                    """,
+                    [
+                        (s.feed_url, s.etag, s.last_modified, s.high_water, json.dumps(s.seen_guids))
+                        for s in states
+                    ],
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not persist feed state: {e}")
+
+
+class FeedFetcher:
+    """
+    Fetches many feeds concurrently with conditional GETs
+
+    Args:
+        state_store: Where validators and high-water marks are kept
+        per_host_limit: Concurrent connections to any one host
+        max_connections: Concurrent connections overall
+        timeout: Total seconds allowed per request
+        late_entry_grace: How far behind the high-water mark an unseen entry
+            may be published and still count as new
+        max_seen_guids: GUIDs remembered per feed
+    """
+
+    def __init__(self, state_store: Optional[InMemoryFeedStateStore] = None, per_host_limit: int = 2,
+                 max_connections: int = 10, timeout: float = 30, user_agent: str = DEFAULT_USER_AGENT,
+                 late_entry_grace: timedelta = timedelta(hours=6), max_seen_guids: int = 500):
+        self.state_store = state_store or InMemoryFeedStateStore()
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.late_entry_grace = late_entry_grace
+        self.max_seen_guids = max_seen_guids
+
+    async def fetch_all(self, feeds: Sequence[Tuple[str, str]],
+                        session: Optional[aiohttp.ClientSession] = None) -> List[FeedResult]:
+        """Fetch (name, url) feeds concurrently; results are in input order"""
+        states = self.state_store.load_many([url for _, url in feeds])
+        if session is not None:
+            return await self._fetch_with(session, feeds, states)
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host_limit)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent},
+        ) as session:
+            return await self._fetch_with(session, feeds, states)
+
+    async def _fetch_with(self, session, feeds, states) -> List[FeedResult]:
+        return list(await asyncio.gather(*(
+            self._fetch(session, name, url, states[url]) for name, url in feeds
+        )))
+
+    async def _fetch(self, session: aiohttp.ClientSession, name: str, url: str, state: FeedState) -> FeedResult:
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return FeedResult(name, url, 304, state=state)
+                if response.status >= 400:
+                    return FeedResult(name, url, response.status, error=f"HTTP {response.status}")
+                body = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            return FeedResult(name, url, 0, error=str(e) or type(e).__name__)
+
+        # Parsing is CPU-bound; keep it off the event loop
+        parsed = await asyncio.to_thread(feedparser.parse, body)
+        entries = [
+            entry for entry in parsed.entries
+            if state.is_new(entry_guid(entry), entry_published(entry), self.late_entry_grace)
+        ]
+        return FeedResult(
+            name, url, response.status,
+            entries=entries,
+            total_entries=len(parsed.entries),
+            bytes_downloaded=len(body),
+            state=state.advanced(entries, etag, last_modified, self.max_seen_guids),
+        )
+
+    def commit(self, results: Iterable[FeedResult]):
+        """Persist the state of results whose entries have been handled"""
+        self.state_store.save_many([r.state for r in results if r.state is not None and not r.error])
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Background Health Sampling
+Dependency probes run on a fixed cadence; endpoints serve the last snapshot.
+
+A ``HealthSampler`` owns named probes (sync or async callables). Every
+``interval`` seconds it runs all probes concurrently, each bounded by
+``probe_timeout``, and publishes an immutable ``HealthSnapshot``. Liveness,
+readiness and metrics endpoints read ``snapshot()`` in O(1): they never open
+connections or wait on a dependency, and each snapshot reports its age so a
+stalled sampler shows up as stale rather than as stale-but-healthy. Until
+the first round completes the snapshot is empty and stale (warming up); the
+first round belongs to the sampler, never to a probe request.
+
+Probe results:
+    returns a bool      ok = the bool
+    returns a value     ok, value kept (e.g. gap hours)
+    raises / times out  not ok, error kept
+
+Synchronous probes run on worker threads, so a slow dependency never blocks
+the event loop; a probe still running from the previous round is reported as
+failed instead of being started again. Services without their own event loop
+run the sampler on a daemon thread with ``start_in_thread()``.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Outcome of one probe run"""
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+    latency_seconds: float = 0.0
+    checked_at: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class HealthSnapshot:
+    """Probe results of one sampling round; ``sampled_at`` is None before the first"""
+    results: Mapping[str, ProbeResult]
+    sampled_at: Optional[float]
+    rounds: int
+    max_age_seconds: float
+
+    def ok(self, name: str) -> bool:
+        result = self.results.get(name)
+        return bool(result and result.ok)
+
+    def value(self, name: str, default: Any = None) -> Any:
+        result = self.results.get(name)
+        return result.value if result and result.ok else default
+
+    def age_seconds(self, now: Optional[float] = None) -> Optional[float]:
+        if self.sampled_at is None:
+            return None
+        return max(0.0, (now if now is not None else time.time()) - self.sampled_at)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        age = self.age_seconds(now)
+        return age is None or age > self.max_age_seconds
+
+    @property
+    def warming_up(self) -> bool:
+        return self.sampled_at is None
+
+    @property
+    def sampled_at_datetime(self) -> Optional[datetime]:
+        if self.sampled_at is None:
+            return None
+        return datetime.fromtimestamp(self.sampled_at, tz=timezone.utc)
+
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        age = self.age_seconds(now)
+        return {
+            "sampled_at": self.sampled_at_datetime.isoformat() if self.sampled_at is not None else None,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stale": self.is_stale(now),
+            "warming_up": self.warming_up,
+            "rounds": self.rounds,
+            "checks": {
+                name: {
+                    "ok": result.ok,
+                    "value": result.value if not isinstance(result.value, bool) else None,
+                    "error": result.error,
+                    "latency_ms": round(result.latency_seconds * 1000, 2),
+                }
+                for name, result in self.results.items()
+            },
+        }
+
+
+class HealthSampler:
+    """
+    Periodic dependency prober publishing cached health snapshots
+
+    Args:
+        interval: Seconds between sampling rounds
+        probe_timeout: Seconds a single probe may take before it counts as failed
+        stale_after: Snapshot age at which it is reported stale (default 3 intervals)
+        clock: Wall-clock time source (injectable for tests)
+    """
+
+    def __init__(self, interval: float = 30, probe_timeout: float = 10,
+                 stale_after: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self.clock = clock
+        self._probes: Dict[str, Callable[[], Any]] = {}
+        self._inflight = set()
+        self._snapshot = HealthSnapshot(MappingProxyType({}), None, 0, self.stale_after)
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add_probe(self, name: str, probe: Callable[[], Any]):
+        """Register a sync or async zero-argument probe"""
+        self._probes[name] = probe
+
+    def snapshot(self) -> HealthSnapshot:
+        """The most recently published snapshot (O(1), never blocks)"""
+        return self._snapshot
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def _call_sync(self, name: str, probe: Callable[[], Any]) -> Any:
+        try:
+            return probe()
+        finally:
+            self._inflight.discard(name)
+
+    async def _run_probe(self, name: str, probe: Callable[[], Any]) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(probe):
+                pending = probe()
+            else:
+                if name in self._inflight:
+                    raise RuntimeError("previous probe still running")
+                self._inflight.add(name)
+                pending = asyncio.to_thread(self._call_sync, name, probe)
+            value = await asyncio.wait_for(pending, timeout=self.probe_timeout)
+            ok = value if isinstance(value, bool) else True
+            return ProbeResult(ok, value, None, time.perf_counter() - started, self.clock())
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.probe_timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        return ProbeResult(False, None, error, time.perf_counter() - started, self.clock())
+
+    async def sample_once(self) -> HealthSnapshot:
+        """Run every probe concurrently and publish the resulting snapshot"""
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._run_probe(name, self._probes[name]) for name in names))
+        snapshot = HealthSnapshot(
+            MappingProxyType(dict(zip(names, results))),
+            self.clock(),
+            self._snapshot.rounds + 1,
+            self.stale_after,
+        )
+        self._snapshot = snapshot
+        failed = [name for name, result in snapshot.results.items() if not result.ok]
+        if failed:
+            logger.warning(f"Health probes failing: {', '.join(failed)}")
+        return snapshot
+
+    async def run(self):
+        """Sample until ``stop()``; the first round runs immediately"""
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    await self.sample_once()
+                except Exception as e:
+                    logger.error(f"Health sampling round failed: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._running = False
+
+    def start(self) -> asyncio.Task:
+        """Start sampling on the running event loop (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    def start_in_thread(self) -> threading.Thread:
+        """Start sampling on a daemon thread with its own event loop (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self.run()), name="health-sampler", daemon=True
+            )
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client Pool
+One long-lived ``aiohttp`` session per API provider, configured by
+``HTTP_CLIENTS`` in ``shared.scheduling_config``.
+
+Opening a session per request pays DNS, TCP and TLS setup every time. The
+clients here keep one keep-alive connection pool per provider for the whole
+process (per event loop, since aiohttp sessions are bound to one), with:
+    - a tuned ``TCPConnector`` (connection limits, keep-alive, DNS cache TTL)
+    - total and connect timeouts
+    - retries with exponential backoff and full jitter on connection errors
+      and retryable 5xx statuses, honouring ``Retry-After``
+    - no retries on 429: callers pace requests with the provider's token
+      bucket (``shared.rate_limiter``), which owns rate-limit backoff, and
+      handle a 429 response themselves
+    - optional response decompression and a pluggable JSON decoder
+
+Usage:
+    client = get_http_client("coingecko_premium")
+    async with client.get(url, params=params) as response:
+        data = await client.json(response)
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+    max_retry_after: float = 60.0
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based)"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_retry_after)
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def _json_decoder(name: str) -> Callable[[str], Any]:
+    if name == "orjson":
+        try:
+            import orjson
+            return orjson.loads
+        except ImportError:
+            logger.warning("⚠️ orjson not installed, using json for HTTP responses")
+    return json.loads
+
+
+class ProviderHttpClient:
+    """
+    Pooled HTTP client for one provider
+
+    ``get``/``post``/``request`` are used like the matching ``ClientSession``
+    methods (``async with client.get(...) as response``), so code written
+    against a session can take a client instead.
+    """
+
+    def __init__(self, provider: str, config: Dict[str, Any]):
+        self.provider = provider
+        self.config = config
+        self.retry_policy = RetryPolicy(
+            max_retries=config["max_retries"],
+            backoff_base=config["backoff_base"],
+            backoff_max=config["backoff_max"],
+            retry_statuses=tuple(config["retry_statuses"]),
+        )
+        self.json_loads = _json_decoder(config["json_decoder"])
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "sessions_created": 0}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config["max_connections"],
+            limit_per_host=self.config["max_connections_per_host"],
+            keepalive_timeout=self.config["keepalive_timeout"],
+            ttl_dns_cache=self.config["dns_cache_ttl"],
+        )
+        self._stats["sessions_created"] += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=self.config["total_timeout"],
+                connect=self.config["connect_timeout"],
+            ),
+            auto_decompress=self.config["auto_decompress"],
+            headers=self.config.get("headers"),
+        )
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+        return session
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request, retrying connection errors and retryable statuses
+
+        The final response is yielded whatever its status, so callers keep
+        their own status handling.
+        """
+        session = await self.session()
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            self._stats["requests"] += 1
+            try:
+                response = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= policy.max_retries:
+                    self._stats["errors"] += 1
+                    raise
+                delay = policy.delay(attempt)
+                logger.debug(f"{self.provider} {method} {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if response.status not in policy.retry_statuses or attempt >= policy.max_retries:
+                    break
+                delay = policy.delay(attempt, response.headers.get("Retry-After"))
+                response.release()
+                logger.debug(f"{self.provider} {method} {url} returned {response.status}, retrying in {delay:.2f}s")
+
+            self._stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def json(self, response: aiohttp.ClientResponse) -> Any:
+        """Decode a response body with the provider's JSON decoder"""
+        return await response.json(loads=self.json_loads, content_type=None)
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        """GET and decode JSON; raises ``aiohttp.ClientResponseError`` on non-2xx"""
+        async with self.get(url, **kwargs) as response:
+            response.raise_for_status()
+            return await self.json(response)
+
+    async def close(self):
+        for session in list(self._sessions.values()):
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "open_sessions": sum(1 for s in list(self._sessions.values()) if not s.closed),
+            **self._stats,
+        }
+
+
+# ==============================================================================
+# PROCESS-WIDE REGISTRY
+# ==============================================================================
+
+_clients: Dict[str, ProviderHttpClient] = {}
+_registry_lock = threading.Lock()
+
+
+def get_http_client(provider: str) -> ProviderHttpClient:
+    """Get the shared client for a provider; unknown providers use the defaults"""
+    client = _clients.get(provider)
+    if client is None:
+        from shared.scheduling_config import get_http_client_config
+        config = get_http_client_config(provider)
+        with _registry_lock:
+            client = _clients.get(provider)
+            if client is None:
+                client = ProviderHttpClient(provider, config)
+                _clients[provider] = client
+    return client
+
+
+async def close_http_clients():
+    """Close every pooled session (call on service shutdown)"""
+    for client in list(_clients.values()):
+        await client.close()
+
+
+def get_all_http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every client created in this process"""
+    return {name: client.get_stats() for name, client in list(_clients.items())}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Composite Time-Range Index Migrations
+Indexes backing the half-open range queries built with ``shared.query_builder``.
+
+Each migration is idempotent: it is skipped when the table or one of its
+columns does not exist, or when any existing index (including a primary or
+unique key) already starts with the same columns.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexMigration:
+    """One secondary index; ``table`` may be qualified as ``schema.table``"""
+    table: str
+    name: str
+    columns: Tuple[str, ...]
+
+    def split_table(self, default_schema: Optional[str]) -> Tuple[Optional[str], str]:
+        if "." in self.table:
+            schema, table = self.table.split(".", 1)
+            return schema, table
+        return default_schema, self.table
+
+    def create_sql(self) -> str:
+        return f"CREATE INDEX {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+
+INDEX_MIGRATIONS: List[IndexMigration] = [
+    # Per-symbol gap detection and day lookups
+    IndexMigration("price_data_real", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso")),
+    IndexMigration("onchain_data", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso")),
+    IndexMigration("technical_indicators", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso")),
+    IndexMigration("ohlc_data", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso")),
+    IndexMigration("crypto_onchain_data", "idx_coin_symbol_timestamp", ("coin_symbol", "timestamp")),
+    # Bulk news ingestion probes existing url_hash values per chunk
+    IndexMigration("crypto_news", "idx_url_hash", ("url_hash",)),
+    # Window scans feeding the materialized feature table
+    IndexMigration("crypto_news.crypto_sentiment_data", "idx_published_at", ("published_at",)),
+    IndexMigration("crypto_news.stock_sentiment_data", "idx_published_at", ("published_at",)),
+    IndexMigration("crypto_news.social_sentiment_data", "idx_timestamp", ("timestamp",)),
+]
+
+
+def _current_schema(cursor) -> Optional[str]:
+    cursor.execute("SELECT DATABASE()")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _table_columns(cursor, schema: str, table: str) -> List[str]:
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+        (schema, table),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _index_prefixes(cursor, schema: str, table: str) -> Dict[str, List[str]]:
+    cursor.execute(
+        """
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """,
+        (schema, table),
+    )
+    indexes: Dict[str, List[str]] = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column_name)
+    return indexes
+
+
+def migration_status(cursor, migration: IndexMigration, default_schema: Optional[str] = None) -> str:
+    """'missing_table', 'missing_column', 'covered' or 'pending'"""
+    schema, table = migration.split_table(default_schema or _current_schema(cursor))
+    columns = _table_columns(cursor, schema, table)
+    if not columns:
+        return "missing_table"
+    if any(column not in columns for column in migration.columns):
+        return "missing_column"
+    wanted = [c.lower() for c in migration.columns]
+    for index_columns in _index_prefixes(cursor, schema, table).values():
+        if [c.lower() for c in index_columns[:len(wanted)]] == wanted:
+            return "covered"
+    return "pending"
+
+
+def apply_index_migrations(cursor, dry_run: bool = False,
+                           migrations: Optional[List[IndexMigration]] = None) -> Dict[str, str]:
+    """Create every pending index; returns {table.index: status}
+
+    Status is one of the ``migration_status`` values, with 'pending' replaced
+    by 'created' (or left as 'pending' on a dry run) or 'failed: <error>'.
+    """
+    default_schema = _current_schema(cursor)
+    results = {}
+    for migration in migrations or INDEX_MIGRATIONS:
+        key = f"{migration.table}.{migration.name}"
+        status = migration_status(cursor, migration, default_schema)
+        if status == "pending" and not dry_run:
+            try:
+                cursor.execute(migration.create_sql())
+                status = "created"
+                logger.info(f"✅ Created index {key} ({', '.join(migration.columns)})")
+            except Exception as e:
+                status = f"failed: {e}"
+                logger.error(f"❌ Failed to create index {key}: {e}")
+        results[key] = status
+    return results
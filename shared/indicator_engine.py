@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Incremental Technical Indicator Engine
+NumPy/pandas-backed indicator calculations with per-symbol rolling state.
+
+Cold start computes every indicator over the full price history in one
+vectorized pass and seeds the per-symbol state from the final values. Each
+subsequent bar updates that state in constant time: EMA values, Wilder RSI
+averages, the MACD signal EMA, running SMA/Bollinger sums and the Stochastic
+%K window used for %D.
+
+Definitions (shared by the vectorized and incremental paths):
+    SMA(n)        mean of the last n closes
+    EMA(n)        seeded with SMA(n) of the first n closes, alpha = 2 / (n + 1)
+    RSI(n)        Wilder smoothing (alpha = 1 / n) seeded with the mean of the
+                  first n gains/losses
+    MACD          EMA(fast) - EMA(slow); signal is EMA(signal) of the MACD line
+    Bollinger     SMA(n) +/- k * population standard deviation over n closes
+    Stochastic    %K over the last k highs/lows, %D = SMA(d) of %K
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _seeded_ema(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Recursive EMA seeded with the SMA of the first ``period`` valid values
+
+    Leading NaNs are skipped; the output is NaN until the seed is available.
+    """
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+    start = valid[0]
+    seed_index = start + period - 1
+    series = values[seed_index:].copy()
+    series[0] = values[start:seed_index + 1].mean()
+    out[seed_index:] = pd.Series(series).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+@dataclass
+class _RollingSum:
+    """Fixed-window running sum (and sum of squares) over a stream"""
+    period: int
+    window: deque = None
+    total: float = 0.0
+    total_sq: float = 0.0
+
+    def __post_init__(self):
+        self.window = deque(maxlen=self.period)
+
+    def push(self, value: float):
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.period if self.full else None
+
+    def std(self) -> Optional[float]:
+        if not self.full:
+            return None
+        mean = self.total / self.period
+        return math.sqrt(max(self.total_sq / self.period - mean * mean, 0.0))
+
+
+@dataclass
+class _SeededEma:
+    """Incremental EMA that seeds itself with the SMA of its first values"""
+    period: int
+    alpha: float
+    value: Optional[float] = None
+    seed: List[float] = field(default_factory=list)
+
+    def push(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self.seed.append(x)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+@dataclass
+class SymbolIndicatorState:
+    """Rolling indicator state for one symbol"""
+    last_timestamp: Any = None
+    last_close: Optional[float] = None
+    bars: int = 0
+    sums: Dict[int, _RollingSum] = field(default_factory=dict)
+    emas: Dict[int, _SeededEma] = field(default_factory=dict)
+    rsi_gain: Dict[int, _SeededEma] = field(default_factory=dict)
+    rsi_loss: Dict[int, _SeededEma] = field(default_factory=dict)
+    macd_signal: Optional[_SeededEma] = None
+    highs: deque = None
+    lows: deque = None
+    stoch_k: deque = None
+
+
+class IndicatorEngine:
+    """
+    Vectorized and incremental technical indicator calculator
+
+    Args:
+        sma_periods: SMA window lengths
+        ema_periods: EMA spans
+        rsi_periods: RSI lookbacks
+        bollinger_period: Bollinger window length
+        bollinger_std: Bollinger band width in standard deviations
+        stochastic_k_period: %K lookback
+        stochastic_d_period: %D smoothing length
+        macd_periods: (fast, slow, signal) spans
+    """
+
+    def __init__(
+        self,
+        sma_periods: Sequence[int] = (20, 50, 200),
+        ema_periods: Sequence[int] = (12, 26),
+        rsi_periods: Sequence[int] = (14, 7),
+        bollinger_period: int = 20,
+        bollinger_std: float = 2,
+        stochastic_k_period: int = 14,
+        stochastic_d_period: int = 3,
+        macd_periods: Tuple[int, int, int] = (12, 26, 9),
+    ):
+        self.sma_periods = list(sma_periods)
+        self.ema_periods = list(ema_periods)
+        self.rsi_periods = list(rsi_periods)
+        self.bollinger_period = bollinger_period
+        self.bollinger_std = bollinger_std
+        self.stochastic_k_period = stochastic_k_period
+        self.stochastic_d_period = stochastic_d_period
+        self.macd_fast, self.macd_slow, self.macd_signal_period = macd_periods
+
+        # EMA spans needed internally (MACD legs) even if not reported
+        self._ema_spans = sorted(set(self.ema_periods) | {self.macd_fast, self.macd_slow})
+        self._window_periods = sorted(set(self.sma_periods) | {self.bollinger_period})
+        self._states: Dict[str, SymbolIndicatorState] = {}
+
+    # ------------------------------------------------------------------
+    # Vectorized computation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bar_arrays(bars: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        closes = np.array([float(b["close"]) for b in bars], dtype=float)
+        highs = np.array([float(b.get("high") or 0.0) for b in bars], dtype=float)
+        lows = np.array([float(b.get("low") or 0.0) for b in bars], dtype=float)
+        # Price snapshots without a range fall back to the close
+        highs = np.where(highs > 0, highs, closes)
+        lows = np.where(lows > 0, lows, closes)
+        return highs, lows, closes
+
+    def compute_series(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Compute every indicator for every bar; NaN where not yet defined"""
+        return self._compute(highs, lows, closes)[0]
+
+    def _compute(self, highs: np.ndarray, lows: np.ndarray,
+                 closes: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Vectorized pass returning the indicator series plus the internal
+        series (all EMA legs and Wilder averages) needed to seed rolling state"""
+        closes = np.asarray(closes, dtype=float)
+        highs = np.asarray(highs, dtype=float)
+        lows = np.asarray(lows, dtype=float)
+        close_series = pd.Series(closes)
+        result: Dict[str, np.ndarray] = {}
+
+        for period in self.sma_periods:
+            result[f"sma_{period}"] = close_series.rolling(period).mean().to_numpy()
+
+        emas = {span: _seeded_ema(closes, span, 2 / (span + 1)) for span in self._ema_spans}
+        for period in self.ema_periods:
+            result[f"ema_{period}"] = emas[period]
+
+        changes = np.diff(closes, prepend=np.nan)
+        gains = np.where(np.isnan(changes), np.nan, np.clip(changes, 0, None))
+        losses = np.where(np.isnan(changes), np.nan, np.clip(-changes, 0, None))
+        wilder = {}
+        for period in self.rsi_periods:
+            avg_gain = _seeded_ema(gains, period, 1 / period)
+            avg_loss = _seeded_ema(losses, period, 1 / period)
+            wilder[period] = (avg_gain, avg_loss)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+            rsi = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+            result[f"rsi_{period}"] = rsi
+
+        macd_line = emas[self.macd_fast] - emas[self.macd_slow]
+        macd_signal = _seeded_ema(macd_line, self.macd_signal_period, 2 / (self.macd_signal_period + 1))
+        result["macd_line"] = macd_line
+        result["macd_signal"] = macd_signal
+        result["macd_histogram"] = macd_line - macd_signal
+
+        bb_mid = close_series.rolling(self.bollinger_period).mean().to_numpy()
+        bb_std = close_series.rolling(self.bollinger_period).std(ddof=0).to_numpy()
+        result["bb_upper"] = bb_mid + self.bollinger_std * bb_std
+        result["bb_middle"] = bb_mid
+        result["bb_lower"] = bb_mid - self.bollinger_std * bb_std
+
+        highest = pd.Series(highs).rolling(self.stochastic_k_period).max().to_numpy()
+        lowest = pd.Series(lows).rolling(self.stochastic_k_period).min().to_numpy()
+        span = highest - lowest
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stoch_k = np.where(span == 0, 50.0, (closes - lowest) / span * 100)
+        stoch_k = np.where(np.isnan(span), np.nan, stoch_k)
+        result["stoch_k"] = stoch_k
+        result["stoch_d"] = pd.Series(stoch_k).rolling(self.stochastic_d_period).mean().to_numpy()
+
+        return result, {"emas": emas, "wilder": wilder}
+
+    @staticmethod
+    def _latest(series: Dict[str, np.ndarray]) -> Dict[str, Optional[float]]:
+        latest = {}
+        for name, values in series.items():
+            value = values[-1] if len(values) else np.nan
+            latest[name] = None if np.isnan(value) else float(value)
+        return latest
+
+    def compute_latest(self, bars: Sequence[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+        """Stateless: latest indicator values for a chronological bar list"""
+        if not bars:
+            return {}
+        return self._latest(self.compute_series(*self._bar_arrays(bars)))
+
+    # ------------------------------------------------------------------
+    # Per-symbol incremental state
+    # ------------------------------------------------------------------
+
+    def has_state(self, symbol: str) -> bool:
+        return symbol in self._states
+
+    def last_timestamp(self, symbol: str) -> Any:
+        state = self._states.get(symbol)
+        return state.last_timestamp if state else None
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop state for one symbol (or all) so the next run cold-starts"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def _new_state(self) -> SymbolIndicatorState:
+        state = SymbolIndicatorState()
+        state.sums = {p: _RollingSum(p) for p in self._window_periods}
+        state.emas = {p: _SeededEma(p, 2 / (p + 1)) for p in self._ema_spans}
+        state.rsi_gain = {p: _SeededEma(p, 1 / p) for p in self.rsi_periods}
+        state.rsi_loss = {p: _SeededEma(p, 1 / p) for p in self.rsi_periods}
+        state.macd_signal = _SeededEma(self.macd_signal_period, 2 / (self.macd_signal_period + 1))
+        state.highs = deque(maxlen=self.stochastic_k_period)
+        state.lows = deque(maxlen=self.stochastic_k_period)
+        state.stoch_k = deque(maxlen=self.stochastic_d_period)
+        return state
+
+    def _push(self, state: SymbolIndicatorState, high: float, low: float, close: float,
+              timestamp: Any) -> Dict[str, Optional[float]]:
+        """Advance the state by one bar in constant time and return its indicators"""
+        high = high if high > 0 else close
+        low = low if low > 0 else close
+        indicators: Dict[str, Optional[float]] = {}
+
+        for rolling in state.sums.values():
+            rolling.push(close)
+        for period in self.sma_periods:
+            indicators[f"sma_{period}"] = state.sums[period].mean()
+
+        for ema in state.emas.values():
+            ema.push(close)
+        for period in self.ema_periods:
+            indicators[f"ema_{period}"] = state.emas[period].value
+
+        for period in self.rsi_periods:
+            rsi = None
+            if state.last_close is not None:
+                change = close - state.last_close
+                avg_gain = state.rsi_gain[period].push(max(change, 0.0))
+                avg_loss = state.rsi_loss[period].push(max(-change, 0.0))
+                if avg_gain is not None and avg_loss is not None:
+                    rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+            indicators[f"rsi_{period}"] = rsi
+
+        fast = state.emas[self.macd_fast].value
+        slow = state.emas[self.macd_slow].value
+        macd_line = macd_signal = macd_histogram = None
+        if fast is not None and slow is not None:
+            macd_line = fast - slow
+            macd_signal = state.macd_signal.push(macd_line)
+            if macd_signal is not None:
+                macd_histogram = macd_line - macd_signal
+        indicators["macd_line"] = macd_line
+        indicators["macd_signal"] = macd_signal
+        indicators["macd_histogram"] = macd_histogram
+
+        bb = state.sums[self.bollinger_period]
+        mid, std = bb.mean(), bb.std()
+        indicators["bb_upper"] = mid + self.bollinger_std * std if mid is not None else None
+        indicators["bb_middle"] = mid
+        indicators["bb_lower"] = mid - self.bollinger_std * std if mid is not None else None
+
+        state.highs.append(high)
+        state.lows.append(low)
+        stoch_k = stoch_d = None
+        if len(state.highs) == self.stochastic_k_period:
+            highest, lowest = max(state.highs), min(state.lows)
+            stoch_k = 50.0 if highest == lowest else (close - lowest) / (highest - lowest) * 100
+            state.stoch_k.append(stoch_k)
+            if len(state.stoch_k) == self.stochastic_d_period:
+                stoch_d = sum(state.stoch_k) / self.stochastic_d_period
+        indicators["stoch_k"] = stoch_k
+        indicators["stoch_d"] = stoch_d
+
+        state.last_close = close
+        state.last_timestamp = timestamp
+        state.bars += 1
+        return indicators
+
+    def _seed_state(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                    series: Dict[str, np.ndarray], internals: Dict[str, Any]) -> Optional[SymbolIndicatorState]:
+        """Build rolling state from the tail of a vectorized pass
+
+        Returns None when the history is too short for every component to be
+        seeded; the caller then replays the bars incrementally instead.
+        """
+        finals = [values[-1] for values in internals["emas"].values()]
+        for avg_gain, avg_loss in internals["wilder"].values():
+            finals.extend([avg_gain[-1], avg_loss[-1]])
+        finals.append(series["macd_signal"][-1])
+        finals.append(series["stoch_d"][-1])
+        if np.isnan(finals).any() or len(closes) < max(self._window_periods):
+            return None
+
+        state = self._new_state()
+        for period, rolling in state.sums.items():
+            for close in closes[-period:]:
+                rolling.push(float(close))
+        for span, ema in state.emas.items():
+            ema.value = float(internals["emas"][span][-1])
+        for period, (avg_gain, avg_loss) in internals["wilder"].items():
+            state.rsi_gain[period].value = float(avg_gain[-1])
+            state.rsi_loss[period].value = float(avg_loss[-1])
+        state.macd_signal.value = float(series["macd_signal"][-1])
+        state.highs.extend(float(h) for h in highs[-self.stochastic_k_period:])
+        state.lows.extend(float(l) for l in lows[-self.stochastic_k_period:])
+        state.stoch_k.extend(float(k) for k in series["stoch_k"][-self.stochastic_d_period:])
+        state.last_close = float(closes[-1])
+        state.bars = len(closes)
+        return state
+
+    def warm_start(self, symbol: str, bars: Sequence[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+        """Cold start: one vectorized pass over the full history, then seed the state
+
+        Later ``update`` calls continue exactly where the vectorized series ends.
+        """
+        self.invalidate(symbol)
+        if not bars:
+            return {}
+
+        highs, lows, closes = self._bar_arrays(bars)
+        series, internals = self._compute(highs, lows, closes)
+
+        state = self._seed_state(highs, lows, closes, series, internals)
+        if state is None:
+            # Short history: replaying is cheap and handles partially seeded EMAs
+            state = self._new_state()
+            for high, low, close in zip(highs, lows, closes):
+                self._push(state, float(high), float(low), float(close), None)
+        state.last_timestamp = bars[-1].get("timestamp")
+        self._states[symbol] = state
+        return self._latest(series)
+
+    def update(self, symbol: str, bar: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """Apply one new bar to an existing symbol state in O(1)"""
+        state = self._states.get(symbol)
+        if state is None:
+            raise KeyError(f"No indicator state for {symbol}; call warm_start first")
+        timestamp = bar.get("timestamp")
+        if state.last_timestamp is not None and timestamp is not None and timestamp <= state.last_timestamp:
+            raise ValueError(f"Out-of-order bar for {symbol}: {timestamp} <= {state.last_timestamp}")
+        close = float(bar["close"])
+        return self._push(state, float(bar.get("high") or 0.0), float(bar.get("low") or 0.0), close, timestamp)
+
+    def update_many(self, symbol: str, bars: Iterable[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+        """Apply several chronological bars; returns indicators after the last one"""
+        indicators: Dict[str, Optional[float]] = {}
+        for bar in bars:
+            indicators = self.update(symbol, bar)
+        return indicators
+
+    def bar_count(self, symbol: str) -> int:
+        state = self._states.get(symbol)
+        return state.bars if state else 0
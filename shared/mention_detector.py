@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Crypto Mention Detection
+Aho-Corasick multi-pattern matcher over the symbols, names and aliases in
+``crypto_assets``.
+
+Every pattern is compiled into one automaton, so finding all mentions costs a
+single linear scan of the text no matter how many assets are tracked.
+
+Matching rules:
+    - Matches must sit on word boundaries (no letter or digit either side)
+    - Symbols are case-sensitive ("SOL", not "sol"), so tickers that are also
+      English words ("ONE", "NEAR") only match when written as tickers
+    - Names and aliases are case-insensitive ("bitcoin", "Bitcoin")
+    - Overlapping matches resolve leftmost-longest, so "Bitcoin Cash" yields
+      BCH only, not BCH and BTC
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Mention:
+    """One matched occurrence of an asset in a text"""
+    symbol: str
+    start: int
+    end: int
+    text: str
+
+
+class AhoCorasickAutomaton:
+    """
+    Aho-Corasick automaton over str characters
+
+    Patterns are added with an arbitrary payload, then ``build`` computes the
+    failure links; ``iter_matches`` yields (start, end, payload) for every
+    pattern occurrence, overlaps included.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._pattern_count = 0
+        self._built = False
+
+    def __len__(self) -> int:
+        return self._pattern_count
+
+    def add(self, pattern: str, payload: Any):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((len(pattern), payload))
+        self._pattern_count += 1
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge output sets"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                end = index + 1
+                for length, payload in out[node]:
+                    yield end - length, end, payload
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercase without changing offsets (a few characters expand when lowered)"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def parse_aliases(value: Any) -> List[str]:
+    """Aliases from a crypto_assets row: JSON array text, list, or comma-separated text"""
+    if not value:
+        return []
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.split(",")
+    if isinstance(value, str):
+        value = [value]
+    return [str(alias).strip() for alias in value if str(alias).strip()]
+
+
+class MentionDetector:
+    """
+    Compiled matcher for a fixed set of assets
+
+    Args:
+        assets: (symbol, name, aliases) tuples; name and aliases may be None
+        min_name_length: Names/aliases shorter than this are ignored, since
+            short case-insensitive words match far too much ordinary text
+    """
+
+    def __init__(self, assets: Iterable[Sequence[Any]], min_name_length: int = 3):
+        self._automaton = AhoCorasickAutomaton()
+        self.symbols: Set[str] = set()
+
+        for asset in assets:
+            symbol = str(asset[0]).strip().upper() if asset and asset[0] else ""
+            if not symbol:
+                continue
+            self.symbols.add(symbol)
+            # Case-sensitive patterns are stored lowercased with the exact
+            # spelling kept for verification after the case-folded scan
+            self._automaton.add(symbol.lower(), (symbol, symbol))
+
+            terms = []
+            if len(asset) > 1 and asset[1]:
+                terms.append(str(asset[1]))
+            if len(asset) > 2:
+                terms.extend(parse_aliases(asset[2]))
+            for term in terms:
+                term = term.strip()
+                if len(term) >= min_name_length and term.upper() != symbol:
+                    self._automaton.add(term.lower(), (symbol, None))
+
+        self._automaton.build()
+
+    @classmethod
+    def from_symbols(cls, symbols: Iterable[str]) -> "MentionDetector":
+        """Detector for bare tickers, with no names or aliases"""
+        return cls((symbol,) for symbol in symbols)
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._automaton)
+
+    def find_mentions(self, text: str) -> List[Mention]:
+        """Every non-overlapping mention, leftmost-longest, in text order"""
+        if not text:
+            return []
+        folded = _lower_same_length(text)
+        length = len(text)
+        candidates = []
+        for start, end, (symbol, exact) in self._automaton.iter_matches(folded):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < length and _is_word_char(text[end]):
+                continue
+            if exact is not None and text[start:end] != exact:
+                continue
+            candidates.append((start, -end, symbol))
+
+        mentions = []
+        covered_until = 0
+        for start, negative_end, symbol in sorted(candidates):
+            if start < covered_until:
+                continue
+            end = -negative_end
+            mentions.append(Mention(symbol, start, end, text[start:end]))
+            covered_until = end
+        return mentions
+
+    def detect(self, text: str) -> List[str]:
+        """Distinct symbols mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(m.symbol for m in self.find_mentions(text)))
+
+
+class CryptoAssetMentionIndex:
+    """
+    MentionDetector kept in sync with the crypto_assets table
+
+    ``refresh`` compares ``CHECKSUM TABLE crypto_assets`` with the value seen at
+    the last build and only reloads and recompiles when it changed, so calling
+    it every collection cycle costs one cheap query.
+
+    Args:
+        asset_query: Query returning (symbol, name, aliases) rows
+        fallback_symbols: Used when the table cannot be read and nothing has
+            been loaded yet
+    """
+
+    DEFAULT_ASSET_QUERY = "SELECT symbol, name, aliases FROM crypto_assets WHERE is_active = 1"
+
+    def __init__(self, asset_query: str = DEFAULT_ASSET_QUERY,
+                 fallback_symbols: Iterable[str] = ()):
+        self.asset_query = asset_query
+        self.fallback_symbols = set(fallback_symbols)
+        self.detector: Optional[MentionDetector] = None
+        self._checksum: Any = None
+        self._lock = threading.Lock()
+        self.last_built: Optional[float] = None
+        self.builds = 0
+
+    @property
+    def symbols(self) -> Set[str]:
+        return self.detector.symbols if self.detector else set()
+
+    def _table_checksum(self, cursor) -> Any:
+        try:
+            cursor.execute("CHECKSUM TABLE crypto_assets")
+            row = cursor.fetchone()
+            return row[-1] if row else None
+        except Exception as e:
+            logger.debug(f"CHECKSUM TABLE crypto_assets failed, reloading assets: {e}")
+            return None
+
+    def refresh(self, cursor, force: bool = False) -> bool:
+        """Rebuild from the table if it changed; returns True when rebuilt"""
+        with self._lock:
+            checksum = self._table_checksum(cursor)
+            if not force and self.detector is not None and checksum is not None and checksum == self._checksum:
+                return False
+
+            cursor.execute(self.asset_query)
+            rows = [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+            self.detector = MentionDetector(rows)
+            self._checksum = checksum
+            self.last_built = time.time()
+            self.builds += 1
+            logger.info(
+                f"✅ Built mention detector: {len(self.detector.symbols)} assets, "
+                f"{self.detector.pattern_count} patterns"
+            )
+            return True
+
+    def use_fallback(self):
+        """Fall back to bare tickers if no detector has been built yet"""
+        with self._lock:
+            if self.detector is None:
+                self.detector = MentionDetector.from_symbols(self.fallback_symbols)
+
+    def detect(self, text: str) -> List[str]:
+        if self.detector is None:
+            self.use_fallback()
+        return self.detector.detect(text)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Onchain Completeness Scoring
+One definition of ``data_completeness_percentage`` for onchain rows, usable in
+Python (scored before insert and written with the row) and in SQL (set-based
+recompute of stored rows).
+
+The score is 70% core fields and 30% enhanced fields, each weighted by the
+share of fields that are populated. Fields that are not columns of the table
+never count in either form, so both give the same result for a stored row.
+
+Usage:
+    row['data_completeness_percentage'] = onchain_completeness(row)
+    recompute_onchain_completeness(cursor, start_date, end_date)
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from shared.query_builder import date_span_bounds, range_predicate
+
+logger = logging.getLogger(__name__)
+
+# Core required fields for onchain data (weight 70%)
+ONCHAIN_CORE_FIELDS = (
+    'symbol', 'data_date', 'active_addresses_24h', 'transaction_count_24h',
+    'exchange_net_flow_24h', 'price_volatility_7d', 'market_cap_realized',
+    'hash_rate', 'network_difficulty', 'transaction_volume_24h',
+)
+
+# Enhanced fields, lower priority (weight 30%)
+ONCHAIN_ENHANCED_FIELDS = (
+    'mvrv_ratio', 'social_score', 'developer_score', 'community_score',
+    'nvt_ratio', 'total_value_locked', 'staking_rewards_rate',
+)
+
+CORE_WEIGHT = 70.0
+ENHANCED_WEIGHT = 30.0
+
+# Columns of onchain_data (see EnhancedOnchainCollector.ensure_table_exists)
+ONCHAIN_TABLE_COLUMNS = frozenset((
+    'id', 'symbol', 'coin_id', 'timestamp_iso', 'collected_at',
+    'active_addresses', 'transaction_count', 'transaction_volume', 'hash_rate', 'difficulty',
+    'block_height', 'block_time_seconds', 'circulating_supply', 'total_supply', 'max_supply',
+    'supply_inflation_rate', 'network_value_to_transactions', 'realized_cap', 'mvrv_ratio',
+    'nvt_ratio', 'github_commits_30d', 'developer_activity_score', 'staking_yield',
+    'staked_percentage', 'validator_count', 'total_value_locked', 'defi_protocols_count',
+    'data_source', 'data_quality_score', 'data_completeness_percentage',
+))
+
+
+def onchain_completeness(record: Dict, columns: Iterable[str] = ONCHAIN_TABLE_COLUMNS) -> float:
+    """Completeness percentage (0.0 to 100.0) of an onchain record; fields outside ``columns`` never count"""
+    columns = set(columns)
+
+    def populated(fields: Sequence[str]) -> int:
+        return sum(1 for field in fields if field in columns and record.get(field) is not None)
+
+    populated_core = populated(ONCHAIN_CORE_FIELDS)
+    populated_enhanced = populated(ONCHAIN_ENHANCED_FIELDS)
+    return min(100.0, populated_core / len(ONCHAIN_CORE_FIELDS) * CORE_WEIGHT
+               + populated_enhanced / len(ONCHAIN_ENHANCED_FIELDS) * ENHANCED_WEIGHT)
+
+
+def onchain_completeness_sql(columns: Iterable[str] = ONCHAIN_TABLE_COLUMNS) -> str:
+    """SQL expression computing ``onchain_completeness`` from a row's columns"""
+    columns = set(columns)
+
+    def populated(fields: Sequence[str]) -> str:
+        present = [f"({field} IS NOT NULL)" for field in fields if field in columns]
+        return " + ".join(present) if present else "0"
+
+    return (
+        f"LEAST(100.0, ({populated(ONCHAIN_CORE_FIELDS)}) * {CORE_WEIGHT} / {len(ONCHAIN_CORE_FIELDS)}"
+        f" + ({populated(ONCHAIN_ENHANCED_FIELDS)}) * {ENHANCED_WEIGHT} / {len(ONCHAIN_ENHANCED_FIELDS)})"
+    )
+
+
+def completeness_chunks(start_date: date, end_date: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """Inclusive (first, last) day ranges covering start_date..end_date"""
+    chunks = []
+    first = start_date
+    while first <= end_date:
+        last = min(first + timedelta(days=chunk_days - 1), end_date)
+        chunks.append((first, last))
+        first = last + timedelta(days=1)
+    return chunks
+
+
+def recompute_onchain_completeness(cursor, start_date: date, end_date: date,
+                                   symbols: Optional[Sequence[str]] = None,
+                                   chunk_days: int = 7, table: str = "onchain_data",
+                                   commit=None) -> Dict[str, int]:
+    """
+    Recompute completeness for stored rows, one set-based UPDATE per chunk of days
+
+    Args:
+        cursor: Database cursor
+        start_date, end_date: Inclusive day range to repair
+        symbols: Limit to these symbols (all symbols if None)
+        chunk_days: Days per UPDATE, keeping each statement's row locks short
+        commit: Called after each chunk (e.g. ``conn.commit``)
+
+    Returns:
+        {"chunks": n, "rows_updated": n}
+    """
+    symbol_predicate = ""
+    symbol_params: Tuple = ()
+    if symbols:
+        symbol_predicate = f" AND symbol IN ({', '.join(['%s'] * len(symbols))})"
+        symbol_params = tuple(symbols)
+
+    query = f"""
+        UPDATE {table}
+        SET data_completeness_percentage = {onchain_completeness_sql()}
+        WHERE {range_predicate("timestamp_iso")}{symbol_predicate}
+    """
+
+    totals = {"chunks": 0, "rows_updated": 0}
+    for first, last in completeness_chunks(start_date, end_date, chunk_days):
+        cursor.execute(query, (*date_span_bounds(first, last), *symbol_params))
+        totals["chunks"] += 1
+        totals["rows_updated"] += max(cursor.rowcount, 0)
+        if commit is not None:
+            commit()
+        logger.info(f"Recomputed onchain completeness {first}..{last}: {cursor.rowcount} rows")
+    return totals
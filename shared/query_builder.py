@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Sargable Time-Range Query Building
+Half-open range predicates for day and hour buckets, plus a registry of the
+hot queries whose plans ``scripts/verify_query_plans.py`` checks.
+
+``DATE(col) = %s`` or ``HOUR(col) = %s`` wraps the indexed column in a
+function, so MySQL cannot use a (symbol, timestamp) index and scans every row
+for the symbol or the whole table. The helpers here turn a bucket into
+``col >= start AND col < end`` instead, which selects the same rows and is
+resolved with an index range scan.
+
+Usage:
+    predicate, params = day_range("timestamp_iso", target_date)
+    cursor.execute(f"SELECT ... WHERE symbol = %s AND {predicate}", (symbol, *params))
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Sequence, Tuple, Union
+
+DateLike = Union[date, datetime]
+
+ONE_DAY = timedelta(days=1)
+ONE_HOUR = timedelta(hours=1)
+
+
+def day_start(value: DateLike) -> datetime:
+    """Midnight at the start of the day containing ``value``"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return datetime.combine(value, datetime.min.time())
+
+
+def day_bounds(value: DateLike) -> Tuple[datetime, datetime]:
+    """[start, end) of the day containing ``value``"""
+    start = day_start(value)
+    return start, start + ONE_DAY
+
+
+def hour_bounds(value: DateLike) -> Tuple[datetime, datetime]:
+    """[start, end) of the hour containing ``value`` (a date means its first hour)"""
+    if not isinstance(value, datetime):
+        value = day_start(value)
+    start = value.replace(minute=0, second=0, microsecond=0)
+    return start, start + ONE_HOUR
+
+
+def date_span_bounds(start: DateLike, end: DateLike) -> Tuple[datetime, datetime]:
+    """[start, end) covering every whole day from ``start`` through ``end`` inclusive"""
+    return day_start(start), day_start(end) + ONE_DAY
+
+
+def range_predicate(column: str) -> str:
+    """Half-open range on ``column``; bind the (start, end) bounds as parameters"""
+    return f"{column} >= %s AND {column} < %s"
+
+
+def day_range(column: str, value: DateLike) -> Tuple[str, Tuple[datetime, datetime]]:
+    """Sargable replacement for ``DATE(column) = value``"""
+    return range_predicate(column), day_bounds(value)
+
+
+def hour_range(column: str, value: DateLike) -> Tuple[str, Tuple[datetime, datetime]]:
+    """Sargable replacement for ``DATE(column) = d AND HOUR(column) = h``"""
+    return range_predicate(column), hour_bounds(value)
+
+
+def date_span_range(column: str, start: DateLike, end: DateLike) -> Tuple[str, Tuple[datetime, datetime]]:
+    """Sargable replacement for ``DATE(column) BETWEEN start AND end``"""
+    return range_predicate(column), date_span_bounds(start, end)
+
+
+def before_day(column: str, value: DateLike) -> Tuple[str, Tuple[datetime]]:
+    """Sargable replacement for ``DATE(column) < value``"""
+    return f"{column} < %s", (day_start(value),)
+
+
+# ==============================================================================
+# HOT QUERY REGISTRY
+# ==============================================================================
+
+@dataclass(frozen=True)
+class RegisteredQuery:
+    """A hot query whose plan must use an index
+
+    ``sql`` and ``params`` are a representative instance of the query as the
+    service issues it; the verification tool runs ``EXPLAIN`` on them.
+    """
+    name: str
+    sql: str
+    params: Tuple
+
+
+_REGISTRY: Dict[str, RegisteredQuery] = {}
+
+
+def register_query(name: str, sql: str, params: Tuple = ()) -> RegisteredQuery:
+    """Add (or replace) a query in the plan-verification registry"""
+    query = RegisteredQuery(name, sql, tuple(params))
+    _REGISTRY[name] = query
+    return query
+
+
+def get_registered_queries() -> List[RegisteredQuery]:
+    return list(_REGISTRY.values())
+
+
+def existing_days_query(table: str, time_column: str, key_column: str = "symbol") -> str:
+    """Distinct days that already have rows for one key within a half-open range
+
+    Bind ``(key, *date_span_bounds(start, end))``.
+    """
+    return f"""
+        SELECT DISTINCT DATE({time_column}) AS date_only
+        FROM {table}
+        WHERE {key_column} = %s
+        AND {range_predicate(time_column)}
+    """
+
+
+def url_hash_probe_query(count: int) -> str:
+    """Stored crypto_news url_hashes among ``count`` candidates; bind the hashes"""
+    return f"SELECT url_hash FROM crypto_news WHERE url_hash IN ({', '.join(['%s'] * count)})"
+
+
+def price_history_query() -> str:
+    """One symbol's OHLCV rows within a half-open range, oldest first
+
+    Bind ``(symbol, *day_bounds(day))`` or ``(symbol, *date_span_bounds(start, end))``.
+    """
+    return f"""
+        SELECT timestamp_iso, open, high, low, close, volume
+        FROM price_data_real
+        WHERE symbol = %s
+        AND {range_predicate("timestamp_iso")}
+        ORDER BY timestamp_iso ASC
+    """
+
+
+def price_history_since_query() -> str:
+    """One symbol's OHLCV rows strictly newer than a timestamp, oldest first
+
+    Bind ``(symbol, since)``.
+    """
+    return """
+        SELECT timestamp_iso, open, high, low, close, volume
+        FROM price_data_real
+        WHERE symbol = %s
+        AND timestamp_iso > %s
+        ORDER BY timestamp_iso ASC
+    """
+
+
+def latest_ohlc_query() -> str:
+    """Latest ohlc_data candle of one symbol within a range; bind ``(symbol, *day_bounds(day))``"""
+    return f"""
+        SELECT
+            open_price,
+            high_price,
+            low_price,
+            close_price,
+            volume as ohlc_volume,
+            data_source as ohlc_source
+        FROM ohlc_data
+        WHERE symbol = %s
+        AND {range_predicate("timestamp_iso")}
+        ORDER BY timestamp_iso DESC
+        LIMIT 1
+    """
+
+
+def technical_span_query() -> str:
+    """One symbol's technical indicators within a range, newest first
+
+    Bind ``(symbol, *date_span_bounds(start, end))``.
+    """
+    return f"""
+        SELECT
+            symbol, timestamp_iso, DATE(timestamp_iso) as tech_date,
+            rsi_14, sma_20, sma_50, sma_30, sma_200, ema_12, ema_20, ema_26, ema_50, ema_200,
+            macd, macd_signal, macd_histogram,
+            bb_upper, bb_middle, bb_lower, stoch_k, stoch_d, atr_14, vwap
+        FROM technical_indicators
+        WHERE symbol = %s
+        AND {range_predicate("timestamp_iso")}
+        ORDER BY timestamp_iso DESC
+    """
+
+
+def crypto_sentiment_hourly_query(per_asset: bool) -> str:
+    """Hourly crypto sentiment aggregates within a range, per asset or for ``crypto_general``
+
+    Bind ``date_span_bounds(start, end)``.
+    """
+    asset_column = "asset, " if per_asset else ""
+    asset_filter = "asset IS NOT NULL AND asset != 'crypto_general'" if per_asset else "asset = 'crypto_general'"
+    return f"""
+        SELECT
+            {asset_column}DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
+            COUNT(*) as sentiment_count,
+            AVG(cryptobert_score) as avg_cryptobert_score,
+            AVG(vader_score) as avg_vader_score,
+            AVG(textblob_score) as avg_textblob_score,
+            AVG(crypto_keywords_score) as avg_crypto_keywords_score
+        FROM crypto_news.crypto_sentiment_data
+        WHERE {range_predicate("published_at")}
+        AND {asset_filter}
+        GROUP BY {asset_column}sent_date, sent_hour
+    """
+
+
+def stock_sentiment_hourly_query() -> str:
+    """Hourly stock sentiment aggregates within a range; bind ``date_span_bounds(start, end)``"""
+    return f"""
+        SELECT
+            DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
+            COUNT(*) as sentiment_count,
+            AVG(finbert_sentiment_score) as avg_finbert_sentiment_score,
+            AVG(fear_greed_score) as avg_fear_greed_score,
+            AVG(volatility_sentiment) as avg_volatility_sentiment,
+            AVG(risk_appetite) as avg_risk_appetite,
+            AVG(crypto_correlation) as avg_crypto_correlation
+        FROM crypto_news.stock_sentiment_data
+        WHERE {range_predicate("published_at")}
+        GROUP BY sent_date, sent_hour
+    """
+
+
+def social_sentiment_hourly_query(asset_count: int) -> str:
+    """Hourly social sentiment for ``asset_count`` lower-cased asset aliases within a range
+
+    Bind ``(*aliases, *date_span_bounds(start, end))``.
+    """
+    return f"""
+        SELECT
+            DATE(timestamp) AS price_date,
+            HOUR(timestamp) AS price_hour,
+            COUNT(*) AS social_post_count,
+            AVG(sentiment_score) AS social_avg_sentiment,
+            AVG(confidence) AS social_avg_confidence,
+            COUNT(DISTINCT author) AS social_unique_authors
+        FROM crypto_news.social_sentiment_data
+        WHERE LOWER(asset) IN ({",".join(["%s"] * asset_count)})
+            AND {range_predicate("timestamp")}
+        GROUP BY price_date, price_hour
+    """
+
+
+def onchain_span_query() -> str:
+    """One symbol's crypto_onchain_data rows within a range, newest first
+
+    Bind ``(symbol, *date_span_bounds(start, end))``.
+    """
+    return f"""
+        SELECT
+            coin_symbol as symbol,
+            DATE(timestamp) as onchain_date,
+            active_addresses_24h,
+            transaction_count_24h,
+            exchange_net_flow_24h,
+            price_volatility_7d
+        FROM crypto_onchain_data
+        WHERE coin_symbol = %s
+        AND {range_predicate("timestamp")}
+        AND active_addresses_24h IS NOT NULL
+        AND transaction_count_24h IS NOT NULL
+        ORDER BY timestamp DESC
+    """
+
+
+def placeholder_cleanup_query(table: str, time_column: str) -> str:
+    """Delete a table's unfilled placeholder rows older than a cutoff
+
+    Bind ``(day_start(cutoff_day),)``; the bare column keeps the range indexable.
+    """
+    return f"""
+        DELETE FROM {table}
+        WHERE data_completeness_percentage = 0
+        AND data_source LIKE '%%placeholder%%'
+        AND {time_column} < %s
+    """
+
+
+# Tables the placeholder manager prunes, with the column their cutoff applies to
+PLACEHOLDER_CLEANUP_COLUMNS = {
+    "macro_indicators": "indicator_date",
+    "technical_indicators": "timestamp",
+    "crypto_onchain_data": "data_date",
+    "sentiment_analysis_results": "timestamp",
+}
+
+
+def hourly_prices_query(symbol_count: int) -> str:
+    """Latest crypto_prices row per (symbol, hour) in a window, joined to the same hour a day earlier
+
+    Bind ``(*symbols, window_start - ONE_DAY, window_end, window_start)``.
+    """
+    placeholders = ",".join(["%s"] * symbol_count)
+    return f"""
+        WITH hourly AS (
+            SELECT
+                symbol, timestamp_iso, price_date, price_hour, price, volume,
+                market_cap, price_change_24h, percent_change_24h
+            FROM (
+                SELECT
+                    symbol, timestamp_iso, price, volume, market_cap,
+                    price_change_24h, percent_change_24h,
+                    DATE(timestamp_iso) AS price_date,
+                    HOUR(timestamp_iso) AS price_hour,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY symbol, DATE(timestamp_iso), HOUR(timestamp_iso)
+                        ORDER BY timestamp_iso DESC
+                    ) AS rn
+                FROM crypto_prices
+                WHERE symbol IN ({placeholders})
+                AND {range_predicate("timestamp_iso")}
+                AND price IS NOT NULL
+            ) ranked
+            WHERE rn = 1
+        )
+        SELECT
+            cur.symbol, cur.timestamp_iso, cur.price_date, cur.price_hour,
+            cur.price AS current_price, cur.volume AS volume_usd_24h,
+            cur.market_cap, cur.price_change_24h,
+            cur.percent_change_24h AS price_change_percentage_24h,
+            prev.price AS price_24h_ago
+        FROM hourly cur
+        LEFT JOIN hourly prev
+            ON prev.symbol = cur.symbol
+            AND prev.price_date = cur.price_date - INTERVAL 1 DAY
+            AND prev.price_hour = cur.price_hour
+            AND prev.price > 0
+        WHERE cur.timestamp_iso >= %s
+        ORDER BY cur.symbol, cur.timestamp_iso
+    """
+
+
+def latest_per_day_query(table: str, symbol_column: str, time_column: str, columns: Sequence[str],
+                         symbol_count: int, extra_where: str = "") -> str:
+    """Latest row per (symbol, day) of a daily source within a range
+
+    Bind ``(*symbols, range_start, range_end)``.
+    """
+    return f"""
+        SELECT * FROM (
+            SELECT
+                {symbol_column} AS symbol,
+                DATE({time_column}) AS source_date,
+                {", ".join(columns)},
+                ROW_NUMBER() OVER (
+                    PARTITION BY {symbol_column}, DATE({time_column})
+                    ORDER BY {time_column} DESC
+                ) AS rn
+            FROM {table}
+            WHERE {symbol_column} IN ({",".join(["%s"] * symbol_count)})
+            AND {range_predicate(time_column)}
+            {extra_where}
+        ) ranked
+        WHERE rn = 1
+    """
+
+
+def crypto_sentiment_assets_hourly_query(asset_count: int) -> str:
+    """Hourly crypto sentiment aggregates for ``asset_count`` assets within a range
+
+    Bind ``(window_start, window_end, *assets)``.
+    """
+    return f"""
+        SELECT
+            asset, DATE(published_at) as sent_date, HOUR(published_at) as sent_hour,
+            COUNT(*) as sentiment_count,
+            AVG(cryptobert_score) as avg_cryptobert_score,
+            AVG(vader_score) as avg_vader_score,
+            AVG(textblob_score) as avg_textblob_score,
+            AVG(crypto_keywords_score) as avg_crypto_keywords_score
+        FROM crypto_news.crypto_sentiment_data
+        WHERE {range_predicate("published_at")}
+        AND asset IN ({",".join(["%s"] * asset_count)})
+        GROUP BY asset, sent_date, sent_hour
+    """
+
+
+def social_sentiment_by_symbol_hourly_query(alias_count: int) -> str:
+    """Hourly social sentiment per symbol, mapping ``alias_count`` lower-cased aliases in SQL
+
+    Mapping in SQL lets ``COUNT(DISTINCT author)`` span every alias of a symbol.
+    Bind ``(*(alias, symbol) pairs, window_start, window_end, *aliases)``.
+    """
+    case_clause = " ".join(["WHEN %s THEN %s"] * alias_count)
+    return f"""
+        SELECT
+            CASE LOWER(asset) {case_clause} END AS symbol,
+            DATE(timestamp) AS price_date,
+            HOUR(timestamp) AS price_hour,
+            COUNT(*) AS social_post_count,
+            AVG(sentiment_score) AS social_avg_sentiment,
+            AVG(confidence) AS social_avg_confidence,
+            COUNT(DISTINCT author) AS social_unique_authors
+        FROM crypto_news.social_sentiment_data
+        WHERE {range_predicate("timestamp")}
+        AND LOWER(asset) IN ({",".join(["%s"] * alias_count)})
+        GROUP BY symbol, price_date, price_hour
+    """
+
+
+def _register_hot_queries():
+    """Register the hot queries, built by the same functions the services call"""
+    today = date.today()
+    week_ago = today - timedelta(days=7)
+    span = date_span_bounds(week_ago, today)
+    day = day_bounds(today)
+
+    register_query("prices.get_missing_dates", existing_days_query("price_data_real", "timestamp_iso"), ("BTC", *span))
+    register_query("news.url_hash_probe", url_hash_probe_query(2), ("0" * 32, "f" * 32))
+    register_query("onchain.get_missing_onchain_dates", existing_days_query("onchain_data", "timestamp_iso"), ("BTC", *span))
+    register_query("technical.get_historical_price_data", price_history_query(), ("BTC", *day))
+    register_query("technical.get_price_data_since", price_history_since_query(), ("BTC", day[0]))
+    register_query("materialized.daily_ohlc", latest_ohlc_query(), ("BTC", *day))
+    register_query("materialized.technical_span", technical_span_query(), ("BTC", *span))
+    register_query("materialized.crypto_sentiment_span", crypto_sentiment_hourly_query(per_asset=True), span)
+    register_query("materialized.crypto_general_sentiment_span", crypto_sentiment_hourly_query(per_asset=False), span)
+    register_query("materialized.stock_sentiment_span", stock_sentiment_hourly_query(), span)
+    register_query("materialized.social_sentiment_span", social_sentiment_hourly_query(2), ("btc", "bitcoin", *span))
+    register_query("materialized.onchain_span", onchain_span_query(), ("BTC", *span))
+
+    for table, time_column in PLACEHOLDER_CLEANUP_COLUMNS.items():
+        register_query(f"placeholders.cleanup_old_placeholders.{table}",
+                       placeholder_cleanup_query(table, time_column), (day_start(week_ago),))
+
+    # Set-based realtime updater: one window of two symbols
+    symbols = ("BTC", "ETH")
+    window = day_bounds(today)
+    register_query("materialized.fetch_hourly_prices", hourly_prices_query(len(symbols)),
+                   (*symbols, window[0] - ONE_DAY, window[1], window[0]))
+    for name, table, symbol_column, time_column, columns in (
+        ("ohlc", "ohlc_data", "symbol", "timestamp_iso", ["open_price", "close_price"]),
+        ("technical", "technical_indicators", "symbol", "timestamp_iso", ["rsi_14", "sma_20"]),
+        ("onchain", "crypto_onchain_data", "coin_symbol", "timestamp", ["active_addresses_24h"]),
+    ):
+        register_query(f"materialized.fetch_latest_per_day.{name}",
+                       latest_per_day_query(table, symbol_column, time_column, columns, len(symbols)),
+                       (*symbols, *window))
+    register_query("materialized.fetch_coin_sentiment_by_hour", crypto_sentiment_assets_hourly_query(3),
+                   (*window, *symbols, "crypto_general"))
+    register_query("materialized.fetch_social_sentiment_by_hour", social_sentiment_by_symbol_hourly_query(2),
+                   ("btc", "BTC", "bitcoin", "BTC", *window, "btc", "bitcoin"))
+
+
+_register_hot_queries()
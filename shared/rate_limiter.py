@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Centralized API Rate Limiting
+Token-bucket limiters per API provider, driven by ``RATE_LIMITS`` in
+``shared.scheduling_config``.
+
+Each provider gets one bucket refilled at ``calls_per_minute / 60`` tokens per
+second and holding at most ``burst_allowance`` tokens. Async callers queue
+behind a single dispatcher that sleeps exactly as long as the bucket needs to
+refill, so waiting costs no polling. Bucket state lives in a pluggable
+backend: ``InMemoryRateLimitBackend`` for a single process, or
+``RedisRateLimitBackend`` so every collector pod draws from the same budget.
+"""
+
+import abc
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(abc.ABC):
+    """Storage for token-bucket state shared by one or more limiters"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def take(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        """Take ``tokens`` from the bucket if available
+
+        Returns 0.0 when the tokens were taken, otherwise the number of seconds
+        until enough tokens will have been refilled (nothing is taken).
+        """
+
+    async def take_async(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        return self.take(key, tokens, rate, capacity)
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local bucket state; safe to share between threads and event loops"""
+
+    name = "memory"
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        # The critical section is pure arithmetic, so the lock is never held
+        # across an await or a sleep
+        with self._lock:
+            now = self._clock()
+            available, updated = self._buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - updated) * rate)
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                return 0.0
+            self._buckets[key] = (available, now)
+            return (tokens - available) / rate
+
+
+# Same algorithm as the in-memory backend, evaluated atomically on the Redis
+# server using its clock so pods with skewed clocks still agree. The wait is
+# returned as a string because Redis truncates Lua numbers to integers.
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local available = tonumber(state[1])
+local updated = tonumber(state[2])
+if available == nil or updated == nil then
+    available = capacity
+    updated = now
+end
+available = math.min(capacity, available + math.max(0, now - updated) * rate)
+local wait = 0
+if available >= requested then
+    available = available - requested
+else
+    wait = (requested - available) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(available), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Bucket state stored in Redis (or any server speaking the Redis protocol
+    with Lua scripting), shared by every process using the same key prefix
+
+    Args:
+        client: ``redis.Redis`` or ``redis.asyncio.Redis`` instance
+        key_prefix: Namespace for bucket keys
+        fallback: Backend used while Redis is unreachable; defaults to a
+            process-local in-memory backend so collectors keep their own limit
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, key_prefix: str = "rate_limit",
+                 fallback: Optional[RateLimitBackend] = None):
+        self._client = client
+        self._key_prefix = key_prefix
+        self._fallback = fallback or InMemoryRateLimitBackend()
+        self._is_async = asyncio.iscoroutinefunction(getattr(client, "eval", None))
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisRateLimitBackend":
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=2), **kwargs)
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}:{key}"
+
+    def _fallback_take(self, error: Exception, key: str, tokens: float, rate: float, capacity: float) -> float:
+        logger.warning(f"⚠️ Redis rate limit backend unavailable, using local bucket for {key}: {error}")
+        return self._fallback.take(key, tokens, rate, capacity)
+
+    def take(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        if self._is_async:
+            raise RuntimeError("Blocking take() needs a synchronous Redis client")
+        try:
+            return float(self._client.eval(_REDIS_TOKEN_BUCKET, 1, self._key(key), rate, capacity, tokens))
+        except Exception as e:
+            return self._fallback_take(e, key, tokens, rate, capacity)
+
+    async def take_async(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        if not self._is_async:
+            return await asyncio.to_thread(self.take, key, tokens, rate, capacity)
+        try:
+            return float(await self._client.eval(_REDIS_TOKEN_BUCKET, 1, self._key(key), rate, capacity, tokens))
+        except Exception as e:
+            return self._fallback_take(e, key, tokens, rate, capacity)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token-bucket limiter for one API provider
+
+    Async waiters are served in FIFO order by a single dispatcher task; each
+    waiter is woken exactly once, when its tokens have been taken.
+
+    Args:
+        name: Bucket key (normally the provider name from ``RATE_LIMITS``)
+        calls_per_minute: Sustained request budget
+        burst: Bucket capacity, i.e. calls allowed back to back after idling
+        backend: Where bucket state lives; defaults to process-local memory
+    """
+
+    def __init__(self, name: str, calls_per_minute: float, burst: float = 1,
+                 backend: Optional[RateLimitBackend] = None):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        self.name = name
+        self.calls_per_minute = calls_per_minute
+        self.rate = calls_per_minute / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.backend = backend or InMemoryRateLimitBackend()
+
+        self._waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._stats = {"granted": 0, "waited": 0, "wait_seconds_total": 0.0}
+
+    def _check_tokens(self, tokens: float):
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot take {tokens} tokens from {self.name} (capacity {self.capacity})")
+
+    def _record(self, started: Optional[float]):
+        self._stats["granted"] += 1
+        if started is not None:
+            self._stats["waited"] += 1
+            self._stats["wait_seconds_total"] += time.monotonic() - started
+
+    async def acquire(self, tokens: float = 1, timeout: Optional[float] = None):
+        """Wait until ``tokens`` are available and take them
+
+        Raises:
+            asyncio.TimeoutError: if ``timeout`` seconds pass first
+        """
+        self._check_tokens(tokens)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures belong to one loop; start fresh if the caller's loop changed
+            self._loop = loop
+            self._waiters = deque()
+            self._dispatcher = None
+
+        if not self._waiters and await self.backend.take_async(self.name, tokens, self.rate, self.capacity) <= 0:
+            self._record(None)
+            return
+
+        started = time.monotonic()
+        future = loop.create_future()
+        self._waiters.append((future, tokens))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        # A cancelled or timed-out waiter leaves a done future that the
+        # dispatcher skips
+        await asyncio.wait_for(future, timeout)
+        self._record(started)
+
+    # Name used by collectors written against the previous BaseCollector limiter
+    wait_for_token = acquire
+
+    async def _dispatch(self):
+        while self._waiters:
+            future, tokens = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            wait = await self.backend.take_async(self.name, tokens, self.rate, self.capacity)
+            if wait <= 0:
+                self._waiters.popleft()
+                if not future.done():
+                    future.set_result(None)
+            else:
+                await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take ``tokens`` if immediately available, without waiting"""
+        self._check_tokens(tokens)
+        if self._waiters or self.backend.take(self.name, tokens, self.rate, self.capacity) > 0:
+            return False
+        self._record(None)
+        return True
+
+    def acquire_blocking(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Blocking variant for synchronous collectors; sleeps only as long as
+        the bucket needs to refill. Returns False if ``timeout`` expires."""
+        self._check_tokens(tokens)
+        started = time.monotonic()
+        waited = False
+        while True:
+            wait = self.backend.take(self.name, tokens, self.rate, self.capacity)
+            if wait <= 0:
+                self._record(started if waited else None)
+                return True
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            waited = True
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "backend": self.backend.name,
+            "calls_per_minute": self.calls_per_minute,
+            "burst": self.capacity,
+            "waiting": sum(1 for future, _ in self._waiters if not future.done()),
+            **self._stats,
+        }
+
+
+# ==============================================================================
+# PROCESS-WIDE REGISTRY
+# ==============================================================================
+
+_backend: Optional[RateLimitBackend] = None
+_limiters: Dict[str, TokenBucketRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_backend() -> RateLimitBackend:
+    backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend_name != "redis":
+        return InMemoryRateLimitBackend()
+
+    try:
+        import redis
+        url = os.getenv("RATE_LIMIT_REDIS_URL")
+        if url:
+            client = redis.Redis.from_url(url, socket_timeout=2)
+        else:
+            from shared.database_config import get_redis_config
+            client = redis.Redis(**{**get_redis_config(), "socket_timeout": 2})
+        logger.info("✅ Using Redis rate limit backend")
+        return RedisRateLimitBackend(client, key_prefix=os.getenv("RATE_LIMIT_KEY_PREFIX", "rate_limit"))
+    except Exception as e:
+        logger.warning(f"⚠️ Redis rate limit backend unavailable, falling back to memory: {e}")
+        return InMemoryRateLimitBackend()
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Get the process-wide backend selected by RATE_LIMIT_BACKEND (memory|redis)"""
+    global _backend
+    if _backend is None:
+        with _registry_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def get_rate_limiter(provider: str) -> TokenBucketRateLimiter:
+    """Get the shared limiter for a provider listed in RATE_LIMITS"""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        from shared.scheduling_config import get_rate_limit_config
+        config = get_rate_limit_config(provider)
+        backend = get_rate_limit_backend()
+        with _registry_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limiter = TokenBucketRateLimiter(
+                    provider,
+                    calls_per_minute=config["calls_per_minute"],
+                    burst=config.get("burst_allowance", 1),
+                    backend=backend,
+                )
+                _limiters[provider] = limiter
+    return limiter
+
+
+def get_all_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every limiter created in this process"""
+    return {name: limiter.get_stats() for name, limiter in list(_limiters.items())}
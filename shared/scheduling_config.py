@@ -132,6 +132,69 @@ RATE_LIMITS = {
     "news_apis": {
         "calls_per_minute": 60,
         "delay_between_calls": 1.0
+    },
+    "coingecko_free": {
+        "calls_per_minute": 60,
+        "delay_between_calls": 1.0
+    },
+    "defillama": {
+        "calls_per_minute": 120,
+        "delay_between_calls": 0.5
+    },
+    "blockchain_apis": {
+        "calls_per_minute": 30,
+        "delay_between_calls": 2.0
+    },
+    "onchain_additional_apis": {
+        "calls_per_minute": 40,
+        "delay_between_calls": 1.5
+    }
+}
+
+# HTTP connection pool, timeout and retry settings per provider; each entry
+# overrides the "default" entry (see shared.http_client)
+HTTP_CLIENTS = {
+    "default": {
+        "total_timeout": 30,
+        "connect_timeout": 10,
+        "max_connections": 50,
+        "max_connections_per_host": 10,
+        "keepalive_timeout": 60,
+        "dns_cache_ttl": 300,
+        "auto_decompress": True,
+        "json_decoder": "json",
+        "max_retries": 3,
+        "backoff_base": 0.5,
+        "backoff_max": 10.0,
+        "retry_statuses": [500, 502, 503, 504]
+    },
+    "coingecko_premium": {
+        "max_connections_per_host": 20
+    },
+    "coingecko_free": {
+        "max_connections_per_host": 4,
+        "backoff_base": 2.0
+    },
+    "coinbase": {
+        "total_timeout": 10
+    },
+    "defillama": {
+        "total_timeout": 60,  # /protocols is several MB
+        "max_connections_per_host": 4
+    },
+    "fred_api": {
+        "max_connections_per_host": 8
+    },
+    "news_apis": {
+        "max_connections_per_host": 2
+    },
+    "blockchain_apis": {
+        "max_connections_per_host": 4,
+        "backoff_base": 1.0
+    },
+    "onchain_additional_apis": {
+        "max_connections_per_host": 4,
+        "backoff_base": 1.0
     }
 }
 
@@ -242,6 +305,12 @@ def get_rate_limit_config(api_name: str) -> Dict[str, Any]:
         raise ValueError(f"Unknown API: {api_name}")
     return RATE_LIMITS[api_name].copy()
 
+def get_http_client_config(provider: str) -> Dict[str, Any]:
+    """Get HTTP client settings for a provider, merged over the defaults"""
+    config = HTTP_CLIENTS["default"].copy()
+    config.update(HTTP_CLIENTS.get(provider, {}))
+    return config
+
 def get_api_delay(api_name: str) -> float:
     """Get delay between API calls"""
     config = get_rate_limit_config(api_name)
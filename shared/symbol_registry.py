@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Symbol Registry
+Process-wide, in-memory view of ``crypto_assets`` for every collector.
+
+The whole table is loaded with one query into an immutable snapshot:
+
+    symbol -> SymbolRecord (coingecko_id, name, aliases, exchanges, row metadata)
+    alias / name (lowercase) -> symbol
+
+Lookups never touch MySQL. After ``refresh_seconds`` the next lookup runs a
+cheap ``CHECKSUM TABLE`` version check and only reloads the table when it
+changed; a new snapshot replaces the old one in a single assignment, so
+readers always see one consistent version.
+
+Usage:
+    registry = get_symbol_registry()
+    coin_id = registry.coingecko_id('BTC') or 'btc'
+    symbols = registry.collector_symbols('onchain')
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXCHANGE_SUPPORT_SUFFIX = "_supported"
+
+
+@dataclass(frozen=True)
+class SymbolRecord:
+    """One ``crypto_assets`` row"""
+    symbol: str
+    name: Optional[str]
+    coingecko_id: Optional[str]
+    market_cap_rank: Optional[int]
+    is_active: bool
+    aliases: Tuple[str, ...] = ()
+    exchanges: FrozenSet[str] = frozenset()
+    metadata: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+    def supported_on(self, exchange: str) -> bool:
+        return exchange.lower() in self.exchanges
+
+
+def _parse_aliases(value: Any) -> Tuple[str, ...]:
+    """``aliases`` is a JSON column; the driver may hand back text or a list"""
+    if not value:
+        return ()
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [part.strip() for part in value.split(",")]
+    if isinstance(value, str):
+        value = [value]
+    return tuple(str(alias) for alias in value if alias)
+
+
+def build_symbol_record(row: Dict[str, Any]) -> SymbolRecord:
+    """SymbolRecord from a dictionary-cursor row"""
+    rank = row.get("market_cap_rank")
+    return SymbolRecord(
+        symbol=str(row["symbol"]).upper(),
+        name=row.get("name"),
+        coingecko_id=row.get("coingecko_id") or None,
+        market_cap_rank=int(rank) if rank is not None else None,
+        is_active=bool(row.get("is_active", 1)),
+        aliases=_parse_aliases(row.get("aliases")),
+        exchanges=frozenset(
+            column[:-len(EXCHANGE_SUPPORT_SUFFIX)]
+            for column, value in row.items()
+            if column.endswith(EXCHANGE_SUPPORT_SUFFIX) and value
+        ),
+        metadata=MappingProxyType(dict(row)),
+    )
+
+
+def exchange_format(symbol: str, exchange: str) -> str:
+    """BTC / BTCUSD -> BTC-USD on coinbase, BTCUSDT on binance; unchanged elsewhere"""
+    base = symbol[:-3] if symbol.endswith("USD") else symbol
+    if exchange == "coinbase":
+        return f"{base}-USD"
+    if exchange == "binance":
+        return f"{base}USDT"
+    return symbol
+
+
+def _rank_order(record: SymbolRecord) -> Tuple:
+    """``ORDER BY market_cap_rank, symbol`` as MySQL sorts it (NULL ranks first)"""
+    return (record.market_cap_rank is not None, record.market_cap_rank or 0, record.symbol)
+
+
+@dataclass(frozen=True)
+class SymbolRegistrySnapshot:
+    """Immutable indexes built from one ``crypto_assets`` load"""
+    loaded_at: float
+    version: Optional[int] = None
+    records: Mapping[str, SymbolRecord] = field(default_factory=lambda: MappingProxyType({}))
+    aliases: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], loaded_at: float,
+                  version: Optional[int] = None) -> "SymbolRegistrySnapshot":
+        records = {}
+        for row in rows:
+            if row.get("symbol"):
+                record = build_symbol_record(row)
+                records[record.symbol] = record
+
+        # Names and aliases never shadow a real symbol or an active asset
+        aliases: Dict[str, str] = {}
+        for record in sorted(records.values(), key=lambda r: (not r.is_active, _rank_order(r))):
+            for alias in (record.name, *record.aliases):
+                if alias:
+                    aliases.setdefault(str(alias).strip().lower(), record.symbol)
+        for symbol in records:
+            aliases[symbol.lower()] = symbol
+
+        return cls(
+            loaded_at=loaded_at,
+            version=version,
+            records=MappingProxyType(records),
+            aliases=MappingProxyType(aliases),
+        )
+
+    def resolve(self, symbol_or_alias: str) -> Optional[str]:
+        """Canonical symbol for a symbol, asset name or alias"""
+        if not symbol_or_alias:
+            return None
+        key = symbol_or_alias.strip()
+        if key.upper() in self.records:
+            return key.upper()
+        return self.aliases.get(key.lower())
+
+    def get(self, symbol_or_alias: str) -> Optional[SymbolRecord]:
+        symbol = self.resolve(symbol_or_alias)
+        return self.records.get(symbol) if symbol else None
+
+    def active(self) -> List[SymbolRecord]:
+        """Active records in market-cap-rank order"""
+        return sorted((r for r in self.records.values() if r.is_active), key=_rank_order)
+
+
+def _connect_crypto_prices():
+    import mysql.connector
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST", "172.22.32.1"),
+        port=int(os.getenv("MYSQL_PORT", "3306")),
+        user=os.getenv("MYSQL_USER", "news_collector"),
+        password=os.getenv("MYSQL_PASSWORD", "99Rules!"),
+        database="crypto_prices",
+        charset='utf8mb4'
+    )
+
+
+class SymbolRegistry:
+    """
+    TTL-refreshed ``crypto_assets`` snapshot with in-memory lookups
+
+    Args:
+        connect: Returns a new MySQL connection to the database holding crypto_assets
+        refresh_seconds: Age after which the next lookup runs the version check
+        retry_seconds: Delay before retrying after a failed load
+    """
+
+    def __init__(self, connect: Callable[[], Any] = _connect_crypto_prices,
+                 refresh_seconds: float = 3600, retry_seconds: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self._connect = connect
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._snapshot = SymbolRegistrySnapshot(loaded_at=0.0)
+        self._next_check = 0.0
+        self._loaded = False
+        self._refresh_lock = threading.Lock()
+        self.stats = {"loads": 0, "version_checks": 0, "unchanged": 0, "load_errors": 0}
+
+    def _table_version(self, conn) -> Optional[int]:
+        """``CHECKSUM TABLE`` of crypto_assets; None if the server cannot say"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("CHECKSUM TABLE crypto_assets")
+            row = cursor.fetchone()
+            return int(row[1]) if row and row[1] is not None else None
+        except Exception as e:
+            logger.debug(f"crypto_assets version check unavailable: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def _reload(self, force: bool):
+        conn = self._connect()
+        try:
+            self.stats["version_checks"] += 1
+            version = self._table_version(conn)
+            if not force and self._loaded and version is not None and version == self._snapshot.version:
+                self.stats["unchanged"] += 1
+                return
+
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT * FROM crypto_assets")
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+        self._snapshot = SymbolRegistrySnapshot.from_rows(rows, self._clock(), version)
+        self._loaded = True
+        self.stats["loads"] += 1
+        logger.info(f"✅ Symbol registry loaded {len(self._snapshot.records)} assets from crypto_assets")
+
+    def refresh(self, force: bool = False) -> SymbolRegistrySnapshot:
+        """Version-check (or with ``force``, reload) now, keeping the old snapshot on failure"""
+        with self._refresh_lock:
+            if not force and self._clock() < self._next_check:
+                return self._snapshot
+            try:
+                self._reload(force)
+                self._next_check = self._clock() + self.refresh_seconds
+            except Exception as e:
+                self.stats["load_errors"] += 1
+                self._next_check = self._clock() + self.retry_seconds
+                logger.warning(f"Symbol registry refresh failed: {e}")
+        return self._snapshot
+
+    def snapshot(self) -> SymbolRegistrySnapshot:
+        """Current snapshot, refreshing it first if it is due"""
+        if self._clock() < self._next_check:
+            return self._snapshot
+        return self.refresh()
+
+    def preload(self) -> SymbolRegistrySnapshot:
+        """Load up front so the first collection cycle does not pay for it"""
+        return self.refresh()
+
+    # Lookups - all served from the current snapshot
+
+    def resolve(self, symbol_or_alias: str) -> Optional[str]:
+        return self.snapshot().resolve(symbol_or_alias)
+
+    def get(self, symbol_or_alias: str) -> Optional[SymbolRecord]:
+        return self.snapshot().get(symbol_or_alias)
+
+    def coingecko_id(self, symbol_or_alias: str) -> Optional[str]:
+        record = self.get(symbol_or_alias)
+        return record.coingecko_id if record else None
+
+    def coingecko_ids(self, symbols: List[str]) -> Dict[str, Optional[str]]:
+        snapshot = self.snapshot()
+        return {
+            symbol: (record.coingecko_id if record else None)
+            for symbol, record in ((s, snapshot.get(s)) for s in symbols)
+        }
+
+    def exists(self, symbol: str) -> bool:
+        """True if ``symbol`` is an active asset"""
+        record = self.snapshot().records.get(symbol.upper()) if symbol else None
+        return bool(record and record.is_active)
+
+    def metadata(self, symbol: str) -> Dict[str, Any]:
+        """The active asset's full crypto_assets row, or {}"""
+        record = self.snapshot().records.get(symbol.upper()) if symbol else None
+        return dict(record.metadata) if record and record.is_active else {}
+
+    def collector_symbols(self, collector_type: str) -> List[str]:
+        """Active symbols for a collector type, in market-cap-rank order"""
+        collector_type = collector_type.lower()
+        records = self.snapshot().active()
+        if collector_type in ("coinbase", "price", "technical"):
+            # Price/technical collectors prioritize coinbase-supported symbols
+            records = [r for r in records if r.supported_on("coinbase")]
+        elif collector_type == "onchain":
+            # Onchain data availability follows market cap
+            records = [r for r in records if r.market_cap_rank is not None and r.market_cap_rank <= 100]
+        elif collector_type == "sentiment":
+            records = [r for r in records if r.aliases or r.name]
+        return [r.symbol for r in records]
+
+    def exchange_symbols(self, exchange: str = "coinbase") -> Dict[str, str]:
+        """Exchange-format symbol -> internal symbol for the active assets an exchange lists"""
+        records = sorted(self.snapshot().active(), key=lambda r: r.symbol)
+        if exchange == "coinbase":
+            records = [r for r in records if r.supported_on("coinbase")]
+        return {exchange_format(r.symbol, exchange): r.symbol for r in records}
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self.stats,
+            "assets": len(snapshot.records),
+            "version": snapshot.version,
+            "age_seconds": round(self._clock() - snapshot.loaded_at, 1) if self._loaded else None,
+        }
+
+
+# ==============================================================================
+# PROCESS-WIDE REGISTRY
+# ==============================================================================
+
+_registry: Optional[SymbolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """Get the process-wide registry (refresh interval from SYMBOL_REGISTRY_REFRESH_SECONDS)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SymbolRegistry(
+                    refresh_seconds=float(os.getenv("SYMBOL_REGISTRY_REFRESH_SECONDS", "3600")),
+                )
+    return _registry
@@ -82,93 +82,21 @@ EXCHANGE_FORMATS = {
     }
 }
 
+def _symbol_registry():
+    """Process-wide crypto_assets registry (this module is also imported as a flat module)"""
+    try:
+        from shared.symbol_registry import get_symbol_registry
+    except ImportError:
+        from symbol_registry import get_symbol_registry
+    return get_symbol_registry()
+
 # Dynamic symbol management functions (replaces hardcoded mappings)
 def get_exchange_symbol_mappings(exchange: str = "coinbase", use_cache: bool = True) -> dict:
-    """Get symbol mappings from crypto_assets table dynamically"""
-    import mysql.connector
-    import os
-    from datetime import datetime, timedelta
-    
-    # Simple caching to avoid repeated DB calls
-    cache_key = f"_symbol_cache_{exchange}"
-    cache_time_key = f"_symbol_cache_time_{exchange}"
-    cache_duration = timedelta(hours=1)  # Cache for 1 hour
-    
-    # Check cache
-    if use_cache and hasattr(get_exchange_symbol_mappings, cache_key):
-        cache_time = getattr(get_exchange_symbol_mappings, cache_time_key, None)
-        if cache_time and datetime.now() - cache_time < cache_duration:
-            return getattr(get_exchange_symbol_mappings, cache_key)
-    
-    try:
-        # Connect to database
-        conn = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "172.22.32.1"),
-            port=int(os.getenv("MYSQL_PORT", "3306")),
-            user=os.getenv("MYSQL_USER", "news_collector"),
-            password=os.getenv("MYSQL_PASSWORD", "99Rules!"),
-            database="crypto_prices",
-            charset='utf8mb4'
-        )
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get symbols based on exchange support
-        if exchange == "coinbase":
-            query = """
-                SELECT symbol, name, coingecko_id, aliases 
-                FROM crypto_assets 
-                WHERE is_active = 1 AND coinbase_supported = 1
-                ORDER BY symbol
-            """
-        else:
-            # For other exchanges, get all active symbols
-            query = """
-                SELECT symbol, name, coingecko_id, aliases 
-                FROM crypto_assets 
-                WHERE is_active = 1
-                ORDER BY symbol
-            """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        # Build mapping dictionary
-        mappings = {}
-        for row in results:
-            internal_symbol = row['symbol']
-            
-            # Generate exchange-specific format
-            if exchange == "coinbase":
-                if internal_symbol.endswith('USD'):
-                    base = internal_symbol[:-3]
-                    exchange_format = f"{base}-USD"
-                else:
-                    exchange_format = f"{internal_symbol}-USD"
-            elif exchange == "binance":
-                if internal_symbol.endswith('USD'):
-                    base = internal_symbol[:-3]
-                    exchange_format = f"{base}USDT"
-                else:
-                    exchange_format = f"{internal_symbol}USDT"
-            else:
-                exchange_format = internal_symbol
-            
-            mappings[exchange_format] = internal_symbol
-        
-        cursor.close()
-        conn.close()
-        
-        # Cache results
-        setattr(get_exchange_symbol_mappings, cache_key, mappings)
-        setattr(get_exchange_symbol_mappings, cache_time_key, datetime.now())
-        
-        return mappings
-        
-    except Exception as e:
-        print(f"Warning: Could not load symbols from database: {e}")
-        # Fallback to empty dict if DB connection fails
-        return {}
+    """Get symbol mappings from crypto_assets table dynamically (served by the symbol registry)"""
+    registry = _symbol_registry()
+    if not use_cache:
+        registry.refresh(force=True)
+    return registry.exchange_symbols(exchange)
 
 def get_supported_symbols(exchange: str = "coinbase", format_type: str = "internal") -> list:
     """Get list of supported symbols from crypto_assets table"""
@@ -339,114 +267,15 @@ ARCHIVED_TABLES = {
 
 def get_collector_symbols(collector_type: str) -> list:
     """Get symbols for specific collector type from crypto_assets table"""
-    try:
-        import mysql.connector
-        import os
-        
-        conn = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "172.22.32.1"),
-            port=int(os.getenv("MYSQL_PORT", "3306")),
-            user=os.getenv("MYSQL_USER", "news_collector"),
-            password=os.getenv("MYSQL_PASSWORD", "99Rules!"),
-            database="crypto_prices",
-            charset='utf8mb4'
-        )
-        
-        cursor = conn.cursor()
-        
-        # Different queries based on collector type
-        if collector_type.lower() in ["coinbase", "price", "technical"]:
-            # For price/technical collectors, prioritize coinbase-supported symbols
-            cursor.execute(
-                "SELECT symbol FROM crypto_assets WHERE is_active = 1 AND coinbase_supported = 1 ORDER BY market_cap_rank, symbol"
-            )
-        elif collector_type.lower() == "onchain":
-            # For onchain, get top market cap symbols (onchain data availability)
-            cursor.execute(
-                "SELECT symbol FROM crypto_assets WHERE is_active = 1 AND market_cap_rank <= 100 ORDER BY market_cap_rank, symbol"
-            )
-        elif collector_type.lower() == "sentiment":
-            # For sentiment, get symbols with high social media presence
-            cursor.execute(
-                "SELECT symbol FROM crypto_assets WHERE is_active = 1 AND (aliases IS NOT NULL OR name IS NOT NULL) ORDER BY market_cap_rank, symbol"
-            )
-        else:
-            # Default: all active symbols
-            cursor.execute(
-                "SELECT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY market_cap_rank, symbol"
-            )
-        
-        symbols = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        
-        return symbols
-        
-    except Exception as e:
-        print(f"Warning: Could not get symbols from database: {e}")
-        return []  # Return empty list on error
+    return _symbol_registry().collector_symbols(collector_type)
 
 def validate_symbol_exists(symbol: str) -> bool:
     """Check if symbol exists in crypto_assets table"""
-    try:
-        import mysql.connector
-        import os
-        
-        conn = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "172.22.32.1"),
-            port=int(os.getenv("MYSQL_PORT", "3306")),
-            user=os.getenv("MYSQL_USER", "news_collector"),
-            password=os.getenv("MYSQL_PASSWORD", "99Rules!"),
-            database="crypto_prices",
-            charset='utf8mb4'
-        )
-        
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) FROM crypto_assets WHERE symbol = %s AND is_active = 1",
-            (symbol,)
-        )
-        
-        count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
-        
-        return count > 0
-        
-    except Exception as e:
-        print(f"Warning: Could not validate symbol {symbol}: {e}")
-        return False  # Assume invalid on error
+    return _symbol_registry().exists(symbol)
 
 def get_symbol_metadata(symbol: str) -> dict:
     """Get metadata for a symbol from crypto_assets table"""
-    try:
-        import mysql.connector
-        import os
-        
-        conn = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "172.22.32.1"),
-            port=int(os.getenv("MYSQL_PORT", "3306")),
-            user=os.getenv("MYSQL_USER", "news_collector"),
-            password=os.getenv("MYSQL_PASSWORD", "99Rules!"),
-            database="crypto_prices",
-            charset='utf8mb4'
-        )
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT * FROM crypto_assets WHERE symbol = %s AND is_active = 1",
-            (symbol,)
-        )
-        
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        
-        return result or {}
-        
-    except Exception as e:
-        print(f"Warning: Could not get metadata for {symbol}: {e}")
-        return {}
+    return _symbol_registry().metadata(symbol)
 
 # ==============================================================================
 # CONFIGURATION HELPERS
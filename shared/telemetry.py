@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Streaming Performance Telemetry
+Fixed-memory latency and throughput statistics per operation.
+
+Each operation (``collection``, ``db``, ``api`` ...) keeps:
+
+    LogHistogram   durations in logarithmic buckets: a constant number of
+                   counters, quantiles within ``growth - 1`` relative error
+    DecayingRate   exponentially decayed events/second for calls and errors
+
+Recording is O(1) and a summary costs the same whether a collector has run
+for a minute or a month. An optional Prometheus histogram (labelled by
+``operation``) receives every observation as well.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+# Prometheus buckets spanning fast queries to long backfills (seconds)
+PROMETHEUS_DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class LogHistogram:
+    """
+    Log-bucketed histogram of positive values
+
+    Bucket ``i`` holds values in [min_value * growth**i, min_value * growth**(i+1)).
+    Values below ``min_value`` or above ``max_value`` are clamped into the first
+    and last buckets; exact min/max are tracked separately.
+
+    Args:
+        min_value: Lower bound of the first bucket
+        max_value: Upper bound of the last bucket
+        growth: Ratio between consecutive bucket bounds (1.05 -> ~2.5% error)
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 3600.0, growth: float = 1.05):
+        if min_value <= 0 or max_value <= min_value or growth <= 1:
+            raise ValueError("need 0 < min_value < max_value and growth > 1")
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.counts: List[int] = [0] * (int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(int(math.log(value / self.min_value) / self._log_growth), len(self.counts) - 1)
+
+    def record(self, value: float):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (geometric bucket midpoint, clamped to min/max)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                value = self.min_value * self.growth ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class DecayingRate:
+    """
+    Exponentially decayed event rate
+
+    Each event's weight decays by ``e^(-age / tau)``; the rate is the decayed
+    weight divided by ``tau``, i.e. roughly events/second over the last ``tau``
+    seconds, without storing any events.
+    """
+
+    def __init__(self, tau_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.tau = tau_seconds
+        self.clock = clock
+        self._value = 0.0
+        self._updated = clock()
+
+    def _decay(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._value *= math.exp(-elapsed / self.tau)
+            self._updated = now
+
+    def mark(self, count: float = 1.0):
+        self._decay(self.clock())
+        self._value += count
+
+    def rate(self) -> float:
+        """Events per second"""
+        self._decay(self.clock())
+        return self._value / self.tau
+
+
+class OperationStats:
+    """Latency histogram and decayed call/error rates for one operation"""
+
+    def __init__(self, tau_seconds: float, clock: Callable[[], float]):
+        self.histogram = LogHistogram()
+        self.calls = DecayingRate(tau_seconds, clock)
+        self.errors = DecayingRate(tau_seconds, clock)
+        self.error_count = 0
+
+    def record(self, seconds: float, success: bool):
+        self.histogram.record(seconds)
+        self.calls.mark()
+        if not success:
+            self.error_count += 1
+            self.errors.mark()
+
+    def summary(self, quantiles=DEFAULT_QUANTILES) -> Dict[str, Any]:
+        histogram = self.histogram
+        summary = {
+            "count": histogram.count,
+            "errors": self.error_count,
+            "mean_seconds": histogram.mean,
+            "max_seconds": histogram.max,
+        }
+        for q in quantiles:
+            summary[f"p{round(q * 100):g}_seconds"] = histogram.quantile(q)
+        summary["calls_per_minute"] = round(self.calls.rate() * 60, 4)
+        summary["errors_per_minute"] = round(self.errors.rate() * 60, 4)
+        return summary
+
+
+class PerformanceTelemetry:
+    """
+    Per-operation streaming telemetry
+
+    Args:
+        prometheus_histogram: Optional prometheus_client Histogram with an
+            ``operation`` label; every recorded duration is observed on it
+        tau_seconds: Decay constant for the call/error rates
+        max_operations: Distinct operation names tracked; later names are ignored
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, prometheus_histogram=None, tau_seconds: float = 300.0,
+                 max_operations: int = 64, clock: Callable[[], float] = time.monotonic):
+        self.prometheus_histogram = prometheus_histogram
+        self.tau_seconds = tau_seconds
+        self.max_operations = max_operations
+        self.clock = clock
+        self._operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def record(self, operation: str, seconds: float, success: bool = True):
+        """Record one duration for ``operation``"""
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                if len(self._operations) >= self.max_operations:
+                    self.dropped += 1
+                    return
+                stats = self._operations[operation] = OperationStats(self.tau_seconds, self.clock)
+            stats.record(seconds, success)
+        if self.prometheus_histogram is not None:
+            self.prometheus_histogram.labels(operation=operation).observe(seconds)
+
+    @contextmanager
+    def timer(self, operation: str) -> Iterator[None]:
+        """Time the enclosed block; an exception records a failed call and propagates"""
+        started = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.record(operation, time.perf_counter() - started, success)
+
+    def operation(self, operation: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self._operations.get(operation)
+            return stats.summary() if stats else None
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99, mean, max and decayed rates for every operation"""
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._operations.items()}
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Local Fake HTTP APIs
+Replays CoinGecko, FRED, DeFiLlama, RSS and in-cluster collector responses.
+
+``FakeApiServer`` is a threaded stdlib HTTP server. Routes are matched on the
+original upstream host and a path regex; each route has its own injected
+latency and an optional token-bucket rate limit that answers 429 with a
+``Retry-After`` header, like the real providers do.
+
+``redirect_http(server)`` reroutes the collectors' outgoing traffic to it
+without touching their URLs: ``aiohttp.ClientSession._request`` and
+``requests.Session.request`` are wrapped so ``https://api.llama.fi/v2/chains``
+becomes ``http://127.0.0.1:<port>/api.llama.fi/v2/chains``.
+
+Fixture payloads are generated deterministically from the request (coin id,
+series id, chain, feed URL), so any symbol the seeded database mentions gets
+a plausible answer.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
+
+from shared.telemetry import LogHistogram
+
+# (status, headers, body); handlers may also return a dict/list (JSON, 200)
+Response = Tuple[int, Dict[str, str], bytes]
+Handler = Callable[["FakeRequest"], Any]
+
+
+@dataclass
+class FakeRequest:
+    method: str
+    host: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    match: Optional[re.Match] = None
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class TokenBucket:
+    """``rate`` requests/second with bursts of ``burst``"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+@dataclass
+class Route:
+    """
+    One upstream endpoint
+
+    Args:
+        host: Upstream host the collectors call (``*.example.com`` allowed)
+        path: Regex matched against the request path
+        handler: FakeRequest -> JSON-able object or (status, headers, body)
+        latency: Seconds slept before answering
+        rate_limit: Requests/second before answering 429 (None: unlimited)
+        retry_after: ``Retry-After`` seconds sent with a 429
+    """
+    host: str
+    path: str
+    handler: Handler
+    latency: float = 0.0
+    rate_limit: Optional[float] = None
+    retry_after: int = 1
+    name: str = ""
+    _pattern: Pattern = field(init=False, repr=False)
+    _bucket: Optional[TokenBucket] = field(init=False, repr=False, default=None)
+
+    def __post_init__(self):
+        self._pattern = re.compile(self.path)
+        self.name = self.name or f"{self.host}{self.path}"
+        if self.rate_limit:
+            self._bucket = TokenBucket(self.rate_limit)
+
+    def matches(self, host: str, path: str) -> Optional[re.Match]:
+        if self.host.startswith("*."):
+            if not (host == self.host[2:] or host.endswith(self.host[1:])):
+                return None
+        elif host != self.host:
+            return None
+        return self._pattern.fullmatch(path)
+
+
+class FakeApiServer:
+    """
+    Threaded local HTTP server replaying provider fixtures
+
+    Args:
+        routes: Routes tried in order (default: ``default_routes()``)
+        latency: Default latency for routes that do not set one
+        host: Interface to bind (port is chosen by the OS)
+    """
+
+    def __init__(self, routes: Optional[List[Route]] = None, latency: float = 0.0, host: str = "127.0.0.1"):
+        self.routes = routes if routes is not None else default_routes()
+        self.default_latency = latency
+        self._lock = threading.Lock()
+        self.reset_stats()
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self)
+
+            do_POST = do_GET
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    # Clients drop idle keep-alive connections when their session closes
+                    pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), RequestHandler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats: Dict[str, Dict[str, int]] = {}
+            self.latency = LogHistogram()
+
+    def start(self) -> "FakeApiServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeApiServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _count(self, route: str, status: int, seconds: float):
+        with self._lock:
+            counts = self.stats.setdefault(route, {"requests": 0, "rate_limited": 0, "errors": 0})
+            counts["requests"] += 1
+            counts["rate_limited"] += int(status == 429)
+            counts["errors"] += int(status >= 500 or status == 404)
+            self.latency.record(seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {name: dict(counts) for name, counts in self.stats.items()}
+            return {
+                "requests": sum(counts["requests"] for counts in routes.values()),
+                "rate_limited": sum(counts["rate_limited"] for counts in routes.values()),
+                "p95_response_seconds": self.latency.quantile(0.95),
+                "routes": routes,
+            }
+
+    def _dispatch(self, request: FakeRequest) -> Tuple[str, float, Response]:
+        for route in self.routes:
+            match = route.matches(request.host, request.path)
+            if match is None:
+                continue
+            request.match = match
+            latency = route.latency or self.default_latency
+            if route._bucket is not None and not route._bucket.take():
+                body = json.dumps({"error": "rate limited"}).encode()
+                return route.name, latency, (429, {"Retry-After": str(route.retry_after),
+                                                   "Content-Type": "application/json"}, body)
+            try:
+                result = route.handler(request)
+            except Exception as e:
+                return route.name, latency, (500, {"Content-Type": "application/json"},
+                                             json.dumps({"error": str(e)}).encode())
+            if isinstance(result, tuple):
+                return route.name, latency, result
+            return route.name, latency, (200, {"Content-Type": "application/json"}, json.dumps(result).encode())
+        return f"unmatched/{request.host}", self.default_latency, (404, {"Content-Type": "application/json"}, b'{"error": "not found"}')
+
+    def _handle(self, http: BaseHTTPRequestHandler):
+        started = time.perf_counter()
+        parts = urlsplit(http.path)
+        upstream, _, path = parts.path.lstrip("/").partition("/")
+        length = int(http.headers.get("Content-Length") or 0)
+        if length:
+            http.rfile.read(length)
+        request = FakeRequest(http.command, upstream.split(":")[0].lower(), "/" + path,
+                              parse_qs(parts.query), {k.lower(): v for k, v in http.headers.items()})
+        route, latency, (status, headers, body) = self._dispatch(request)
+        if latency:
+            time.sleep(latency)
+        # Count before replying so stats are settled once the client has its response
+        self._count(route, status, time.perf_counter() - started)
+        http.send_response(status)
+        for name, value in headers.items():
+            http.send_header(name, value)
+        http.send_header("Content-Length", str(len(body)))
+        http.end_headers()
+        if http.command != "HEAD":
+            http.wfile.write(body)
+
+    def rewrite(self, url: Any) -> str:
+        """``https://host/path?q`` -> ``http://127.0.0.1:port/host/path?q``"""
+        url = str(url)
+        if url.startswith(self.base_url):
+            return url
+        parts = urlsplit(url)
+        rewritten = f"{self.base_url}/{parts.netloc}{parts.path or '/'}"
+        return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+
+@contextmanager
+def redirect_http(server: FakeApiServer) -> Iterator[None]:
+    """Send every aiohttp and requests call to ``server`` for the duration"""
+    import aiohttp
+    import requests
+
+    original_aiohttp = aiohttp.ClientSession._request
+    original_requests = requests.Session.request
+
+    async def aiohttp_request(session, method, str_or_url, *args, **kwargs):
+        return await original_aiohttp(session, method, server.rewrite(str_or_url), *args, **kwargs)
+
+    def requests_request(session, method, url, *args, **kwargs):
+        return original_requests(session, method, server.rewrite(url), *args, **kwargs)
+
+    with patch.object(aiohttp.ClientSession, "_request", aiohttp_request), \
+            patch.object(requests.Session, "request", requests_request):
+        yield
+
+
+# ==============================================================================
+# FIXTURES
+# ==============================================================================
+
+def stable_unit(*parts: Any) -> float:
+    """Deterministic value in [0, 1) for the given key"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def coin_price(coin_id: str) -> float:
+    return round(0.01 + 60_000 * stable_unit("price", coin_id) ** 3, 8)
+
+
+def coingecko_simple_price(request: FakeRequest) -> Dict[str, Any]:
+    currency = request.param("vs_currencies", "usd").split(",")[0]
+    prices = {}
+    for coin_id in filter(None, request.param("ids", "").split(",")):
+        price = coin_price(coin_id)
+        prices[coin_id] = {
+            currency: price,
+            f"{currency}_market_cap": round(price * 1e7 * (1 + stable_unit("cap", coin_id)), 2),
+            f"{currency}_24h_change": round(20 * stable_unit("change", coin_id) - 10, 4),
+        }
+    return prices
+
+
+def coingecko_coin(request: FakeRequest) -> Dict[str, Any]:
+    coin_id = request.match.group("coin")
+    price = coin_price(coin_id)
+    supply = round(1e6 + 1e9 * stable_unit("supply", coin_id))
+    usd = lambda value: {"usd": round(value, 8)}
+    return {
+        "id": coin_id,
+        "symbol": coin_id.split("-")[0],
+        "name": coin_id.title(),
+        "market_data": {
+            "current_price": usd(price),
+            "market_cap": usd(price * supply),
+            "fully_diluted_valuation": usd(price * supply * 1.2),
+            "total_volume": usd(price * supply * 0.05),
+            "high_24h": usd(price * 1.03),
+            "low_24h": usd(price * 0.97),
+            "ath": usd(price * 2),
+            "atl": usd(price / 10),
+            "circulating_supply": supply,
+            "total_supply": supply * 1.1,
+            "max_supply": supply * 1.2,
+            "price_change_percentage_24h": round(10 * stable_unit("pct", coin_id) - 5, 4),
+        },
+        "developer_data": {
+            "commit_count_4_weeks": int(200 * stable_unit("commits", coin_id)),
+            "forks": int(1000 * stable_unit("forks", coin_id)),
+            "stars": int(5000 * stable_unit("stars", coin_id)),
+        },
+        "community_data": {
+            "twitter_followers": int(1e6 * stable_unit("twitter", coin_id)),
+            "reddit_subscribers": int(1e5 * stable_unit("reddit", coin_id)),
+        },
+    }
+
+
+def coingecko_market_chart_range(request: FakeRequest) -> Dict[str, Any]:
+    coin_id = request.match.group("coin")
+    start = int(float(request.param("from", "0")))
+    end = int(float(request.param("to", str(int(time.time())))))
+    step = 3600 if end - start <= 90 * 86400 else 86400
+    base = coin_price(coin_id)
+    points = [(ts * 1000, base * (1 + 0.05 * (stable_unit("walk", coin_id, ts) - 0.5)))
+              for ts in range(start - start % step, end + 1, step)]
+    return {
+        "prices": [[ts, round(price, 8)] for ts, price in points],
+        "market_caps": [[ts, round(price * 1e7, 2)] for ts, price in points],
+        "total_volumes": [[ts, round(price * 1e5, 2)] for ts, price in points],
+    }
+
+
+DEFILLAMA_CHAINS = ["Ethereum", "Solana", "Avalanche", "Polygon", "Cardano", "Polkadot", "BSC",
+                    "Cosmos", "Near", "Fantom", "Harmony", "Arbitrum", "Optimism", "Base", "Tron"]
+
+
+def defillama_chains(request: FakeRequest) -> List[Dict[str, Any]]:
+    return [{"name": chain, "tvl": round(1e8 + 5e10 * stable_unit("tvl", chain), 2), "tokenSymbol": chain[:3].upper()}
+            for chain in DEFILLAMA_CHAINS]
+
+
+def defillama_protocols(request: FakeRequest, count: int = 3000) -> List[Dict[str, Any]]:
+    # /protocols is the multi-megabyte document the snapshot cache exists for
+    return [
+        {
+            "name": f"Protocol {i}",
+            "slug": f"protocol-{i}",
+            "tvl": round(1e9 * stable_unit("protocol", i) ** 4, 2),
+            "chains": [DEFILLAMA_CHAINS[(i + k) % len(DEFILLAMA_CHAINS)] for k in range(1 + i % 3)],
+            "category": "Dexes" if i % 2 else "Lending",
+        }
+        for i in range(count)
+    ]
+
+
+def defillama_chain_history(request: FakeRequest, days: int = 730) -> List[Dict[str, Any]]:
+    chain = request.match.group("chain")
+    today = int(datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    return [{"date": today - 86400 * i, "tvl": round(1e8 + 5e10 * stable_unit("tvl", chain, i), 2)}
+            for i in range(days, -1, -1)]
+
+
+def fred_observations(request: FakeRequest) -> Dict[str, Any]:
+    series_id = request.param("series_id", "UNKNOWN")
+    start = date.fromisoformat(request.param("observation_start", (date.today() - timedelta(days=365)).isoformat()))
+    end = date.fromisoformat(request.param("observation_end", date.today().isoformat()))
+    observations = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            observations.append({"date": day.isoformat(),
+                                 "value": f"{100 * stable_unit('fred', series_id, day):.4f}"})
+        day += timedelta(days=1)
+    return {"count": len(observations), "observations": observations}
+
+
+def rss_feed(request: FakeRequest, items: int = 50, new_per_hour: int = 6) -> Response:
+    """RSS 2.0 feed whose newest items change every ``3600 / new_per_hour`` seconds; honours If-None-Match"""
+    feed = f"{request.host}{request.path}"
+    slot = int(time.time() // (3600 / new_per_hour))
+    etag = f'"{hashlib.md5(f"{feed}-{slot}".encode()).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return 304, {"ETag": etag}, b""
+    mentions = ["Bitcoin", "Ethereum", "Solana", "Cardano", "XRP", "Chainlink", "Avalanche", "Polkadot"]
+    entries = []
+    for i in range(items):
+        number = slot - i
+        published = datetime.fromtimestamp(number * 3600 / new_per_hour, tz=timezone.utc)
+        topic = mentions[number % len(mentions)]
+        entries.append(f"""
+    <item>
+      <title>{topic} market update #{number}</title>
+      <link>https://{request.host}/news/{number}</link>
+      <guid>https://{request.host}/news/{number}</guid>
+      <pubDate>{format_datetime(published)}</pubDate>
+      <description>{topic} and BTC traders react as ETH volumes move; analysis #{number}.</description>
+    </item>""")
+    body = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>{request.host}</title><link>https://{request.host}/</link>
+<description>Benchmark feed</description>{''.join(entries)}
+</channel></rss>""".encode()
+    return 200, {"Content-Type": "application/rss+xml", "ETag": etag}, body
+
+
+def coinbase_exchange_rates(request: FakeRequest) -> Dict[str, Any]:
+    currency = request.param("currency", "BTC")
+    return {"data": {"currency": currency, "rates": {"USD": str(coin_price(currency.lower()))}}}
+
+
+def ml_market_data(request: FakeRequest) -> Dict[str, Any]:
+    markets = {etf: {"price": round(50 + 400 * stable_unit(etf), 2), "volume": int(1e7 * stable_unit("v", etf)),
+                     "rsi_14": round(100 * stable_unit("rsi", etf), 2), "sma_20": round(100 * stable_unit("s", etf), 2),
+                     "ema_12": round(100 * stable_unit("e", etf), 2)}
+               for etf in ("QQQ", "ARKK", "XLE", "XLF", "GLD", "TLT")}
+    return {
+        "traditional_markets": markets,
+        "market_indices": {"dxy": 104.2, "nasdaq": 18000.5, "nasdaq_volume": 5.1e9, "gold": 2350.1,
+                           "oil": 78.4, "treasury_10y": 4.3, "treasury_2y": 4.7, "copper": 4.4},
+        "ml_indicators": {"crypto_correlation": 0.42, "sector_rotation": 0.1, "risk_parity": 0.6,
+                          "momentum": 0.3, "value_growth": 0.9, "volatility_regime": 1, "liquidity_stress": 0.2},
+    }
+
+
+def derivatives_data(request: FakeRequest) -> Dict[str, Any]:
+    symbols = ["BTC", "ETH", "ADA", "SOL", "MATIC", "AVAX", "DOT", "LINK", "LTC", "XRP"]
+    return {
+        "cryptocurrencies": {
+            symbol: {exchange: {"funding_rate": round(0.001 * stable_unit(symbol, exchange), 6),
+                                "open_interest": round(1e9 * stable_unit("oi", symbol, exchange), 2),
+                                "liquidations_long": round(1e6 * stable_unit("ll", symbol, exchange), 2),
+                                "liquidations_short": round(1e6 * stable_unit("ls", symbol, exchange), 2)}
+                     for exchange in ("binance", "bybit", "okx")}
+            for symbol in symbols
+        },
+        "composite_indicators": {"avg_funding_rate": 0.0004, "total_open_interest": 3.2e10, "liquidation_ratio": 1.1,
+                                 "funding_divergence": 0.02, "derivatives_momentum": 0.3,
+                                 "leverage_sentiment": 0.5, "market_stress_indicator": 0.1},
+    }
+
+
+def blockstream_tip_height(request: FakeRequest) -> Response:
+    height = 870_000 + int(time.time() // 600) % 10_000
+    return 200, {"Content-Type": "text/plain"}, str(height).encode()
+
+
+def blockstream_tip(request: FakeRequest) -> Dict[str, Any]:
+    return {"id": "00" * 32, "height": 870_000, "difficulty": 9.5e13, "tx_count": 3200, "timestamp": int(time.time())}
+
+
+def messari_metrics(request: FakeRequest) -> Dict[str, Any]:
+    asset = request.match.group("asset")
+    return {"data": {"symbol": asset.upper(), "market_data": {
+        "realized_cap": coin_price(asset) * 1.2e7,
+        "mcap_realized_usd": coin_price(asset) * 1.2e7,
+        "mcap_dom_percent": 50.0,
+        "real_volume_last_24_hours": 1.5e10,
+    }}}
+
+
+RSS_HOSTS = ("feeds.coindesk.com", "cointelegraph.com", "cryptoslate.com", "decrypt.co",
+             "bitcoinmagazine.com", "coinmarketcap.com")
+
+
+def default_routes(latency: float = 0.0, coingecko_rate_limit: Optional[float] = None,
+                   rss_items: int = 50) -> List[Route]:
+    """Fixture routes for every upstream the benchmark scenarios reach"""
+    routes = []
+    for host in ("pro-api.coingecko.com", "api.coingecko.com"):
+        routes += [
+            Route(host, r"/api/v3/simple/price", coingecko_simple_price, latency, coingecko_rate_limit,
+                  name="coingecko/simple/price"),
+            Route(host, r"/api/v3/coins/(?P<coin>[\w.-]+)/market_chart/range", coingecko_market_chart_range,
+                  latency, coingecko_rate_limit, name="coingecko/market_chart/range"),
+            Route(host, r"/api/v3/coins/(?P<coin>[\w.-]+)(/history)?", coingecko_coin, latency,
+                  coingecko_rate_limit, name="coingecko/coins"),
+        ]
+    routes += [
+        Route("api.llama.fi", r"/v2/chains", defillama_chains, latency, name="defillama/chains"),
+        Route("api.llama.fi", r"/protocols", defillama_protocols, latency, name="defillama/protocols"),
+        Route("api.llama.fi", r"/v2/historicalChainTvl/(?P<chain>[\w-]+)", defillama_chain_history, latency,
+              name="defillama/historicalChainTvl"),
+        Route("blockstream.info", r"/api/blocks/tip/height", blockstream_tip_height, latency,
+              name="blockstream/tip/height"),
+        Route("blockstream.info", r"/api/blocks/tip", blockstream_tip, latency, name="blockstream/tip"),
+        Route("data.messari.io", r"/api/v1/assets/(?P<asset>\w+)/metrics", messari_metrics, latency,
+              name="messari/metrics"),
+        Route("api.stlouisfed.org", r"/fred/series/observations", fred_observations, latency,
+              name="fred/observations"),
+        Route("api.coinbase.com", r"/v2/exchange-rates", coinbase_exchange_rates, latency,
+              name="coinbase/exchange-rates"),
+        Route("ml-market-collector", r"/data", ml_market_data, latency, name="ml-market/data"),
+        Route("derivatives-collector", r"/data", derivatives_data, latency, name="derivatives/data"),
+    ]
+    routes += [Route(host, r"/.*", lambda request: rss_feed(request, rss_items), latency, name=f"rss/{host}")
+               for host in RSS_HOSTS]
+    return routes
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Harness
+Runs collector scenarios against local stand-ins and reports machine-readable results.
+
+Each iteration of a scenario gets a fresh ``BenchmarkEnvironment``:
+
+    MySQLStandIn         SQLite database seeded to ``scale`` x production rows
+    FakeApiServer        provider fixtures with injected latency / rate limits
+    patches              mysql.connector.connect -> stand-in, HTTP -> fake server
+
+A scenario's setup (module import, collector construction) runs inside the
+environment but outside the timed section; only its ``run`` callable is
+timed. Per scenario the harness reports records/sec, iteration latency
+percentiles, statement counts by kind, HTTP request counts and peak RSS, and
+``compare_to_baseline`` flags metrics that moved past their tolerance.
+"""
+
+import importlib.util
+import os
+import statistics
+import sys
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+from tests.benchmarks.fake_api import FakeApiServer, default_routes, redirect_http
+from tests.benchmarks.mysql_standin import MySQLStandIn, seed_production_like
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+RESULTS_VERSION = 1
+
+# Environment every scenario runs with: in-process rate-limit state, a
+# premium-style CoinGecko key (selects the pro endpoints) and no Redis
+BENCHMARK_ENV = {
+    "COINGECKO_API_KEY": "CG-benchmark",
+    "RATE_LIMIT_BACKEND": "memory",
+    "MYSQL_HOST": "benchmark-standin",
+    "DB_HOST": "benchmark-standin",
+}
+
+# metric -> (better direction, relative tolerance before it counts as a regression)
+BASELINE_METRICS = {
+    "records_per_second": ("higher", 0.25),
+    "p95_seconds": ("lower", 0.25),
+    "statements": ("lower", 0.10),
+    "peak_rss_mb": ("lower", 0.20),
+}
+
+
+@dataclass
+class BenchmarkOptions:
+    """
+    Knobs shared by every scenario
+
+    Args:
+        scale: Fraction of production row counts to seed
+        symbols: Active symbols in crypto_assets (and series in the seeded tables)
+        iterations: Timed runs per scenario, each against a freshly seeded database
+        api_latency: Seconds the fake APIs sleep before answering
+        api_rate_limit: CoinGecko requests/second the fake API allows (None: unlimited)
+        client_rate_limits: Keep the collectors' own production rate limiters; off by
+            default so the fake API's limits, not provider budgets, pace the run
+        rss_items: Items per fake RSS feed
+    """
+    scale: float = 0.01
+    symbols: int = 20
+    iterations: int = 3
+    api_latency: float = 0.005
+    api_rate_limit: Optional[float] = None
+    client_rate_limits: bool = False
+    rss_items: int = 50
+
+
+@dataclass
+class ScenarioOutcome:
+    """What one timed run produced"""
+    records: int
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    setup: Callable[["BenchmarkEnvironment"], Callable[[], ScenarioOutcome]]
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, description: str):
+    """Register ``setup(env) -> run()`` as a benchmark scenario"""
+    def register(setup):
+        SCENARIOS[name] = Scenario(name, description, setup)
+        return setup
+    return register
+
+
+@contextmanager
+def unlimited_client_rate_limits() -> Iterator[None]:
+    """Give every provider bucket in RATE_LIMITS an effectively infinite budget"""
+    from shared import rate_limiter
+    from shared.scheduling_config import RATE_LIMITS
+
+    unlimited = {provider: {**config, "calls_per_minute": 10 ** 9, "burst_allowance": 10 ** 6}
+                 for provider, config in RATE_LIMITS.items()}
+    with patch.dict(RATE_LIMITS, unlimited), patch.dict(rate_limiter._limiters, clear=True):
+        yield
+
+
+class BenchmarkEnvironment:
+    """
+    Seeded stand-in database plus patched I/O for one scenario iteration
+
+    Args:
+        options: Benchmark options
+        server: Running fake API server shared by the iterations
+    """
+
+    def __init__(self, options: BenchmarkOptions, server: FakeApiServer):
+        self.options = options
+        self.server = server
+        self.standin: Optional[MySQLStandIn] = None
+        self.seeded: Dict[str, int] = {}
+        self._stack = ExitStack()
+
+    def __enter__(self) -> "BenchmarkEnvironment":
+        try:
+            self.standin = MySQLStandIn()
+            self._stack.callback(self.standin.close)
+            self.seeded = seed_production_like(self.standin, self.options.scale, self.options.symbols)
+            self._stack.enter_context(patch.dict(os.environ, BENCHMARK_ENV))
+            self._stack.enter_context(patch("mysql.connector.connect", self.standin.connect))
+            self._stack.enter_context(redirect_http(self.server))
+            if not self.options.client_rate_limits:
+                self._stack.enter_context(unlimited_client_rate_limits())
+        except BaseException:
+            self._stack.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+
+    @property
+    def active_symbols(self) -> List[str]:
+        conn = self.standin.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT symbol FROM crypto_assets WHERE is_active = 1 ORDER BY id")
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def load_service(self, relative_path: str, modules: Optional[Dict[str, Any]] = None):
+        """
+        Import a service module fresh (module-level collectors bind to this environment)
+
+        ``modules`` are installed in ``sys.modules`` for the rest of the
+        iteration, for services importing packages that live outside this tree.
+        """
+        path = os.path.join(PROJECT_ROOT, relative_path)
+        name = f"benchmark_{os.path.splitext(os.path.basename(path))[0]}_{uuid.uuid4().hex[:8]}"
+        if modules:
+            self._stack.enter_context(patch.dict(sys.modules, modules))
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        self._stack.callback(sys.modules.pop, name, None)
+        spec.loader.exec_module(module)
+        return module
+
+    def reset_stats(self):
+        self.standin.reset_stats()
+        self.server.reset_stats()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def run_scenario(name: str, options: BenchmarkOptions) -> Dict[str, Any]:
+    """Run ``options.iterations`` timed iterations of one scenario; returns its result record"""
+    definition = SCENARIOS[name]
+    durations, rates = [], []
+    outcome, db_stats, http_stats, seeded = None, {}, {}, {}
+    routes = default_routes(options.api_latency, options.api_rate_limit, options.rss_items)
+
+    with FakeApiServer(routes, latency=options.api_latency) as server:
+        for _ in range(max(1, options.iterations)):
+            with BenchmarkEnvironment(options, server) as env:
+                run = definition.setup(env)
+                env.reset_stats()
+                started = time.perf_counter()
+                outcome = run()
+                elapsed = time.perf_counter() - started
+                durations.append(elapsed)
+                rates.append(outcome.records / elapsed if elapsed > 0 else 0.0)
+                db_stats, http_stats, seeded = env.standin.get_stats(), server.get_stats(), env.seeded
+
+    durations.sort()
+    return {
+        "scenario": name,
+        "description": definition.description,
+        "iterations": len(durations),
+        "records": outcome.records,
+        "records_per_second": round(statistics.median(rates), 3),
+        "p50_seconds": round(statistics.median(durations), 6),
+        "p95_seconds": round(durations[min(len(durations) - 1, int(0.95 * len(durations)))], 6),
+        "max_seconds": round(durations[-1], 6),
+        "statements": db_stats.get("statements", 0),
+        "statements_by_kind": db_stats.get("by_kind", {}),
+        "statements_per_record": round(db_stats.get("statements", 0) / outcome.records, 3) if outcome.records else None,
+        "p95_statement_seconds": db_stats.get("p95_statement_seconds"),
+        "rows_written": db_stats.get("rows_written", 0),
+        "executemany_batches": db_stats.get("executemany_batches", 0),
+        "commits": db_stats.get("commits", 0),
+        "connections_opened": db_stats.get("connections_opened", 0),
+        "sql_errors": db_stats.get("errors", 0),
+        "unsupported_sql": db_stats.get("unsupported", {}),
+        "http_requests": http_stats.get("requests", 0),
+        "http_rate_limited": http_stats.get("rate_limited", 0),
+        "p95_http_seconds": http_stats.get("p95_response_seconds"),
+        "http_routes": http_stats.get("routes", {}),
+        "peak_rss_mb": peak_rss_mb(),
+        "seeded_rows": seeded,
+        "details": outcome.details,
+    }
+
+
+def results_document(results: List[Dict[str, Any]], options: BenchmarkOptions) -> Dict[str, Any]:
+    return {
+        "version": RESULTS_VERSION,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "options": asdict(options),
+        "scenarios": {result["scenario"]: result for result in results},
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                        metrics: Dict[str, tuple] = BASELINE_METRICS) -> Dict[str, Any]:
+    """
+    Compare two results documents metric by metric
+
+    A metric regresses when it moves in the worse direction by more than its
+    relative tolerance, and improves when it moves the other way by as much.
+    Scenarios missing from either side are listed but not judged.
+    """
+    comparison, regressions = {}, []
+    current_scenarios = current.get("scenarios", {})
+    baseline_scenarios = baseline.get("scenarios", {})
+    for name, result in current_scenarios.items():
+        reference = baseline_scenarios.get(name)
+        if reference is None:
+            comparison[name] = {"status": "new"}
+            continue
+        checks = {}
+        for metric, (direction, tolerance) in metrics.items():
+            now, then = result.get(metric), reference.get(metric)
+            if now is None or then is None:
+                continue
+            change = (now - then) / then if then else (0.0 if now == then else float("inf"))
+            worse = change < -tolerance if direction == "higher" else change > tolerance
+            better = change > tolerance if direction == "higher" else change < -tolerance
+            status = "regressed" if worse else "improved" if better else "ok"
+            checks[metric] = {"baseline": then, "current": now, "change": round(change, 4), "status": status}
+            if worse:
+                regressions.append(f"{name}.{metric}")
+        comparison[name] = {
+            "status": "regressed" if any(c["status"] == "regressed" for c in checks.values()) else "ok",
+            "metrics": checks,
+        }
+    for name in baseline_scenarios:
+        if name not in current_scenarios:
+            comparison[name] = {"status": "missing"}
+    return {"scenarios": comparison, "regressions": regressions}
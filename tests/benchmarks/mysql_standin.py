@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed MySQL Stand-in
+A ``mysql.connector.connect`` replacement for offline benchmarks.
+
+Every connection opened through ``MySQLStandIn.connect`` is a real sqlite3
+connection to one shared database file (WAL mode), so collectors that open a
+connection per query, share a pool or write from worker threads behave as they
+do against MySQL. Statements are translated from the MySQL dialect the
+collectors use:
+
+    %s / %(name)s placeholders       -> ? / :name
+    db.table qualifiers              -> table (one namespace)
+    INSERT IGNORE                    -> INSERT OR IGNORE
+    ON DUPLICATE KEY UPDATE VALUES() -> ON CONFLICT DO UPDATE SET excluded.
+    DATE_SUB/DATE_ADD, +/- INTERVAL  -> datetime(x, '-n unit')
+    NOW(), CURDATE(), HOUR(), ...    -> registered SQL functions
+    CREATE TABLE (MySQL DDL)         -> SQLite table + indexes
+    information_schema.*             -> emulated from sqlite_master
+    SHOW COLUMNS FROM t              -> emulated from PRAGMA table_info
+    SET / SHOW / USE / START TRANSACTION -> no-ops
+
+Writes to a column or table that does not exist fail with
+``mysql.connector.errors.ProgrammingError`` as they would against MySQL, so
+the seeded schemas declare every column the collectors write.
+
+Statement counts (by kind), rows written, commits, connections opened and a
+latency histogram of every execute are collected in ``stats``.
+"""
+
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mysql.connector import errors as mysql_errors
+
+from shared.table_config import COLLECTOR_TABLE_CONFIG
+from shared.telemetry import LogHistogram
+
+DATABASE_PREFIXES = ("crypto_prices", "crypto_news", "crypto_transactions")
+NO_OP_PREFIXES = ("SET ", "SHOW ", "USE ", "START TRANSACTION", "BEGIN", "LOCK ", "UNLOCK ",
+                  "ANALYZE ", "OPTIMIZE ", "FLUSH ", "DROP INDEX ")
+INTERVAL_UNITS = {"SECOND": "seconds", "MINUTE": "minutes", "HOUR": "hours", "DAY": "days",
+                  "MONTH": "months", "YEAR": "years"}
+
+_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d{1,6})?$")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_PLACEHOLDER_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|%\((\w+)\)s|%s")
+_DB_PREFIX_RE = re.compile(r"\b(?:%s)\.(?=`?\w)" % "|".join(DATABASE_PREFIXES))
+_ON_DUPLICATE_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_VALUES_FN_RE = re.compile(r"\bVALUES\s*\(\s*`?(\w+)`?\s*\)", re.I)
+_DATE_ARITH_RE = re.compile(
+    r"\b(DATE_SUB|DATE_ADD)\(\s*((?:[^(),]|\([^()]*\))+?)\s*,\s*INTERVAL\s+([^\s)]+)\s+(\w+)\s*\)", re.I)
+_INTERVAL_RE = re.compile(r"(\w+\(\)|\?|[\w.]+)\s*([-+])\s*INTERVAL\s+([^\s)]+)\s+(\w+)", re.I)
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*")
+_CHECKSUM_RE = re.compile(r"^\s*CHECKSUM\s+TABLE\s+(.+?)\s*(?:QUICK|EXTENDED)?\s*;?\s*$", re.I | re.S)
+_SHOW_COLUMNS_RE = re.compile(r"^\s*SHOW\s+(?:FULL\s+)?COLUMNS\s+FROM\s+`?([\w.]+)`?\s*;?\s*$", re.I)
+_CREATE_TABLE_RE = re.compile(
+    r"^\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)[^)]*$", re.I | re.S)
+
+
+def _adapt_datetime(value: datetime) -> str:
+    # MySQL DATETIME drops the zone; so does the stand-in
+    return value.replace(tzinfo=None).isoformat(" ")
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, float)
+
+
+def _convert_value(value: Any) -> Any:
+    """Bring DATETIME/DATE strings back as datetime/date, as mysql.connector does"""
+    if isinstance(value, str):
+        if len(value) >= 19 and _DATETIME_RE.match(value):
+            return datetime.fromisoformat(value)
+        if len(value) == 10 and _DATE_RE.match(value):
+            return date.fromisoformat(value)
+    return value
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, current, quote = [], 0, [], None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _index_columns(spec: str) -> str:
+    """``(a(191), b DESC)`` -> ``a, b DESC`` (prefix lengths are MySQL-only)"""
+    inner = spec[spec.index("(") + 1:spec.rindex(")")]
+    return ", ".join(re.sub(r"\(\d+\)", "", column).strip() for column in _split_top_level(inner))
+
+
+def _column_type(definition: str) -> str:
+    upper = definition.upper()
+    if re.search(r"\b(TINYINT|SMALLINT|MEDIUMINT|BIGINT|INT|INTEGER|BOOLEAN|BOOL)\b", upper):
+        return "INTEGER"
+    if re.search(r"\b(DECIMAL|NUMERIC|FLOAT|DOUBLE|REAL)\b", upper):
+        return "REAL"
+    return "TEXT"
+
+
+def translate_create_table(sql: str) -> Tuple[str, bool, List[str]]:
+    """
+    MySQL CREATE TABLE -> (SQLite CREATE TABLE, IF NOT EXISTS, CREATE INDEX statements)
+
+    Types collapse to SQLite affinities, AUTO_INCREMENT becomes an INTEGER
+    PRIMARY KEY, KEY/UNIQUE KEY clauses become separate indexes, and
+    engine/charset/partition options and foreign keys are dropped.
+    """
+    match = _CREATE_TABLE_RE.match(_SQL_COMMENT_RE.sub("", sql))
+    if not match:
+        raise mysql_errors.ProgrammingError(msg=f"Unsupported CREATE TABLE: {sql[:80]}")
+    if_not_exists, table, body = bool(match.group(1)), match.group(2), match.group(3)
+    columns, constraints, indexes = [], [], []
+    autoincrement = None
+    for item in _split_top_level(body):
+        upper = item.upper()
+        keyword = upper.split(None, 1)[0].strip("`")
+        if keyword == "CONSTRAINT":
+            item = re.sub(r"^CONSTRAINT\s+`?\w+`?\s+", "", item, flags=re.I)
+            upper = item.upper()
+            keyword = upper.split(None, 1)[0]
+        if keyword == "PRIMARY":
+            columns_spec = _index_columns(item)
+            if columns_spec.strip("`") != autoincrement:
+                constraints.append(f"PRIMARY KEY ({columns_spec})")
+        elif keyword == "UNIQUE":
+            name = re.match(r"UNIQUE\s+(?:KEY|INDEX)?\s*`?(\w*)`?", item, re.I).group(1) or f"u{len(indexes)}"
+            indexes.append(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}__{name} ON {table} ({_index_columns(item)})")
+        elif keyword in ("KEY", "INDEX", "FULLTEXT", "SPATIAL"):
+            name = re.match(r"(?:FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)\s*`?(\w*)`?", item, re.I).group(1) or f"i{len(indexes)}"
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {table}__{name} ON {table} ({_index_columns(item)})")
+        elif keyword in ("FOREIGN", "CHECK"):
+            continue
+        else:
+            name = item.split(None, 1)[0].strip("`")
+            if "AUTO_INCREMENT" in upper:
+                autoincrement = name
+                columns.append(f"{name} INTEGER PRIMARY KEY AUTOINCREMENT")
+                continue
+            column = f"{name} {_column_type(item)}"
+            if re.search(r"\bPRIMARY\s+KEY\b", upper):
+                column += " PRIMARY KEY"
+            elif re.search(r"\bUNIQUE\b", upper):
+                column += " UNIQUE"
+            default = re.search(r"\bDEFAULT\s+('(?:[^']|'')*'|[-\w.]+(?:\(\))?)", item, re.I)
+            if default and default.group(1).upper() not in ("NULL",):
+                value = default.group(1)
+                column += " DEFAULT CURRENT_TIMESTAMP" if value.upper().startswith("CURRENT_TIMESTAMP") else f" DEFAULT {value}"
+            columns.append(column)
+    ddl = f"CREATE TABLE {'IF NOT EXISTS ' if if_not_exists else ''}{table} ({', '.join(columns + constraints)})"
+    return ddl, if_not_exists, indexes
+
+
+def _interval(expression: str, sign: str, amount: str, unit: str) -> str:
+    unit = unit.upper()
+    if unit == "WEEK":
+        amount, unit = f"({amount}) * 7", "DAY"
+    modifier = INTERVAL_UNITS.get(unit)
+    if modifier is None:
+        raise mysql_errors.ProgrammingError(msg=f"Unsupported INTERVAL unit {unit}")
+    return f"datetime({expression}, '{sign}' || ({amount}) || ' {modifier}')"
+
+
+@lru_cache(maxsize=2048)
+def translate_sql(sql: str, has_params: bool) -> str:
+    """Rewrite one MySQL statement into SQLite syntax (cached per statement text)"""
+    if has_params:
+        def placeholder(match):
+            token = match.group(0)
+            if token == "%s":
+                return "?"
+            if match.group(1):
+                return f":{match.group(1)}"
+            return token
+        sql = _PLACEHOLDER_RE.sub(placeholder, sql)
+    sql = _DB_PREFIX_RE.sub("", sql)
+    sql = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", sql, flags=re.I)
+    sql = re.sub(r"\bFOR\s+UPDATE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b", "", sql, flags=re.I)
+    sql = re.sub(r"\bTIMESTAMPDIFF\(\s*(\w+)\s*,", r"TIMESTAMPDIFF('\1',", sql, flags=re.I)
+    sql = re.sub(r"\bIF\s*\(", "iif(", sql)
+    sql = _DATE_ARITH_RE.sub(
+        lambda m: _interval(m.group(2), "-" if m.group(1).upper() == "DATE_SUB" else "+", m.group(3), m.group(4)), sql)
+    sql = _INTERVAL_RE.sub(lambda m: _interval(m.group(1), m.group(2), m.group(3), m.group(4)), sql)
+    duplicate = _ON_DUPLICATE_RE.search(sql)
+    if duplicate:
+        head, assignments = sql[:duplicate.start()], sql[duplicate.end():]
+        assignments = _VALUES_FN_RE.sub(r"excluded.\1", assignments)
+        sql = f"{head} ON CONFLICT DO UPDATE SET {assignments}"
+    return sql
+
+
+def _timestampdiff(unit: str, start: Any, end: Any) -> Optional[int]:
+    if start is None or end is None:
+        return None
+    start, end = _convert_value(str(start)), _convert_value(str(end))
+    if isinstance(start, date) and not isinstance(start, datetime):
+        start = datetime.combine(start, datetime.min.time())
+    if isinstance(end, date) and not isinstance(end, datetime):
+        end = datetime.combine(end, datetime.min.time())
+    seconds = (end - start).total_seconds()
+    divisor = {"SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400, "WEEK": 604800}.get(unit.upper(), 1)
+    return int(seconds // divisor)
+
+
+def _hour(value: Any) -> Optional[int]:
+    value = _convert_value(value) if isinstance(value, str) else value
+    return value.hour if isinstance(value, datetime) else None
+
+
+def _unix_timestamp(*args) -> Optional[int]:
+    if not args:
+        return int(time.time())
+    value = _convert_value(args[0]) if isinstance(args[0], str) else args[0]
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return None
+
+
+class MySQLStandIn:
+    """
+    Shared SQLite database plus statement accounting for one benchmark run
+
+    Args:
+        path: SQLite file (default: a new temporary file)
+        database: Name reported by DATABASE() and information_schema
+    """
+
+    def __init__(self, path: Optional[str] = None, database: str = "crypto_prices"):
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="benchmark-mysql-", suffix=".sqlite3")
+            os.close(handle)
+        self.path = path
+        self.database = database
+        self._lock = threading.Lock()
+        self.unsupported: Dict[str, int] = {}
+        self.reset_stats()
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                "statements": 0, "by_kind": {}, "rows_written": 0, "executemany_batches": 0,
+                "commits": 0, "rollbacks": 0, "connections_opened": 0, "errors": 0, "sql_seconds": 0.0,
+            }
+            self.latency = LogHistogram()
+
+    def record(self, kind: str, seconds: float, rows_written: int = 0, batch: bool = False, error: bool = False):
+        with self._lock:
+            stats = self.stats
+            stats["statements"] += 1
+            stats["by_kind"][kind] = stats["by_kind"].get(kind, 0) + 1
+            stats["rows_written"] += max(rows_written, 0)
+            stats["executemany_batches"] += int(batch)
+            stats["errors"] += int(error)
+            stats["sql_seconds"] += seconds
+            self.latency.record(seconds)
+
+    def count(self, field: str):
+        with self._lock:
+            self.stats[field] += 1
+
+    def note_unsupported(self, message: str):
+        with self._lock:
+            self.unsupported[message[:160]] = self.unsupported.get(message[:160], 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, by_kind=dict(self.stats["by_kind"]))
+            stats["p95_statement_seconds"] = self.latency.quantile(0.95)
+            stats["unsupported"] = dict(self.unsupported)
+        stats["sql_seconds"] = round(stats["sql_seconds"], 6)
+        return stats
+
+    def connect(self, *args, **kwargs) -> "StandInConnection":
+        """Drop-in for ``mysql.connector.connect``; credentials and host are ignored"""
+        self.count("connections_opened")
+        return StandInConnection(self, kwargs.get("database") or self.database, kwargs.get("autocommit", False))
+
+    def execute_script(self, statements: Sequence[str]):
+        """Run MySQL DDL/DML outside the accounting (used for seeding)"""
+        conn = StandInConnection(self, self.database, True, record=False)
+        try:
+            cursor = conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            conn.close()
+
+    def bulk_insert(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]):
+        """Seed rows directly through sqlite3 (no translation, no accounting)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            placeholders = ", ".join("?" * len(columns))
+            conn.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def row_counts(self) -> Dict[str, int]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                                     "AND name NOT LIKE 'sqlite_%'")]
+            return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+        finally:
+            conn.close()
+
+    def close(self):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except OSError:
+                pass
+
+
+class StandInConnection:
+    """The subset of ``MySQLConnection`` the collectors use"""
+
+    def __init__(self, standin: MySQLStandIn, database: str, autocommit: bool = False, record: bool = True):
+        self.standin = standin
+        self._database = database
+        self.autocommit = autocommit
+        self.record = record
+        self._conn = sqlite3.connect(standin.path, timeout=30, check_same_thread=False,
+                                     isolation_level=None if autocommit else "IMMEDIATE")
+        self._conn.execute("PRAGMA busy_timeout = 30000")
+        self._conn.execute("ATTACH DATABASE ':memory:' AS information_schema")
+        self._conn.executescript("""
+            CREATE TABLE information_schema.TABLES (TABLE_SCHEMA, TABLE_NAME, TABLE_ROWS);
+            CREATE TABLE information_schema.COLUMNS (TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION,
+                                                     DATA_TYPE, COLUMN_KEY);
+            CREATE TABLE information_schema.STATISTICS (TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, NON_UNIQUE,
+                                                        SEQ_IN_INDEX, COLUMN_NAME);
+        """)
+        self._conn.create_function("NOW", 0, lambda: _adapt_datetime(datetime.now().replace(microsecond=0)))
+        self._conn.create_function("UTC_TIMESTAMP", 0, lambda: _adapt_datetime(datetime.utcnow().replace(microsecond=0)))
+        self._conn.create_function("CURDATE", 0, lambda: date.today().isoformat())
+        self._conn.create_function("DATABASE", 0, lambda: self._database)
+        self._conn.create_function("HOUR", 1, _hour)
+        self._conn.create_function("UNIX_TIMESTAMP", -1, _unix_timestamp)
+        self._conn.create_function("FROM_UNIXTIME", 1, lambda value: _adapt_datetime(datetime.fromtimestamp(value)))
+        self._conn.create_function("TIMESTAMPDIFF", 3, _timestampdiff)
+        self._conn.create_function("CONCAT", -1, lambda *parts: None if None in parts else "".join(map(str, parts)))
+        self._conn.create_function("GREATEST", -1, lambda *values: None if None in values else max(values))
+        self._conn.create_function("LEAST", -1, lambda *values: None if None in values else min(values))
+        self._open = True
+
+    @property
+    def database(self) -> str:
+        return self._database
+
+    def cursor(self, buffered: Optional[bool] = None, dictionary: Optional[bool] = None, **kwargs) -> "StandInCursor":
+        return StandInCursor(self, dictionary=bool(dictionary))
+
+    def commit(self):
+        self._conn.commit()
+        if self.record:
+            self.standin.count("commits")
+
+    def rollback(self):
+        self._conn.rollback()
+        if self.record:
+            self.standin.count("rollbacks")
+
+    def start_transaction(self, *args, **kwargs):
+        pass
+
+    def is_connected(self) -> bool:
+        return self._open
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        if not self._open:
+            raise mysql_errors.InterfaceError(msg="Connection is closed")
+
+    def reconnect(self, attempts: int = 1, delay: int = 0):
+        pass
+
+    def get_server_info(self) -> str:
+        return f"8.0-sqlite-{sqlite3.sqlite_version}"
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self._conn.close()
+
+    disconnect = close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _refresh_information_schema(self):
+        conn = self._conn
+        schema = self._database
+        if not conn.in_transaction:
+            # Rewriting the in-memory catalog must not open a write transaction on main
+            isolation, conn.isolation_level = conn.isolation_level, None
+            try:
+                self._fill_information_schema(conn, schema)
+            finally:
+                conn.isolation_level = isolation
+        else:
+            self._fill_information_schema(conn, schema)
+
+    @staticmethod
+    def _fill_information_schema(conn: sqlite3.Connection, schema: str):
+        conn.execute("DELETE FROM information_schema.TABLES")
+        conn.execute("DELETE FROM information_schema.COLUMNS")
+        conn.execute("DELETE FROM information_schema.STATISTICS")
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            conn.execute("INSERT INTO information_schema.TABLES VALUES (?, ?, ?)",
+                         (schema, table, conn.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]))
+            for cid, name, column_type, _, _, pk in conn.execute(f"PRAGMA main.table_info({table})"):
+                conn.execute("INSERT INTO information_schema.COLUMNS VALUES (?, ?, ?, ?, ?, ?)",
+                             (schema, table, name, cid + 1, (column_type or "text").lower(), "PRI" if pk else ""))
+                if pk:
+                    conn.execute("INSERT INTO information_schema.STATISTICS VALUES (?, ?, 'PRIMARY', 0, ?, ?)",
+                                 (schema, table, pk, name))
+            for _, index, unique, _, _ in conn.execute(f"PRAGMA main.index_list({table})"):
+                for seq, _, name in conn.execute(f"PRAGMA main.index_info({index})"):
+                    conn.execute("INSERT INTO information_schema.STATISTICS VALUES (?, ?, ?, ?, ?, ?)",
+                                 (schema, table, index.split("__", 1)[-1], 0 if unique else 1, seq + 1, name))
+
+
+class StandInCursor:
+    """The subset of ``MySQLCursor`` the collectors use (always buffered)"""
+
+    def __init__(self, connection: StandInConnection, dictionary: bool = False):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self.statement = None
+        self._rows: List[Any] = []
+        self._position = 0
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return tuple(column[0] for column in self.description or ())
+
+    @property
+    def with_rows(self) -> bool:
+        return self.description is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def close(self):
+        self._rows = []
+
+    def execute(self, operation: str, params: Any = None, multi: bool = False):
+        self._run(operation, params, many=False)
+
+    def executemany(self, operation: str, seq_params: Sequence[Any]):
+        seq_params = list(seq_params)
+        if not seq_params:
+            self.rowcount = 0
+            return
+        self._run(operation, seq_params, many=True)
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def _run(self, operation: str, params: Any, many: bool):
+        standin = self.connection.standin
+        self.statement = operation
+        stripped = operation.lstrip().lstrip("(").lstrip()
+        kind = stripped.split(None, 1)[0].upper() if stripped else "EMPTY"
+        started = time.perf_counter()
+        written, error = 0, False
+        try:
+            written = self._dispatch(operation, stripped, kind, params, many)
+        except Exception:
+            error = True
+            raise
+        finally:
+            if self.connection.record:
+                standin.record(kind, time.perf_counter() - started, written, batch=many, error=error)
+
+    def _dispatch(self, operation: str, stripped: str, kind: str, params: Any, many: bool) -> int:
+        upper = stripped[:32].upper()
+        self._rows, self._position, self.description = [], 0, None
+        if kind == "SHOW" and _SHOW_COLUMNS_RE.match(operation):
+            return self._show_columns(operation)
+        if upper.startswith(NO_OP_PREFIXES):
+            self.rowcount = 0
+            return 0
+        if kind == "CREATE" and re.match(r"CREATE\s+(TEMPORARY\s+)?TABLE", upper):
+            return self._create_table(operation)
+        if kind in ("CREATE", "ALTER", "DROP", "TRUNCATE", "RENAME"):
+            return self._ddl(operation, params)
+        if kind == "CHECKSUM":
+            return self._checksum(operation)
+
+        sql = translate_sql(operation, params is not None)
+        if "information_schema" in sql.lower():
+            self.connection._refresh_information_schema()
+        if params is not None and not many and not isinstance(params, (dict, list, tuple)):
+            params = (params,)
+
+        try:
+            if many:
+                cursor = self.connection._conn.executemany(sql, params)
+            else:
+                cursor = self.connection._conn.execute(sql, params if params is not None else ())
+        except sqlite3.OperationalError as e:
+            self.connection.standin.note_unsupported(f"{e}: {' '.join(operation.split())[:100]}")
+            raise mysql_errors.ProgrammingError(msg=str(e)) from e
+        except sqlite3.IntegrityError as e:
+            raise mysql_errors.IntegrityError(msg=str(e)) from e
+        except (sqlite3.ProgrammingError, sqlite3.InterfaceError) as e:
+            raise mysql_errors.ProgrammingError(msg=str(e)) from e
+
+        self.lastrowid = cursor.lastrowid
+        if cursor.description is not None:
+            self.description = cursor.description
+            names = [column[0] for column in cursor.description]
+            rows = [tuple(_convert_value(value) for value in row) for row in cursor.fetchall()]
+            self._rows = [dict(zip(names, row)) for row in rows] if self.dictionary else rows
+            self.rowcount = len(self._rows)
+            return 0
+        self.rowcount = cursor.rowcount
+        return cursor.rowcount if kind in ("INSERT", "REPLACE", "UPDATE", "DELETE") else 0
+
+    def _checksum(self, operation: str) -> int:
+        """``CHECKSUM TABLE t``: (qualified name, CRC32 of the table's rows), NULL if it does not exist"""
+        match = _CHECKSUM_RE.match(operation)
+        if not match:
+            raise mysql_errors.ProgrammingError(msg=f"Unsupported CHECKSUM: {operation[:80]}")
+        conn = self.connection._conn
+        rows = []
+        for name in (part.strip().strip("`") for part in match.group(1).split(",")):
+            table = _DB_PREFIX_RE.sub("", name)
+            try:
+                contents = conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+                checksum = zlib.crc32(repr(contents).encode())
+            except sqlite3.OperationalError:
+                checksum = None
+            qualified = name if "." in name else f"{self.connection.database}.{name}"
+            rows.append((qualified, checksum))
+        self.description = (("Table",) + (None,) * 6, ("Checksum",) + (None,) * 6)
+        self._rows = [dict(zip(("Table", "Checksum"), row)) for row in rows] if self.dictionary else rows
+        self.rowcount = len(rows)
+        return 0
+
+    def _show_columns(self, operation: str) -> int:
+        """``SHOW COLUMNS FROM t``: (Field, Type, Null, Key, Default, Extra) per column"""
+        table = _DB_PREFIX_RE.sub("", _SHOW_COLUMNS_RE.match(operation).group(1))
+        info = self.connection._conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+        if not info:
+            raise mysql_errors.ProgrammingError(msg=f"Table '{self.connection.database}.{table}' doesn't exist")
+        rows = [(name, (column_type or "text").lower(), "NO" if notnull or pk else "YES", "PRI" if pk else "",
+                 default, "") for _, name, column_type, notnull, default, pk in info]
+        names = ("Field", "Type", "Null", "Key", "Default", "Extra")
+        self.description = tuple((name,) + (None,) * 6 for name in names)
+        self._rows = [dict(zip(names, row)) for row in rows] if self.dictionary else rows
+        self.rowcount = len(rows)
+        return 0
+
+    def _create_table(self, operation: str) -> int:
+        ddl, if_not_exists, indexes = translate_create_table(_DB_PREFIX_RE.sub("", operation))
+        conn = self.connection._conn
+        for statement in [ddl, *indexes]:
+            try:
+                conn.execute(statement)
+            except sqlite3.OperationalError as e:
+                if "already exists" in str(e) and if_not_exists:
+                    continue
+                raise mysql_errors.ProgrammingError(msg=str(e)) from e
+        self.rowcount = 0
+        return 0
+
+    def _ddl(self, operation: str, params: Any) -> int:
+        """Other DDL is attempted as-is; what SQLite cannot express is skipped and noted"""
+        sql = translate_sql(operation, params is not None)
+        sql = re.sub(r"\(\s*(\d+)\s*\)", "", sql) if sql.upper().lstrip().startswith("CREATE") else sql
+        try:
+            self.connection._conn.execute(sql, params or ())
+        except sqlite3.OperationalError as e:
+            if "already exists" not in str(e) and "duplicate column" not in str(e):
+                self.connection.standin.note_unsupported(f"skipped DDL ({e}): {' '.join(operation.split())[:100]}")
+        self.rowcount = 0
+        return 0
+
+
+# ==============================================================================
+# PRODUCTION-LIKE SEED DATA
+# ==============================================================================
+
+# Approximate production sizes of tables that COLLECTOR_TABLE_CONFIG does not
+# list (documented alongside their names in shared/table_config.py)
+SUPPORT_TABLE_ROWS = {
+    "crypto_assets": 362,
+    "crypto_news": 119_000,
+    # Sources the realtime materialized updater reads; crypto_prices is its
+    # price table and is sized like price_data_real
+    "crypto_prices": 4_100_000,
+    "ohlc_data": 498_000,
+    "crypto_onchain_data": 153_000,
+    "crypto_sentiment_data": 33_000,
+    "stock_sentiment_data": 1_400,
+    "social_sentiment_data": 33_000,
+}
+
+# ml_features_materialized columns the realtime materialized updater writes
+# besides its (symbol, price_date, price_hour) key (seeded NULL, so refreshed
+# rows show)
+ML_FEATURE_COLUMNS = [
+    "volume_24h", "hourly_volume", "market_cap", "price_change_24h", "price_change_percentage_24h",
+    "open_price", "high_price", "low_price", "close_price", "ohlc_volume",
+    "rsi_14", "sma_20", "sma_50", "ema_12", "ema_26", "macd", "macd_line", "macd_signal", "macd_histogram",
+    "bb_upper", "bb_middle", "bb_lower", "stoch_k", "stoch_d", "atr_14", "vwap",
+    "vix", "spx", "dxy", "tnx", "treasury_10y", "fed_funds_rate", "gold_price", "oil_price",
+    "unemployment_rate", "inflation_rate",
+    "crypto_sentiment_count", "avg_cryptobert_score", "avg_vader_score", "avg_textblob_score",
+    "avg_crypto_keywords_score", "general_crypto_sentiment_count", "avg_general_cryptobert_score",
+    "avg_general_vader_score", "avg_general_textblob_score", "avg_general_crypto_keywords_score",
+    "stock_sentiment_count", "avg_finbert_sentiment_score", "avg_fear_greed_score",
+    "avg_volatility_sentiment", "avg_risk_appetite", "avg_crypto_correlation",
+    "social_post_count", "social_avg_sentiment", "social_avg_confidence", "social_unique_authors",
+    "active_addresses_24h", "transaction_count_24h", "exchange_net_flow_24h", "price_volatility_7d",
+    "data_quality_score",
+]
+
+# Columns the collectors write to each table, with the keys and indexes their
+# queries rely on; a write to any other column fails as it would in MySQL
+SEED_SCHEMAS = {
+    "crypto_assets": """
+        CREATE TABLE crypto_assets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20) NOT NULL,
+            name VARCHAR(100),
+            coingecko_id VARCHAR(100),
+            aliases TEXT,
+            coinbase_supported TINYINT DEFAULT 0,
+            is_active TINYINT DEFAULT 0,
+            status VARCHAR(20) DEFAULT 'inactive',
+            UNIQUE KEY uk_symbol (symbol)
+        )""",
+    "price_data_real": """
+        CREATE TABLE price_data_real (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), coin_id VARCHAR(100), name VARCHAR(100),
+            timestamp BIGINT, timestamp_iso DATETIME,
+            current_price DECIMAL(20,8), open DECIMAL(20,8), high DECIMAL(20,8),
+            low DECIMAL(20,8), close DECIMAL(20,8), volume DECIMAL(30,8),
+            market_cap DECIMAL(30,2), volume_usd_24h DECIMAL(30,2), price_change_24h DECIMAL(20,8),
+            price_change_percentage_24h DECIMAL(10,4), market_cap_rank INT,
+            circulating_supply DECIMAL(30,8), total_supply DECIMAL(30,8), max_supply DECIMAL(30,8),
+            ath DECIMAL(20,8), atl DECIMAL(20,8),
+            data_source VARCHAR(50), collection_interval VARCHAR(20), created_at DATETIME,
+            UNIQUE KEY uk_symbol_time (symbol, timestamp_iso),
+            KEY idx_time (timestamp_iso)
+        )""",
+    "technical_indicators": """
+        CREATE TABLE technical_indicators (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), timestamp_iso DATETIME, price DOUBLE, current_price DOUBLE,
+            sma_20 DOUBLE, sma_50 DOUBLE, sma_200 DOUBLE, ema_12 DOUBLE, ema_26 DOUBLE,
+            rsi_14 DOUBLE, rsi_7 DOUBLE, macd DOUBLE, macd_line DOUBLE, macd_signal DOUBLE,
+            macd_histogram DOUBLE, bb_upper DOUBLE, bb_middle DOUBLE, bb_lower DOUBLE,
+            stoch_k DOUBLE, stoch_d DOUBLE, atr_14 DOUBLE, vwap DOUBLE, latest_price DOUBLE, data_points INT,
+            created_at DATETIME, updated_at DATETIME,
+            UNIQUE KEY uk_symbol_time (symbol, timestamp_iso),
+            KEY idx_created (created_at)
+        )""",
+    "onchain_data": """
+        CREATE TABLE onchain_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), coin_id VARCHAR(100), timestamp_iso DATETIME, collected_at DATETIME,
+            active_addresses BIGINT, transaction_count BIGINT, transaction_volume DOUBLE,
+            hash_rate DOUBLE, difficulty DOUBLE, block_height BIGINT, block_time_seconds DOUBLE,
+            circulating_supply DOUBLE, total_supply DOUBLE, max_supply DOUBLE,
+            supply_inflation_rate DOUBLE, network_value_to_transactions DOUBLE, realized_cap DOUBLE,
+            mvrv_ratio DOUBLE, nvt_ratio DOUBLE, github_commits_30d INT, developer_activity_score DOUBLE,
+            staking_yield DOUBLE, staked_percentage DOUBLE, validator_count INT,
+            total_value_locked DOUBLE, defi_protocols_count INT, data_source VARCHAR(200),
+            data_quality_score DOUBLE, data_completeness_percentage DOUBLE,
+            UNIQUE KEY uk_symbol_time (symbol, timestamp_iso)
+        )""",
+    "macro_indicators": """
+        CREATE TABLE macro_indicators (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            indicator_name VARCHAR(100), indicator_date DATE, value DOUBLE,
+            fred_series_id VARCHAR(50), frequency VARCHAR(20), category VARCHAR(50),
+            data_source VARCHAR(50), collected_at DATETIME, created_at DATETIME, updated_at DATETIME,
+            UNIQUE KEY uk_indicator_date (indicator_name, indicator_date)
+        )""",
+    "real_time_sentiment_signals": """
+        CREATE TABLE real_time_sentiment_signals (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), timestamp DATETIME, sentiment_score DOUBLE, created_at DATETIME,
+            KEY idx_symbol_time (symbol, timestamp)
+        )""",
+    "ml_features_materialized": """
+        CREATE TABLE ml_features_materialized (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), price_date DATE, price_hour INT, timestamp_iso DATETIME,
+            current_price DOUBLE, ohlc_source VARCHAR(50), updated_at DATETIME,
+            """ + ", ".join(f"{column} DOUBLE" for column in ML_FEATURE_COLUMNS) + """,
+            UNIQUE KEY unique_symbol_date_hour (symbol, price_date, price_hour),
+            KEY idx_time (timestamp_iso)
+        )""",
+    "crypto_prices": """
+        CREATE TABLE crypto_prices (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), timestamp_iso DATETIME, price DOUBLE, volume DOUBLE, market_cap DOUBLE,
+            price_change_24h DOUBLE, percent_change_24h DOUBLE,
+            KEY idx_symbol_time (symbol, timestamp_iso)
+        )""",
+    "ohlc_data": """
+        CREATE TABLE ohlc_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(20), timestamp_iso DATETIME, open_price DOUBLE, high_price DOUBLE,
+            low_price DOUBLE, close_price DOUBLE, volume DOUBLE, data_source VARCHAR(50),
+            UNIQUE KEY uk_symbol_time (symbol, timestamp_iso)
+        )""",
+    "crypto_onchain_data": """
+        CREATE TABLE crypto_onchain_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            coin_symbol VARCHAR(20), timestamp DATETIME, active_addresses_24h BIGINT,
+            transaction_count_24h BIGINT, exchange_net_flow_24h DOUBLE, price_volatility_7d DOUBLE,
+            KEY idx_symbol_time (coin_symbol, timestamp)
+        )""",
+    "crypto_sentiment_data": """
+        CREATE TABLE crypto_sentiment_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            asset VARCHAR(50), published_at DATETIME, cryptobert_score DOUBLE, vader_score DOUBLE,
+            textblob_score DOUBLE, crypto_keywords_score DOUBLE,
+            KEY idx_published (published_at)
+        )""",
+    "stock_sentiment_data": """
+        CREATE TABLE stock_sentiment_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            published_at DATETIME, finbert_sentiment_score DOUBLE, fear_greed_score DOUBLE,
+            volatility_sentiment DOUBLE, risk_appetite DOUBLE, crypto_correlation DOUBLE,
+            KEY idx_published (published_at)
+        )""",
+    "social_sentiment_data": """
+        CREATE TABLE social_sentiment_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            asset VARCHAR(50), timestamp DATETIME, sentiment_score DOUBLE, confidence DOUBLE,
+            author VARCHAR(100),
+            KEY idx_time (timestamp)
+        )""",
+    "news_data": """
+        CREATE TABLE news_data (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title TEXT, url TEXT, url_hash CHAR(64), published_at DATETIME, created_at DATETIME,
+            UNIQUE KEY uk_url_hash (url_hash)
+        )""",
+    "crypto_news": """
+        CREATE TABLE crypto_news (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title TEXT, content TEXT, url TEXT, url_hash CHAR(64), published_at DATETIME,
+            source VARCHAR(100), category VARCHAR(50), crypto_mentions TEXT,
+            sentiment_score DOUBLE, sentiment_confidence DOUBLE, llm_sentiment_score DOUBLE,
+            llm_sentiment_confidence DOUBLE, llm_sentiment_analysis TEXT, market_type VARCHAR(20),
+            stock_sentiment_score DOUBLE, stock_sentiment_confidence DOUBLE, stock_sentiment_analysis TEXT,
+            created_at DATETIME, updated_at DATETIME,
+            UNIQUE KEY uk_url_hash (url_hash)
+        )""",
+}
+
+# Spacing between consecutive rows of one symbol / series when seeding
+SEED_STEPS = {
+    "price_data_real": timedelta(hours=1),
+    "technical_indicators": timedelta(hours=1),
+    "onchain_data": timedelta(days=1),
+    "macro_indicators": timedelta(days=1),
+    "real_time_sentiment_signals": timedelta(minutes=15),
+    "ml_features_materialized": timedelta(hours=1),
+    "crypto_prices": timedelta(minutes=15),
+    "ohlc_data": timedelta(hours=1),
+    "crypto_onchain_data": timedelta(days=1),
+    "crypto_sentiment_data": timedelta(minutes=15),
+    "stock_sentiment_data": timedelta(hours=1),
+    "social_sentiment_data": timedelta(minutes=5),
+    "news_data": timedelta(minutes=5),
+    "crypto_news": timedelta(minutes=5),
+}
+
+# Columns left NULL when seeding: the collectors under benchmark fill them
+SEED_NULL_COLUMNS = {
+    "ml_features_materialized": set(ML_FEATURE_COLUMNS) | {"ohlc_source"},
+}
+
+# Columns holding an asset symbol; their rows are seeded round-robin over the active symbols
+_SYMBOL_COLUMNS = ("symbol", "coin_symbol", "asset")
+_TIME_COLUMNS = ("timestamp_iso", "timestamp", "indicator_date", "published_at", "created_at",
+                 "updated_at", "collected_at")
+
+
+def parse_record_count(text: str) -> int:
+    """``"4.1M"`` -> 4100000, ``"323K"`` -> 323000, ``"12+"`` -> 12"""
+    match = re.match(r"\s*([\d.]+)\s*([KMB]?)", str(text), re.I)
+    if not match:
+        return 0
+    multiplier = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}[match.group(2).upper()]
+    return int(round(float(match.group(1)) * multiplier))
+
+
+def production_row_counts() -> Dict[str, int]:
+    """Table -> production row count, from COLLECTOR_TABLE_CONFIG plus support tables"""
+    counts = dict(SUPPORT_TABLE_ROWS)
+    for config in COLLECTOR_TABLE_CONFIG.values():
+        counts[config["target_table"].split(".")[-1]] = parse_record_count(config.get("records", "0"))
+    return counts
+
+
+def asset_symbols(count: int) -> List[str]:
+    """Deterministic asset symbols: real majors first, then synthetic ones"""
+    majors = ["BTC", "ETH", "SOL", "ADA", "DOT", "LINK", "AVAX", "MATIC", "ATOM", "XRP",
+              "LTC", "UNI", "AAVE", "NEAR", "ALGO", "DOGE", "BCH", "FIL", "ICP", "XLM"]
+    return (majors + [f"TK{i:03d}" for i in range(count)])[:count]
+
+
+def _seed_rows(table: str, columns: List[Tuple[str, str]], total: int, symbols: List[str],
+               anchor: datetime, rng: random.Random) -> Tuple[List[str], List[tuple]]:
+    names = [name for name, _ in columns if name != "id"]
+    step = SEED_STEPS.get(table, timedelta(hours=1))
+    series = symbols if any(name in _SYMBOL_COLUMNS for name in names) else [f"SERIES_{i}" for i in range(20)]
+    prices = {key: rng.uniform(0.5, 50_000) for key in series}
+    rows = []
+    for i in range(total):
+        key = series[i % len(series)]
+        moment = anchor - step * (i // len(series))
+        prices[key] *= 1 + rng.gauss(0, 0.01)
+        row = []
+        for name, column_type in columns:
+            if name == "id":
+                continue
+            if name in _SYMBOL_COLUMNS or name == "indicator_name":
+                row.append(key)
+            elif name == "price_date":
+                row.append(moment.date().isoformat())
+            elif name == "price_hour":
+                row.append(moment.hour)
+            elif name == "url_hash":
+                row.append(hashlib.sha256(f"{table}-{i}".encode()).hexdigest())
+            elif name in _TIME_COLUMNS:
+                row.append(moment.date().isoformat() if name == "indicator_date" else _adapt_datetime(moment))
+            elif column_type == "REAL":
+                row.append(round(prices[key] * rng.uniform(0.98, 1.02), 8))
+            elif column_type == "INTEGER":
+                row.append(int(moment.timestamp()) if name == "timestamp" else i)
+            else:
+                row.append(f"{name}-{i}")
+        rows.append(tuple(row))
+    return names, rows
+
+
+def seed_production_like(standin: MySQLStandIn, scale: float = 0.01, active_symbols: int = 20,
+                         seed: int = 7, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Create the collector tables and fill them to ``scale`` x production size
+
+    ``crypto_assets`` keeps its full production size (it is the symbol
+    registry every collector reads); the first ``active_symbols`` assets are
+    active and Coinbase-supported. Time series end at the current hour and
+    step back per ``SEED_STEPS``, round-robin over the active symbols.
+    Returns table -> rows seeded.
+    """
+    rng = random.Random(seed)
+    anchor = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    standin.execute_script(list(SEED_SCHEMAS.values()))
+    counts = production_row_counts()
+    symbols = asset_symbols(active_symbols)
+
+    assets = asset_symbols(counts["crypto_assets"])
+    standin.bulk_insert(
+        "crypto_assets",
+        ["symbol", "name", "coingecko_id", "aliases", "coinbase_supported", "is_active", "status"],
+        [(symbol, f"{symbol} Coin", f"{symbol.lower()}-coin", None, int(active), int(active),
+          "active" if active else "inactive")
+         for index, symbol in enumerate(assets) for active in [index < active_symbols]],
+    )
+    seeded = {"crypto_assets": len(assets)}
+
+    conn = sqlite3.connect(standin.path)
+    try:
+        for table in SEED_SCHEMAS:
+            if table == "crypto_assets":
+                continue
+            total = max(1, int(counts.get(table, 0) * scale))
+            columns = [(name, column_type) for _, name, column_type, *_ in conn.execute(f"PRAGMA table_info({table})")
+                       if name not in SEED_NULL_COLUMNS.get(table, ())]
+            names, rows = _seed_rows(table, columns, total, symbols, anchor, rng)
+            standin.bulk_insert(table, names, rows)
+            seeded[table] = total
+    finally:
+        conn.close()
+    return seeded
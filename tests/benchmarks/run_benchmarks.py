@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Runner
+Runs the collector scenarios against local stand-ins and writes a JSON report.
+
+    python -m tests.benchmarks.run_benchmarks
+    python -m tests.benchmarks.run_benchmarks --scenarios prices,news --scale 0.05 --symbols 100
+    python -m tests.benchmarks.run_benchmarks --baseline test-results/benchmarks-baseline.json
+
+Each scenario runs in its own spawned process so peak RSS is per scenario and
+module-level state cannot leak between them. Exits non-zero when a scenario
+fails or a metric regresses past its tolerance against ``--baseline``.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from tests.benchmarks import scenarios  # noqa: E402,F401  (registers the scenarios)
+from tests.benchmarks.harness import (  # noqa: E402
+    SCENARIOS,
+    BenchmarkOptions,
+    compare_to_baseline,
+    results_document,
+    run_scenario,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = os.path.join("test-results", "benchmarks.json")
+
+
+def _run_isolated(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    logging.basicConfig(level=logging.WARNING)
+    return run_scenario(name, BenchmarkOptions(**options))
+
+
+def run_one(name: str, options: BenchmarkOptions, isolate: bool) -> Dict[str, Any]:
+    try:
+        if not isolate:
+            return run_scenario(name, options)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return pool.submit(_run_isolated, name, asdict(options)).result()
+    except Exception as e:
+        logger.exception(f"Scenario {name} failed")
+        return {"scenario": name, "description": SCENARIOS[name].description, "error": f"{type(e).__name__}: {e}"}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the offline collector benchmarks")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--scale", type=float, default=BenchmarkOptions.scale,
+                        help="Fraction of production row counts to seed")
+    parser.add_argument("--symbols", type=int, default=BenchmarkOptions.symbols,
+                        help="Active symbols in the seeded crypto_assets table")
+    parser.add_argument("--iterations", type=int, default=BenchmarkOptions.iterations,
+                        help="Timed iterations per scenario")
+    parser.add_argument("--latency", type=float, default=BenchmarkOptions.api_latency,
+                        help="Seconds of injected latency per fake API response")
+    parser.add_argument("--coingecko-rate-limit", type=float, default=None,
+                        help="Requests/second the fake CoinGecko API allows before answering 429")
+    parser.add_argument("--client-rate-limits", action="store_true",
+                        help="Keep the collectors' production client-side rate limits")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--save-baseline", help="Also write the results to this path as the new baseline")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Run scenarios in this process (faster, but RSS is cumulative)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = parse_args(argv)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        logger.error(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+        return 2
+
+    options = BenchmarkOptions(
+        scale=args.scale,
+        symbols=args.symbols,
+        iterations=args.iterations,
+        api_latency=args.latency,
+        api_rate_limit=args.coingecko_rate_limit,
+        client_rate_limits=args.client_rate_limits,
+    )
+
+    results = []
+    for name in names:
+        logger.info(f"Running scenario {name}")
+        result = run_one(name, options, isolate=not args.no_isolate)
+        results.append(result)
+        if "error" in result:
+            logger.error(f"  {name}: {result['error']}")
+        else:
+            logger.info(f"  {name}: {result['records']} records, {result['records_per_second']}/s, "
+                        f"p95 {result['p95_seconds']}s, {result['statements']} statements, "
+                        f"{result['http_requests']} HTTP requests, peak RSS {result['peak_rss_mb']} MB")
+
+    document = results_document(results, options)
+    failed = [result["scenario"] for result in results if "error" in result]
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        document["comparison"] = compare_to_baseline(document, baseline)
+        for regression in document["comparison"]["regressions"]:
+            logger.warning(f"Regression: {regression}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2, default=str)
+        logger.info(f"Results written to {path}")
+
+    if failed or document.get("comparison", {}).get("regressions"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark Scenarios
+End-to-end runs of the collectors against the offline stand-ins.
+
+Each ``setup(env)`` imports the service inside the benchmark environment,
+builds the collector and returns the callable the harness times. Records are
+what the pipeline stored (or, for the updater, rows it upserted).
+"""
+
+import asyncio
+import types
+from datetime import date, timedelta
+
+from tests.benchmarks.harness import BenchmarkEnvironment, ScenarioOutcome, scenario
+
+PRICE_SERVICE = "services/price-collection/enhanced_crypto_prices_service.py"
+ONCHAIN_COLLECTOR = "services/onchain-collection/enhanced_onchain_collector.py"
+TECHNICAL_CALCULATOR = "services/enhanced_technical_calculator.py"
+NEWS_COLLECTOR = "services/news-collection/enhanced_crypto_news_collector.py"
+MATERIALIZED_UPDATER = "archive/src/docker/materialized_updater/realtime_materialized_updater.py"
+
+ONCHAIN_BACKFILL_DAYS = 3
+MATERIALIZED_DAYS = 7
+
+
+class NullMLCalculator:
+    """
+    Stand-in for ``enhanced_ml_calculations.AdvancedMLCalculator``
+
+    That package is not part of this tree; the materialized scenario measures
+    the set-based reads and upserts, so the advanced ML columns stay NULL.
+    """
+
+    def __init__(self, db_config=None):
+        pass
+
+    def calculate_advanced_ml_indicators(self, symbol, timestamp_iso, record):
+        return {}
+
+    def get_default_ml_indicators(self):
+        return {}
+
+
+@scenario("prices", "EnhancedCryptoPricesService: batched /simple/price for all symbols, then one upsert")
+def prices(env: BenchmarkEnvironment):
+    module = env.load_service(PRICE_SERVICE)
+    service = module.EnhancedCryptoPricesService()
+
+    def run() -> ScenarioOutcome:
+        async def cycle():
+            try:
+                result = await service.get_current_prices_all_symbols()
+                stored = await asyncio.to_thread(service.store_prices_to_mysql, result["prices"])
+                return result, stored
+            finally:
+                await service.close()
+
+        result, stored = asyncio.run(cycle())
+        return ScenarioOutcome(stored, {"symbols_requested": result["symbols_requested"],
+                                        "api_calls": result["api_calls"]})
+    return run
+
+
+@scenario("onchain", f"EnhancedOnchainCollector: {ONCHAIN_BACKFILL_DAYS}-day backfill, all sources fanned out")
+def onchain(env: BenchmarkEnvironment):
+    module = env.load_service(ONCHAIN_COLLECTOR)
+    collector = module.EnhancedOnchainCollector()
+    symbols = env.active_symbols
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=ONCHAIN_BACKFILL_DAYS - 1)
+
+    def run() -> ScenarioOutcome:
+        result = asyncio.run(collector.run_backfill(start, end, symbols))
+        return ScenarioOutcome(result["records_stored"], {"dates_processed": result["dates_processed"],
+                                                          "errors": len(result["errors"]),
+                                                          "source_stats": collector.source_stats})
+    return run
+
+
+@scenario("technical", "EnhancedTechnicalCalculator: indicators for every active symbol from seeded prices")
+def technical(env: BenchmarkEnvironment):
+    module = env.load_service(TECHNICAL_CALCULATOR)
+    collector = module.EnhancedTechnicalCalculator()
+    # One batch: the calculator sleeps between batches to pace production load
+    collector.config.batch_processing_size = max(collector.config.batch_processing_size, env.options.symbols)
+    if not env.options.client_rate_limits:
+        collector.rate_limiter = None
+
+    def run() -> ScenarioOutcome:
+        processed = asyncio.run(collector.collect_data())
+        return ScenarioOutcome(processed, {"collection_errors": collector.collection_errors})
+    return run
+
+
+@scenario("news", "CryptoNewsService: conditional-GET fetch of every RSS feed, parse, mention detection, bulk upsert")
+def news(env: BenchmarkEnvironment):
+    module = env.load_service(NEWS_COLLECTOR)
+    service = module.news_collector.service
+
+    def run() -> ScenarioOutcome:
+        result = service.run_collection_cycle()
+        return ScenarioOutcome(result["items_stored"], {"items_collected": result["items_collected"],
+                                                        "sources_processed": result["sources_processed"],
+                                                        "errors": result["errors"]})
+    return run
+
+
+@scenario("materialized", f"RealTimeMaterializedTableUpdater: set-based {MATERIALIZED_DAYS}-day refresh "
+                          "of ml_features_materialized for every active symbol")
+def materialized(env: BenchmarkEnvironment):
+    ml_calculations = types.ModuleType("enhanced_ml_calculations")
+    ml_calculations.AdvancedMLCalculator = NullMLCalculator
+    module = env.load_service(MATERIALIZED_UPDATER, modules={"enhanced_ml_calculations": ml_calculations})
+    updater = module.RealTimeMaterializedTableUpdater()
+    updater.end_date = date.today()
+    updater.start_date = updater.end_date - timedelta(days=MATERIALIZED_DAYS - 1)
+
+    def run() -> ScenarioOutcome:
+        processed = updater.process_updates_set_based(updater.symbols)
+        return ScenarioOutcome(processed, {"symbols": len(updater.symbols),
+                                           "start_date": updater.start_date.isoformat(),
+                                           "end_date": updater.end_date.isoformat()})
+    return run
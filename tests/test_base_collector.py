@@ -362,7 +362,8 @@ class TestCircuitBreakerAndRateLimiting(BaseCollectorTestCase):
         """Test rate limiter is properly initialized"""
         rl = mock_collector.rate_limiter
         assert rl is not None
-        assert rl.max_tokens == 60  # From config
+        assert rl.calls_per_minute == 60  # From config
+        assert rl.capacity == 60
     
     @pytest.mark.asyncio
     async def test_rate_limiting_functionality(self, mock_collector):
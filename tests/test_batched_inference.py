@@ -0,0 +1,151 @@
+"""
+Unit tests for micro-batched model inference
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.batched_inference import InferenceResultCache, MicroBatcher
+from services.enhanced_sentiment_ml_analysis import EnhancedMLSentimentCollector
+
+
+class RecordingModel:
+    """Fake pipeline that records each batch and the thread it ran on"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.threads = set()
+        self.fail_on = fail_on
+
+    def __call__(self, model_key, texts):
+        self.batches.append((model_key, list(texts)))
+        self.threads.add(threading.current_thread().name)
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError("model exploded")
+        return [f"{model_key}:{text}" for text in texts]
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    """Test batching, dedup and caching"""
+
+    def test_concurrent_requests_share_length_sorted_batches(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=4, max_latency=10)
+        texts = ["x" * n for n in (5, 1, 4, 2, 7, 3, 6, 8)]
+
+        results = asyncio.run(batcher.infer_many("crypto", texts))
+
+        assert results == [f"crypto:{t}" for t in texts]
+        assert [len(batch) for _, batch in model.batches] == [4, 4]
+        assert [len(t) for t in model.batches[0][1]] == [1, 2, 3, 4]
+        assert model.threads and all(name.startswith("inference") for name in model.threads)
+        batcher.close()
+
+    def test_partial_batch_flushes_after_latency_deadline(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=32, max_latency=0.01)
+
+        results = asyncio.run(batcher.infer_many("stock", ["a", "b"]))
+
+        assert results == ["stock:a", "stock:b"]
+        assert model.batches == [("stock", ["a", "b"])]
+        batcher.close()
+
+    def test_duplicates_and_repeats_skip_inference(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=8, max_latency=0.01)
+
+        async def run():
+            first = await batcher.infer_many("crypto", ["same", "same", "other"])
+            second = await batcher.infer("crypto", "same")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first == ["crypto:same", "crypto:same", "crypto:other"]
+        assert second == "crypto:same"
+        assert model.batches == [("crypto", ["same", "other"])]
+        stats = batcher.get_stats()
+        assert stats["deduplicated"] == 1
+        assert stats["cache_hits"] == 1
+        assert stats["texts_inferred"] == 2
+        batcher.close()
+
+    def test_models_are_batched_separately(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=8, max_latency=0.01)
+
+        async def run():
+            return await asyncio.gather(batcher.infer("crypto", "t"), batcher.infer("stock", "t"))
+
+        assert asyncio.run(run()) == ["crypto:t", "stock:t"]
+        assert sorted(model.batches) == [("crypto", ["t"]), ("stock", ["t"])]
+        batcher.close()
+
+    def test_batch_failure_propagates_and_is_not_cached(self):
+        model = RecordingModel(fail_on="bad")
+        batcher = MicroBatcher(model, max_batch_size=8, max_latency=0.01)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.infer_many("crypto", ["bad", "good"]))
+
+        assert batcher.get_stats()["errors"] == 1
+        assert len(batcher.cache) == 0
+        batcher.close()
+
+
+@pytest.mark.unit
+class TestInferenceResultCache:
+    """Test LRU eviction"""
+
+    def test_evicts_least_recently_used(self):
+        cache = InferenceResultCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+
+class TopLabelPipeline:
+    """Fake top-1 pipeline: one bare {label, score} dict per text, like HuggingFace's default"""
+
+    LABELS = {"up": ("LABEL_2", 0.9), "down": ("LABEL_0", 0.8)}
+
+    def __call__(self, texts, **kwargs):
+        return [{"label": self.LABELS[text][0], "score": self.LABELS[text][1]} for text in texts]
+
+
+@pytest.mark.unit
+class TestSentimentPipelineBatch:
+    """Test per-text result shape does not depend on batch size"""
+
+    def _collector(self):
+        collector = EnhancedMLSentimentCollector.__new__(EnhancedMLSentimentCollector)
+        collector.crypto_sentiment_pipeline = TopLabelPipeline()
+        collector.config = type("Config", (), {"fallback_confidence": 0.5})()
+        collector.logger = type("Logger", (), {"warning": print, "error": print})()
+        return collector
+
+    def test_multi_text_batch_scores_like_single_texts(self):
+        collector = self._collector()
+        batched = collector._run_pipeline_batch("crypto", ["up", "down"])
+        single = collector._run_pipeline_batch("crypto", ["up"])
+
+        assert batched[0] == single[0] == [{"label": "LABEL_2", "score": 0.9}]
+
+        async def scores(results):
+            return [await collector._extract_sentiment_from_results(result, "crypto") for result in results]
+
+        assert asyncio.run(scores(batched)) == [(0.9, 0.9), (-0.8, 0.8)]
+        assert asyncio.run(scores(single)) == [(0.9, 0.9)]
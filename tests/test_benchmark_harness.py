@@ -0,0 +1,165 @@
+"""
+Unit tests for the offline benchmark stand-ins and baseline comparison
+"""
+
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from mysql.connector import errors as mysql_errors
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.benchmarks.fake_api import FakeApiServer, Route, default_routes
+from tests.benchmarks.harness import compare_to_baseline
+from tests.benchmarks.mysql_standin import (
+    MySQLStandIn,
+    parse_record_count,
+    seed_production_like,
+    translate_sql,
+)
+
+
+@pytest.fixture
+def standin():
+    db = MySQLStandIn()
+    yield db
+    db.close()
+
+
+@pytest.mark.unit
+class TestMySQLStandIn:
+    """Test MySQL dialect translation and statement accounting"""
+
+    def test_translate_placeholders_and_dialect(self):
+        sql = translate_sql(
+            "SELECT * FROM crypto_prices.price_data_real WHERE symbol = %s AND note = '100%s' "
+            "AND timestamp > NOW() - INTERVAL 7 DAY", True)
+        assert "symbol = ?" in sql
+        assert "'100%s'" in sql
+        assert "crypto_prices." not in sql
+        assert "datetime(NOW(), '-' || (7) || ' days')" in sql
+        assert translate_sql("INSERT IGNORE INTO t (a) VALUES (%s)", True).startswith("INSERT OR IGNORE")
+
+    def test_upsert_and_stats(self, standin):
+        conn = standin.connect()
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS prices (id INT AUTO_INCREMENT PRIMARY KEY, "
+                       "symbol VARCHAR(10), price DECIMAL(20,8), UNIQUE KEY uk_symbol (symbol))")
+        upsert = ("INSERT INTO prices (symbol, price) VALUES (%s, %s) "
+                  "ON DUPLICATE KEY UPDATE price = VALUES(price)")
+        cursor.executemany(upsert, [("BTC", 1.0), ("ETH", 2.0)])
+        cursor.execute(upsert, ("BTC", 3.0))
+        conn.commit()
+
+        dict_cursor = conn.cursor(dictionary=True)
+        dict_cursor.execute("SELECT symbol, price FROM prices ORDER BY symbol")
+        assert dict_cursor.fetchall() == [{"symbol": "BTC", "price": 3.0}, {"symbol": "ETH", "price": 2.0}]
+        conn.close()
+
+        stats = standin.get_stats()
+        assert stats["executemany_batches"] == 1
+        assert stats["rows_written"] == 3
+        assert stats["commits"] == 1
+        assert stats["by_kind"]["INSERT"] == 2
+
+    def test_information_schema_and_unknown_columns(self, standin):
+        conn = standin.connect()
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE news (id INT PRIMARY KEY, title TEXT)")
+        cursor.execute("SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", ("news",))
+        assert {row[0] for row in cursor.fetchall()} == {"id", "title"}
+
+        # Writes naming a column the table lacks fail as they would in MySQL
+        with pytest.raises(mysql_errors.ProgrammingError, match="sentiment"):
+            cursor.execute("INSERT INTO news (id, title, sentiment) VALUES (%s, %s, %s)", (1, "a", 0.5))
+        with pytest.raises(mysql_errors.ProgrammingError):
+            cursor.execute("INSERT INTO news_archive (id) VALUES (%s)", (1,))
+        cursor.execute("INSERT INTO news (id, title) VALUES (%s, %s)", (1, "a"))
+        conn.commit()
+
+        cursor.execute("CHECKSUM TABLE news")
+        (table, before), = cursor.fetchall()
+        cursor.execute("UPDATE news SET title = %s WHERE id = %s", ("b", 1))
+        cursor.execute("CHECKSUM TABLE news")
+        assert table == "crypto_prices.news"
+        assert cursor.fetchone()[1] != before
+        conn.close()
+
+    def test_seed_scales_production_row_counts(self, standin):
+        assert parse_record_count("4.1M") == 4_100_000
+        assert parse_record_count("362") == 362
+        seeded = seed_production_like(standin, scale=0.001, active_symbols=5)
+        counts = standin.row_counts()
+        assert counts["crypto_assets"] == 362
+        assert counts["price_data_real"] == seeded["price_data_real"] > 0
+
+        conn = standin.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM crypto_assets WHERE is_active = 1 AND coinbase_supported = 1")
+        assert cursor.fetchone()[0] == 5
+        conn.close()
+
+
+@pytest.mark.unit
+class TestFakeApiServer:
+    """Test fixture replay, injected latency and rate limiting"""
+
+    def _get(self, url):
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, None, e.headers
+
+    def test_replays_fixtures_through_rewritten_urls(self):
+        with FakeApiServer(default_routes()) as server:
+            url = server.rewrite("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd")
+            assert url.startswith(server.base_url)
+            status, body, _ = self._get(url)
+            assert status == 200
+            assert body["bitcoin"]["usd"] > 0
+            assert server.get_stats()["requests"] == 1
+
+    def test_latency_and_rate_limit(self):
+        routes = [Route("api.example.com", r"/ping", lambda request: {"ok": True},
+                        latency=0.05, rate_limit=1, retry_after=7)]
+        with FakeApiServer(routes) as server:
+            url = server.rewrite("https://api.example.com/ping")
+            started = time.perf_counter()
+            assert self._get(url)[0] == 200
+            assert time.perf_counter() - started >= 0.05
+            status, _, headers = self._get(url)
+            assert status == 429
+            assert headers["Retry-After"] == "7"
+            assert server.get_stats()["rate_limited"] == 1
+
+
+@pytest.mark.unit
+class TestBaselineComparison:
+    """Test regression detection against a saved baseline"""
+
+    def test_flags_only_moves_past_tolerance(self):
+        baseline = {"scenarios": {
+            "prices": {"records_per_second": 100.0, "p95_seconds": 1.0, "statements": 10, "peak_rss_mb": 100.0},
+            "news": {"records_per_second": 50.0},
+        }}
+        current = {"scenarios": {
+            "prices": {"records_per_second": 70.0, "p95_seconds": 0.5, "statements": 10, "peak_rss_mb": 110.0},
+            "technical": {"records_per_second": 10.0},
+        }}
+        comparison = compare_to_baseline(current, baseline)
+        prices = comparison["scenarios"]["prices"]
+        assert prices["status"] == "regressed"
+        assert prices["metrics"]["records_per_second"]["status"] == "regressed"
+        assert prices["metrics"]["p95_seconds"]["status"] == "improved"
+        assert prices["metrics"]["peak_rss_mb"]["status"] == "ok"
+        assert comparison["regressions"] == ["prices.records_per_second"]
+        assert comparison["scenarios"]["technical"]["status"] == "new"
+        assert comparison["scenarios"]["news"]["status"] == "missing"
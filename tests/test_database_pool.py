@@ -0,0 +1,190 @@
+"""
+Unit tests for the shared database connection pool
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.database_pool import DatabaseConnectionPool, AsyncDatabasePool, PoolTimeoutError
+
+
+def make_fake_connection(connected=True):
+    """Fake MySQL connection whose cursor answers SELECT 1"""
+    conn = Mock()
+    conn.is_connected.return_value = connected
+    conn.in_transaction = False
+    cursor = Mock()
+    cursor.fetchall.return_value = [(1,)]
+    cursor.rowcount = 2
+    conn.cursor.return_value = cursor
+    return conn
+
+
+@pytest.mark.unit
+class TestDatabaseConnectionPool:
+    """Test bounded checkout, validation and recycling"""
+
+    def test_connections_are_reused(self):
+        factory = Mock(side_effect=make_fake_connection)
+        pool = DatabaseConnectionPool(pool_size=2, connection_factory=factory)
+
+        for _ in range(5):
+            with pool.get_connection_context() as conn:
+                conn.cursor().execute("SELECT 1")
+
+        assert factory.call_count == 1
+        stats = pool.get_pool_stats()
+        assert stats["checkouts"] == 5
+        assert stats["idle_connections"] == 1
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = DatabaseConnectionPool(pool_size=1, checkout_timeout=0.05,
+                                      connection_factory=make_fake_connection)
+
+        with pool.get_connection_context():
+            with pytest.raises(PoolTimeoutError):
+                with pool.get_connection_context():
+                    pass
+
+        assert pool.get_pool_stats()["timeouts"] == 1
+
+    def test_waiter_receives_released_connection(self):
+        pool = DatabaseConnectionPool(pool_size=1, checkout_timeout=2,
+                                      connection_factory=make_fake_connection)
+        acquired = []
+
+        def worker():
+            with pool.get_connection_context() as conn:
+                acquired.append(conn)
+
+        with pool.get_connection_context() as first:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            time.sleep(0.05)
+            assert acquired == []
+
+        thread.join(timeout=2)
+        assert acquired == [first]
+
+    def test_stale_connection_is_replaced(self):
+        dead = make_fake_connection(connected=False)
+        factory = Mock(side_effect=[dead, make_fake_connection()])
+        pool = DatabaseConnectionPool(pool_size=1, validation_interval=0,
+                                      connection_factory=factory)
+
+        with pool.get_connection_context():
+            pass
+        with pool.get_connection_context() as conn:
+            assert conn is not dead
+
+        dead.close.assert_called_once()
+        assert pool.get_pool_stats()["invalidated"] == 1
+
+    def test_expired_connection_is_recycled(self):
+        factory = Mock(side_effect=lambda: make_fake_connection())
+        pool = DatabaseConnectionPool(pool_size=1, max_lifetime=0.01,
+                                      connection_factory=factory)
+
+        with pool.get_connection_context():
+            time.sleep(0.02)
+        with pool.get_connection_context():
+            pass
+
+        assert factory.call_count == 2
+        assert pool.get_pool_stats()["recycled"] >= 1
+
+    def test_open_transaction_rolled_back_on_release(self):
+        conn = make_fake_connection()
+        pool = DatabaseConnectionPool(pool_size=1, connection_factory=lambda: conn)
+
+        with pool.get_connection_context():
+            conn.in_transaction = True
+
+        conn.rollback.assert_called_once()
+
+    def test_failed_connect_frees_slot(self):
+        factory = Mock(side_effect=[RuntimeError("refused"), make_fake_connection()])
+        pool = DatabaseConnectionPool(pool_size=1, connection_factory=factory)
+
+        with pytest.raises(RuntimeError):
+            with pool.get_connection_context():
+                pass
+        with pool.get_connection_context():
+            pass
+
+        assert pool.get_pool_stats()["open_connections"] == 1
+
+    def test_session_init_statements_run_once_per_connection(self):
+        conn = make_fake_connection()
+        pool = DatabaseConnectionPool(pool_size=1, connection_factory=lambda: conn,
+                                      session_init=["SET SESSION max_execution_time = 30000"])
+
+        for _ in range(3):
+            with pool.get_connection_context():
+                pass
+
+        conn.cursor.return_value.execute.assert_called_once_with("SET SESSION max_execution_time = 30000")
+
+    def test_driver_pool_keys_are_not_forwarded(self):
+        pool = DatabaseConnectionPool(connection_kwargs={'host': 'db', 'pool_name': 'x', 'pool_size': 3},
+                                      connection_factory=make_fake_connection)
+
+        assert pool._connection_kwargs == {'host': 'db'}
+
+
+@pytest.mark.unit
+class TestAsyncDatabasePool:
+    """Test the executor-backed async facade"""
+
+    def test_queries_run_off_the_event_loop(self):
+        pool = DatabaseConnectionPool(pool_size=2, connection_factory=make_fake_connection)
+        async_pool = AsyncDatabasePool(pool)
+        loop_thread = []
+
+        def probe(conn):
+            return threading.get_ident()
+
+        async def scenario():
+            loop_thread.append(threading.get_ident())
+            return await async_pool.run(probe), await async_pool.fetchone("SELECT 1")
+
+        worker_thread, row = asyncio.run(scenario())
+        async_pool.close()
+
+        assert worker_thread != loop_thread[0]
+        assert row == (1,)
+
+    def test_health_check_reports_failure(self):
+        pool = DatabaseConnectionPool(pool_size=1, connection_factory=Mock(side_effect=RuntimeError("down")))
+        async_pool = AsyncDatabasePool(pool)
+
+        assert asyncio.run(async_pool.health_check()) is False
+        async_pool.close()
+
+    def test_on_complete_reports_latency_and_outcome(self):
+        pool = DatabaseConnectionPool(pool_size=1, connection_factory=make_fake_connection)
+        calls = []
+        async_pool = AsyncDatabasePool(pool, on_complete=lambda seconds, success: calls.append((seconds, success)))
+
+        def fail(conn):
+            raise RuntimeError("query failed")
+
+        async def scenario():
+            await async_pool.fetchall("SELECT 1")
+            with pytest.raises(RuntimeError):
+                await async_pool.run(fail)
+
+        asyncio.run(scenario())
+        async_pool.close()
+
+        assert [success for _, success in calls] == [True, False]
+        assert all(seconds >= 0 for seconds, _ in calls)
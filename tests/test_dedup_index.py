@@ -0,0 +1,107 @@
+"""
+Unit tests for the bounded duplicate index
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.dedup_index import DedupIndex, RecordFingerprinter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestRecordFingerprinter:
+    """Test stable record fingerprints"""
+
+    def test_full_record_ignores_key_order(self):
+        fingerprint = RecordFingerprinter()
+        a = {"symbol": "BTC", "price": 1.5, "timestamp": datetime(2024, 1, 1)}
+        b = {"timestamp": datetime(2024, 1, 1), "price": 1.5, "symbol": "BTC"}
+
+        assert fingerprint(a) == fingerprint(b)
+        assert fingerprint(a) != fingerprint({**a, "price": 1.6})
+        assert 0 <= fingerprint(a) < 2 ** 64
+
+    def test_key_fields_ignore_other_fields(self):
+        fingerprint = RecordFingerprinter(("symbol", "timestamp"))
+        a = {"symbol": "BTC", "timestamp": "2024-01-01", "price": 1.5}
+
+        assert fingerprint(a) == fingerprint({**a, "price": 2.0})
+        assert fingerprint(a) != fingerprint({**a, "symbol": "ETH"})
+
+
+@pytest.mark.unit
+class TestDedupIndex:
+    """Test O(1) membership with FIFO/TTL eviction and snapshots"""
+
+    def test_hits_misses_and_fifo_eviction(self):
+        index = DedupIndex(max_entries=3)
+
+        assert [index.check_and_add({"id": i}) for i in range(4)] == [False] * 4
+        assert len(index) == 3
+        # id 0 was evicted first; id 3 is still present
+        assert not index.contains({"id": 0})
+        assert index.check_and_add({"id": 3})
+        assert index.get_stats()["hits"] == 1
+        assert index.get_stats()["misses"] == 4
+        assert index.get_stats()["evictions"] == 1
+
+    def test_ttl_eviction(self):
+        clock = Clock()
+        index = DedupIndex(max_entries=100, ttl_seconds=60, clock=clock)
+        index.check_and_add({"id": 1})
+        clock.now += 30
+        index.check_and_add({"id": 2})
+
+        clock.now += 31
+        assert not index.contains({"id": 1})
+        assert index.contains({"id": 2})
+        assert not index.check_and_add({"id": 1})
+
+    def test_snapshot_round_trip_keeps_order_and_ages(self, tmp_path):
+        path = str(tmp_path / "dedup" / "snapshot.json")
+        clock = Clock()
+        index = DedupIndex(max_entries=3, ttl_seconds=100, clock=clock)
+        index.check_and_add({"id": 1})
+        clock.now += 50
+        index.check_and_add({"id": 2})
+        assert index.save(path)
+        assert len(json.load(open(path))["entries"]) == 2
+
+        restarted_clock = Clock()
+        restarted = DedupIndex(max_entries=3, ttl_seconds=100, clock=restarted_clock)
+        restarted.check_and_add({"id": 3})
+        assert restarted.load(path) == 2
+        assert restarted.contains({"id": 1}) and restarted.contains({"id": 2})
+
+        # Restored entries are older than anything seen since startup
+        restarted.check_and_add({"id": 4})
+        assert not restarted.contains({"id": 1})
+        assert restarted.contains({"id": 3})
+
+        # Ages carry over: id 2 was 0s old at save time and expires 100s later
+        restarted_clock.now += 101
+        assert not restarted.contains({"id": 2})
+
+    def test_missing_or_corrupt_snapshot_restores_nothing(self, tmp_path):
+        index = DedupIndex()
+        assert index.load(str(tmp_path / "missing.json")) == 0
+
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert index.load(str(corrupt)) == 0
+        assert len(index) == 0
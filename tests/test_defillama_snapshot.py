@@ -0,0 +1,123 @@
+"""
+Unit tests for the DeFiLlama snapshot cache
+"""
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.defillama_snapshot import DefiLlamaSnapshotCache, build_protocol_count_index
+
+CHAINS = [{"name": "Ethereum", "tvl": 50e9}, {"name": "Solana", "tvl": 8e9}]
+PROTOCOLS = [
+    {"name": "Aave", "tvl": 10e9, "chains": ["Ethereum", "Polygon"]},
+    {"name": "Tiny", "tvl": 5_000, "chains": ["Ethereum"]},
+    {"name": "Jito", "tvl": 2e9, "chains": ["Solana", "solana"]},
+    {"name": "NoTvl", "tvl": None, "chains": ["Solana"]},
+]
+
+
+def epoch(day):
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeClient:
+    """Serves canned DeFiLlama payloads and counts downloads per path"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.payloads = {
+            "/v2/chains": CHAINS,
+            "/protocols": PROTOCOLS,
+            "/v2/historicalChainTvl/ethereum": [
+                {"date": epoch(date(2024, 1, 1)), "tvl": 40e9},
+                {"date": epoch(date(2024, 1, 2)), "tvl": 41e9},
+            ],
+        }
+
+    @asynccontextmanager
+    async def get(self, url, **kwargs):
+        path = url.split("api.llama.fi", 1)[1]
+        self.calls.append(path)
+        await asyncio.sleep(0)
+        if self.fail:
+            yield FakeResponse(500, None)
+        else:
+            yield FakeResponse(200, self.payloads[path])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestDefiLlamaSnapshotCache:
+    """Test download sharing and indexes"""
+
+    def test_all_symbols_share_one_download(self):
+        client = FakeClient()
+        cache = DefiLlamaSnapshotCache()
+
+        async def run():
+            return await asyncio.gather(*(cache.get_snapshot(client) for _ in range(50)))
+
+        snapshots = asyncio.run(run())
+
+        assert all(s is snapshots[0] for s in snapshots)
+        assert sorted(client.calls) == ["/protocols", "/v2/chains"]
+        assert snapshots[0].tvl("ethereum") == 50e9
+        assert snapshots[0].active_protocols("Ethereum") == 1
+        assert snapshots[0].active_protocols("solana") == 1
+        assert snapshots[0].active_protocols("cosmos") == 0
+
+    def test_refreshes_after_window_and_keeps_stale_on_failure(self):
+        clock = Clock()
+        client = FakeClient()
+        cache = DefiLlamaSnapshotCache(refresh_seconds=60, clock=clock)
+
+        first = asyncio.run(cache.get_snapshot(client))
+        clock.now = 30
+        assert asyncio.run(cache.get_snapshot(client)) is first
+        assert len(client.calls) == 2
+
+        clock.now = 90
+        client.fail = True
+        assert asyncio.run(cache.get_snapshot(client)) is first
+        assert cache.stats["download_errors"] == 1
+
+    def test_history_is_downloaded_once_per_chain_and_indexed_by_day(self):
+        client = FakeClient()
+        cache = DefiLlamaSnapshotCache()
+
+        async def run():
+            return [await cache.chain_tvl_on(client, "Ethereum", day)
+                    for day in (date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3))]
+
+        assert asyncio.run(run()) == [40e9, 41e9, None]
+        assert client.calls == ["/v2/historicalChainTvl/ethereum"]
+
+
+@pytest.mark.unit
+def test_protocol_count_index_skips_small_and_duplicate_chains():
+    assert build_protocol_count_index(PROTOCOLS, min_tvl=100_000) == {"ethereum": 1, "polygon": 1, "solana": 1}
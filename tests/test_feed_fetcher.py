@@ -0,0 +1,160 @@
+"""
+Unit tests for conditional, concurrent RSS feed fetching
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.feed_fetcher import FeedFetcher, FeedState, InMemoryFeedStateStore, MySQLFeedStateStore
+
+
+def rss(*items):
+    body = "".join(
+        f"<item><title>{title}</title><link>https://news.example/{guid}</link>"
+        f"<guid>{guid}</guid><pubDate>{pub}</pubDate></item>"
+        for guid, title, pub in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{body}</channel></rss>'
+
+
+ITEM_A = ("a", "Bitcoin rallies", "Mon, 10 Nov 2025 10:00:00 GMT")
+ITEM_B = ("b", "Ether follows", "Mon, 10 Nov 2025 11:00:00 GMT")
+ITEM_C = ("c", "Solana news", "Mon, 10 Nov 2025 12:00:00 GMT")
+
+
+class FakeFeedServer:
+    """Serves one mutable feed with ETag support and counts requests"""
+
+    def __init__(self):
+        self.items = [ITEM_A, ITEM_B]
+        self.version = 1
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        etag = f'"v{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text=rss(*self.items), headers={"ETag": etag}, content_type="application/rss+xml")
+
+    async def handle_error(self, request):
+        return web.Response(status=503)
+
+
+async def run_cycles(server, store, cycles):
+    app = web.Application()
+    app.router.add_get("/feed", server.handle)
+    app.router.add_get("/broken", server.handle_error)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    feeds = [("Feed", f"http://127.0.0.1:{port}/feed"), ("Broken", f"http://127.0.0.1:{port}/broken")]
+
+    fetcher = FeedFetcher(store, per_host_limit=2)
+    outcomes = []
+    try:
+        for change in cycles:
+            change(server)
+            results = await fetcher.fetch_all(feeds)
+            fetcher.commit(results)
+            outcomes.append(results)
+    finally:
+        await runner.cleanup()
+    return outcomes
+
+
+@pytest.mark.unit
+class TestFeedFetcher:
+    """Test conditional GETs and high-water filtering"""
+
+    def test_unchanged_feed_returns_304_and_only_new_entries_are_returned(self):
+        server = FakeFeedServer()
+
+        def add_item(s):
+            s.items = [ITEM_A, ITEM_B, ITEM_C]
+            s.version += 1
+
+        first, second, third = asyncio.run(run_cycles(
+            server, InMemoryFeedStateStore(), [lambda s: None, lambda s: None, add_item]
+        ))
+
+        assert [e.id for e in first[0].entries] == ["a", "b"]
+        assert first[1].error == "HTTP 503"
+
+        assert second[0].not_modified
+        assert second[0].entries == []
+        assert server.requests[2]["If-None-Match"] == '"v1"'
+
+        assert third[0].status == 200
+        assert third[0].total_entries == 3
+        assert [e.id for e in third[0].entries] == ["c"]
+        assert third[0].state.high_water == datetime(2025, 11, 10, 12)
+
+    def test_uncommitted_results_are_fetched_again(self):
+        server = FakeFeedServer()
+        store = InMemoryFeedStateStore()
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/feed", server.handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            fetcher = FeedFetcher(store)
+            try:
+                await fetcher.fetch_all([("Feed", f"http://127.0.0.1:{port}/feed")])
+                return await fetcher.fetch_all([("Feed", f"http://127.0.0.1:{port}/feed")])
+            finally:
+                await runner.cleanup()
+
+        results = asyncio.run(run())
+
+        assert results[0].status == 200
+        assert len(results[0].entries) == 2
+
+
+@pytest.mark.unit
+class TestFeedState:
+    """Test high-water and GUID rules"""
+
+    def test_seen_guids_and_stale_entries_are_not_new(self):
+        state = FeedState("u", high_water=datetime(2025, 11, 10, 12), seen_guids=["a"])
+        grace = timedelta(hours=1)
+
+        assert not state.is_new("a", datetime(2025, 11, 10, 13), grace)
+        assert not state.is_new("old", datetime(2025, 11, 10, 10), grace)
+        assert state.is_new("late", datetime(2025, 11, 10, 11, 30), grace)
+        assert state.is_new("undated", None, grace)
+
+    def test_seen_guids_are_bounded(self):
+        entries = [{"id": str(i), "published_parsed": (2025, 1, 1, 0, 0, i)} for i in range(10)]
+
+        state = FeedState("u").advanced(entries, '"e"', None, max_seen_guids=3)
+
+        assert state.seen_guids == ["7", "8", "9"]
+        assert state.high_water == datetime(2025, 1, 1, 0, 0, 9)
+        assert state.etag == '"e"'
+
+
+@pytest.mark.unit
+class TestMySQLFeedStateStore:
+    """Test persistence fallbacks"""
+
+    def test_database_outage_keeps_in_process_state(self):
+        store = MySQLFeedStateStore(MagicMock(side_effect=Exception("db down")))
+        store.save_many([FeedState("u", etag='"x"')])
+
+        assert store.load_many(["u"])["u"].etag == '"x"'
@@ -0,0 +1,111 @@
+"""
+Unit tests for background health sampling
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.health_monitor import HealthSampler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestHealthSampler:
+    """Test cached snapshots of sync/async probes"""
+
+    def test_snapshot_before_and_after_sampling(self):
+        clock = Clock()
+        sampler = HealthSampler(interval=10, clock=clock)
+        sampler.add_probe('database', lambda: True)
+
+        async def database_gap():
+            return 2.5
+        sampler.add_probe('gap_hours', database_gap)
+
+        empty = sampler.snapshot()
+        assert empty.sampled_at is None
+        assert empty.is_stale(clock.now)
+        assert not empty.ok('database')
+
+        snapshot = asyncio.run(sampler.sample_once())
+        assert sampler.snapshot() is snapshot
+        assert snapshot.ok('database') and snapshot.ok('gap_hours')
+        assert snapshot.value('gap_hours') == 2.5
+        assert snapshot.rounds == 1
+        assert snapshot.to_dict(clock.now)['checks']['gap_hours']['value'] == 2.5
+
+    def test_failures_and_timeouts_mark_probe_unhealthy(self):
+        sampler = HealthSampler(probe_timeout=0.05)
+        release = threading.Event()
+
+        def failing():
+            raise ConnectionError("refused")
+
+        async def hanging():
+            await asyncio.sleep(10)
+
+        sampler.add_probe('database', lambda: False)
+        sampler.add_probe('redis', failing)
+        sampler.add_probe('api', hanging)
+        sampler.add_probe('slow_sync', lambda: release.wait(5))
+
+        async def two_rounds():
+            first = await sampler.sample_once()
+            # The timed-out sync probe is still running: it is not started twice
+            second = await sampler.sample_once()
+            release.set()
+            return first, second
+
+        first, second = asyncio.run(two_rounds())
+        assert not any(first.ok(name) for name in ('database', 'redis', 'api', 'slow_sync'))
+        assert first.results['redis'].error == "refused"
+        assert "timed out" in first.results['api'].error
+        assert "timed out" in first.results['slow_sync'].error
+        assert second.results['slow_sync'].error == "previous probe still running"
+        assert first.value('database', default=-1) == -1
+
+    def test_snapshot_goes_stale_without_new_samples(self):
+        clock = Clock()
+        sampler = HealthSampler(interval=10, clock=clock)
+        sampler.add_probe('database', lambda: True)
+        asyncio.run(sampler.sample_once())
+
+        clock.now += 30
+        assert not sampler.snapshot().is_stale(clock.now)
+        clock.now += 1
+        snapshot = sampler.snapshot()
+        assert snapshot.is_stale(clock.now)
+        assert snapshot.age_seconds(clock.now) == 31
+        assert snapshot.ok('database')
+
+    def test_background_run_samples_until_stopped(self):
+        sampler = HealthSampler(interval=0.01)
+        calls = []
+        sampler.add_probe('database', lambda: calls.append(1) or True)
+
+        async def run_briefly():
+            sampler.start()
+            assert sampler.snapshot().warming_up
+            await asyncio.sleep(0.1)
+            snapshot = sampler.snapshot()
+            sampler.stop()
+            return snapshot
+
+        first = asyncio.run(run_briefly())
+        assert first.ok('database')
+        assert sampler.snapshot().rounds > 1
+        assert not sampler.running
@@ -0,0 +1,144 @@
+"""
+Unit tests for the shared pooled HTTP client
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from aiohttp import web
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.http_client import ProviderHttpClient, RetryPolicy, get_http_client
+from shared.scheduling_config import get_http_client_config
+
+
+def make_client(**overrides):
+    config = get_http_client_config("test_provider")
+    config.update({"backoff_base": 0.001, "backoff_max": 0.01, **overrides})
+    return ProviderHttpClient("test_provider", config)
+
+
+async def with_server(handler, scenario):
+    app = web.Application()
+    app.router.add_get("/data", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await scenario(f"http://127.0.0.1:{port}/data")
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.unit
+class TestProviderHttpClient:
+    """Test pooling and retries"""
+
+    def test_retries_retryable_status_then_succeeds(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return web.Response(status=503)
+            return web.json_response({"ok": True})
+
+        client = make_client()
+
+        async def scenario(url):
+            try:
+                return await client.get_json(url)
+            finally:
+                await client.close()
+
+        assert asyncio.run(with_server(handler, scenario)) == {"ok": True}
+        assert len(calls) == 3
+        assert client.get_stats()["retries"] == 2
+
+    def test_final_retryable_response_is_returned_to_caller(self):
+        async def handler(request):
+            return web.Response(status=503, headers={"Retry-After": "0"})
+
+        client = make_client(max_retries=1)
+
+        async def scenario(url):
+            try:
+                async with client.get(url) as response:
+                    return response.status
+            finally:
+                await client.close()
+
+        assert asyncio.run(with_server(handler, scenario)) == 503
+        assert client.get_stats()["requests"] == 2
+
+    def test_rate_limited_response_is_left_to_the_rate_limiter(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            return web.Response(status=429, headers={"Retry-After": "0"})
+
+        client = make_client()
+
+        async def scenario(url):
+            try:
+                async with client.get(url) as response:
+                    return response.status
+            finally:
+                await client.close()
+
+        assert asyncio.run(with_server(handler, scenario)) == 429
+        assert len(calls) == 1
+        assert client.get_stats()["retries"] == 0
+
+    def test_one_session_and_connection_reused_across_requests(self):
+        peers = set()
+
+        async def handler(request):
+            peers.add(request.transport.get_extra_info("peername"))
+            return web.json_response([1, 2, 3])
+
+        client = make_client()
+
+        async def scenario(url):
+            try:
+                for _ in range(5):
+                    assert await client.get_json(url) == [1, 2, 3]
+            finally:
+                await client.close()
+
+        asyncio.run(with_server(handler, scenario))
+
+        assert client.get_stats()["sessions_created"] == 1
+        assert len(peers) == 1
+
+
+@pytest.mark.unit
+class TestRetryPolicy:
+    """Test backoff bounds"""
+
+    def test_full_jitter_is_bounded_and_retry_after_wins(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0, max_retry_after=30)
+
+        assert all(0 <= policy.delay(attempt) <= 4.0 for attempt in range(10))
+        assert policy.delay(0, "7") == 7.0
+        assert policy.delay(0, "600") == 30
+        assert 0 <= policy.delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= 1.0
+
+
+@pytest.mark.unit
+class TestRegistry:
+    """Test provider config merging"""
+
+    def test_provider_overrides_defaults(self):
+        config = get_http_client_config("defillama")
+
+        assert config["total_timeout"] == 60
+        assert config["dns_cache_ttl"] == get_http_client_config("unknown")["dns_cache_ttl"]
+        assert get_http_client("defillama") is get_http_client("defillama")
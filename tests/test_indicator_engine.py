@@ -0,0 +1,128 @@
+"""
+Unit tests for the incremental technical indicator engine
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.indicator_engine import IndicatorEngine
+
+
+def make_bars(count, seed=7):
+    """Random-walk OHLC bars, oldest first"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(hours=i),
+            "open": close,
+            "high": close + abs(rng.normal(0, 0.5)),
+            "low": close - abs(rng.normal(0, 0.5)),
+            "close": close,
+            "volume": 1000.0,
+        }
+        for i, close in enumerate(closes)
+    ]
+
+
+def assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        if value is None:
+            assert actual[name] is None, name
+        else:
+            assert actual[name] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+@pytest.mark.unit
+class TestIndicatorEngine:
+    """Test vectorized and incremental paths agree"""
+
+    @pytest.fixture
+    def engine(self):
+        return IndicatorEngine()
+
+    def test_incremental_updates_match_full_recompute(self, engine):
+        bars = make_bars(260)
+        engine.warm_start("BTC", bars[:220])
+
+        for i in range(220, 260):
+            incremental = engine.update("BTC", bars[i])
+            assert_same(incremental, engine.compute_latest(bars[:i + 1]))
+
+        assert engine.bar_count("BTC") == 260
+        assert engine.last_timestamp("BTC") == bars[-1]["timestamp"]
+
+    def test_short_history_replay_matches_full_recompute(self, engine):
+        bars = make_bars(60)
+        engine.warm_start("ETH", bars[:30])
+
+        latest = engine.update_many("ETH", bars[30:])
+
+        assert_same(latest, engine.compute_latest(bars))
+        assert latest["sma_200"] is None
+
+    def test_macd_signal_is_ema_of_macd_line(self, engine):
+        series = engine.compute_series(*IndicatorEngine._bar_arrays(make_bars(120)))
+        line = series["macd_line"]
+        signal = series["macd_signal"]
+
+        assert not np.isclose(line[-1], signal[-1])
+        first = np.flatnonzero(~np.isnan(line))[0]
+        assert signal[first + 8] == pytest.approx(line[first:first + 9].mean())
+
+    def test_stoch_d_is_mean_of_last_k_values(self, engine):
+        series = engine.compute_series(*IndicatorEngine._bar_arrays(make_bars(50)))
+
+        assert series["stoch_d"][-1] == pytest.approx(series["stoch_k"][-3:].mean())
+
+    def test_out_of_order_bar_is_rejected(self, engine):
+        bars = make_bars(30)
+        engine.warm_start("SOL", bars)
+
+        with pytest.raises(ValueError):
+            engine.update("SOL", bars[-1])
+
+    def test_update_requires_warm_start(self, engine):
+        with pytest.raises(KeyError):
+            engine.update("ADA", make_bars(1)[0])
+
+    def test_invalidate_drops_state(self, engine):
+        engine.warm_start("BTC", make_bars(30))
+        engine.invalidate("BTC")
+
+        assert not engine.has_state("BTC")
+
+
+@pytest.mark.unit
+class TestTechnicalCalculatorConfig:
+    """Test the calculator's configuration and construction"""
+
+    def test_from_env_builds_calculator_config(self):
+        from services.enhanced_technical_calculator import TechnicalCalculatorConfig
+
+        with patch.dict(os.environ, {"MYSQL_DATABASE": "crypto_test"}):
+            config = TechnicalCalculatorConfig.from_env()
+
+        assert type(config) is TechnicalCalculatorConfig
+        assert config.service_name == "enhanced-technical-calculator"
+        assert config.mysql_database == "crypto_test"
+        assert config.sma_periods == [20, 50, 200]
+
+    def test_calculator_engine_uses_config_periods(self):
+        from services.enhanced_technical_calculator import EnhancedTechnicalCalculator
+
+        with patch("mysql.connector.connect", side_effect=Exception("no database in unit tests")):
+            calculator = EnhancedTechnicalCalculator()
+
+        assert calculator.config.service_name == "enhanced-technical-calculator"
+        assert calculator.indicator_engine.sma_periods == calculator.config.sma_periods
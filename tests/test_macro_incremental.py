@@ -0,0 +1,141 @@
+"""
+Unit tests for incremental, concurrent FRED ingestion
+"""
+
+import importlib.util
+import os
+import re
+import sys
+import threading
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'macro-collection', 'enhanced_macro_collector_v2.py'
+)
+
+
+@pytest.fixture(scope="module")
+def macro_module():
+    spec = importlib.util.spec_from_file_location("enhanced_macro_collector_incremental", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def observation(indicator, day, value):
+    return {
+        "indicator_name": indicator.name,
+        "indicator_date": day,
+        "value": value,
+        "fred_series_id": indicator.fred_series_id,
+        "frequency": indicator.frequency.value,
+        "category": indicator.category,
+    }
+
+
+@pytest.mark.unit
+class TestWatermarks:
+    """Test fetch windows and new/revised filtering"""
+
+    def test_fetch_starts_at_watermark_minus_revision_window(self, macro_module):
+        daily = macro_module.MacroIndicator("10Y_TREASURY", "DGS10", macro_module.DataFrequency.DAILY, "", "rates")
+        today = date(2024, 3, 10)
+
+        assert macro_module.fetch_start_date(daily, None, today) == date(2024, 3, 3)
+        watermark = macro_module.SeriesWatermark(last_date=date(2024, 3, 8))
+        assert macro_module.fetch_start_date(daily, watermark, today) == date(2024, 3, 1)
+
+    def test_only_new_and_revised_observations_are_kept(self, macro_module):
+        daily = macro_module.MacroIndicator("10Y_TREASURY", "DGS10", macro_module.DataFrequency.DAILY, "", "rates")
+        watermark = macro_module.SeriesWatermark(
+            last_date=date(2024, 3, 8),
+            recent_values={date(2024, 3, 7): 4.1, date(2024, 3, 8): 4.2},
+        )
+        points = [
+            observation(daily, date(2024, 3, 7), 4.1),
+            observation(daily, date(2024, 3, 8), 4.25),
+            observation(daily, date(2024, 3, 9), 4.3),
+        ]
+
+        changed, revised = macro_module.new_or_revised(points, watermark)
+        assert [p["indicator_date"] for p in changed] == [date(2024, 3, 8), date(2024, 3, 9)]
+        assert revised == 1
+
+
+@pytest.mark.unit
+class TestIncrementalCycle:
+    """Test one cycle: concurrent fetches and a single bulk upsert"""
+
+    def test_cycle_fetches_from_watermarks_and_upserts_once(self, macro_module):
+        collector = macro_module.EnhancedMacroCollector()
+        collector.indicators = collector.indicators[:3]
+        last = date.today() - timedelta(days=1)
+        collector.load_watermarks = MagicMock(return_value={
+            collector.indicators[0].name: macro_module.SeriesWatermark(last_date=last, recent_values={last: 1.0}),
+        })
+
+        starts = {}
+
+        def fetch(indicator, start_date=None, end_date=None):
+            starts[indicator.name] = start_date
+            return [observation(indicator, last, 1.0), observation(indicator, date.today(), 2.0)]
+
+        collector.fetch_indicator_data = fetch
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        with patch("mysql.connector.connect", return_value=conn):
+            result = collector.collect_all_macro_data()
+
+        first = collector.indicators[0]
+        assert starts[first.name] == last - timedelta(days=macro_module.REVISION_LOOKBACK_DAYS[first.frequency])
+        assert result["indicators_processed"] == 3
+        # The first series' unchanged watermark observation is not rewritten
+        assert result["records_stored"] == 5
+        assert result["records_revised"] == 0
+
+        cursor.execute.assert_called_once()
+        sql, params = cursor.execute.call_args[0]
+        assert len(re.findall(r"\(%s, %s, %s, %s, %s, %s, %s, NOW\(\), NOW\(\), NOW\(\)\)", sql)) == 5
+        assert len(params) == 5 * 7
+
+
+@pytest.mark.unit
+class TestChunkedStore:
+    """Test per-chunk commits and per-thread sessions"""
+
+    def test_failed_chunk_is_skipped_and_not_counted(self, macro_module):
+        collector = macro_module.EnhancedMacroCollector()
+        indicator = collector.indicators[0]
+        points = [observation(indicator, date(2024, 3, day), float(day)) for day in range(1, 6)]
+        cursor = MagicMock()
+        cursor.execute.side_effect = [None, Exception("Data truncated for column 'value'"), None]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        with patch("mysql.connector.connect", return_value=conn), \
+                patch.object(macro_module, "MACRO_UPSERT_CHUNK_SIZE", 2):
+            stored = collector.store_indicator_data(points)
+
+        assert stored == 3
+        assert cursor.execute.call_count == 3
+        assert conn.commit.call_count == 2
+        conn.rollback.assert_called_once()
+        assert collector.health_metrics['database_error_count'] == 1
+
+    def test_each_fetch_thread_gets_its_own_session(self, macro_module):
+        collector = macro_module.EnhancedMacroCollector()
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(collector.session))
+        thread.start()
+        thread.join()
+
+        assert collector.session is collector.session
+        assert sessions[0] is not collector.session
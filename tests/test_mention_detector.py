@@ -0,0 +1,113 @@
+"""
+Unit tests for the Aho-Corasick crypto mention detector
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.mention_detector import (
+    AhoCorasickAutomaton,
+    CryptoAssetMentionIndex,
+    MentionDetector,
+    parse_aliases,
+)
+
+ASSETS = [
+    ("BTC", "Bitcoin", '["XBT", "bitcoin core"]'),
+    ("BCH", "Bitcoin Cash", None),
+    ("ETH", "Ethereum", "ether, eth2"),
+    ("ONE", "Harmony", None),
+    ("SOL", "Solana", None),
+]
+
+
+@pytest.mark.unit
+class TestAutomaton:
+    """Test raw multi-pattern matching"""
+
+    def test_reports_overlapping_matches(self):
+        automaton = AhoCorasickAutomaton()
+        for pattern in ("he", "she", "his", "hers"):
+            automaton.add(pattern, pattern)
+
+        matches = sorted(automaton.iter_matches("ushers"))
+
+        assert matches == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+        assert len(automaton) == 4
+
+
+@pytest.mark.unit
+class TestMentionDetector:
+    """Test mention rules"""
+
+    def setup_method(self):
+        self.detector = MentionDetector(ASSETS)
+
+    def test_names_and_aliases_are_case_insensitive(self):
+        text = "BITCOIN rallied while ether and xbt traders watched Solana"
+
+        assert self.detector.detect(text) == ["BTC", "ETH", "SOL"]
+
+    def test_symbols_are_case_sensitive(self):
+        assert self.detector.detect("this is one way to sol-ve it") == []
+        assert self.detector.detect("ONE and SOL gained") == ["ONE", "SOL"]
+
+    def test_word_boundaries(self):
+        assert self.detector.detect("ETHX and BTCUSD and Bitcoiners") == []
+        assert self.detector.detect("(BTC), ETH/USD") == ["BTC", "ETH"]
+
+    def test_leftmost_longest_wins(self):
+        mentions = self.detector.find_mentions("Bitcoin Cash forked from Bitcoin")
+
+        assert [(m.symbol, m.text) for m in mentions] == [("BCH", "Bitcoin Cash"), ("BTC", "Bitcoin")]
+
+    def test_from_symbols(self):
+        detector = MentionDetector.from_symbols({"BTC", "ETH", "ADA"})
+
+        assert detector.detect("Bitcoin (BTC) and Ethereum (ETH) lead") == ["BTC", "ETH"]
+        assert detector.pattern_count == 3
+
+    def test_parse_aliases(self):
+        assert parse_aliases('["XBT", " sats "]') == ["XBT", "sats"]
+        assert parse_aliases("ether, eth2") == ["ether", "eth2"]
+        assert parse_aliases(b'"xbt"') == ["xbt"]
+        assert parse_aliases(None) == []
+
+
+@pytest.mark.unit
+class TestCryptoAssetMentionIndex:
+    """Test checksum-gated rebuilds"""
+
+    def make_cursor(self, checksums):
+        cursor = MagicMock()
+        checksums = iter(checksums)
+        cursor.fetchone.side_effect = lambda: ("crypto_prices.crypto_assets", next(checksums))
+        cursor.fetchall.return_value = ASSETS
+        return cursor
+
+    def test_rebuilds_only_when_table_changes(self):
+        index = CryptoAssetMentionIndex()
+        cursor = self.make_cursor([111, 111, 222])
+
+        assert index.refresh(cursor) is True
+        assert index.refresh(cursor) is False
+        assert index.refresh(cursor) is True
+        assert index.builds == 2
+        assert index.detect("Harmony (ONE) news") == ["ONE"]
+
+    def test_fallback_only_when_never_loaded(self):
+        index = CryptoAssetMentionIndex(fallback_symbols=["BTC"])
+        index.use_fallback()
+
+        assert index.symbols == {"BTC"}
+
+        index.refresh(self.make_cursor([1]), force=True)
+        index.use_fallback()
+
+        assert "SOL" in index.symbols
@@ -0,0 +1,110 @@
+"""
+Unit tests for batched ML market collection over a recorded-fixture data source
+"""
+
+import importlib.util
+import os
+import re
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.market_data import (
+    MarketDataSource,
+    RecordedMarketDataSource,
+    compute_asset_metrics,
+    record_market_data,
+)
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'market-collection', 'ml_market_collector.py'
+)
+
+
+def bars(closes, dates=("2024-01-01", "2024-01-02", "2024-01-03"), volume=1000.0):
+    return [
+        {"date": day, "Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": volume}
+        for day, close in zip(dates, closes)
+    ]
+
+
+RECORDED = {
+    "SPY": bars([400.0, 404.0, 400.0]),
+    "QQQ": bars([350.0, 360.0, 363.6]),
+    "^VIX": bars([14.0, 15.0, 18.0], volume=0.0),
+    # Trades on a different calendar: its last two closes are 01-02 and 01-04
+    "EURUSD=X": bars([1.10, 1.20], dates=("2024-01-02", "2024-01-04"), volume=0.0),
+}
+
+
+@pytest.fixture(scope="module")
+def market_module():
+    spec = importlib.util.spec_from_file_location("ml_market_collector_batch", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.unit
+class TestAssetMetrics:
+    """Test column-wise metrics over a multi-ticker frame"""
+
+    def test_metrics_use_each_tickers_own_last_closes(self):
+        source = RecordedMarketDataSource(RECORDED)
+        metrics = compute_asset_metrics(source.download(["SPY", "EURUSD=X", "MISSING"]))
+
+        assert list(metrics.index) == ["SPY", "EURUSD=X"]
+        assert metrics.loc["SPY", "price"] == 400.0
+        assert metrics.loc["SPY", "change_1d_pct"] == pytest.approx(-400 / 404)
+        assert metrics.loc["SPY", "high"] == 401.0
+        assert metrics.loc["EURUSD=X", "change_1d_pct"] == pytest.approx(100 / 11)
+        assert metrics.loc["EURUSD=X", "volume_ratio"] == 1.0
+        assert metrics.loc["SPY", "data_quality"] == "HIGH"
+
+    def test_recorded_fixture_round_trip(self, tmp_path):
+        frame = RecordedMarketDataSource(RECORDED).download(["SPY", "^VIX"])
+        path = str(tmp_path / "bars.json")
+        record_market_data(frame, path)
+
+        replayed = RecordedMarketDataSource.from_file(path).download(["SPY", "^VIX"])
+        assert replayed["Close"].equals(frame["Close"])
+
+    def test_source_must_implement_download(self):
+        class Incomplete(MarketDataSource):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+@pytest.mark.unit
+class TestBatchedCollection:
+    """Test one download and one upsert per collection"""
+
+    def test_collection_downloads_once_and_upserts_once(self, market_module):
+        source = RecordedMarketDataSource(RECORDED)
+        collector = market_module.MLMarketDataCollector(data_source=source)
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        with patch.object(market_module, "SHARED_POOL_AVAILABLE", False), \
+             patch.object(market_module, "get_connection_fallback", return_value=conn, create=True):
+            result = collector.collect_ml_market_data()
+
+        assert len(source.calls) == 1
+        assert set(source.calls[0]) == set(collector.ml_assets)
+        assert result['assets_collected'] == 4
+
+        cursor.execute.assert_called_once()
+        sql, params = cursor.execute.call_args[0]
+        rows = len(re.findall(r"\(%s, %s, %s, %s, %s, %s\)", sql))
+        assert rows == 4 * 3 + result['ml_indicators_calculated']
+        assert len(params) == rows * 6
+        assert "ML_QQQ_PRICE" in params and "ML_RISK_ON_RISK_OFF_RATIO" in params
+        ratio = params[params.index("ML_RISK_ON_RISK_OFF_RATIO") + 2]
+        assert ratio == pytest.approx(363.6 / 18.0)
@@ -0,0 +1,109 @@
+"""
+Unit tests for incremental OHLC collection with per-symbol watermarks
+"""
+
+import importlib.util
+import os
+import re
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'ohlc-collection', 'enhanced_ohlc_collector.py'
+)
+HOUR_MS = 3600 * 1000
+
+
+@pytest.fixture(scope="module")
+def ohlc_module():
+    spec = importlib.util.spec_from_file_location("enhanced_ohlc_collector_incremental", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def collector(ohlc_module):
+    with patch("mysql.connector.connect", side_effect=Exception("no database in unit tests")):
+        collector = ohlc_module.EnhancedOHLCCollector()
+    collector.symbols = ['BTC', 'ETH', 'SOL']
+    collector.symbol_registry = MagicMock()
+    collector.symbol_registry.coingecko_id.side_effect = {'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana'}.get
+    return collector
+
+
+def candle(ts, close=100.0):
+    return [ts, 99.0, 101.0, 98.0, close]
+
+
+@pytest.mark.unit
+class TestWatermarkWindows:
+    """Test fetch window sizing and candle filtering"""
+
+    def test_window_is_sized_to_gap(self, ohlc_module):
+        now = 1_700_000_000_000
+        window = ohlc_module.fetch_window_days
+
+        assert window(None, now) == ohlc_module.OHLC_INITIAL_DAYS
+        assert window((now - HOUR_MS, (0, 0, 0, 0)), now) is None
+        assert window((now - 5 * HOUR_MS, (0, 0, 0, 0)), now) == 7
+        assert window((now - 10 * 24 * HOUR_MS, (0, 0, 0, 0)), now) == 14
+        assert window((now - 90 * 24 * HOUR_MS, (0, 0, 0, 0)), now) == 30
+
+    def test_only_new_or_revised_candles_are_kept(self, ohlc_module):
+        watermark = (2000, (99.0, 101.0, 98.0, 100.0))
+        data = [candle(1000), candle(2000), candle(3000), [4000, 1.0]]
+
+        assert ohlc_module.new_or_changed_candles(data, watermark) == [candle(3000)]
+        revised = [candle(2000, close=100.5), candle(3000)]
+        assert ohlc_module.new_or_changed_candles(revised, watermark) == revised
+
+
+@pytest.mark.unit
+class TestIncrementalCollection:
+    """Test a full cycle costs calls and rows proportional to new candles"""
+
+    def test_cycle_skips_fresh_symbols_and_batches_volume(self, ohlc_module, collector):
+        now_ms = int(time.time() * 1000)
+        base = now_ms - 6 * HOUR_MS
+        collector.load_watermarks = MagicMock(return_value={
+            'BTC': (base, (99.0, 101.0, 98.0, 100.0)),
+            'ETH': (now_ms - HOUR_MS, (99.0, 101.0, 98.0, 100.0)),
+        })
+
+        requests = []
+
+        def make_request(endpoint, params=None):
+            requests.append((endpoint, params))
+            if endpoint == "coins/markets":
+                return [{'id': 'bitcoin', 'total_volume': 5e9}, {'id': 'solana', 'total_volume': 1e9}]
+            return [candle(base - 4 * HOUR_MS), candle(base), candle(base + 4 * HOUR_MS)]
+
+        collector.make_request = make_request
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+
+        with patch("mysql.connector.connect", return_value=conn):
+            result = collector.collect_all_ohlc_data()
+
+        endpoints = [endpoint for endpoint, _ in requests]
+        assert endpoints == ["coins/markets", "coins/bitcoin/ohlc", "coins/solana/ohlc"]
+        assert requests[0][1]['ids'] == "bitcoin,solana"
+        assert requests[1][1]['days'] == 7
+        assert result['up_to_date_symbols'] == 1
+        assert result['successful_symbols'] == 2
+        # BTC writes its one new candle, SOL (no watermark) writes all three
+        assert result['total_records_collected'] == 4
+
+        statements = cursor.execute.call_args_list
+        assert len(statements) == 2
+        sql, params = statements[0][0]
+        assert len(re.findall(r"\(%s(?:, %s){9}\)", sql)) == 1
+        assert params[2] == base + 4 * HOUR_MS and params[8] == 5e9
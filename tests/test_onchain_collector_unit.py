@@ -23,6 +23,8 @@ onchain_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(onchain_module)
 EnhancedOnchainCollector = onchain_module.EnhancedOnchainCollector
 
+from shared.scheduling_config import get_rate_limit_config
+
 
 class TestEnhancedOnchainCollector:
     """Test Enhanced Onchain Data Collector functionality"""
@@ -140,11 +142,25 @@ class TestEnhancedOnchainCollector:
         """Test API rate limiting functionality"""
         endpoint = 'test_endpoint'
         
-        # Test rate limiting delay
+        limiter = onchain_module.get_rate_limiter('blockchain_apis')
+        granted = limiter.get_stats()['granted']
+        
+        # Unknown endpoints draw from the generic blockchain API bucket
         await onchain_collector.rate_limit(endpoint)
         
-        # Should track the last call time
-        assert endpoint in onchain_collector.last_api_call
+        assert limiter.get_stats()['granted'] == granted + 1
+
+    def test_coingecko_calls_share_one_bucket(self, onchain_collector):
+        """Every CoinGecko endpoint draws from the one shared CoinGecko budget"""
+        providers = onchain_collector.rate_limit_providers
+        coingecko = {p for e, p in providers.items() if e.startswith('coingecko')}
+        others = {p for e, p in providers.items() if not e.startswith('coingecko')}
+
+        expected = 'coingecko_premium' if onchain_collector.use_premium_api else 'coingecko_free'
+        assert coingecko == {expected}
+        assert expected not in others
+        for provider in providers.values():
+            assert get_rate_limit_config(provider)['calls_per_minute'] > 0
 
 
 
@@ -0,0 +1,78 @@
+"""
+Unit tests for onchain completeness scoring and repair
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.onchain_completeness import (
+    completeness_chunks,
+    onchain_completeness,
+    onchain_completeness_sql,
+    recompute_onchain_completeness,
+)
+
+ROWS = [
+    {'symbol': 'BTC', 'hash_rate': 5.0, 'mvrv_ratio': 1.2, 'nvt_ratio': None, 'total_value_locked': None},
+    {'symbol': 'ETH', 'hash_rate': None, 'mvrv_ratio': None, 'nvt_ratio': 3.0, 'total_value_locked': 9.0},
+    {'symbol': 'DOGE', 'hash_rate': None, 'mvrv_ratio': None, 'nvt_ratio': None, 'total_value_locked': None},
+]
+
+
+@pytest.mark.unit
+class TestOnchainCompleteness:
+    """Test the Python and SQL scores agree"""
+
+    def test_sql_expression_matches_python_score(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (symbol TEXT, hash_rate REAL, mvrv_ratio REAL, nvt_ratio REAL, total_value_locked REAL)")
+        conn.executemany(
+            "INSERT INTO t VALUES (:symbol, :hash_rate, :mvrv_ratio, :nvt_ratio, :total_value_locked)", ROWS
+        )
+        # SQLite spells LEAST as two-argument MIN
+        expression = onchain_completeness_sql().replace("LEAST(", "MIN(")
+
+        scores = [row[0] for row in conn.execute(f"SELECT {expression} FROM t ORDER BY rowid")]
+
+        assert scores == pytest.approx([onchain_completeness(row) for row in ROWS])
+        assert scores[0] == pytest.approx(2 / 10 * 70 + 1 / 7 * 30)
+
+    def test_fields_that_are_not_columns_never_count(self):
+        # social_score is an enhanced field but not a column of onchain_data
+        record = {'symbol': 'BTC', 'hash_rate': 5.0, 'social_score': 80.0}
+
+        assert onchain_completeness(record) == pytest.approx(2 / 10 * 70)
+        assert onchain_completeness(record, columns=('symbol', 'hash_rate', 'social_score')) == pytest.approx(
+            2 / 10 * 70 + 1 / 7 * 30
+        )
+
+    def test_chunks_cover_range_inclusively(self):
+        assert completeness_chunks(date(2024, 1, 1), date(2024, 1, 10), 4) == [
+            (date(2024, 1, 1), date(2024, 1, 4)),
+            (date(2024, 1, 5), date(2024, 1, 8)),
+            (date(2024, 1, 9), date(2024, 1, 10)),
+        ]
+
+    def test_recompute_runs_one_update_per_chunk(self):
+        cursor = MagicMock()
+        cursor.rowcount = 3
+        commit = MagicMock()
+
+        totals = recompute_onchain_completeness(
+            cursor, date(2024, 1, 1), date(2024, 1, 10), symbols=['BTC', 'ETH'], chunk_days=5, commit=commit
+        )
+
+        assert totals == {"chunks": 2, "rows_updated": 6}
+        assert commit.call_count == 2
+        sql, params = cursor.execute.call_args_list[1][0]
+        assert sql.count("UPDATE onchain_data") == 1
+        assert "symbol IN (%s, %s)" in sql
+        assert params == (datetime(2024, 1, 6), datetime(2024, 1, 11), 'BTC', 'ETH')
@@ -0,0 +1,124 @@
+"""
+Unit tests for concurrent onchain source fan-out and backfill
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+collector_path = os.path.join(os.path.dirname(__file__), '..', 'services', 'onchain-collection', 'enhanced_onchain_collector.py')
+spec = importlib.util.spec_from_file_location("enhanced_onchain_collector_fanout", collector_path)
+onchain_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(onchain_module)
+
+SOURCE_METHODS = {
+    'get_coingecko_data': {'circulating_supply': 100, 'hash_rate': 1.0, 'total_value_locked': 5},
+    'get_enhanced_coingecko_data': {'circulating_supply': 0, 'github_commits_30d': 42},
+    'get_defilama_tvl_data': {'total_value_locked': 9, 'defi_protocols_count': None},
+    'get_network_metrics': {'hash_rate': 2.0},
+    'get_additional_metrics': {'staking_yield': 4.5},
+}
+
+
+def patch_sources(collector, delays, payloads=SOURCE_METHODS):
+    """Replace each source with one that sleeps ``delays[name]`` then returns its payload"""
+    for name, payload in payloads.items():
+        async def source(*args, _payload=payload, _delay=delays.get(name, 0), **kwargs):
+            await asyncio.sleep(_delay)
+            return dict(_payload)
+        setattr(collector, name, source)
+
+
+@pytest.fixture
+def collector():
+    return onchain_module.EnhancedOnchainCollector()
+
+
+@pytest.mark.unit
+class TestSourceFanOut:
+    """Test parallel sources, priority merging and timeouts"""
+
+    def test_merge_is_deterministic_whatever_order_sources_finish(self, collector):
+        merged = []
+        for delays in ({}, {'get_coingecko_data': 0.05, 'get_network_metrics': 0.01},
+                       {'get_additional_metrics': 0.03, 'get_defilama_tvl_data': 0.02}):
+            patch_sources(collector, delays)
+            merged.append(asyncio.run(collector.collect_onchain_data('BTC', date(2024, 1, 1))))
+
+        assert merged[0] == merged[1] == merged[2]
+        data = merged[0]
+        assert data['circulating_supply'] == 100  # enhanced zero does not override
+        assert data['hash_rate'] == 2.0  # network overrides coingecko
+        assert data['total_value_locked'] == 9
+        assert 'defi_protocols_count' not in data  # defilama None is dropped
+        assert data['data_source'] == 'coingecko,coingecko-enhanced,defilama,network-api,additional-apis'
+
+    def test_sources_run_in_parallel(self, collector):
+        patch_sources(collector, {name: 0.1 for name in SOURCE_METHODS})
+
+        started = time.monotonic()
+        asyncio.run(collector.collect_onchain_data('BTC'))
+
+        assert time.monotonic() - started < 0.3
+
+    def test_timed_out_source_keeps_partial_result(self, collector):
+        patch_sources(collector, {'get_network_metrics': 1.0})
+        collector.source_timeout = 0.05
+
+        data = asyncio.run(collector.collect_onchain_data('BTC'))
+
+        assert data['hash_rate'] == 1.0
+        assert data['staking_yield'] == 4.5
+        assert 'network-api' not in data['data_source']
+        assert collector.source_stats['network-api']['timeouts'] == 1
+        assert collector.source_stats['coingecko']['ok'] == 1
+
+
+@pytest.mark.unit
+class TestConcurrentBackfill:
+    """Test bounded concurrency, failure skipping and batched stores"""
+
+    def test_backfill_bounds_in_flight_work_and_skips_failing_symbols(self, collector):
+        end = date(2024, 1, 30)
+        in_flight = {'now': 0, 'max': 0}
+        calls = {}
+        stored = []
+
+        async def collect(symbol, target_date=None):
+            calls[symbol] = calls.get(symbol, 0) + 1
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return None if symbol == 'DEAD' else {'symbol': symbol, 'timestamp_iso': target_date}
+
+        def store(rows):
+            stored.append(len(rows))
+            return len(rows)
+
+        collector.backfill_concurrency = 6
+        collector.collect_onchain_data = collect
+        collector.store_onchain_data = store
+        collector.ensure_table_exists = lambda: None
+        collector.get_missing_onchain_dates = lambda symbol, start, finish: [
+            finish - timedelta(days=i) for i in range(30)
+        ]
+
+        with patch.object(onchain_module, 'ENSURE_PLACEHOLDERS', False):
+            result = asyncio.run(collector.run_backfill(end - timedelta(days=29), end, ['BTC', 'ETH', 'DEAD']))
+
+        assert result['dates_processed'] == 60
+        assert result['records_stored'] == 60
+        assert result['errors'] == []
+        assert calls['DEAD'] == 5
+        assert 1 < in_flight['max'] <= 6
+        assert max(stored) <= 25
@@ -0,0 +1,97 @@
+"""
+Unit tests for the Centralized Placeholder Manager bulk grid generator
+"""
+
+import os
+import sys
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Import the service - need to handle the hyphenated directory name
+import importlib.util
+service_path = os.path.join(os.path.dirname(__file__), '..', 'services', 'placeholder-manager', 'placeholder_manager.py')
+spec = importlib.util.spec_from_file_location("placeholder_manager", service_path)
+placeholder_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(placeholder_module)
+CentralizedPlaceholderManager = placeholder_module.CentralizedPlaceholderManager
+
+
+@pytest.fixture
+def manager():
+    return CentralizedPlaceholderManager()
+
+
+@pytest.fixture
+def cursor():
+    cursor = MagicMock()
+    cursor.rowcount = 4
+    return cursor
+
+
+@pytest.mark.unit
+class TestPlaceholderGrid:
+    """Test grid generation and set-based insertion"""
+
+    def test_daily_grid_is_anchored_at_time_of_day(self, manager):
+        timestamps = list(manager.generate_placeholder_timestamps(
+            date(2024, 1, 1), date(2024, 1, 3), 'daily', (23, 59)))
+
+        assert timestamps == [datetime(2024, 1, d, 23, 59) for d in (1, 2, 3)]
+
+    def test_sub_daily_grid_covers_whole_days(self, manager):
+        timestamps = list(manager.generate_placeholder_timestamps(
+            date(2024, 1, 1), date(2024, 1, 2), '5min'))
+
+        assert len(timestamps) == 2 * 288
+        assert timestamps[0] == datetime(2024, 1, 1, 0, 0)
+        assert timestamps[-1] == datetime(2024, 1, 2, 23, 55)
+
+    def test_grid_is_inserted_with_one_anti_join_per_chunk(self, manager, cursor):
+        manager.grid_chunk_size = 2
+        timestamps = [datetime(2024, 1, d) for d in (1, 2, 3)]
+
+        created = manager.bulk_insert_placeholders(cursor, 'derivatives', ['BTC', 'ETH', 'BTC'], timestamps)
+
+        inserts = [c for c in cursor.execute.call_args_list if 'INSERT IGNORE INTO crypto_derivatives_ml' in c[0][0]]
+        assert len(inserts) == 2
+        sql, params = inserts[0][0]
+        assert 'CROSS JOIN placeholder_grid_times' in sql
+        assert 'WHERE existing.symbol IS NULL' in sql
+        assert params == (0.0, 'placeholder_manager', 'placeholder')
+        assert created == 8
+
+        batches = [c[0][1] for c in cursor.executemany.call_args_list]
+        assert batches[0] == [('BTC',), ('ETH',)]
+        assert batches[1:] == [[(timestamps[0],), (timestamps[1],)], [(timestamps[2],)]]
+
+    def test_macro_grid_uses_indicator_keys(self, manager, cursor):
+        with patch.object(manager, 'bulk_insert_placeholders', return_value=3) as bulk:
+            assert manager.ensure_placeholders(cursor, 'macro', 2) == 3
+
+        _, collector, keys, timestamps = bulk.call_args[0]
+        assert collector == 'macro'
+        assert keys == manager.collector_configs['macro']['indicators']
+        assert len(list(timestamps)) == 3
+
+    def test_populated_ohlc_table_is_skipped(self, manager, cursor):
+        cursor.fetchone.return_value = (500000,)
+        with patch.object(manager, 'get_symbols_for_collector', return_value=['BTC']), \
+             patch.object(manager, 'bulk_insert_placeholders') as bulk:
+            assert manager.ensure_placeholders(cursor, 'ohlc') == 0
+
+        bulk.assert_not_called()
+
+    def test_comprehensive_run_reports_counts_per_table(self, manager):
+        conn = MagicMock()
+        with patch.object(manager, 'get_db_connection', return_value=conn), \
+             patch.object(manager, 'ensure_placeholders', return_value=5):
+            results = manager.ensure_comprehensive_placeholders()
+
+        active = [name for name, config in manager.collector_configs.items() if config['active']]
+        assert results == {name: 5 for name in active}
+        assert manager.stats['placeholders_by_table']['ohlc_data'] == 5
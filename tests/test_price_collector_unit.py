@@ -0,0 +1,223 @@
+"""
+Unit tests for Enhanced Crypto Prices Service
+"""
+
+import pytest
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Import the service - need to handle the hyphenated directory name
+import importlib.util
+service_path = os.path.join(os.path.dirname(__file__), '..', 'services', 'price-collection', 'enhanced_crypto_prices_service.py')
+spec = importlib.util.spec_from_file_location("enhanced_crypto_prices_service", service_path)
+prices_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(prices_module)
+EnhancedCryptoPricesService = prices_module.EnhancedCryptoPricesService
+
+
+def rate_limited_http():
+    """Pooled client stub whose every GET answers 429 with a long Retry-After"""
+    response = MagicMock(status=429, headers={"Retry-After": "60"})
+    http = MagicMock()
+    http.get.return_value.__aenter__ = AsyncMock(return_value=response)
+    http.get.return_value.__aexit__ = AsyncMock(return_value=False)
+    return http
+
+
+class TestBatchedSpotPricing:
+    """Test multi-id /simple/price batching"""
+
+    @pytest.fixture
+    def service(self):
+        return EnhancedCryptoPricesService()
+
+    def test_chunking_respects_id_limit(self, service):
+        service.price_batch_max_ids = 2
+        chunks = service._chunk_coin_ids(["a", "b", "c", "d", "e"])
+        assert chunks == [["a", "b"], ["c", "d"], ["e"]]
+
+    def test_chunking_respects_url_length(self, service):
+        service.price_batch_max_url_length = 20
+        ids = ["bitcoin", "ethereum", "cardano", "solana"]
+        chunks = service._chunk_coin_ids(ids)
+
+        assert [i for chunk in chunks for i in chunk] == ids
+        for chunk in chunks:
+            assert len("%2C".join(chunk)) <= 20
+
+    def test_batch_falls_back_only_for_missing_ids(self, service):
+        service.price_batch_max_ids = 2
+        responses = {
+            ("bitcoin", "ethereum"): {"bitcoin": {"usd": 1.0}},
+            ("solana",): {"solana": {"usd": 3.0}},
+            ("ethereum",): {"ethereum": {"usd": 2.0}},
+        }
+
+        async def fake_fetch(coin_ids, vs_currency="usd"):
+            return responses[tuple(coin_ids)]
+
+        with patch.object(service, "_fetch_simple_price", side_effect=fake_fetch) as fetch:
+            result = asyncio.run(service.get_coingecko_prices_batch(["bitcoin", "ethereum", "solana"]))
+
+        assert result == {"bitcoin": {"usd": 1.0}, "ethereum": {"usd": 2.0}, "solana": {"usd": 3.0}}
+        assert fetch.call_count == 3
+
+    def test_failed_chunk_is_not_retried_per_id(self, service):
+        with patch.object(service, "_fetch_simple_price", AsyncMock(return_value=None)) as fetch:
+            result = asyncio.run(service.get_coingecko_prices_batch(["bitcoin", "ethereum"]))
+
+        assert result == {}
+        assert fetch.call_count == 1
+
+    def test_rate_limited_chunk_fails_without_sleeping(self, service):
+        service.coingecko_http = rate_limited_http()
+
+        with patch.object(service, "_check_rate_limit", AsyncMock()), \
+             patch.object(prices_module.asyncio, "sleep", AsyncMock()) as sleep:
+            result = asyncio.run(service._fetch_simple_price(["bitcoin", "ethereum"]))
+
+        assert result is None
+        sleep.assert_not_awaited()
+
+    def test_all_symbols_fan_out_per_symbol(self, service):
+        definitions = prices_module.crypto_definitions
+        ids = {"BTC": "bitcoin", "WBTC": "bitcoin", "ETH": "ethereum"}
+
+        with patch.object(definitions, "get_coinbase_symbols", return_value=list(ids)), \
+             patch.object(definitions, "get_coingecko_id", side_effect=ids.get), \
+             patch.object(definitions, "get_coin_name", side_effect=lambda s: s), \
+             patch.object(service, "get_coingecko_prices_batch",
+                          AsyncMock(return_value={"bitcoin": {"usd": 100.0}})), \
+             patch.object(service, "get_current_price_coinbase", AsyncMock(return_value=50.0)) as coinbase:
+            result = asyncio.run(service.get_current_prices_all_symbols())
+
+        prices = {p["symbol"]: (p["current_price"], p["data_source"]) for p in result["prices"]}
+        assert prices == {
+            "BTC": (100.0, "coingecko"),
+            "WBTC": (100.0, "coingecko"),
+            "ETH": (50.0, "coinbase"),
+        }
+        coinbase.assert_awaited_once_with("ETH")
+
+    def test_coinbase_fallback_concurrency_is_bounded(self, service):
+        definitions = prices_module.crypto_definitions
+        symbols = [f"C{i}" for i in range(10)]
+        service.coinbase_fallback_concurrency = 3
+        in_flight, peak = 0, 0
+
+        async def fake_coinbase(symbol):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 1.0
+
+        with patch.object(definitions, "get_coinbase_symbols", return_value=symbols), \
+             patch.object(definitions, "get_coingecko_id", return_value=None), \
+             patch.object(definitions, "get_coin_name", side_effect=lambda s: s), \
+             patch.object(service, "get_coingecko_prices_batch", AsyncMock(return_value={})), \
+             patch.object(service, "get_current_price_coinbase", side_effect=fake_coinbase):
+            result = asyncio.run(service.get_current_prices_all_symbols())
+
+        assert len(result["prices"]) == 10
+        assert peak == 3
+
+
+class TestRangeBackfill:
+    """Test range-based historical backfill"""
+
+    @pytest.fixture
+    def service(self):
+        return EnhancedCryptoPricesService()
+
+    def test_missing_dates_coalesce_into_ranges(self, service):
+        d = prices_module.date
+        dates = [d(2024, 1, 5), d(2024, 1, 1), d(2024, 1, 2), d(2024, 1, 3), d(2024, 1, 7)]
+
+        assert service._coalesce_date_ranges(dates) == [
+            (d(2024, 1, 1), d(2024, 1, 3)),
+            (d(2024, 1, 5), d(2024, 1, 5)),
+            (d(2024, 1, 7), d(2024, 1, 7)),
+        ]
+        assert service._coalesce_date_ranges(dates[1:4], max_days=2) == [
+            (d(2024, 1, 1), d(2024, 1, 2)),
+            (d(2024, 1, 3), d(2024, 1, 3)),
+        ]
+
+    def test_hourly_points_resample_to_first_point_per_day(self, service):
+        day = 1704067200  # 2024-01-01 00:00 UTC
+        chart = {
+            "prices": [[(day + h * 3600) * 1000, 100.0 + h] for h in range(48)],
+            "market_caps": [[day * 1000, 5.0], [(day + 86400) * 1000, 6.0]],
+            "total_volumes": [[(day + 60) * 1000, 7.0]],
+        }
+
+        buckets = service._resample_market_chart(chart)
+
+        assert buckets == {
+            day: {"price": 100.0, "market_cap": 5.0, "volume": 7.0},
+            day + 86400: {"price": 124.0, "market_cap": 6.0},
+        }
+
+    def test_backfill_issues_one_request_per_range(self, service):
+        d = prices_module.date
+        definitions = prices_module.crypto_definitions
+        missing = [d(2024, 1, 1), d(2024, 1, 2), d(2024, 1, 3), d(2024, 1, 10)]
+        day = 1704067200
+
+        async def fake_range(coingecko_id, start, end, vs_currency="usd"):
+            days = (end - start).days + 1
+            offset = (start - d(2024, 1, 1)).days
+            return {"prices": [[(day + (offset + i) * 86400) * 1000, 10.0 + i] for i in range(days)]}
+
+        with patch.object(definitions, "get_coingecko_symbols_mapping",
+                          return_value={"BTC": "bitcoin"}) as mapping, \
+             patch.object(definitions, "get_coin_name", return_value="Bitcoin"), \
+             patch.object(service, "get_missing_dates", return_value=missing), \
+             patch.object(service, "fetch_market_chart_range", side_effect=fake_range) as fetch, \
+             patch.object(service, "store_historical_data", side_effect=len) as store:
+            result = asyncio.run(service.run_backfill(d(2024, 1, 1), d(2024, 1, 10), ["BTC", "XYZ"]))
+
+        assert mapping.call_count == 1
+        assert fetch.call_count == 2
+        rows = store.call_args[0][0]
+        assert [row["timestamp_iso"].date() for row in rows] == missing
+        assert rows[1]["price_change_24h"] == 1.0
+        assert result["api_requests"] == 2
+        assert result["total_stored"] == 4
+        assert result["success_rate"] == 100
+
+    def test_backfill_queries_missing_dates_off_the_event_loop(self, service):
+        definitions = prices_module.crypto_definitions
+        threads = []
+
+        def fake_missing(symbol, start, end):
+            threads.append(threading.current_thread())
+            return []
+
+        with patch.object(definitions, "get_coingecko_symbols_mapping",
+                          return_value={"BTC": "bitcoin", "ETH": "ethereum"}), \
+             patch.object(service, "get_missing_dates", side_effect=fake_missing):
+            asyncio.run(service.run_backfill(prices_module.date(2024, 1, 1), prices_module.date(2024, 1, 2),
+                                             ["BTC", "ETH"]))
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    def test_rate_limited_range_fails_without_sleeping(self, service):
+        service.coingecko_http = rate_limited_http()
+        d = prices_module.date
+
+        with patch.object(service, "_check_rate_limit", AsyncMock()), \
+             patch.object(prices_module.asyncio, "sleep", AsyncMock()) as sleep:
+            result = asyncio.run(service.fetch_market_chart_range("bitcoin", d(2024, 1, 1), d(2024, 1, 3)))
+
+        assert result is None
+        sleep.assert_not_awaited()
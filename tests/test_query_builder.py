@@ -0,0 +1,155 @@
+"""
+Unit tests for sargable time-range predicates, index migrations and plan checks
+"""
+
+import os
+import re
+import sys
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.index_migrations import IndexMigration, apply_index_migrations, migration_status
+from shared.query_builder import (
+    PLACEHOLDER_CLEANUP_COLUMNS,
+    date_span_range,
+    day_range,
+    get_registered_queries,
+    hour_range,
+    hourly_prices_query,
+    placeholder_cleanup_query,
+    price_history_query,
+    social_sentiment_by_symbol_hourly_query,
+    social_sentiment_hourly_query,
+    url_hash_probe_query,
+)
+from scripts.verify_query_plans import check_plan
+
+
+@pytest.mark.unit
+class TestRangePredicates:
+    """Test bucket bounds"""
+
+    def test_day_range_is_half_open(self):
+        predicate, params = day_range("timestamp_iso", datetime(2024, 3, 5, 17, 30))
+
+        assert predicate == "timestamp_iso >= %s AND timestamp_iso < %s"
+        assert params == (datetime(2024, 3, 5), datetime(2024, 3, 6))
+
+    def test_hour_range(self):
+        _, params = hour_range("published_at", datetime(2024, 3, 5, 17, 30, 12))
+
+        assert params == (datetime(2024, 3, 5, 17), datetime(2024, 3, 5, 18))
+
+    def test_date_span_includes_the_whole_last_day(self):
+        _, params = date_span_range("timestamp", date(2024, 2, 28), datetime(2024, 3, 1, 9))
+
+        assert params == (datetime(2024, 2, 28), datetime(2024, 3, 2))
+
+    def test_registered_queries_never_wrap_filtered_columns(self):
+        queries = get_registered_queries()
+
+        assert queries
+        for query in queries:
+            where = query.sql.split("WHERE", 1)[1]
+            assert not re.search(r"\b(DATE|HOUR)\(", where), query.name
+            assert query.sql.count("%s") == len(query.params), query.name
+
+    def test_registered_queries_are_the_service_builders(self):
+        queries = {query.name: query.sql for query in get_registered_queries()}
+
+        assert queries["news.url_hash_probe"] == url_hash_probe_query(2)
+        assert queries["technical.get_historical_price_data"] == price_history_query()
+        assert queries["materialized.social_sentiment_span"] == social_sentiment_hourly_query(2)
+        assert url_hash_probe_query(3).count("%s") == 3
+
+    def test_placeholder_cleanup_and_set_based_reads_are_registered(self):
+        queries = {query.name: query.sql for query in get_registered_queries()}
+
+        for table, column in PLACEHOLDER_CLEANUP_COLUMNS.items():
+            assert queries[f"placeholders.cleanup_old_placeholders.{table}"] == placeholder_cleanup_query(table, column)
+        assert queries["materialized.fetch_hourly_prices"] == hourly_prices_query(2)
+        assert queries["materialized.fetch_social_sentiment_by_hour"] == social_sentiment_by_symbol_hourly_query(2)
+        assert {"ohlc", "technical", "onchain"} == {
+            name.rsplit(".", 1)[1] for name in queries if name.startswith("materialized.fetch_latest_per_day.")
+        }
+
+
+@pytest.mark.unit
+class TestIndexMigrations:
+    """Test idempotent index creation"""
+
+    def make_cursor(self, columns, indexes):
+        cursor = MagicMock()
+        results = []
+
+        def execute(sql, params=None):
+            if "DATABASE()" in sql:
+                results.append([("crypto_prices",)])
+            elif "information_schema.COLUMNS" in sql:
+                results.append([(c,) for c in columns])
+            elif "information_schema.STATISTICS" in sql:
+                results.append([(name, col) for name, cols in indexes.items() for col in cols])
+            else:
+                results.append([])
+
+        cursor.execute.side_effect = execute
+        cursor.fetchall.side_effect = lambda: results[-1]
+        cursor.fetchone.side_effect = lambda: results[-1][0]
+        return cursor
+
+    def test_existing_unique_key_prefix_counts_as_covered(self):
+        cursor = self.make_cursor(["symbol", "timestamp_iso"],
+                                  {"unique_symbol_timestamp": ["symbol", "timestamp_iso", "source"]})
+        migration = IndexMigration("onchain_data", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso"))
+
+        assert migration_status(cursor, migration) == "covered"
+
+    def test_pending_index_is_created_once(self):
+        cursor = self.make_cursor(["symbol", "timestamp_iso"], {"PRIMARY": ["id"], "idx_symbol": ["symbol"]})
+        migrations = [
+            IndexMigration("price_data_real", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso")),
+            IndexMigration("price_data_real", "idx_coin", ("coin_symbol",)),
+        ]
+
+        results = apply_index_migrations(cursor, migrations=migrations)
+
+        assert results == {
+            "price_data_real.idx_symbol_timestamp_iso": "created",
+            "price_data_real.idx_coin": "missing_column",
+        }
+        created = [c[0][0] for c in cursor.execute.call_args_list if c[0][0].startswith("CREATE INDEX")]
+        assert created == ["CREATE INDEX idx_symbol_timestamp_iso ON price_data_real (symbol, timestamp_iso)"]
+
+    def test_dry_run_only_reports(self):
+        cursor = self.make_cursor(["symbol", "timestamp_iso"], {})
+        migration = IndexMigration("price_data_real", "idx_symbol_timestamp_iso", ("symbol", "timestamp_iso"))
+
+        assert apply_index_migrations(cursor, dry_run=True, migrations=[migration]) == {
+            "price_data_real.idx_symbol_timestamp_iso": "pending"
+        }
+
+
+@pytest.mark.unit
+class TestPlanCheck:
+    """Test EXPLAIN row classification"""
+
+    def test_range_scan_passes(self):
+        plan = [{"table": "price_data_real", "type": "range", "possible_keys": "idx_symbol_timestamp_iso"}]
+        assert check_plan(plan) == []
+
+    def test_full_scan_without_candidate_index_fails(self):
+        plan = [{"table": "price_data_real", "type": "ALL", "possible_keys": None}]
+        assert len(check_plan(plan)) == 1
+
+    def test_skipped_index_fails_only_when_strict(self):
+        plan = [
+            {"table": "<derived2>", "type": "ALL", "possible_keys": None},
+            {"table": "ohlc_data", "type": "ALL", "possible_keys": "idx_symbol_timestamp_iso"},
+        ]
+        assert check_plan(plan) == []
+        assert len(check_plan(plan, strict=True)) == 1
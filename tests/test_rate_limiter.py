@@ -0,0 +1,169 @@
+"""
+Unit tests for the shared token-bucket rate limiter
+"""
+
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.rate_limiter import (
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    RedisRateLimitBackend,
+    TokenBucketRateLimiter,
+    get_rate_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestInMemoryBackend:
+    """Test bucket arithmetic"""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        backend = InMemoryRateLimitBackend(clock=clock)
+
+        assert [backend.take("api", 1, rate=2.0, capacity=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert backend.take("api", 1, rate=2.0, capacity=3) == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert backend.take("api", 1, rate=2.0, capacity=3) == 0.0
+
+    def test_refill_is_capped_at_capacity(self):
+        clock = FakeClock()
+        backend = InMemoryRateLimitBackend(clock=clock)
+        backend.take("api", 2, rate=1.0, capacity=2)
+
+        clock.now = 100
+        assert backend.take("api", 2, rate=1.0, capacity=2) == 0.0
+        assert backend.take("api", 1, rate=1.0, capacity=2) == pytest.approx(1.0)
+
+    def test_buckets_are_independent(self):
+        backend = InMemoryRateLimitBackend(clock=FakeClock())
+        backend.take("a", 1, rate=1.0, capacity=1)
+
+        assert backend.take("b", 1, rate=1.0, capacity=1) == 0.0
+
+    def test_backend_must_implement_take(self):
+        class NoTake(RateLimitBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            NoTake()
+
+
+@pytest.mark.unit
+class TestTokenBucketRateLimiter:
+    """Test async waiting, ordering and blocking use"""
+
+    def test_waiters_are_served_in_order_without_polling(self):
+        limiter = TokenBucketRateLimiter("api", calls_per_minute=1200, burst=1)  # 20/s
+        backend_take = Mock(wraps=limiter.backend.take)
+        limiter.backend.take = backend_take
+        order = []
+
+        async def worker(i):
+            await limiter.acquire()
+            order.append(i)
+
+        async def scenario():
+            await asyncio.gather(*(worker(i) for i in range(5)))
+
+        started = time.monotonic()
+        asyncio.run(scenario())
+        elapsed = time.monotonic() - started
+
+        assert order == [0, 1, 2, 3, 4]
+        assert 0.15 <= elapsed < 1.0
+        # One attempt per grant plus one per refill wait, not a 100ms poll loop
+        assert backend_take.call_count <= 10
+        assert limiter.get_stats()["granted"] == 5
+
+    def test_timed_out_waiter_does_not_block_others(self):
+        limiter = TokenBucketRateLimiter("api", calls_per_minute=600, burst=1)  # 10/s
+
+        async def scenario():
+            await limiter.acquire()
+            with pytest.raises(asyncio.TimeoutError):
+                await limiter.acquire(timeout=0.01)
+            await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+        asyncio.run(scenario())
+        assert limiter.get_stats()["waiting"] == 0
+
+    def test_usable_from_successive_event_loops(self):
+        limiter = TokenBucketRateLimiter("api", calls_per_minute=6000, burst=1)
+
+        asyncio.run(limiter.acquire())
+        asyncio.run(limiter.acquire())
+
+        assert limiter.get_stats()["granted"] == 2
+
+    def test_try_and_blocking_acquire(self):
+        limiter = TokenBucketRateLimiter("api", calls_per_minute=600, burst=2)
+
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        assert not limiter.acquire_blocking(timeout=0.01)
+        assert limiter.acquire_blocking(timeout=1)
+
+    def test_request_larger_than_burst_is_rejected(self):
+        limiter = TokenBucketRateLimiter("api", calls_per_minute=60, burst=2)
+
+        with pytest.raises(ValueError):
+            limiter.try_acquire(3)
+
+
+@pytest.mark.unit
+class TestRedisBackend:
+    """Test the shared-state backend against fake clients"""
+
+    def test_sync_client_receives_prefixed_key(self):
+        client = Mock()
+        client.eval.return_value = "0.25"
+        backend = RedisRateLimitBackend(client, key_prefix="limits")
+
+        assert backend.take("coingecko_premium", 1, rate=8.0, capacity=10) == 0.25
+        args = client.eval.call_args[0]
+        assert args[1:] == (1, "limits:coingecko_premium", 8.0, 10, 1)
+
+    def test_async_client_is_awaited(self):
+        client = Mock()
+        client.eval = AsyncMock(return_value="0")
+        backend = RedisRateLimitBackend(client)
+
+        assert asyncio.run(backend.take_async("api", 1, rate=1.0, capacity=1)) == 0.0
+        client.eval.assert_awaited_once()
+
+    def test_unreachable_redis_falls_back_to_local_bucket(self):
+        client = Mock()
+        client.eval.side_effect = ConnectionError("down")
+        backend = RedisRateLimitBackend(client)
+
+        assert backend.take("api", 1, rate=1.0, capacity=1) == 0.0
+        assert backend.take("api", 1, rate=1.0, capacity=1) > 0
+
+
+@pytest.mark.unit
+def test_provider_limiters_come_from_rate_limits():
+    limiter = get_rate_limiter("coingecko_premium")
+
+    assert limiter is get_rate_limiter("coingecko_premium")
+    assert limiter.calls_per_minute == 500
+    assert limiter.capacity == 10
@@ -0,0 +1,271 @@
+"""
+Unit tests for the set-based ml_features_materialized update path
+"""
+
+import importlib.util
+import os
+import sys
+import types
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.benchmarks.mysql_standin import MySQLStandIn
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'archive', 'src', 'docker', 'materialized_updater',
+    'realtime_materialized_updater.py'
+)
+
+ML_FIELDS = [
+    "risk_parity_signal", "momentum_factor", "carry_trade_signal", "flight_to_quality",
+    "macro_surprise_index", "sentiment_regime", "liquidity_stress", "volatility_term_structure",
+    "regime_transition_prob", "systemic_risk_indicator", "ml_confidence_score",
+]
+
+# Every column the row path's INSERT names, i.e. the columns both paths can write
+FEATURE_COLUMNS = [
+    "timestamp_iso", "current_price", "volume_24h", "hourly_volume", "market_cap",
+    "price_change_24h", "price_change_percentage_24h",
+    "open_price", "high_price", "low_price", "close_price", "ohlc_volume", "ohlc_source",
+    "rsi_14", "sma_20", "sma_50", "ema_12", "ema_26", "macd", "macd_signal", "macd_histogram",
+    "bb_upper", "bb_middle", "bb_lower", "stoch_k", "stoch_d", "atr_14", "vwap",
+    "vix", "spx", "dxy", "tnx", "fed_funds_rate",
+    "crypto_sentiment_count", "avg_cryptobert_score", "avg_vader_score", "avg_textblob_score",
+    "avg_crypto_keywords_score", "stock_sentiment_count", "avg_finbert_sentiment_score",
+    "avg_fear_greed_score", "avg_volatility_sentiment", "avg_risk_appetite", "avg_crypto_correlation",
+    "general_crypto_sentiment_count", "avg_general_cryptobert_score", "avg_general_vader_score",
+    "avg_general_textblob_score", "avg_general_crypto_keywords_score",
+    "social_post_count", "social_avg_sentiment", "social_weighted_sentiment",
+    "social_engagement_weighted_sentiment", "social_verified_user_sentiment",
+    "social_total_engagement", "social_unique_authors", "social_avg_confidence",
+    "data_quality_score",
+] + ML_FIELDS
+
+DAY = date(2025, 1, 2)
+
+
+class FakeMLCalculator:
+    def __init__(self, config=None):
+        pass
+
+    def calculate_advanced_ml_indicators(self, symbol, timestamp_iso, record):
+        return {field: round(0.01 * (i + 1), 4) for i, field in enumerate(ML_FIELDS)}
+
+    def get_default_ml_indicators(self):
+        return {field: None for field in ML_FIELDS}
+
+
+@pytest.fixture(scope="module")
+def updater_module():
+    """Import the archived service without a database or the external ML package"""
+    ml_module = types.ModuleType("enhanced_ml_calculations")
+    ml_module.AdvancedMLCalculator = FakeMLCalculator
+    spec = importlib.util.spec_from_file_location("realtime_materialized_updater", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, {"enhanced_ml_calculations": ml_module}), \
+            patch("mysql.connector.connect", side_effect=Exception("no database in unit tests")):
+        spec.loader.exec_module(module)
+    return module
+
+
+def make_updater(module, feature_columns=None, insert_only=False):
+    updater = module.RealTimeMaterializedTableUpdater.__new__(module.RealTimeMaterializedTableUpdater)
+    updater.processing_stats = {"total_processed": 0, "total_inserted": 0, "total_updated": 0,
+                                "total_upserted": 0}
+    updater.ml_calculator = FakeMLCalculator()
+    updater._feature_columns = set(feature_columns or FEATURE_COLUMNS) | {"symbol", "price_date", "price_hour"}
+    updater.insert_only = insert_only
+    return updater
+
+
+class RecordingCursor:
+    def __init__(self, rows=None):
+        self.statements = []
+        self.rows = rows or []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.statements.append((" ".join(sql.split()), list(params)))
+        self.rowcount = 1
+
+    def fetchall(self):
+        return self.rows
+
+
+def price_row(symbol, hour, price, prev=None):
+    return {
+        "symbol": symbol, "timestamp_iso": datetime.combine(DAY, datetime.min.time()) + timedelta(hours=hour, minutes=55),
+        "price_date": DAY, "price_hour": hour, "current_price": price, "volume_usd_24h": 1000.0,
+        "market_cap": price * 100, "price_change_24h": None, "price_change_percentage_24h": None,
+        "price_24h_ago": prev,
+    }
+
+
+def sources():
+    return {
+        "ohlc": {("BTC", DAY): {"open_price": 99.0, "high_price": 102.0, "low_price": 98.0, "close_price": 101.0,
+                                "ohlc_volume": 5.0, "ohlc_source": "fixture"}},
+        "technical": {("BTC", DAY): {"rsi_14": 55.0, "sma_20": 100.0, "ema_12": 100.5, "macd": 0.4}},
+        "onchain": {},
+        "macro_dates": [DAY - timedelta(days=3)],
+        "macro": {DAY - timedelta(days=3): {"vix": 14.0, "dxy": 103.0}},
+        "sentiment": {
+            "coin": {("BTC", DAY, 10): {"sentiment_count": 3, "avg_cryptobert_score": 0.2}},
+            "general": {},
+            "stock": {(DAY, 10): {"sentiment_count": 2, "avg_finbert_sentiment_score": -0.1}},
+            "social": {("BTC", DAY, 10): {"social_post_count": 7, "social_avg_sentiment": 0.3,
+                                           "social_avg_confidence": 0.8, "social_unique_authors": 4}},
+        },
+    }
+
+
+@pytest.mark.unit
+class TestSetBasedSql:
+    """Test the generated range queries and multi-row upserts"""
+
+    def test_upsert_columns_clauses_and_params(self, updater_module):
+        updater = make_updater(updater_module, feature_columns=["current_price", "social_post_count", "open_price"])
+        cursor = RecordingCursor()
+        records = [
+            {"symbol": "BTC", "price_date": DAY, "price_hour": 1, "current_price": 1.0, "open_price": 0.9,
+             "social_post_count": 2, "not_a_column": "x"},
+            {"symbol": "ETH", "price_date": DAY, "price_hour": 1, "current_price": 2.0},
+            {"symbol": "SOL", "price_date": DAY, "price_hour": 1, "social_post_count": 0},
+        ]
+
+        with patch.object(updater_module, "UPSERT_BATCH_SIZE", 2):
+            updater.upsert_feature_records(cursor, records)
+
+        (first_sql, first_params), (second_sql, second_params) = cursor.statements
+        columns = "symbol, price_date, price_hour, current_price, open_price, social_post_count"
+        assert first_sql.startswith(f"INSERT INTO ml_features_materialized ({columns}) VALUES (%s, %s, %s, %s, %s, %s), (")
+        assert first_sql.count("(%s, %s, %s, %s, %s, %s)") == 2
+        assert second_sql.count("(%s, %s, %s, %s, %s, %s)") == 1
+        assert first_sql.endswith(
+            "ON DUPLICATE KEY UPDATE current_price = COALESCE(current_price, VALUES(current_price)), "
+            "open_price = COALESCE(VALUES(open_price), open_price), social_post_count = VALUES(social_post_count)"
+        )
+        assert first_params == ["BTC", DAY, 1, 1.0, 0.9, 2, "ETH", DAY, 1, 2.0, None, None]
+        assert second_params == ["SOL", DAY, 1, None, None, 0]
+        assert updater.processing_stats["total_upserted"] == 3
+
+    def test_insert_only_leaves_existing_rows(self, updater_module):
+        updater = make_updater(updater_module, insert_only=True)
+        cursor = RecordingCursor()
+
+        updater.upsert_feature_records(cursor, [{"symbol": "BTC", "price_date": DAY, "price_hour": 0}])
+
+        (sql, _), = cursor.statements
+        assert sql.endswith("ON DUPLICATE KEY UPDATE symbol = symbol")
+        assert updater.upsert_feature_records(cursor, []) == 0
+        assert len(cursor.statements) == 1
+
+    def test_hourly_prices_reads_one_extra_day_for_the_24h_join(self, updater_module):
+        updater = make_updater(updater_module)
+        cursor = RecordingCursor()
+        start, end = datetime(2025, 1, 2), datetime(2025, 1, 3)
+
+        updater.fetch_hourly_prices(cursor, ["BTC", "ETH"], start, end)
+
+        (sql, params), = cursor.statements
+        assert "WHERE symbol IN (%s,%s)" in sql
+        assert "prev.price_date = cur.price_date - INTERVAL 1 DAY" in sql
+        assert params == ["BTC", "ETH", datetime(2025, 1, 1), end, start]
+
+    def test_social_sentiment_maps_aliases_in_sql(self, updater_module):
+        updater = make_updater(updater_module)
+        cursor = RecordingCursor()
+        start, end = datetime(2025, 1, 2), datetime(2025, 1, 3)
+
+        updater.fetch_sentiment_by_hour(cursor, ["BTC"], start, end, {"btc": "BTC", "bitcoin": "BTC"})
+
+        coin, stock, (social_sql, social_params) = cursor.statements
+        assert coin[1] == [start, end, "BTC", "crypto_general"]
+        assert stock[1] == [start, end]
+        assert "CASE LOWER(asset) WHEN %s THEN %s WHEN %s THEN %s END AS symbol" in social_sql
+        assert "AND LOWER(asset) IN (%s,%s)" in social_sql
+        assert social_params == ["btc", "BTC", "bitcoin", "BTC", start, end, "btc", "bitcoin"]
+
+    def test_build_feature_record_merges_sources(self, updater_module):
+        updater = make_updater(updater_module)
+
+        record = updater.build_feature_record(price_row("BTC", 10, 110.0, prev=100.0), sources())
+
+        assert record["price_change_24h"] == 10.0
+        assert record["price_change_percentage_24h"] == 10.0
+        assert record["close_price"] == 101.0 and record["ohlc_source"] == "fixture"
+        assert record["macd"] == record["macd_line"] == 0.4
+        # Macro values are carried forward from the latest date on or before the row
+        assert record["vix"] == 14.0
+        assert record["crypto_sentiment_count"] == 3
+        assert record["stock_sentiment_count"] == 2
+        assert record["social_unique_authors"] == 4
+        assert record["data_quality_score"] == 100
+
+
+def create_features_table(standin):
+    conn = standin.connect()
+    cursor = conn.cursor()
+    columns = ", ".join(f"{column} DOUBLE" for column in FEATURE_COLUMNS if column != "timestamp_iso")
+    cursor.execute(
+        "CREATE TABLE ml_features_materialized (id BIGINT AUTO_INCREMENT PRIMARY KEY, symbol VARCHAR(20), "
+        f"price_date DATE, price_hour INT, timestamp_iso DATETIME, {columns}, "
+        "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+        "UNIQUE KEY unique_symbol_date_hour (symbol, price_date, price_hour))"
+    )
+    # An existing row: some gaps to fill, stale social and OHLC values to overwrite
+    cursor.execute(
+        "INSERT INTO ml_features_materialized (symbol, price_date, price_hour, current_price, rsi_14, "
+        "open_price, social_post_count, crypto_sentiment_count, stock_sentiment_count) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+        ("BTC", DAY, 10, 109.0, None, 50.0, 1, 0, 0),
+    )
+    conn.commit()
+    return conn
+
+
+def table_contents(conn):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT * FROM ml_features_materialized ORDER BY symbol, price_hour")
+    return [{k: v for k, v in row.items() if k not in ("id", "updated_at")} for row in cursor.fetchall()]
+
+
+@pytest.mark.unit
+class TestSetRowEquivalence:
+    """The set-based upsert leaves the table as the per-record path does"""
+
+    def test_same_rows_after_insert_and_update(self, updater_module):
+        updater = make_updater(updater_module)
+        rows = [price_row("BTC", 10, 110.0, prev=100.0), price_row("BTC", 11, 111.0),
+                price_row("ETH", 10, 10.0, prev=9.5)]
+        records = [updater.build_feature_record(row, sources()) for row in rows]
+
+        row_db, set_db = MySQLStandIn(), MySQLStandIn()
+        try:
+            row_conn, set_conn = create_features_table(row_db), create_features_table(set_db)
+
+            cursor = row_conn.cursor(dictionary=True, buffered=True)
+            outcomes = [updater.insert_or_update_record(dict(record), row_conn, cursor) for record in records]
+            row_conn.commit()
+
+            updater.upsert_feature_records(set_conn.cursor(), [dict(record) for record in records])
+            set_conn.commit()
+
+            assert outcomes == ["UPDATED", "INSERTED", "INSERTED"]
+            row_rows, set_rows = table_contents(row_conn), table_contents(set_conn)
+            assert len(row_rows) == 3
+            assert set_rows == row_rows
+
+            existing = row_rows[0]
+            assert existing["current_price"] == 109.0      # filled only when missing
+            assert existing["rsi_14"] == 55.0              # gap filled
+            assert existing["open_price"] == 99.0          # OHLC overwritten
+            assert existing["social_post_count"] == 7      # social overwritten
+        finally:
+            row_db.close()
+            set_db.close()
@@ -0,0 +1,171 @@
+"""
+Unit tests for the crypto_assets symbol registry
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.symbol_registry import SymbolRegistry
+
+ROWS = [
+    {"symbol": "BTC", "name": "Bitcoin", "coingecko_id": "bitcoin", "aliases": '["btc", "xbt"]',
+     "market_cap_rank": 1, "is_active": 1, "coinbase_supported": 1, "binance_us_supported": 1},
+    {"symbol": "ETH", "name": "Ethereum", "coingecko_id": "ethereum", "aliases": None,
+     "market_cap_rank": 2, "is_active": 1, "coinbase_supported": 1, "binance_us_supported": 0},
+    {"symbol": "NEWT", "name": "Newt", "coingecko_id": None, "aliases": None,
+     "market_cap_rank": None, "is_active": 1, "coinbase_supported": 0, "binance_us_supported": 0},
+    {"symbol": "LUNA", "name": "Terra", "coingecko_id": "terra-luna", "aliases": '["luna"]',
+     "market_cap_rank": 150, "is_active": 0, "coinbase_supported": 1, "binance_us_supported": 0},
+]
+
+
+class FakeCursor:
+    def __init__(self, db, dictionary=False):
+        self.db = db
+        self.dictionary = dictionary
+        self.result = []
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(sql.strip())
+        if sql.startswith("CHECKSUM"):
+            self.result = [("crypto_prices.crypto_assets", self.db.checksum)]
+        else:
+            self.result = [dict(row) for row in self.db.rows]
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    """Serves crypto_assets rows and a settable table checksum"""
+
+    def __init__(self, rows, checksum=1):
+        self.rows = rows
+        self.checksum = checksum
+        self.statements = []
+        self.fail = False
+
+    def connect(self):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self, dictionary)
+
+    def close(self):
+        pass
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_registry(db, clock=None):
+    return SymbolRegistry(connect=db.connect, refresh_seconds=3600, retry_seconds=60, clock=clock or Clock())
+
+
+@pytest.mark.unit
+class TestSymbolRegistryLookups:
+    """Test lookups served from the preloaded snapshot"""
+
+    def test_one_load_serves_every_lookup(self):
+        db = FakeDatabase(ROWS)
+        registry = make_registry(db)
+
+        assert registry.coingecko_id("BTC") == "bitcoin"
+        assert registry.coingecko_id("eth") == "ethereum"
+        assert registry.coingecko_id("Bitcoin") == "bitcoin"
+        assert registry.coingecko_id("xbt") == "bitcoin"
+        assert registry.coingecko_id("NEWT") is None
+        assert registry.coingecko_id("UNKNOWN") is None
+        assert registry.coingecko_ids(["BTC", "ETH"]) == {"BTC": "bitcoin", "ETH": "ethereum"}
+
+        assert db.statements == ["CHECKSUM TABLE crypto_assets", "SELECT * FROM crypto_assets"]
+
+    def test_existence_and_metadata_only_cover_active_assets(self):
+        registry = make_registry(FakeDatabase(ROWS))
+
+        assert registry.exists("BTC")
+        assert not registry.exists("LUNA")
+        assert registry.metadata("ETH")["name"] == "Ethereum"
+        assert registry.metadata("LUNA") == {}
+        assert registry.get("BTC").supported_on("binance_us")
+
+    def test_collector_symbols_follow_table_config_rules(self):
+        registry = make_registry(FakeDatabase(ROWS))
+
+        # NULL market_cap_rank sorts first, as in MySQL
+        assert registry.collector_symbols("all") == ["NEWT", "BTC", "ETH"]
+        assert registry.collector_symbols("price") == ["BTC", "ETH"]
+        assert registry.collector_symbols("onchain") == ["BTC", "ETH"]
+        assert registry.exchange_symbols("coinbase") == {"BTC-USD": "BTC", "ETH-USD": "ETH"}
+        assert registry.exchange_symbols("binance")["BTCUSDT"] == "BTC"
+
+
+@pytest.mark.unit
+class TestSymbolRegistryRefresh:
+    """Test TTL version checks and atomic snapshot replacement"""
+
+    def test_unchanged_version_keeps_snapshot(self):
+        db = FakeDatabase(ROWS)
+        clock = Clock()
+        registry = make_registry(db, clock)
+        first = registry.snapshot()
+
+        clock.now = 3599
+        assert registry.snapshot() is first
+        clock.now = 3600
+        assert registry.snapshot() is first
+        assert db.statements.count("SELECT * FROM crypto_assets") == 1
+        assert registry.stats["unchanged"] == 1
+
+    def test_changed_version_swaps_snapshot(self):
+        db = FakeDatabase(ROWS)
+        clock = Clock()
+        registry = make_registry(db, clock)
+        first = registry.snapshot()
+
+        db.rows = ROWS + [{"symbol": "SOL", "name": "Solana", "coingecko_id": "solana",
+                           "market_cap_rank": 5, "is_active": 1, "coinbase_supported": 1}]
+        db.checksum = 2
+        clock.now = 3600
+
+        assert registry.coingecko_id("SOL") == "solana"
+        assert first.get("SOL") is None
+        assert registry.stats["loads"] == 2
+
+    def test_failed_refresh_keeps_last_snapshot(self):
+        db = FakeDatabase(ROWS)
+        clock = Clock()
+        registry = make_registry(db, clock)
+        registry.preload()
+
+        db.fail = True
+        clock.now = 3600
+        assert registry.coingecko_id("BTC") == "bitcoin"
+        assert registry.stats["load_errors"] == 1
+
+        # Retried after retry_seconds, not on every lookup
+        clock.now = 3630
+        registry.coingecko_id("ETH")
+        assert registry.stats["load_errors"] == 1
+        db.fail = False
+        clock.now = 3660
+        registry.coingecko_id("ETH")
+        assert registry.stats["version_checks"] == 2
@@ -0,0 +1,235 @@
+"""
+Unit tests for the technical indicators historical recompute mode
+"""
+
+import importlib.util
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'technical-collection', 'enhanced_technical_indicators_collector.py'
+)
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def technical_module():
+    spec = importlib.util.spec_from_file_location("enhanced_technical_indicators_recompute", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_prices(count, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    return [(START + timedelta(minutes=5 * i), float(close)) for i, close in enumerate(closes)]
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, sql, params=()):
+        db = self.db
+        if "CREATE TABLE" in sql:
+            self.result = []
+        elif "INSERT INTO technical_recompute_checkpoints" in sql:
+            db.checkpoints[params[0]] = tuple(params[1:])
+        elif "FROM technical_recompute_checkpoints" in sql:
+            self.result = [db.checkpoints[params[0]]] if params[0] in db.checkpoints else []
+        elif "INSERT INTO technical_indicators" in sql:
+            width = 2 + len(db.columns)
+            for i in range(0, len(params), width):
+                values = params[i:i + width]
+                db.indicators[values[1]] = dict(zip(db.columns, values[2:]))
+                db.writes.append(values[1])
+        elif "FROM technical_indicators" in sql:
+            _, first, last = params
+            self.result = [
+                (ts, *(row[c] for c in db.columns))
+                for ts, row in db.indicators.items() if first <= ts <= last
+            ]
+        elif "DESC" in sql:
+            _, before, limit = params
+            self.result = [p for p in db.prices if p[0] < before][-limit:][::-1]
+        else:
+            _, bound, end, limit = params
+            after = (lambda ts: ts >= bound) if ">= %s AND timestamp_iso <" in sql else (lambda ts: ts > bound)
+            self.result = [p for p in db.prices if after(p[0]) and p[0] < end][:limit]
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    """price_data_real, technical_indicators and checkpoint rows for one symbol"""
+
+    def __init__(self, prices, columns):
+        self.prices = prices
+        self.columns = columns
+        self.indicators = {}
+        self.checkpoints = {}
+        self.writes = []
+
+    def connect(self):
+        return self
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_collector(module, db):
+    with patch.object(module.TechnicalIndicatorsCollector, "_load_symbols_from_database"):
+        collector = module.TechnicalIndicatorsCollector(start_scheduler=False)
+    collector.symbols = ["BTC"]
+    collector.get_db_connection = db.connect
+    return collector
+
+
+def assert_rows_match(module, stored, expected):
+    for column, key in module.INDICATOR_COLUMNS.items():
+        if expected[key] is None:
+            assert stored[column] is None, column
+        else:
+            assert math.isclose(stored[column], expected[key], rel_tol=1e-8, abs_tol=1e-6), column
+
+
+@pytest.mark.unit
+class TestIndicatorRows:
+    """Test the vectorized per-timestamp indicator rows"""
+
+    def test_latest_row_matches_engine(self, technical_module):
+        prices = make_prices(120)
+        collector = make_collector(technical_module, FakeDatabase([], []))
+        rows = technical_module.technical_indicator_rows(
+            "BTC", [p[0] for p in prices], [p[1] for p in prices], collector.indicator_engine
+        )
+
+        assert len(rows) == 120 - technical_module.MIN_INDICATOR_PRICES + 1
+        assert rows[0]['sma_50'] is None and rows[0]['sma_20'] is not None
+        latest = collector.indicator_engine.compute_latest([{"close": p[1]} for p in prices])
+        assert rows[-1]['macd'] == round(latest['macd_line'], 6)
+        assert rows[-1]['rsi_14'] == round(latest['rsi_14'], 6)
+
+
+@pytest.mark.unit
+class TestHistoricalRecompute:
+    """Test chunked recompute with warm-up, stale detection and checkpoints"""
+
+    def test_chunked_recompute_matches_full_pass(self, technical_module):
+        prices = make_prices(900)
+        db = FakeDatabase(prices, list(technical_module.INDICATOR_COLUMNS))
+        collector = make_collector(technical_module, db)
+
+        totals = collector.recompute_symbol_history("BTC", START, START + timedelta(days=30),
+                                                    chunk_rows=200, warmup_rows=300)
+
+        expected = technical_module.technical_indicator_rows(
+            "BTC", [p[0] for p in prices], [p[1] for p in prices], collector.indicator_engine
+        )
+        assert totals['prices_read'] == 900
+        assert totals['chunks'] == 5
+        assert len(db.indicators) == len(expected)
+        for row in expected:
+            assert_rows_match(technical_module, db.indicators[row['timestamp_iso']], row)
+
+    def test_only_missing_and_stale_rows_are_written(self, technical_module):
+        prices = make_prices(200)
+        db = FakeDatabase(prices, list(technical_module.INDICATOR_COLUMNS))
+        collector = make_collector(technical_module, db)
+        collector.recompute_symbol_history("BTC", START, START + timedelta(days=30))
+
+        stale_ts, missing_ts = prices[50][0], prices[120][0]
+        db.indicators[stale_ts]['rsi_14'] = 1.0
+        del db.indicators[missing_ts]
+        db.writes.clear()
+        db.checkpoints.clear()
+
+        totals = collector.recompute_symbol_history("BTC", START, START + timedelta(days=30))
+        assert sorted(db.writes) == [stale_ts, missing_ts]
+        assert totals['rows_current'] == len(db.indicators) - 2
+
+    def test_rerun_resumes_from_checkpoint(self, technical_module):
+        prices = make_prices(300)
+        db = FakeDatabase(prices[:200], list(technical_module.INDICATOR_COLUMNS))
+        collector = make_collector(technical_module, db)
+        collector.recompute_symbol_history("BTC", START, START + timedelta(days=30), chunk_rows=80)
+        assert db.checkpoints["BTC"] == (START, START + timedelta(days=30), prices[199][0])
+
+        db.prices = prices
+        db.writes.clear()
+        totals = collector.recompute_symbol_history("BTC", START, START + timedelta(days=30), chunk_rows=80)
+
+        assert totals['prices_read'] == 100
+        assert db.writes == [p[0] for p in prices[200:]]
+
+    def test_checkpoint_for_another_range_end_is_ignored(self, technical_module):
+        prices = make_prices(200)
+        db = FakeDatabase(prices, list(technical_module.INDICATOR_COLUMNS))
+        collector = make_collector(technical_module, db)
+        collector.recompute_symbol_history("BTC", START, START + timedelta(days=30))
+
+        totals = collector.recompute_symbol_history("BTC", START, START + timedelta(days=31))
+
+        assert totals['prices_read'] == 200
+        assert db.checkpoints["BTC"][1] == START + timedelta(days=31)
+
+    def test_intensive_backfill_range_is_hour_aligned(self, technical_module):
+        collector = make_collector(technical_module, FakeDatabase([], []))
+        ranges = []
+
+        def recompute(symbol, start, end):
+            ranges.append((start, end))
+            return {'prices_read': 0, 'rows_written': 0, 'rows_current': 0, 'chunks': 0}
+
+        collector.recompute_symbol_history = recompute
+        collector._intensive_backfill(6)
+        collector._intensive_backfill(6)
+
+        (start, end), retry = ranges
+        assert retry == (start, end)
+        assert start.minute == start.second == start.microsecond == 0
+        assert end - start == timedelta(hours=7)
+
+    def test_recompute_history_runs_symbols_in_parallel(self, technical_module):
+        collector = make_collector(technical_module, FakeDatabase([], []))
+        calls = []
+
+        def recompute(symbol, start, end):
+            calls.append(symbol)
+            if symbol == "BAD":
+                raise RuntimeError("boom")
+            return {'prices_read': 10, 'rows_written': 4, 'rows_current': 6, 'chunks': 1}
+
+        collector.recompute_symbol_history = recompute
+        result = collector.recompute_history(START, START + timedelta(days=1), symbols=["BTC", "ETH", "BAD"], workers=3)
+
+        assert sorted(calls) == ["BAD", "BTC", "ETH"]
+        assert result['rows_written'] == 8
+        assert result['errors'] == 1
+        assert result['status'] == 'partial'
+        assert collector.stats['history_rows_written'] == 8
@@ -0,0 +1,106 @@
+"""
+Unit tests for streaming performance telemetry
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Add the project root to the path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.telemetry import DecayingRate, LogHistogram, PerformanceTelemetry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestLogHistogram:
+    """Test fixed-memory quantiles"""
+
+    def test_quantiles_within_bucket_error(self):
+        values = np.random.default_rng(11).lognormal(mean=-3, sigma=1.5, size=50000)
+        histogram = LogHistogram(growth=1.05)
+        buckets = len(histogram.counts)
+        for value in values:
+            histogram.record(float(value))
+
+        assert len(histogram.counts) == buckets
+        assert histogram.count == 50000
+        for q in (0.5, 0.95, 0.99):
+            exact = float(np.quantile(values, q))
+            assert histogram.quantile(q) == pytest.approx(exact, rel=0.05)
+        assert histogram.mean == pytest.approx(values.mean())
+        assert histogram.max == values.max()
+
+    def test_out_of_range_values_are_clamped(self):
+        histogram = LogHistogram(min_value=0.001, max_value=10)
+        histogram.record(0.0)
+        histogram.record(1e6)
+
+        assert histogram.quantile(0.0) == pytest.approx(0.001, rel=0.05)
+        assert histogram.quantile(1.0) == 1e6
+        assert (histogram.min, histogram.max) == (0.0, 1e6)
+        assert histogram.quantile(0.5) is not None
+        assert LogHistogram().quantile(0.5) is None
+
+
+@pytest.mark.unit
+class TestDecayingRate:
+    """Test exponentially decayed rates"""
+
+    def test_rate_tracks_recent_events_and_decays(self):
+        clock = Clock()
+        rate = DecayingRate(tau_seconds=60, clock=clock)
+        for _ in range(600):
+            clock.now += 1
+            rate.mark()
+
+        assert rate.rate() == pytest.approx(1.0, rel=0.01)
+        clock.now += 60
+        assert rate.rate() == pytest.approx(np.exp(-1), rel=0.01)
+
+
+@pytest.mark.unit
+class TestPerformanceTelemetry:
+    """Test per-operation summaries and Prometheus observation"""
+
+    def test_summary_per_operation(self):
+        histogram = MagicMock()
+        telemetry = PerformanceTelemetry(prometheus_histogram=histogram, clock=Clock())
+        for ms in range(1, 101):
+            telemetry.record('db', ms / 1000)
+        telemetry.record('collection', 2.0, success=False)
+
+        summary = telemetry.summary()
+        assert summary['db']['count'] == 100
+        assert summary['db']['p50_seconds'] == pytest.approx(0.05, rel=0.05)
+        assert summary['db']['p99_seconds'] == pytest.approx(0.099, rel=0.05)
+        assert summary['collection']['errors'] == 1
+        assert histogram.labels.call_count == 101
+        histogram.labels.assert_called_with(operation='collection')
+        histogram.labels.return_value.observe.assert_called_with(2.0)
+
+    def test_timer_records_failures_and_operations_are_bounded(self):
+        telemetry = PerformanceTelemetry(max_operations=2)
+        with telemetry.timer('api'):
+            pass
+        with pytest.raises(ValueError):
+            with telemetry.timer('api'):
+                raise ValueError("boom")
+        telemetry.record('db', 0.01)
+        telemetry.record('extra', 0.01)
+
+        assert telemetry.operation('api')['count'] == 2
+        assert telemetry.operation('api')['errors'] == 1
+        assert set(telemetry.summary()) == {'api', 'db'}
+        assert telemetry.dropped == 1